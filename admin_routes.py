@@ -15,6 +15,9 @@ from routes import login_required
 # Importar a função de processamento de edição de registros
 from operations.registros import processar_edicao_registro
 
+# Paginação por cursor das listagens
+from utils.paginacao import paginar_keyset, contar_com_cache
+
 # Importar funções de debug
 try:
     from admin_debug import logger as debug_logger, log_db_query, log_db_result, log_db_schema, log_db_tables
@@ -41,11 +44,10 @@ logger = logging.getLogger('admin_routes')
 # Criar o Blueprint para as rotas de administração
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-# Função para obter conexão com o banco de dados
-def get_db_connection():
-    conn = sqlite3.connect('usuarios.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+# Conexões vêm do pool compartilhado em models.database
+from models.database import get_db_connection, get_pool_stats
+from models.historico_json import estatisticas_cache_historico
+from models.schema import get_schema
 
 # Decorator para verificar se o usuário está autenticado e é administrador
 def admin_required(f):
@@ -100,8 +102,7 @@ def log_admin_action(usuario, acao, detalhes):
             cursor = conn.cursor()
             
             # Verificar se a tabela log_atividades existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='log_atividades'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('log_atividades'):
                 # Usar a tabela unificada
                 data_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
                 cursor.execute("""
@@ -195,10 +196,7 @@ def admin_dashboard():
                 total_gr = 0
             
             # Verificar se a tabela solicitacoes_senha existe
-            query = "SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_senha'"
-            log_db_query(query)
-            cursor.execute(query)
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_senha'):
                 # Obter solicitações pendentes
                 query = "SELECT COUNT(*) FROM solicitacoes_senha WHERE status = 'pendente'"
                 log_db_query(query)
@@ -214,10 +212,7 @@ def admin_dashboard():
                 solicitacoes_senha = 0
             
             # Verificar se a tabela solicitacoes_registro existe
-            query = "SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_registro'"
-            log_db_query(query)
-            cursor.execute(query)
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_registro'):
                 query = "SELECT COUNT(*) FROM solicitacoes_registro WHERE status = 'pendente'"
                 log_db_query(query)
                 try:
@@ -232,19 +227,13 @@ def admin_dashboard():
                 solicitacoes_registro = 0
             
             # Verificar se a tabela logs existe
-            query = "SELECT name FROM sqlite_master WHERE type='table' AND name='logs'"
-            log_db_query(query)
-            cursor.execute(query)
-            if cursor.fetchone():
+            if get_schema().tem_tabela('logs'):
                 # Verificar as colunas disponíveis na tabela logs
                 if DEBUG_ENABLED:
                     log_db_schema(conn, 'logs')
                 
                 # Verificar se a tabela usuarios existe para o JOIN
-                query = "SELECT name FROM sqlite_master WHERE type='table' AND name='usuarios'"
-                log_db_query(query)
-                cursor.execute(query)
-                if cursor.fetchone():
+                if get_schema().tem_tabela('usuarios'):
                     # Obter atividade recente (logs)
                     try:
                         query = """
@@ -278,10 +267,7 @@ def admin_dashboard():
                 logs_recentes = []
             
             # Verificar se a tabela registros existe
-            query = "SELECT name FROM sqlite_master WHERE type='table' AND name='registros'"
-            log_db_query(query)
-            cursor.execute(query)
-            if cursor.fetchone():
+            if get_schema().tem_tabela('registros'):
                 # Verificar as colunas disponíveis na tabela registros
                 if DEBUG_ENABLED:
                     colunas_registros = log_db_schema(conn, 'registros')
@@ -299,7 +285,7 @@ def admin_dashboard():
                     total_registros = 0
                 
                 try:
-                    query = "SELECT COUNT(*) FROM registros WHERE data_registro >= date('now', '-7 days') AND excluido = 0"
+                    query = "SELECT COUNT(*) FROM registros WHERE data_registro_iso >= date('now', 'localtime', '-7 days') AND excluido = 0"
                     log_db_query(query)
                     cursor.execute(query)
                     registros_ultima_semana = cursor.fetchone()[0]
@@ -309,15 +295,12 @@ def admin_dashboard():
                     registros_ultima_semana = 0
                 
                 # Verificar se a coluna data_modificacao existe
-                query = "PRAGMA table_info(registros)"
-                log_db_query(query)
-                cursor.execute(query)
-                colunas = cursor.fetchall()
-                tem_data_modificacao = any(col[1] == 'data_modificacao' for col in colunas)
+                schema = get_schema()
+                tem_data_modificacao = schema.tem_coluna('registros', 'data_modificacao')
                 
                 if tem_data_modificacao:
                     try:
-                        query = "SELECT COUNT(*) FROM registros WHERE data_modificacao >= datetime('now', '-7 days') AND excluido = 0"
+                        query = "SELECT COUNT(*) FROM registros WHERE data_modificacao_iso >= datetime('now', 'localtime', '-7 days') AND excluido = 0"
                         log_db_query(query)
                         cursor.execute(query)
                         registros_atualizados = cursor.fetchone()[0]
@@ -330,7 +313,7 @@ def admin_dashboard():
                     registros_atualizados = registros_ultima_semana  # Usar registros da última semana como aproximação
                 
                 # Verificar se a coluna alteracoes_verificadas existe
-                tem_alteracoes_verificadas = any(col[1] == 'alteracoes_verificadas' for col in colunas)
+                tem_alteracoes_verificadas = schema.tem_coluna('registros', 'alteracoes_verificadas')
                 
                 if tem_alteracoes_verificadas:
                     try:
@@ -455,15 +438,13 @@ def usuarios():
             total_pendentes = 0
             
             # Verificar se a tabela de solicitações de registro existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_registro'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_registro'):
                 cursor.execute("SELECT COUNT(*) FROM solicitacoes_registro WHERE status = 'pendente'")
                 solicitacoes_registro = cursor.fetchone()[0]
                 total_pendentes += solicitacoes_registro
             
             # Verificar se a tabela de solicitações de senha existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_senha'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_senha'):
                 cursor.execute("SELECT COUNT(*) FROM solicitacoes_senha WHERE status = 'pendente'")
                 solicitacoes_senha = cursor.fetchone()[0]
                 total_pendentes += solicitacoes_senha
@@ -501,15 +482,13 @@ def novo_usuario():
             cursor = conn.cursor()
             
             # Verificar se a tabela de solicitações de registro existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_registro'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_registro'):
                 cursor.execute("SELECT COUNT(*) FROM solicitacoes_registro WHERE status = 'pendente'")
                 solicitacoes_registro = cursor.fetchone()[0]
                 total_pendentes += solicitacoes_registro
             
             # Verificar se a tabela de solicitações de senha existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_senha'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_senha'):
                 cursor.execute("SELECT COUNT(*) FROM solicitacoes_senha WHERE status = 'pendente'")
                 solicitacoes_senha = cursor.fetchone()[0]
                 total_pendentes += solicitacoes_senha
@@ -769,15 +748,13 @@ def editar_usuario(usuario_id):
             cursor = conn.cursor()
             
             # Verificar se a tabela de solicitações de registro existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_registro'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_registro'):
                 cursor.execute("SELECT COUNT(*) FROM solicitacoes_registro WHERE status = 'pendente'")
                 solicitacoes_registro = cursor.fetchone()[0]
                 total_pendentes += solicitacoes_registro
             
             # Verificar se a tabela de solicitações de senha existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_senha'")
-            if cursor.fetchone():
+            if get_schema().tem_tabela('solicitacoes_senha'):
                 cursor.execute("SELECT COUNT(*) FROM solicitacoes_senha WHERE status = 'pendente'")
                 solicitacoes_senha = cursor.fetchone()[0]
                 total_pendentes += solicitacoes_senha
@@ -1174,50 +1151,47 @@ def logs():
         cursor = conn.cursor()
         
         # Verificar se a tabela logs_unificados existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='logs_unificados'")
-        usar_tabela_unificada = cursor.fetchone() is not None
+        usar_tabela_unificada = get_schema().tem_tabela('logs_unificados')
         
         # Definir a tabela a ser usada
         tabela_logs = "logs_unificados" if usar_tabela_unificada else "log_atividades"
         logger.info(f"Usando tabela de logs: {tabela_logs}")
         
-        # Construir a consulta base
-        query_base = f"FROM {tabela_logs} WHERE 1=1"
+        # Construir as condições da consulta
+        where_logs = "1=1"
         params = []
         
         # Adicionar filtros se fornecidos
         if usuario_filtro:
-            query_base += " AND usuario LIKE ?"
+            where_logs += " AND usuario LIKE ?"
             params.append(f"%{usuario_filtro}%")
             
         if acao_filtro:
-            query_base += " AND acao LIKE ?"
+            where_logs += " AND acao LIKE ?"
             params.append(f"%{acao_filtro}%")
             
         if nivel_filtro:
-            query_base += " AND nivel = ?"
+            where_logs += " AND nivel = ?"
             params.append(nivel_filtro)
             
         if data_inicio:
-            query_base += " AND data_hora >= ?"
+            where_logs += " AND data_hora >= ?"
             params.append(f"{data_inicio} 00:00:00")
             
         if data_fim:
-            query_base += " AND data_hora <= ?"
+            where_logs += " AND data_hora <= ?"
             params.append(f"{data_fim} 23:59:59")
             
         if tipo_log:
             if tipo_log == 'sistema':
-                query_base += " AND nivel = 'sistema'"
+                where_logs += " AND nivel = 'sistema'"
             elif tipo_log == 'usuarios':
-                query_base += " AND nivel = 'admin'"
+                where_logs += " AND nivel = 'admin'"
             elif tipo_log == 'registros':
-                query_base += " AND nivel NOT IN ('sistema', 'admin')"
+                where_logs += " AND nivel NOT IN ('sistema', 'admin')"
         
-        # Contar total de registros para paginação
-        count_query = f"SELECT COUNT(*) {query_base}"
-        cursor.execute(count_query, params)
-        total_logs = cursor.fetchone()[0]
+        # Contar total de registros para paginação (em cache por alguns segundos)
+        total_logs = contar_com_cache(cursor, f"SELECT COUNT(*) FROM {tabela_logs} WHERE {where_logs}", params)
         
         # Calcular total de páginas
         total_pages = (total_logs + per_page - 1) // per_page
@@ -1230,12 +1204,11 @@ def logs():
         if page > total_pages:
             page = total_pages
         
-        # Calcular offset para paginação
-        offset = (page - 1) * per_page
-        
-        # Consulta final com paginação
-        query = f"""
-            SELECT id, usuario, nivel, acao, descricao, 
+        # Página ordenada por data_hora DESC (id desempata): anterior/próxima
+        # usam o cursor e começam direto no índice de data_hora, sem OFFSET.
+        # data_hora é sempre preenchida pelo log_manager.
+        colunas_logs = """
+            id, usuario, nivel, acao, descricao, 
             data_hora as data, 
             CASE 
                 WHEN nivel = 'sistema' THEN 'sistema'
@@ -1243,18 +1216,21 @@ def logs():
                 ELSE 'registros'
             END as tipo_log,
             registro_id
-            {query_base}
-            ORDER BY data_hora DESC
-            LIMIT ? OFFSET ?
         """
+        logs, cursor_anterior, cursor_proximo = paginar_keyset(
+            cursor, colunas_logs, tabela_logs, where_logs, params, ["data_hora", "id"],
+            request.args.get('cursor'), page, per_page
+        )
         
-        # Adicionar parâmetros de paginação
-        params.append(per_page)
-        params.append(offset)
-        
-        # Executar a consulta
-        cursor.execute(query, params)
-        logs = cursor.fetchall()
+        def url_pagina(pagina):
+            args = request.args.copy()
+            args['page'] = pagina
+            args.pop('cursor', None)
+            if pagina == page + 1 and cursor_proximo:
+                args['cursor'] = cursor_proximo
+            elif pagina == page - 1 and cursor_anterior:
+                args['cursor'] = cursor_anterior
+            return url_for('admin.logs', **args)
         
         # Garantir que logs seja uma lista, mesmo que vazia
         if logs is None:
@@ -1274,16 +1250,14 @@ def logs():
         total_pendentes = 0
         
         # Verificar se a tabela de solicitações de registro existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_registro'")
-        if cursor.fetchone():
+        if get_schema().tem_tabela('solicitacoes_registro'):
             cursor.execute("SELECT COUNT(*) as total FROM solicitacoes_registro WHERE status = 'pendente'")
             result = cursor.fetchone()
             if result:
                 total_pendentes += result[0]  # Usar índice em vez de nome da coluna
         
         # Verificar se a tabela de solicitações de senha existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='solicitacoes_senha'")
-        if cursor.fetchone():
+        if get_schema().tem_tabela('solicitacoes_senha'):
             cursor.execute("SELECT COUNT(*) as total FROM solicitacoes_senha WHERE status = 'pendente'")
             result = cursor.fetchone()
             if result:
@@ -1308,7 +1282,8 @@ def logs():
                            nivel=session.get('nivel'),
                            page=page,
                            total_pages=total_pages,
-                           total_logs=total_logs)
+                           total_logs=total_logs,
+                           url_pagina=url_pagina)
     
     except Exception as e:
         logger.error(f"Erro ao listar logs: {e}")
@@ -1401,6 +1376,18 @@ def limpar_logs():
 # Rotas para Estatísticas e Relatórios
 #----------------------------------------------
 
+@admin_bp.route('/api/pool_stats')
+@admin_required
+def api_pool_stats():
+    """API com as estatísticas do pool de conexões SQLite (criadas vs reutilizadas)"""
+    return jsonify(get_pool_stats())
+
+@admin_bp.route('/api/cache_historico')
+@admin_required
+def api_cache_historico():
+    """API com os acertos e faltas do cache das alterações do histórico decodificadas"""
+    return jsonify(estatisticas_cache_historico())
+
 @admin_bp.route('/estatisticas')
 @admin_required
 def estatisticas():
@@ -1422,7 +1409,10 @@ def estatisticas():
             cursor.execute("SELECT status_sm, COUNT(*) FROM registros WHERE excluido = 0 GROUP BY status_sm")
             registros_por_status = cursor.fetchall()
             
-            cursor.execute(f"SELECT COUNT(*) FROM registros WHERE data_registro >= date('now', '-{periodo} days') AND excluido = 0")
+            cursor.execute(
+                "SELECT COUNT(*) FROM registros WHERE data_registro_iso >= date('now', 'localtime', ?) AND excluido = 0",
+                (f"-{int(periodo)} days",)
+            )
             registros_periodo = cursor.fetchone()[0]
             
             # Estatísticas de solicitações
@@ -48,6 +48,9 @@ csrf = CSRFProtect(app)
 # Verificar se a tabela de sessões existe e criá-la se necessário
 create_sessions_table()
 
+# Revalidação da planilha do OneDrive em segundo plano
+excel_processor.iniciar_atualizacao()
+
 # Função para limpar sessões inativas
 @app.before_request
 def cleanup_sessions():
@@ -13,6 +13,12 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # Configurações de banco de dados
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'usuarios.db')
 
+# Pool de conexões SQLite (conexões ociosas mantidas por thread) e PRAGMAs
+DB_POOL_MAX_IDLE = 4
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KB = 16000  # ~16 MB de cache de páginas por conexão
+SQLITE_MMAP_SIZE = 128 * 1024 * 1024
+
 # Configurações de log
 LOG_FILE = 'access.log'
 LOG_FORMAT = '%(asctime)s - %(message)s'
@@ -21,5 +27,10 @@ LOG_LEVEL = 'INFO'
 # Configuração do OneDrive
 ONEDRIVE_URL = "https://ictsi-my.sharepoint.com/:x:/p/leonardo_fragoso_itracker/EV8B0yiu9txKjo3I45WIYXkBG6MEojBRiSfm38PFvP5ZQg?e=EBHGvm"
 
+# Cache local da planilha do OneDrive (tabelas já processadas) e intervalo (segundos)
+# entre as revalidações em segundo plano; 0 desativa a atualização automática
+ONEDRIVE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'planilha_onedrive_cache.bin')
+ONEDRIVE_INTERVALO_ATUALIZACAO = 600
+
 # Configuração de extensões de arquivo permitidas
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'docx'}
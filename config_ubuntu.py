@@ -14,6 +14,12 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # Configurações de banco de dados
 DB_PATH = os.path.join(BASE_DIR, 'usuarios.db')
 
+# Pool de conexões SQLite (conexões ociosas mantidas por thread) e PRAGMAs
+DB_POOL_MAX_IDLE = 4
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KB = 16000  # ~16 MB de cache de páginas por conexão
+SQLITE_MMAP_SIZE = 128 * 1024 * 1024
+
 # Configurações de log
 LOG_FILE = os.path.join(BASE_DIR, 'access.log')
 LOG_FORMAT = '%(asctime)s - %(message)s'
@@ -22,5 +28,10 @@ LOG_LEVEL = 'INFO'
 # Configuração do OneDrive
 ONEDRIVE_URL = "https://ictsi-my.sharepoint.com/:x:/p/leonardo_fragoso_itracker/EV8B0yiu9txKjo3I45WIYXkBK9u7ye7q9YF7bMb1E81fOA?download=1"
 
+# Cache local da planilha do OneDrive (tabelas já processadas) e intervalo (segundos)
+# entre as revalidações em segundo plano; 0 desativa a atualização automática
+ONEDRIVE_CACHE_PATH = os.path.join(BASE_DIR, 'planilha_onedrive_cache.bin')
+ONEDRIVE_INTERVALO_ATUALIZACAO = 600
+
 # Configuração de extensões de arquivo permitidas
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'docx'}
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, Response
 import sqlite3
 import logging
 import os
@@ -6,7 +6,19 @@ import re
 import json
 from datetime import datetime, timedelta
 from functools import wraps
-from historico_utils import sanitize_json_string
+from models.database import get_db_connection as _get_pooled_connection
+from models.schema import get_schema
+from models.contadores import contadores_gr
+from models.rollups import totais_por_dia, mapa_calor_horas, mapa_calor_tardios, estatisticas_sla
+from utils.memo_requisicao import memo_requisicao, limpar_memo_requisicao, estatisticas_memo_requisicao
+from utils.notificador import fluxo_eventos, notificar_alteracao_registro
+from utils.paginacao import paginar_keyset, contar_com_cache
+from utils.date_utils import epoch_data
+from models.alteracoes_pendentes import (
+    TABLE_ALTERACOES_PENDENTES, CAMPOS_MONITORADOS_POS_SMAE,
+    atualizar_alteracoes_pendentes, limpar_alteracoes_pendentes
+)
+from models.historico_campos import TABLE_HISTORICO_CAMPOS, campos_por_historico
 
 # Configurar logging
 logging.basicConfig(level=logging.DEBUG)
@@ -93,6 +105,15 @@ def formatar_data_br(valor):
 # Registrar o filtro para uso nos templates
 gr_blueprint.add_app_template_filter(formatar_data_br, 'formatar_data_br')
 
+# Contador de acertos do cache por requisição (ver utils.memo_requisicao)
+@gr_blueprint.after_request
+def registrar_acertos_memo(response):
+    estatisticas = estatisticas_memo_requisicao()
+    if estatisticas['hits'] or estatisticas['misses']:
+        logger.debug(f"Memo da requisição {request.path}: {estatisticas['hits']} acertos, {estatisticas['misses']} faltas")
+        response.headers['X-Memo-Hits'] = str(estatisticas['hits'])
+    return response
+
 # Classe para gerenciar conexão com o banco de dados usando contexto
 class DatabaseConnection:
     """Classe para gerenciar conexão com o banco de dados usando o padrão de contexto.
@@ -102,11 +123,11 @@ class DatabaseConnection:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM tabela")
     """
-    def __init__(self, database='usuarios.db'):
+    def __init__(self, database=None):
         """Inicializa o gerenciador de conexão.
         
         Args:
-            database (str, optional): Nome do arquivo do banco de dados. Padrão é 'usuarios.db'.
+            database (str, optional): Caminho do banco de dados. Padrão é o DB_PATH da configuração.
         """
         self.database = database
         self.conn = None
@@ -121,8 +142,7 @@ class DatabaseConnection:
             sqlite3.Error: Se ocorrer um erro ao conectar ao banco de dados.
         """
         try:
-            self.conn = sqlite3.connect(self.database)
-            self.conn.row_factory = sqlite3.Row
+            self.conn = get_db_connection(self.database)
             return self.conn
         except sqlite3.Error as e:
             logger.error(f"Erro ao conectar ao banco de dados {self.database}: {e}")
@@ -148,25 +168,24 @@ class DatabaseConnection:
                 except Exception as e:
                     self.conn.rollback()
                     logger.error(f"Erro ao fazer commit: {e}")
+            # Devolve a conexão ao pool compartilhado
             self.conn.close()
 
 # Função para conectar ao banco de dados (mantida para compatibilidade)
-def get_db_connection(database='usuarios.db'):
-    """Estabelece uma conexão com o banco de dados SQLite.
+def get_db_connection(database=None):
+    """Obtém uma conexão do pool compartilhado (models.database).
     
     Args:
-        database (str, optional): Nome do arquivo do banco de dados. Padrão é 'usuarios.db'.
+        database (str, optional): Caminho do banco de dados. Padrão é o DB_PATH da configuração.
         
     Returns:
-        sqlite3.Connection: Objeto de conexão com o banco de dados.
+        sqlite3.Connection: Conexão do pool; ``close()`` a devolve ao pool.
         
     Raises:
         sqlite3.Error: Se ocorrer um erro ao conectar ao banco de dados.
     """
     try:
-        conn = sqlite3.connect(database)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return _get_pooled_connection(database)
     except sqlite3.Error as e:
         logger.error(f"Erro ao conectar ao banco de dados {database}: {e}")
         raise
@@ -179,9 +198,13 @@ def fetchone_dict(cursor):
     return dict((cursor.description[i][0], value) for i, value in enumerate(row))
 
 # Função auxiliar para obter registros com alterações pós SM/AE
+@memo_requisicao
 def get_registros_com_alteracoes_pos_smae(cursor=None, colunas=None):
     """Função auxiliar para obter registros com alterações pós SM/AE
     
+    Lê a tabela materializada registros_alteracoes_pendentes (ver
+    models.alteracoes_pendentes), mantida a cada gravação no histórico.
+    
     Args:
         cursor: Cursor do banco de dados (opcional)
         colunas: Lista de colunas da tabela registros (opcional)
@@ -199,163 +222,41 @@ def get_registros_com_alteracoes_pos_smae(cursor=None, colunas=None):
         conn_local = get_db_connection()
         cursor = conn_local.cursor()
         
-        # Obter colunas se não fornecidas
-        if colunas is None:
-            colunas = verificar_criar_colunas(conn_local, cursor)
+    # Obter colunas do schema em memória se não fornecidas
+    if colunas is None:
+        colunas = get_schema().colunas(TABLE_REGISTROS)
     
     try:
-        # Lista de campos a serem monitorados após inclusão de SM/AE
-        campos_monitorados = [
-            'usuario', 'placa', 'motorista', 'cpf', 'mot_loc', 'carreta', 'carreta1', 'carreta2',
-            'carreta_loc', 'cliente', 'loc_cliente', 'arquivo', 'container_1', 'container_2',
-            'status_sm', 'tipo_carga', 'status_container', 'modalidade', 'gerenciadora',
-            'booking_di', 'pedido_referencia', 'lote_cs', 'on_time_cliente', 'horario_previsto',
-            'observacao_operacional', 'observacao_gr', 'destino_intermediario', 'destino_final',
-            'anexar_nf', 'anexar_os', 'anexar_agendamento', 'numero_nf', 'serie', 'quantidade',
-            'peso_bruto', 'valor_total_nota', 'unidade', 'arquivo_nf_nome', 'arquivo_os_nome',
-            'arquivo_agendamento_nome', 'origem'
-        ]
-        
-        # Verificar quais desses campos existem na tabela
-        campos_existentes = [campo for campo in campos_monitorados if campo in colunas]
+        # Verificar quais dos campos monitorados existem na tabela
+        campos_existentes = [campo for campo in CAMPOS_MONITORADOS_POS_SMAE if campo in colunas]
         
         if not campos_existentes:
             logger.warning("Nenhum campo monitorado encontrado na tabela registros")
             return registros_alterados, registros_alterados_ids
         
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-        if not cursor.fetchone():
+        if not get_schema().tem_tabela(TABLE_HISTORICO):
             logger.warning("Tabela historico não existe. Retornando lista vazia.")
             return [], []
         
-        # Primeiro, obter apenas os IDs dos registros que atendem aos critérios
-        # Isso evita processar JSON potencialmente problemático na consulta principal
-        query_ids = f"""
-                SELECT DISTINCT r.id
-                FROM {TABLE_REGISTROS} r
-                JOIN {TABLE_HISTORICO} h ON r.id = h.registro_id
-                WHERE ((r.numero_sm IS NOT NULL AND r.numero_sm != '' AND r.numero_sm != '0')
-                   OR (r.numero_ae IS NOT NULL AND r.numero_ae != '' AND r.numero_ae != '0'))
-                AND r.excluido = 0
-                AND r.alteracoes_verificadas = 0
-                AND h.data_alteracao >
-                    CASE
-                        WHEN r.data_sm IS NOT NULL AND r.data_sm > r.data_ae THEN r.data_sm
-                        WHEN r.data_ae IS NOT NULL THEN r.data_ae
-                        ELSE r.data_sm
-                    END
-                AND h.alterado_por NOT IN (SELECT username FROM usuarios WHERE nivel = 'gr')
-                AND h.alteracoes NOT LIKE '%"tipo": "Edição GR"%'
-                AND h.alteracoes NOT LIKE '%numero_sm%'
-                AND h.alteracoes NOT LIKE '%numero_ae%'
-        """
-        
-        logger.debug(f"Executando consulta para obter IDs: \n{query_ids}")
-        cursor.execute(query_ids)
-        id_rows = cursor.fetchall()
-        
-        # Extrair IDs
-        ids_registros = [str(row[0]) for row in id_rows]
-        
-        if not ids_registros:
-            logger.info("Nenhum registro encontrado com alterações pós SM/AE")
-            return [], []
-        
-        # Agora, obter os detalhes completos dos registros usando os IDs
-        placeholders = ', '.join(['?' for _ in ids_registros])
-        query_registros = f"""
-            SELECT * FROM {TABLE_REGISTROS} 
-            WHERE id IN ({placeholders}) 
-            AND excluido = 0
+        # Lookup na tabela materializada, mantida na escrita do histórico
+        query = f"""
+            SELECT r.*
+            FROM {TABLE_REGISTROS} r
+            JOIN {TABLE_ALTERACOES_PENDENTES} p ON p.registro_id = r.id
+            WHERE r.excluido = 0
+            AND r.alteracoes_verificadas = 0
+            ORDER BY r.id
         """
         
-        cursor.execute(query_registros, [int(id) for id in ids_registros])
-        registros = cursor.fetchall()
-        
-        # Converter para lista de dicionários
-        registros_dict = []
-        for registro in registros:
-            registro_dict = {}
-            for i, col in enumerate(cursor.description):
-                registro_dict[col[0]] = registro[i]
-            registros_dict.append(registro_dict)
-        
-        # Para cada registro, verificar se as alterações realmente correspondem aos critérios
-        # sem depender de LIKE na consulta SQL para campos JSON
-        registros_filtrados = []
-        ids_filtrados = []
-        
-        campos_relevantes = ['usuario', 'placa', 'motorista', 'cpf', 'mot_loc', 'carreta', 'carreta1', 'carreta2', 
-                             'carreta_loc', 'cliente', 'loc_cliente', 'arquivo', 'container_1', 'container_2', 
-                             'status_sm', 'tipo_carga', 'status_container', 'modalidade', 'gerenciadora', 
-                             'booking_di', 'pedido_referencia', 'lote_cs', 'on_time_cliente', 'horario_previsto', 
-                             'observacao_operacional', 'observacao_gr', 'destino_intermediario', 'destino_final', 
-                             'anexar_nf', 'anexar_os', 'anexar_agendamento', 'numero_nf', 'serie', 'quantidade', 
-                             'peso_bruto', 'valor_total_nota', 'unidade', 'arquivo_nf_nome', 'arquivo_os_nome', 
-                             'arquivo_agendamento_nome', 'origem']
-        
-        for registro_dict in registros_dict:
-            registro_id = registro_dict['id']
-            
-            # Obter histórico de alterações para este registro
-            cursor.execute(f"""
-                SELECT alteracoes FROM {TABLE_HISTORICO} 
-                WHERE registro_id = ? 
-                AND data_alteracao > 
-                    CASE
-                        WHEN ? IS NOT NULL AND ? > ? THEN ?
-                        WHEN ? IS NOT NULL THEN ?
-                        ELSE ?
-                    END
-                AND alterado_por NOT IN (SELECT username FROM usuarios WHERE nivel = 'gr')
-            """, (registro_id, 
-                   registro_dict.get('data_sm'), registro_dict.get('data_sm'), registro_dict.get('data_ae'), registro_dict.get('data_sm'),
-                   registro_dict.get('data_ae'), registro_dict.get('data_ae'), registro_dict.get('data_sm')))
-            
-            historico_rows = cursor.fetchall()
-            tem_alteracao_relevante = False
-            
-            for hist_row in historico_rows:
-                alteracoes_json = hist_row[0]
-                
-                # Aplicar sanitização extrema ao JSON para evitar erros de parsing
-                try:
-                    # Primeiro tentar sanitização normal
-                    alteracoes_json_sanitizado = sanitize_json_string(alteracoes_json)
-                    
-                    # Se falhar, aplicar sanitização extrema
-                    if not alteracoes_json_sanitizado or alteracoes_json_sanitizado == '{}':
-                        # Sanitização extrema: remover todas as barras invertidas e caracteres de controle
-                        alteracoes_json_sanitizado = re.sub(r'\\', '', alteracoes_json)
-                        alteracoes_json_sanitizado = re.sub(r'[\x00-\x1F\x7F]', '', alteracoes_json_sanitizado)
-                    
-                    # Verificar se contém campos relevantes
-                    for campo in campos_relevantes:
-                        if campo in alteracoes_json_sanitizado:
-                            tem_alteracao_relevante = True
-                            break
-                    
-                    # Verificar se não contém campos a serem excluídos
-                    if 'numero_sm' in alteracoes_json_sanitizado or 'numero_ae' in alteracoes_json_sanitizado:
-                        tem_alteracao_relevante = False
-                        
-                    if 'tipo' in alteracoes_json_sanitizado and 'Edição GR' in alteracoes_json_sanitizado:
-                        tem_alteracao_relevante = False
-                        
-                    if tem_alteracao_relevante:
-                        break
-                        
-                except Exception as e:
-                    logger.error(f"Erro ao processar JSON do histórico para registro {registro_id}: {e}")
-                    # Continuar para o próximo histórico
-                    continue
-            
-            if tem_alteracao_relevante:
-                registros_filtrados.append(registro_dict)
-                ids_filtrados.append(str(registro_id))
+        cursor.execute(query)
+        nomes_colunas = [col[0] for col in cursor.description]
+        for registro in cursor.fetchall():
+            registro_dict = dict(zip(nomes_colunas, registro))
+            registros_alterados.append(registro_dict)
+            registros_alterados_ids.append(str(registro_dict['id']))
         
-        logger.info(f"Após filtragem de JSON, encontrados {len(registros_filtrados)} registros com alterações pós SM/AE")
-        return registros_filtrados, ids_filtrados
+        logger.info(f"Encontrados {len(registros_alterados)} registros com alterações pós SM/AE")
+        return registros_alterados, registros_alterados_ids
         
     except Exception as e:
         logger.error(f"Erro ao obter registros com alterações pós SM/AE: {e}")
@@ -366,90 +267,25 @@ def get_registros_com_alteracoes_pos_smae(cursor=None, colunas=None):
             conn_local.close()
 
 # Função auxiliar para obter contagens básicas de registros
+@memo_requisicao
 def get_contagens_basicas(cursor):
     """Função auxiliar para obter contagens básicas de registros
     
+    Todos os cards (status, pendências e alterações pós SM/AE) saem de uma
+    única varredura agregada (ver models.contadores).
+    
     Args:
         cursor: Cursor do banco de dados
         
     Returns:
         dict: Dicionário com as contagens básicas
     """
-    contagens = {}
-    
-    # Contagens por status_sm
-    cursor.execute("SELECT COUNT(*) FROM registros WHERE status_sm = 'Pendente' AND excluido = 0")
-    contagens['registros_pendentes'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM registros WHERE status_sm = 'Em andamento' AND excluido = 0")
-    contagens['registros_andamento'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM registros WHERE status_sm = 'Concluído' AND excluido = 0")
-    contagens['registros_concluidos'] = cursor.fetchone()[0]
-    
-    # Contagem de registros sem container
-    cursor.execute("SELECT COUNT(*) FROM registros WHERE (container_1 IS NULL OR container_1 = '') AND excluido = 0")
-    contagens['sem_container'] = cursor.fetchone()[0]
-    
-    # Contagem de registros sem SM
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM registros 
-        WHERE (numero_sm IS NULL OR numero_sm = '') 
-        AND excluido = 0
-    """)
-    contagens['sem_sm'] = cursor.fetchone()[0]
-    
-    # Contagem de registros sem AE
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM registros 
-        WHERE (numero_ae IS NULL OR numero_ae = '') 
-        AND excluido = 0
-    """)
-    contagens['sem_ae'] = cursor.fetchone()[0]
-    
-    # Contagem de registros sem NF anexada - Abordagem mais abrangente
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM registros 
-        WHERE (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') 
-        AND excluido = 0
-    """)
-    contagens['sem_nf'] = cursor.fetchone()[0]
-    logger.info(f"Contagem sem_nf (consulta modificada): {contagens['sem_nf']}")
-    
-    # Verificar todos os valores distintos de anexar_nf para diagnóstico
-    cursor.execute("""
-        SELECT DISTINCT anexar_nf 
-        FROM registros 
-        WHERE excluido = 0
-    """)
-    valores_distintos = cursor.fetchall()
-    logger.info(f"Valores distintos de anexar_nf: {valores_distintos}")
-    
-    # Verificação detalhada dos registros sem NF
-    cursor.execute("""
-        SELECT id, anexar_nf 
-        FROM registros 
-        WHERE excluido = 0
-        LIMIT 10
-    """)
-    registros_sem_nf = cursor.fetchall()
-    logger.info(f"Amostra de registros: {registros_sem_nf}")
-    
-    # Contagem de registros sem OS anexada
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM registros 
-        WHERE (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') 
-        AND excluido = 0
-    """)
-    contagens['sem_os'] = cursor.fetchone()[0]
-    
+    contagens = contadores_gr(cursor)
+    logger.debug(f"Contagens básicas: {contagens}")
     return contagens
 
 # Função auxiliar para calcular tempos médios
+@memo_requisicao
 def calcular_tempos_medios(cursor):
     """Função auxiliar para calcular tempos médios entre etapas
     
@@ -461,25 +297,16 @@ def calcular_tempos_medios(cursor):
     """
     tempos = {}
     
-    # Calcular tempo médio entre data_registro e horario_previsto (se disponível)
-    cursor.execute("""
-        SELECT AVG(julianday(horario_previsto) - julianday(data_registro)) 
-        FROM registros 
-        WHERE horario_previsto IS NOT NULL AND data_registro IS NOT NULL AND excluido = 0
-    """)
-    tempo_medio_inicio_dias = cursor.fetchone()[0]
+    # Calcular tempo médio entre data_registro e horario_previsto (se disponível),
+    # lido dos agregados de SLA (models.rollups)
+    tempo_medio_inicio_dias = estatisticas_sla(cursor, 'inicio')['media']
     if tempo_medio_inicio_dias is not None:
         tempos['tempo_medio_inicio'] = f"{tempo_medio_inicio_dias:.1f} dias"
     else:
         tempos['tempo_medio_inicio'] = "N/A"
     
     # Calcular tempo médio entre horario_previsto e on_time_cliente (se disponível)
-    cursor.execute("""
-        SELECT AVG(julianday(on_time_cliente) - julianday(horario_previsto)) 
-        FROM registros 
-        WHERE on_time_cliente IS NOT NULL AND horario_previsto IS NOT NULL AND excluido = 0
-    """)
-    tempo_medio_conclusao_dias = cursor.fetchone()[0]
+    tempo_medio_conclusao_dias = estatisticas_sla(cursor, 'conclusao')['media']
     if tempo_medio_conclusao_dias is not None:
         tempos['tempo_medio_conclusao'] = f"{tempo_medio_conclusao_dias:.1f} dias"
     else:
@@ -489,44 +316,20 @@ def calcular_tempos_medios(cursor):
 
 # Função auxiliar para verificar e criar colunas necessárias
 def verificar_criar_colunas(conn, cursor):
-    """Função auxiliar para verificar e criar colunas necessárias na tabela registros
+    """Função auxiliar que retorna as colunas da tabela registros
+    
+    As colunas necessárias (alteracoes_verificadas, modificado_por, ...) são
+    criadas pelas migrações executadas no boot; aqui apenas consultamos o
+    schema em memória, sem nenhuma consulta de metadados.
     
     Args:
-        conn: Conexão com o banco de dados
-        cursor: Cursor do banco de dados
+        conn: Conexão com o banco de dados (mantido por compatibilidade)
+        cursor: Cursor do banco de dados (mantido por compatibilidade)
         
     Returns:
-        list: Lista atualizada de colunas da tabela registros
+        list: Lista de colunas da tabela registros
     """
-    # Obter informações sobre as colunas da tabela registros
-    cursor.execute(f"PRAGMA table_info({TABLE_REGISTROS})")
-    colunas = [col[1] for col in cursor.fetchall()]
-    
-    # Verificar se a coluna 'alteracoes_verificadas' existe, se não, criar
-    if COL_ALTERACOES_VERIFICADAS not in colunas:
-        try:
-            cursor.execute(f"ALTER TABLE {TABLE_REGISTROS} ADD COLUMN {COL_ALTERACOES_VERIFICADAS} INTEGER DEFAULT 0")
-            conn.commit()
-            logger.info(f"Coluna '{COL_ALTERACOES_VERIFICADAS}' adicionada à tabela {TABLE_REGISTROS}")
-            # Atualizar a lista de colunas após adicionar a nova coluna
-            cursor.execute(f"PRAGMA table_info({TABLE_REGISTROS})")
-            colunas = [col[1] for col in cursor.fetchall()]
-        except Exception as e:
-            logger.error(f"Erro ao adicionar coluna '{COL_ALTERACOES_VERIFICADAS}': {e}")
-    
-    # Verificar se a coluna 'modificado_por' existe, se não, criar
-    if COL_MODIFICADO_POR not in colunas:
-        try:
-            cursor.execute(f"ALTER TABLE {TABLE_REGISTROS} ADD COLUMN {COL_MODIFICADO_POR} TEXT")
-            conn.commit()
-            logger.info(f"Coluna '{COL_MODIFICADO_POR}' adicionada à tabela {TABLE_REGISTROS}")
-            # Atualizar a lista de colunas após adicionar a nova coluna
-            cursor.execute(f"PRAGMA table_info({TABLE_REGISTROS})")
-            colunas = [col[1] for col in cursor.fetchall()]
-        except Exception as e:
-            logger.error(f"Erro ao adicionar coluna '{COL_MODIFICADO_POR}': {e}")
-    
-    return colunas
+    return list(get_schema().colunas(TABLE_REGISTROS))
 
 # Função auxiliar para formatar dados para exibição
 def formatar_dados_exibicao(valor, tipo='texto'):
@@ -601,8 +404,7 @@ def registrar_historico(cursor, registro_id, tipo_alteracao, campos, valores=Non
     """
     try:
         # Verificar se a tabela histórico existe
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{TABLE_HISTORICO}'")
-        if not cursor.fetchone():
+        if not get_schema().tem_tabela(TABLE_HISTORICO):
             logger.warning(MSG_TABELA_HISTORICO_NAO_ENCONTRADA)
             return False
         
@@ -627,6 +429,10 @@ def registrar_historico(cursor, registro_id, tipo_alteracao, campos, valores=Non
             VALUES (?, ?, ?, ?)
         """, (registro_id, usuario, json.dumps(alteracoes), datetime.now().strftime('%d-%m-%Y %H:%M:%S')))
         
+        # Manter a marcação de alterações pendentes pós SM/AE
+        atualizar_alteracoes_pendentes(cursor, registro_id)
+        limpar_memo_requisicao()
+        
         # Commit das alterações se a conexão foi fornecida
         if conn:
             conn.commit()
@@ -768,10 +574,19 @@ def ambiente():
     filtro_alteracoes_pos_smae = False
     page = 1
     
-    # Função auxiliar para gerar URLs de paginação
+    cursor_anterior = None
+    cursor_proximo = None
+    
+    # Função auxiliar para gerar URLs de paginação; anterior/próxima levam o
+    # cursor da página atual e não precisam de OFFSET
     def gerar_url_paginacao(pagina):
         args = request.args.copy()
         args['page'] = pagina
+        args.pop('cursor', None)
+        if pagina == pagina_atual + 1 and cursor_proximo:
+            args['cursor'] = cursor_proximo
+        elif pagina == pagina_atual - 1 and cursor_anterior:
+            args['cursor'] = cursor_anterior
         return url_for('gr.ambiente', **args)
     
     try:
@@ -795,26 +610,26 @@ def ambiente():
             # Verificar e criar colunas necessárias usando a função auxiliar
             colunas = verificar_criar_colunas(conn, cursor)
             
-            # Construir a consulta SQL base
-            query = "SELECT * FROM registros WHERE excluido = 0"
+            # Construir as condições da consulta
+            where_query = "excluido = 0"
             params = []
             
             # Aplicar filtros
             if filtro_sem_sm:
-                query += " AND (numero_sm IS NULL OR numero_sm = '')"
+                where_query += " AND (numero_sm IS NULL OR numero_sm = '')"
             
             if filtro_sem_ae:
-                query += " AND (numero_ae IS NULL OR numero_ae = '')"
+                where_query += " AND (numero_ae IS NULL OR numero_ae = '')"
             
             if filtro_sem_container:
                 # Usar a coluna container_1
-                query += " AND (container_1 IS NULL OR container_1 = '')"
+                where_query += " AND (container_1 IS NULL OR container_1 = '')"
                 
             if filtro_sem_nf:
-                query += " AND (anexar_nf IS NULL OR anexar_nf = '')"
+                where_query += " AND (anexar_nf IS NULL OR anexar_nf = '')"
                 
             if filtro_sem_os:
-                query += " AND (anexar_os IS NULL OR anexar_os = '')"
+                where_query += " AND (anexar_os IS NULL OR anexar_os = '')"
                 
             if filtro_alteracoes_pos_smae:
                 # Obter registros com alterações pós SM/AE usando a função auxiliar
@@ -824,46 +639,37 @@ def ambiente():
                 if registros_alterados_filtro and registro_ids:
                     # Usar os IDs na consulta principal
                     ids_str = ",".join([str(id) for id in registro_ids])
-                    query = f"SELECT * FROM registros WHERE id IN ({ids_str}) AND excluido = 0 ORDER BY id DESC"
+                    where_query = f"id IN ({ids_str}) AND excluido = 0"
                     params = []
                     logger.info(f"Filtro alterações pós SM/AE: Encontrados {len(registro_ids)} registros")
                 else:
                     # Se não houver registros, usar uma condição que não retorne nada
-                    query = "SELECT * FROM registros WHERE 1=0"
+                    where_query = "1=0"
                     params = []
                     logger.info("Filtro alterações pós SM/AE: Nenhum registro encontrado")
                     
                 # Verificar se a tabela histórico existe
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-                if not cursor.fetchone():
+                if not get_schema().tem_tabela(TABLE_HISTORICO):
                     # Fallback se a tabela histórico não existir
                     if 'alteracoes_verificadas' in colunas:
-                        query += " AND ((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND alteracoes_verificadas = 0"
+                        where_query += " AND ((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND alteracoes_verificadas = 0"
                     else:
-                        query += " AND ((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0'))"
-            
-            # Adicionar ordenação se não for uma consulta personalizada
-            if not query.strip().endswith("DESC"):
-                query += " ORDER BY id DESC"
+                        where_query += " AND ((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0'))"
             
-            # Contar total de registros para paginação
-            count_query = query.replace("SELECT *", "SELECT COUNT(*)")
-            cursor.execute(count_query, params)
-            total_registros = cursor.fetchone()[0]
+            # Contar total de registros para paginação (em cache por alguns segundos)
+            total_registros = contar_com_cache(cursor, f"SELECT COUNT(*) FROM registros WHERE {where_query}", params)
             
             # Calcular paginação
             itens_por_pagina = 20  # Aumentado de 10 para 20 registros por página
             total_paginas = (total_registros + itens_por_pagina - 1) // itens_por_pagina
             pagina_atual = min(page, total_paginas) if total_paginas > 0 else 1
-            offset = (pagina_atual - 1) * itens_por_pagina
             
-            # Adicionar limite e offset para paginação
-            query += " LIMIT ? OFFSET ?"
-            params.extend([itens_por_pagina, offset])
-            
-            # Executar a consulta final
-            cursor.execute(query, params)
-            registros = [dict(row) for row in cursor.fetchall()]
+            # Página ordenada por id DESC: com cursor começa direto na chave,
+            # sem cursor (salto para uma página numerada) usa OFFSET
+            registros, cursor_anterior, cursor_proximo = paginar_keyset(
+                cursor, "*", "registros", where_query, params, ["id"],
+                request.args.get('cursor'), pagina_atual, itens_por_pagina
+            )
             
             # Obter registros com alterações pós SM/AE para destacar na tabela
             registros_alterados, registros_alterados_ids = get_registros_com_alteracoes_pos_smae(cursor, colunas)
@@ -904,9 +710,8 @@ def ambiente():
             tempo_medio_inicio = tempos['tempo_medio_inicio']
             tempo_medio_conclusao = tempos['tempo_medio_conclusao']
             
-            # Usar a função auxiliar para obter a contagem de alterações nos campos específicos após inclusão de SM/AE
-            _, registros_alterados_ids = get_registros_com_alteracoes_pos_smae(cursor, colunas)
-            alteracoes_pos_smae = len(registros_alterados_ids)
+            # Contagem de alterações pós SM/AE vem da mesma varredura agregada
+            alteracoes_pos_smae = contagens['alteracoes_pos_smae']
                 
             logger.info(f"Total de registros com alterações pós SM/AE: {alteracoes_pos_smae}")
             
@@ -917,8 +722,7 @@ def ambiente():
                 
                 # Se não houver registros alterados e a tabela histórico não existir, usar fallback
                 if not registros_alterados:
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-                    if not cursor.fetchone():
+                    if not get_schema().tem_tabela(TABLE_HISTORICO):
                         # Fallback usando apenas a tabela registros
                         cursor.execute("""
                             SELECT * FROM registros 
@@ -927,7 +731,7 @@ def ambiente():
                             AND data_modificacao IS NOT NULL 
                             AND alteracoes_verificadas = 0
                             AND excluido = 0
-                            ORDER BY data_modificacao DESC
+                            ORDER BY data_modificacao_iso DESC
                         """)
                         registros_alterados = [dict(row) for row in cursor.fetchall()]
                 
@@ -1109,38 +913,12 @@ def dashboard():
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Obter as colunas disponíveis na tabela registros
-            cursor.execute("PRAGMA table_info(registros)")
-            colunas = [info[1] for info in cursor.fetchall()]
-            logger.info(f"Colunas disponíveis na tabela registros: {colunas}")
+            # Tempos médios lidos dos agregados de SLA (models.rollups): soma e
+            # contagem por dia do registro/modificação, com o mesmo filtro de intervalo
             
             # 1. Tempo Médio AE (data de criação AE - data da criação registro ou ultima modificação)
-            # Modificado para considerar apenas valores positivos
-            cursor.execute("""
-                SELECT AVG(tempo) as tempo_medio_ae
-                FROM (
-                    SELECT julianday(data_ae) - 
-                        CASE 
-                            WHEN data_modificacao IS NOT NULL AND data_modificacao > data_registro 
-                            THEN julianday(data_modificacao) 
-                            ELSE julianday(data_registro) 
-                        END as tempo
-                    FROM registros
-                    WHERE data_ae IS NOT NULL 
-                    AND data_registro IS NOT NULL
-                    AND excluido = 0
-                    AND (data_registro BETWEEN ? AND ? OR data_modificacao BETWEEN ? AND ?)
-                    -- Filtrar apenas tempos positivos
-                    AND julianday(data_ae) > 
-                        CASE 
-                            WHEN data_modificacao IS NOT NULL AND data_modificacao > data_registro 
-                            THEN julianday(data_modificacao) 
-                            ELSE julianday(data_registro) 
-                        END
-                )
-            """, (data_inicio, data_fim, data_inicio, data_fim))
-            
-            tempo_medio_ae_dias = cursor.fetchone()[0]
+            # Considera apenas valores positivos
+            tempo_medio_ae_dias = estatisticas_sla(cursor, 'ae', data_inicio, data_fim)['media']
             if tempo_medio_ae_dias is not None and tempo_medio_ae_dias > 0:
                 # Converter dias para horas e minutos
                 tempo_medio_ae_horas = tempo_medio_ae_dias * 24
@@ -1151,32 +929,8 @@ def dashboard():
                 tempo_medio_ae = "N/A"
             
             # 2. Tempo Médio SM (data de criação SM - data da criação registro ou ultima modificação)
-            # Modificado para considerar apenas valores positivos
-            cursor.execute("""
-                SELECT AVG(tempo) as tempo_medio_sm
-                FROM (
-                    SELECT julianday(data_sm) - 
-                        CASE 
-                            WHEN data_modificacao IS NOT NULL AND data_modificacao > data_registro 
-                            THEN julianday(data_modificacao) 
-                            ELSE julianday(data_registro) 
-                        END as tempo
-                    FROM registros
-                    WHERE data_sm IS NOT NULL 
-                    AND data_registro IS NOT NULL
-                    AND excluido = 0
-                    AND (data_registro BETWEEN ? AND ? OR data_modificacao BETWEEN ? AND ?)
-                    -- Filtrar apenas tempos positivos
-                    AND julianday(data_sm) > 
-                        CASE 
-                            WHEN data_modificacao IS NOT NULL AND data_modificacao > data_registro 
-                            THEN julianday(data_modificacao) 
-                            ELSE julianday(data_registro) 
-                        END
-                )
-            """, (data_inicio, data_fim, data_inicio, data_fim))
-            
-            tempo_medio_sm_dias = cursor.fetchone()[0]
+            # Considera apenas valores positivos
+            tempo_medio_sm_dias = estatisticas_sla(cursor, 'sm', data_inicio, data_fim)['media']
             if tempo_medio_sm_dias is not None and tempo_medio_sm_dias > 0:
                 # Converter dias para horas e minutos
                 tempo_medio_sm_horas = tempo_medio_sm_dias * 24
@@ -1187,21 +941,7 @@ def dashboard():
                 tempo_medio_sm = "N/A"
             
             # 3. Tempo médio Hábil para criação da SM (horario_previsto - data_registro ou data_modificacao)
-            cursor.execute("""
-                SELECT AVG(julianday(horario_previsto) - 
-                    CASE 
-                        WHEN data_modificacao IS NOT NULL AND data_modificacao > data_registro 
-                        THEN julianday(data_modificacao) 
-                        ELSE julianday(data_registro) 
-                    END) as tempo_medio_habil
-                FROM registros
-                WHERE horario_previsto IS NOT NULL 
-                AND data_registro IS NOT NULL
-                AND excluido = 0
-                AND (data_registro BETWEEN ? AND ? OR data_modificacao BETWEEN ? AND ?)
-            """, (data_inicio, data_fim, data_inicio, data_fim))
-            
-            tempo_medio_habil_dias = cursor.fetchone()[0]
+            tempo_medio_habil_dias = estatisticas_sla(cursor, 'habil', data_inicio, data_fim)['media']
             if tempo_medio_habil_dias is not None and tempo_medio_habil_dias > 0:
                 # Converter dias para horas e minutos
                 tempo_medio_habil_horas = tempo_medio_habil_dias * 24
@@ -1230,6 +970,11 @@ def dashboard():
             # Determinar o dia atual da semana (0 = segunda, 6 = domingo)
             dia_atual_semana = hoje.weekday()
             
+            # Totais por dia lidos da tabela de agregados (uma leitura para a semana)
+            totais_semana = totais_por_dia(
+                cursor, inicio_semana_atual.strftime('%Y-%m-%d'), hoje.strftime('%Y-%m-%d')
+            )
+            
             # Iterar pelos dias da semana atual até o dia atual
             for i in range(dia_atual_semana + 1):  # +1 para incluir o dia atual
                 data_dia = inicio_semana_atual + timedelta(days=i)
@@ -1241,28 +986,13 @@ def dashboard():
                 # Registrar as datas para debug
                 logger.info(f"Dia {i+1} da semana: {nome_dia} ({data_dia.strftime('%Y-%m-%d')})")
                 
-                # Total de registros no dia
-                cursor.execute("""
-                    SELECT COUNT(*) 
-                    FROM registros 
-                    WHERE date(data_registro) = date(?)
-                    AND excluido = 0
-                """, (data_dia.strftime('%Y-%m-%d'),))
-                total_registros = cursor.fetchone()[0]
+                # Total de registros e total com SM ou AE no dia
+                total_registros, total_com_sm_ae = totais_semana.get(data_dia.strftime('%Y-%m-%d'), (0, 0))
                 dados_registros_total.append(total_registros)
                 
                 # Registrar contagem para debug
                 logger.info(f"Total de registros no dia {nome_dia}: {total_registros}")
                 
-                # Total de registros com SM ou AE no dia
-                cursor.execute("""
-                    SELECT COUNT(*) 
-                    FROM registros 
-                    WHERE date(data_registro) = date(?)
-                    AND excluido = 0
-                    AND ((numero_sm IS NOT NULL AND numero_sm != '') OR (numero_ae IS NOT NULL AND numero_ae != ''))
-                """, (data_dia.strftime('%Y-%m-%d'),))
-                total_com_sm_ae = cursor.fetchone()[0]
                 dados_registros_com_sm_ae.append(total_com_sm_ae)
                 
                 # Registrar contagem para debug
@@ -1277,71 +1007,11 @@ def dashboard():
                 logger.info("Nenhum dia da semana atual para mostrar, adicionando dia padrão")
             
             # 5. Mapa de calor: Horário de cada dia que temos mais registros criados
-            # Obter contagem de registros por hora do dia (0-23) e dia da semana (0-6, onde 0 é segunda)
-            cursor.execute("""
-                SELECT 
-                    strftime('%w', data_registro) as dia_semana,
-                    strftime('%H', data_registro) as hora,
-                    COUNT(*) as total
-                FROM registros
-                WHERE data_registro IS NOT NULL
-                AND excluido = 0
-                AND date(data_registro) BETWEEN date(?) AND date(?)
-                GROUP BY dia_semana, hora
-                ORDER BY dia_semana, hora
-            """, (data_inicio, data_fim))
-            
-            # Inicializar matriz de mapa de calor (7 dias x 24 horas)
-            mapa_calor_registros = [[0 for _ in range(24)] for _ in range(7)]
-            
-            # Preencher a matriz com os dados
-            resultados_heatmap = cursor.fetchall()
-            logger.info(f"Dados para mapa de calor: {len(resultados_heatmap)} registros encontrados")
-            
-            for row in resultados_heatmap:
-                dia = int(row[0])
-                # Converter de 0=domingo para 0=segunda
-                dia = (dia - 1) % 7
-                hora = int(row[1])
-                total = row[2]
-                mapa_calor_registros[dia][hora] = total
-                
-                # Log para depuração
-                if total > 0:
-                    logger.info(f"Mapa de calor: Dia {dia} (0=seg, 6=dom), Hora {hora}h: {total} registros")
+            # Contagem por dia da semana (0 é segunda) e hora (0-23), lida da tabela de agregados
+            mapa_calor_registros = mapa_calor_horas(cursor, data_inicio, data_fim)
             
             # 6. Mapa de calor: Registros criados no mesmo dia da saída prevista entre 6-8h
-            cursor.execute("""
-                SELECT 
-                    strftime('%w', data_registro) as dia_semana,
-                    COUNT(*) as total
-                FROM registros
-                WHERE data_registro IS NOT NULL
-                AND horario_previsto IS NOT NULL
-                AND date(data_registro) = date(horario_previsto)
-                AND strftime('%H', data_registro) IN ('06', '07', '08')
-                AND excluido = 0
-                AND date(data_registro) BETWEEN date(?) AND date(?)
-                GROUP BY dia_semana
-                ORDER BY dia_semana
-            """, (data_inicio, data_fim))
-            
-            # Inicializar array para o mapa de calor (7 dias)
-            mapa_calor_mesmo_dia = [0 for _ in range(7)]
-            
-            # Preencher o array com os dados
-            resultados_tardios = cursor.fetchall()
-            logger.info(f"Dados para mapa de registros tardios: {len(resultados_tardios)} registros encontrados")
-            
-            for row in resultados_tardios:
-                dia = int(row[0])
-                # Converter de 0=domingo para 0=segunda
-                dia = (dia - 1) % 7
-                total = row[1]
-                mapa_calor_mesmo_dia[dia] = total
-                
-                # Log para depuração
-                logger.info(f"Registros tardios: Dia {dia} (0=seg, 6=dom): {total} registros")
+            mapa_calor_mesmo_dia = mapa_calor_tardios(cursor, data_inicio, data_fim)
         
         # Preparar dados para o template
         dados_grafico = {
@@ -1409,8 +1079,10 @@ def confirmar_visualizacao(registro_id):
                 f"UPDATE {TABLE_REGISTROS} SET alteracoes_verificadas = 1 WHERE {COL_ID} = ?",
                 (registro_id,)
             )
+            limpar_alteracoes_pendentes(cursor, registro_id)
             
             conn.commit()
+            notificar_alteracao_registro(registro_id, 'verificado')
             
             # Registrar a ação no log
             usuario = session.get('usuario', 'Sistema')
@@ -1426,9 +1098,6 @@ def confirmar_visualizacao(registro_id):
 @gr_blueprint.route('/historico_alteracoes/<int:registro_id>', methods=['GET'])
 @gr_required
 def obter_historico_alteracoes(registro_id):
-    # Importar módulos necessários
-    import re
-    
     logger.info(f"Obtendo histórico de alterações para o registro {registro_id}")
     
     try:
@@ -1519,160 +1188,67 @@ def obter_historico_alteracoes(registro_id):
             
             try:
                 # Verificar se a tabela histórico existe
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-                if cursor.fetchone():
-                    # Buscar registros do histórico
+                if get_schema().tem_tabela(TABLE_HISTORICO):
+                    # Buscar as alterações já estruturadas por campo (historico_campos)
                     cursor.execute("""
-                        SELECT h.alteracoes, h.data_alteracao, h.alterado_por
+                        SELECT h.id, h.data_alteracao, h.alterado_por
                         FROM historico h
                         WHERE h.registro_id = ? 
-                        ORDER BY h.data_alteracao DESC
+                        ORDER BY h.data_alteracao_epoch DESC, h.id DESC
                     """, (registro_id,))
                     
                     registros_historico = cursor.fetchall()
                     logger.info(f"Encontrados {len(registros_historico)} registros no histórico")
+                    campos_historico = campos_por_historico(cursor, [linha[0] for linha in registros_historico])
                     
                     for registro_hist in registros_historico:
-                        alteracoes_json = registro_hist[0]
                         data_alteracao = registro_hist[1]
                         usuario = registro_hist[2] or 'Sistema'
                         
-                        if alteracoes_json:
-                            try:
-                                # Sanitizar o JSON antes de processá-lo
+                        for campo, valor_anterior, valor_novo, tipo in campos_historico.get(registro_hist[0], []):
+                            if tipo is not None:
+                                # Alteração estruturada (tipo/campos/valores): só os campos com valor
+                                if valor_novo is not None:
+                                    alteracoes.append({
+                                        'campo': campo,
+                                        'valor_anterior': 'Valor anterior não disponível',
+                                        'valor_novo': valor_novo,
+                                        'data_hora': data_alteracao,
+                                        'usuario': usuario
+                                    })
+                                continue
+                            
+                            valor_anterior = valor_anterior or ''
+                            
+                            # Formatação especial para datas conforme o padrão do sistema
+                            if campo in ['data_registro', 'data_modificacao', 'horario_previsto'] and valor_anterior:
+                                # Garantir que as datas estejam no formato padrão DD/MM/YYYY HH:MM:SS para exibição
                                 try:
-                                    # Primeiro tenta sanitização normal
-                                    alteracoes_json_str = sanitize_json_string(alteracoes_json)
-                                    try:
-                                        alteracoes_data = json.loads(alteracoes_json_str)
-                                        logger.info(f"Processando alteração: {alteracoes_data}")
-                                    except json.JSONDecodeError as je:
-                                        logger.error(f"Erro ao decodificar JSON no histórico do registro {registro_id}: {je}")
-                                        logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                                        
-                                        # Tentar sanitização mais agressiva
-                                        try:
-                                            logger.info(f"Tentando sanitização agressiva para o histórico do registro {registro_id}")
-                                            alteracoes_json_str = sanitize_json_string(alteracoes_json, aggressive=True)
-                                            alteracoes_data = json.loads(alteracoes_json_str)
-                                            logger.info(f"Sanitização agressiva bem-sucedida para o histórico do registro {registro_id}")
-                                        except json.JSONDecodeError as je2:
-                                            logger.error(f"Erro na sanitização agressiva para o histórico do registro {registro_id}: {je2}")
-                                            logger.error(f"Posição do erro: {je2.pos}, linha: {je2.lineno}, coluna: {je2.colno}")
-                                            
-                                            # Tentar sanitização extrema como último recurso
-                                            try:
-                                                logger.info(f"Tentando sanitização extrema para o histórico do registro {registro_id}")
-                                                # Usar a função sanitize_json_string com o parâmetro extreme=True
-                                                alteracoes_json_str = sanitize_json_string(alteracoes_json, aggressive=True, extreme=True)
-                                                alteracoes_data = json.loads(alteracoes_json_str)
-                                                logger.info(f"Sanitização extrema bem-sucedida para o histórico do registro {registro_id}")
-                                                logger.info(f"JSON sanitizado: {alteracoes_json_str[:100]}...")
-                                                logger.info(f"Dados recuperados: {str(alteracoes_data)[:100]}...")
-                                                logger.info(f"Tipo de dados: {type(alteracoes_data)}")
-                                                logger.info(f"Número de campos: {len(alteracoes_data) if isinstance(alteracoes_data, dict) else 'N/A'}")
-                                                logger.info(f"Sanitização extrema bem-sucedida para o histórico do registro {registro_id}")
-                                                # Registrar o sucesso da sanitização extrema para análise posterior
-                                                logger.info(f"SUCESSO_SANITIZACAO_EXTREMA: registro_id={registro_id}")
-                                                # Adicionar uma nota ao histórico para indicar que houve sanitização extrema
-                                                alteracoes.append({
-                                                    'campo': 'sistema',
-                                                    'valor_anterior': 'N/A',
-                                                    'valor_novo': 'Dados recuperados com sanitização extrema',
-                                                    'data_hora': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-                                                    'usuario': 'Sistema'
-                                                })
-                                            except Exception:
-                                                # Criar um objeto vazio para não quebrar o processamento
-                                                logger.error(f"Todas as tentativas de sanitização falharam para o histórico do registro {registro_id}")
-                                                alteracoes_data = {}
-                                        except Exception as e2:
-                                            logger.error(f"Falha na sanitização agressiva para o histórico do registro {registro_id}: {e2}")
-                                            # Criar um objeto vazio para não quebrar o processamento
-                                            alteracoes_data = {}
+                                    # Converter para o formato de exibição se for uma data válida
+                                    if '-' in valor_anterior:
+                                        partes = valor_anterior.split(' ')
+                                        if len(partes) > 0:
+                                            data_partes = partes[0].split('-')
+                                            if len(data_partes) == 3:
+                                                # Se estiver no formato YYYY-MM-DD
+                                                if len(data_partes[0]) == 4:
+                                                    valor_anterior = f"{data_partes[2]}/{data_partes[1]}/{data_partes[0]}"
+                                                # Se estiver no formato DD-MM-YYYY
+                                                else:
+                                                    valor_anterior = f"{data_partes[0]}/{data_partes[1]}/{data_partes[2]}"
+                                                
+                                                if len(partes) > 1:
+                                                    valor_anterior += f" {partes[1]}"
                                 except Exception as e:
-                                    logger.error(f"Erro ao sanitizar JSON para o histórico do registro {registro_id}: {e}")
-                                    # Criar um objeto vazio para não quebrar o processamento
-                                    alteracoes_data = {}
-                                 
-                                # Verificar diferentes formatos de alterações
-                                if isinstance(alteracoes_data, dict):
-                                    # Formato 1: {campo: {valor_antigo: x, valor_novo: y}}
-                                    for campo, valores in alteracoes_data.items():
-                                        if isinstance(valores, dict) and 'valor_antigo' in valores:
-                                            # Recuperar o valor original do campo
-                                            valor_anterior = valores.get('valor_antigo', '')
-                                            
-                                            # Formatação especial para datas conforme o padrão do sistema
-                                            if campo in ['data_registro', 'data_modificacao', 'horario_previsto'] and valor_anterior:
-                                                # Garantir que as datas estejam no formato padrão DD/MM/YYYY HH:MM:SS para exibição
-                                                try:
-                                                    # Converter para o formato de exibição se for uma data válida
-                                                    if '-' in valor_anterior:
-                                                        partes = valor_anterior.split(' ')
-                                                        if len(partes) > 0:
-                                                            data_partes = partes[0].split('-')
-                                                            if len(data_partes) == 3:
-                                                                # Se estiver no formato YYYY-MM-DD
-                                                                if len(data_partes[0]) == 4:
-                                                                    valor_anterior = f"{data_partes[2]}/{data_partes[1]}/{data_partes[0]}"
-                                                                # Se estiver no formato DD-MM-YYYY
-                                                                else:
-                                                                    valor_anterior = f"{data_partes[0]}/{data_partes[1]}/{data_partes[2]}"
-                                                                
-                                                                if len(partes) > 1:
-                                                                    valor_anterior += f" {partes[1]}"
-                                                except Exception as e:
-                                                    logger.warning(f"Erro ao formatar data {valor_anterior}: {e}")
-                                            
-                                            alteracoes.append({
-                                                'campo': campo,
-                                                'valor_anterior': valor_anterior,
-                                                'valor_novo': valores.get('valor_novo', ''),
-                                                'data_hora': data_alteracao,
-                                                'usuario': usuario
-                                            })
-                                        elif campo in ['tipo', 'campos', 'usuario', 'valores']:
-                                            # Formato 2: alteração estruturada com tipo, campos, etc.
-                                            if campo == 'valores' and isinstance(valores, dict):
-                                                for sub_campo, valor in valores.items():
-                                                    alteracoes.append({
-                                                        'campo': sub_campo,
-                                                        'valor_anterior': 'Valor anterior não disponível',
-                                                        'valor_novo': str(valor),
-                                                        'data_hora': data_alteracao,
-                                                        'usuario': usuario
-                                                    })
-                                        else:
-                                            # Outros formatos de campo direto
-                                            alteracoes.append({
-                                                'campo': campo,
-                                                'valor_anterior': '',
-                                                'valor_novo': str(valores),
-                                                'data_hora': data_alteracao,
-                                                'usuario': usuario
-                                            })
-                                
-                            except json.JSONDecodeError as je:
-                                # Log detalhado do erro de parsing JSON
-                                logger.error(f"Erro de parsing JSON após sanitização para registro {registro_id}: {je}")
-                                logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                                alteracoes.append({
-                                    'campo': 'Erro de formato JSON',
-                                    'valor_anterior': 'N/A',
-                                    'valor_novo': f"Erro ao processar JSON: {str(je)}",
-                                    'data_hora': data_alteracao,
-                                    'usuario': usuario
-                                })
-                            except Exception as e:
-                                logger.error(f"Erro ao processar alterações JSON: {e}")
-                                alteracoes.append({
-                                    'campo': 'Erro',
-                                    'valor_anterior': 'N/A',
-                                    'valor_novo': f"Erro ao processar alterações: {str(e)}",
-                                    'data_hora': data_alteracao,
-                                    'usuario': usuario
-                                })
+                                    logger.warning(f"Erro ao formatar data {valor_anterior}: {e}")
+                            
+                            alteracoes.append({
+                                'campo': campo,
+                                'valor_anterior': valor_anterior,
+                                'valor_novo': valor_novo if valor_novo is not None else '',
+                                'data_hora': data_alteracao,
+                                'usuario': usuario
+                            })
                 
                 # Se não houver alterações específicas, adicionar uma entrada genérica
                 if not alteracoes:
@@ -1788,8 +1364,10 @@ def confirmar_verificacao(registro_id):
                 SET alteracoes_verificadas = 1
                 WHERE id = ?
             """, (registro_id,))
+            limpar_alteracoes_pendentes(cursor, registro_id)
             
             conn.commit()
+            notificar_alteracao_registro(registro_id, 'verificado')
             
             flash("Alterações verificadas com sucesso", "success")
             return redirect(url_for('gr.ambiente', alteracoes_pos_smae='true'))
@@ -1830,8 +1408,7 @@ def historico_registro(registro_id):
             registro = dict(registro)
             
             # Obter as colunas da tabela registros
-            cursor.execute("PRAGMA table_info(registros)")
-            campos_existentes = [col[1] for col in cursor.fetchall()]
+            campos_existentes = list(get_schema().colunas(TABLE_REGISTROS))
             
             # Preparar informações do registro para exibição
             # Garantir que todos os campos tenham valores válidos
@@ -1906,151 +1483,46 @@ def historico_registro(registro_id):
             
             try:
                 # Verificar se a tabela histórico existe
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-                if cursor.fetchone():
-                    # Buscar todos os registros do histórico que contenham alterações em formato JSON
-                    cursor.execute("""
-                        SELECT h.alteracoes, h.data_alteracao, h.alterado_por, u.nivel
+                if get_schema().tem_tabela(TABLE_HISTORICO):
+                    # Buscar os campos alterados já estruturados (historico_campos)
+                    cursor.execute(f"""
+                        SELECT c.campo, c.valor_anterior, c.valor_novo, h.data_alteracao, h.alterado_por, c.ts
                         FROM historico h
-                        LEFT JOIN usuarios u ON h.alterado_por = u.username
-                        WHERE h.registro_id = ? 
-                        ORDER BY h.data_alteracao DESC
+                        JOIN {TABLE_HISTORICO_CAMPOS} c ON c.historico_id = h.id
+                        WHERE h.registro_id = ? AND c.tipo IS NULL
+                        ORDER BY h.data_alteracao_epoch DESC, h.id DESC, c.id
                     """, (registro_id,))
                     
                     registros_historico = cursor.fetchall()
                     
-                    for registro_hist in registros_historico:
-                        if registro_hist[0]:  # Se temos alterações em JSON
-                            try:
-                                # Registrar o tamanho da string JSON para depuração
-                                json_str_length = len(registro_hist[0]) if registro_hist[0] else 0
-                                logger.debug(f"Processando JSON de tamanho {json_str_length} para histórico do registro {registro_id}")
-                                
-                                # Sanitizar o JSON antes de processá-lo - usar modo agressivo para strings grandes
-                                use_aggressive = json_str_length > 5000
-                                alteracoes_json_str = sanitize_json_string(registro_hist[0], aggressive=use_aggressive)
-                                
-                                try:
-                                    alteracoes_json = json.loads(alteracoes_json_str)
-                                    data_alteracao = registro_hist[1]
-                                    usuario = registro_hist[2]
-                                    nivel_usuario = registro_hist[3]
-                                except json.JSONDecodeError as je:
-                                    logger.error(f"Erro ao decodificar JSON no histórico do registro {registro_id}: {je}")
-                                    logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                                    
-                                    # Registrar um trecho do JSON em torno da posição do erro
-                                    error_pos = je.pos
-                                    context_start = max(0, error_pos - 50)
-                                    context_end = min(len(alteracoes_json_str), error_pos + 50)
-                                    error_context = alteracoes_json_str[context_start:context_end]
-                                    logger.error(f"Contexto do erro: {error_context}")
-                                    
-                                    # Tentar sanitização mais agressiva
-                                    try:
-                                        alteracoes_json_str = sanitize_json_string(registro_hist[0], aggressive=True)
-                                        alteracoes_json = json.loads(alteracoes_json_str)
-                                        data_alteracao = registro_hist[1]
-                                        usuario = registro_hist[2]
-                                        nivel_usuario = registro_hist[3]
-                                        logger.info(f"Sanitização agressiva bem-sucedida para o histórico do registro {registro_id}")
-                                    except json.JSONDecodeError as je2:
-                                        logger.error(f"Sanitização agressiva falhou para histórico do registro {registro_id}: {je2}")
-                                        logger.error(f"Posição do erro após sanitização agressiva: {je2.pos}, linha: {je2.lineno}, coluna: {je2.colno}")
-                                        
-                                        # Tentar uma abordagem ainda mais radical: remover todos os caracteres de escape
-                                        try:
-                                            # Remover todas as barras invertidas
-                                            sanitized_extreme = re.sub(r'\\', '', registro_hist[0])
-                                            # Substituir aspas simples por aspas duplas
-                                            sanitized_extreme = sanitized_extreme.replace("'", '"')
-                                            # Remover caracteres de controle
-                                            sanitized_extreme = re.sub(r'[\x00-\x1F\x7F]', ' ', sanitized_extreme)
-                                            
-                                            try:
-                                                alteracoes_json = json.loads(sanitized_extreme)
-                                                data_alteracao = registro_hist[1]
-                                                usuario = registro_hist[2]
-                                                nivel_usuario = registro_hist[3]
-                                                logger.info(f"Sanitização extrema bem-sucedida para histórico do registro {registro_id}")
-                                            except json.JSONDecodeError as je3:
-                                                logger.error(f"Sanitização extrema falhou: {je3}")
-                                                # Se falhar, pular este registro e continuar com o próximo
-                                                continue
-                                        except Exception as e3:
-                                            logger.error(f"Erro na sanitização extrema: {e3}")
-                                            # Se falhar, pular este registro e continuar com o próximo
-                                            continue
-                                    except Exception as e2:
-                                        logger.error(f"Sanitização agressiva falhou com erro não-JSON: {e2}")
-                                        # Se falhar, pular este registro e continuar com o próximo
-                                        continue
-                                
-                                # Processar cada campo alterado
-                                for campo, valores in alteracoes_json.items():
-                                    # Verificar se é um campo monitorado
-                                    if campo.lower() in [c.lower() for c in campos_existentes]:
-                                        # Verificar se a alteração ocorreu após a inclusão de SM/AE
-                                        data_sm = registro['data_sm'] if 'data_sm' in registro.keys() else None
-                                        data_ae = registro['data_ae'] if 'data_ae' in registro.keys() else None
-                                        
-                                        # Garantir que a data de alteração está no formato correto
-                                        try:
-                                            data_alteracao_dt = datetime.strptime(data_alteracao, '%Y-%m-%d %H:%M:%S')
-                                        except (ValueError, TypeError):
-                                            # Se houver erro no formato da data, usar a data atual
-                                            logger.warning(f"Formato de data inválido: {data_alteracao}. Usando data atual.")
-                                            data_alteracao_dt = datetime.now()
-                                            data_alteracao = data_alteracao_dt.strftime('%Y-%m-%d %H:%M:%S')
-                                        
-                                        # Determinar a data mais recente entre SM e AE
-                                        data_referencia = None
-                                        if data_sm and data_ae:
-                                            try:
-                                                data_sm_dt = datetime.strptime(data_sm, '%Y-%m-%d %H:%M:%S')
-                                                data_ae_dt = datetime.strptime(data_ae, '%Y-%m-%d %H:%M:%S')
-                                                data_referencia = max(data_sm_dt, data_ae_dt)
-                                            except (ValueError, TypeError):
-                                                # Se houver erro no formato da data, usar a data de alteração
-                                                data_referencia = None
-                                        elif data_sm:
-                                            try:
-                                                data_referencia = datetime.strptime(data_sm, '%Y-%m-%d %H:%M:%S')
-                                            except (ValueError, TypeError):
-                                                data_referencia = None
-                                        elif data_ae:
-                                            try:
-                                                data_referencia = datetime.strptime(data_ae, '%Y-%m-%d %H:%M:%S')
-                                            except (ValueError, TypeError):
-                                                data_referencia = None
-                                        
-                                        # Garantir que os valores anterior e novo não sejam nulos
-                                        valor_anterior = valores.get('valor_antigo', '')
-                                        if valor_anterior is None:
-                                            valor_anterior = ''
-                                        
-                                        valor_novo = valores.get('valor_novo', '')
-                                        if valor_novo is None:
-                                            valor_novo = ''
-                                        
-                                        # Só adicionar a alteração se ocorreu após a inclusão de SM/AE
-                                        if not data_referencia or data_alteracao_dt > data_referencia:
-                                            alteracoes.append({
-                                                'data_hora': data_alteracao,
-                                                'usuario': usuario if usuario else 'Sistema',
-                                                'campo': campo,
-                                                'valor_anterior': valor_anterior,
-                                                'valor_novo': valor_novo
-                                            })
-                            except json.JSONDecodeError as je:
-                                logger.warning(f"Formato JSON inválido no histórico: erro na posição {je.pos}, linha {je.lineno}, coluna {je.colno}")
-                                # Não logar o JSON completo para evitar poluir os logs, apenas um trecho em torno do erro
-                                if registro_hist[0] and len(registro_hist[0]) > 0:
-                                    error_pos = min(je.pos, len(registro_hist[0])-1) if je.pos < len(registro_hist[0]) else 0
-                                    context_start = max(0, error_pos - 30)
-                                    context_end = min(len(registro_hist[0]), error_pos + 30)
-                                    error_context = registro_hist[0][context_start:context_end]
-                                    logger.warning(f"Contexto do erro: {error_context}")
+                    # Determinar a data mais recente entre SM e AE
+                    data_sm = registro['data_sm'] if 'data_sm' in registro.keys() else None
+                    data_ae = registro['data_ae'] if 'data_ae' in registro.keys() else None
+                    epocas_smae = [e for e in (epoch_data(data_sm), epoch_data(data_ae)) if e is not None]
+                    data_referencia = max(epocas_smae) if epocas_smae else None
+                    campos_monitorados = {c.lower() for c in campos_existentes}
+                    
+                    for campo, valor_anterior, valor_novo, data_alteracao, usuario, data_alteracao_epoch in registros_historico:
+                        # Verificar se é um campo monitorado
+                        if campo.lower() not in campos_monitorados:
+                            continue
+                        
+                        # Comparar pelo epoch: o texto das datas mistura formatos
+                        if data_alteracao_epoch is None:
+                            # Se houver erro no formato da data, usar a data atual
+                            logger.warning(f"Formato de data inválido: {data_alteracao}. Usando data atual.")
+                            data_alteracao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                            data_alteracao_epoch = epoch_data(data_alteracao)
+                        
+                        # Só adicionar a alteração se ocorreu após a inclusão de SM/AE
+                        if data_referencia is None or data_alteracao_epoch > data_referencia:
+                            alteracoes.append({
+                                'data_hora': data_alteracao,
+                                'usuario': usuario if usuario else 'Sistema',
+                                'campo': campo,
+                                'valor_anterior': valor_anterior if valor_anterior is not None else '',
+                                'valor_novo': valor_novo if valor_novo is not None else ''
+                            })
             except Exception as e:
                 logger.error(f"Erro ao processar histórico: {e}")
         
@@ -2287,6 +1759,7 @@ def editar_registro(registro_id):
                     
                     # Commit das alterações no banco de dados
                     conn.commit()
+                    notificar_alteracao_registro(registro_id, 'alterado')
                     
                     flash("Registro atualizado com sucesso!", "success")
                     return redirect(url_for('gr.ambiente'))
@@ -2359,7 +1832,7 @@ def visualizar_registro(registro_id):
                     SELECT id, registro_id, alterado_por, alteracoes, data_alteracao
                     FROM {TABLE_HISTORICO}
                     WHERE registro_id = ?
-                    ORDER BY data_alteracao DESC
+                    ORDER BY data_alteracao_epoch DESC, id DESC
                 """, (registro_id,))
                 
                 # Verificar se a tabela historico existe
@@ -2434,7 +1907,7 @@ def exibir_confirmacao_verificacao(registro_id):
                 FROM {TABLE_HISTORICO} h
                 LEFT JOIN {TABLE_USUARIOS} u ON h.alterado_por = u.username
                 WHERE h.registro_id = ?
-                ORDER BY h.data_alteracao DESC
+                ORDER BY h.data_alteracao_epoch DESC, h.id DESC
                 LIMIT 10
             """, (registro_id,))
             historico = [dict(row) for row in cursor.fetchall()]
@@ -2484,6 +1957,8 @@ def marcar_alteracoes_verificadas(registro_id):
                     flash("Falha ao marcar alterações como verificadas.", "danger")
                     return redirect(url_for('gr.ambiente', alteracoes_pos_smae='true'))
             
+            limpar_alteracoes_pendentes(cursor, registro_id)
+            
             # Registrar no histórico que as alterações foram verificadas usando a função auxiliar
             registrar_historico(
                 cursor, 
@@ -2495,6 +1970,10 @@ def marcar_alteracoes_verificadas(registro_id):
             # Log de sucesso
             logger.info(f"Alterações marcadas como verificadas com sucesso para o registro {registro_id}")
             
+            # Commit antes de notificar (o DatabaseConnection só faria na saída do bloco)
+            conn.commit()
+            notificar_alteracao_registro(registro_id, 'verificado')
+            
             # Responder de acordo com o tipo de requisição
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return jsonify({
@@ -2542,12 +2021,9 @@ def api_contadores():
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Obter informações sobre as colunas da tabela registros
-            cursor.execute("PRAGMA table_info(registros)")
-            colunas = [col[1] for col in cursor.fetchall()]
-            
-            # Obter contagens básicas usando a função auxiliar
-            contadores = get_contagens_basicas(cursor)
+            # Obter contagens básicas usando a função auxiliar (cópia: o
+            # resultado memoizado é compartilhado com o resto da requisição)
+            contadores = dict(get_contagens_basicas(cursor))
             
             # Manter a chave 'sem_nf' e adicionar 'operacoes_sem_nf' para compatibilidade
             contadores['operacoes_sem_nf'] = contadores['sem_nf']
@@ -2560,12 +2036,26 @@ def api_contadores():
             if 'alteracoes_pos_smae' not in contadores:
                 contadores['alteracoes_pos_smae'] = 0
             
-            # Usar a função auxiliar para obter a contagem de alterações nos campos específicos após inclusão de SM/AE
-            _, registros_alterados_ids = get_registros_com_alteracoes_pos_smae(cursor, colunas)
-            contadores['alteracoes_pos_smae'] = len(registros_alterados_ids)
-            
             return jsonify(contadores)
             
     except Exception as e:
         logger.error(f"Erro ao obter contadores: {e}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+def ler_contadores_stream():
+    """Contadores da GR para o fluxo de eventos (fora do contexto da requisição)"""
+    with get_db_connection() as conn:
+        contadores = contadores_gr(conn.cursor())
+    contadores['operacoes_sem_nf'] = contadores['sem_nf']
+    return contadores
+
+# Fluxo Server-Sent Events com contadores e registros alterados
+@gr_blueprint.route('/stream')
+@gr_required
+def stream():
+    """Envia os contadores na conexão e depois só quando algum registro muda"""
+    return Response(
+        fluxo_eventos(ler_contadores_stream),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
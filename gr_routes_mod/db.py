@@ -1,20 +1,24 @@
 # db.py
 
+import os
+import sys
 import sqlite3
 import logging
 from constants import TABLE_REGISTROS, COL_ALTERACOES_VERIFICADAS, COL_MODIFICADO_POR
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.database import get_db_connection as _get_pooled_connection
+
 logger = logging.getLogger(__name__)
 
 class DatabaseConnection:
-    def __init__(self, database='usuarios.db'):
+    def __init__(self, database=None):
         self.database = database
         self.conn = None
 
     def __enter__(self):
         try:
-            self.conn = sqlite3.connect(self.database)
-            self.conn.row_factory = sqlite3.Row
+            self.conn = _get_pooled_connection(self.database)
             return self.conn
         except sqlite3.Error as e:
             logger.error(f"Erro ao conectar ao banco de dados {self.database}: {e}")
@@ -33,11 +37,9 @@ class DatabaseConnection:
                     logger.error(f"Erro ao fazer commit: {e}")
             self.conn.close()
 
-def get_db_connection(database='usuarios.db'):
+def get_db_connection(database=None):
     try:
-        conn = sqlite3.connect(database)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return _get_pooled_connection(database)
     except sqlite3.Error as e:
         logger.error(f"Erro ao conectar ao banco de dados {database}: {e}")
         raise
@@ -4,6 +4,9 @@ import sqlite3
 from datetime import datetime
 from flask import jsonify
 from models.database import get_db_connection
+from models.schema import get_schema
+from utils.date_utils import epoch_data
+from models.historico_campos import TABLE_HISTORICO_CAMPOS, campos_por_historico
 
 # Constantes para nomes de tabelas
 TABLE_REGISTROS = 'registros'
@@ -369,15 +372,14 @@ def obter_historico_alteracoes(registro_id):
         data_modificacao = None
         
         # Verificar se a tabela historico existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-        tabela_existe = cursor.fetchone()
+        tabela_existe = get_schema().tem_tabela('historico')
         
         if tabela_existe:
             # Buscar a alteração mais recente para este registro
             cursor.execute(
                 """SELECT data_alteracao FROM historico 
                 WHERE registro_id = ? 
-                ORDER BY data_alteracao DESC LIMIT 1""", 
+                ORDER BY data_alteracao_epoch DESC, id DESC LIMIT 1""", 
                 (registro_id,)
             )
             ultima_alteracao = cursor.fetchone()
@@ -426,19 +428,21 @@ def obter_historico_alteracoes(registro_id):
         alteracoes = []
         
         # Verificar se a tabela histórico existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='historico'")
-        if cursor.fetchone():
+        if get_schema().tem_tabela('historico'):
             # Buscar todos os registros do histórico para este registro
             cursor.execute("""
-                SELECT id, registro_id, alterado_por, alteracoes, data_alteracao
+                SELECT id, registro_id, alterado_por, alteracoes, data_alteracao, data_alteracao_epoch
                 FROM historico
                 WHERE registro_id = ?
-                ORDER BY data_alteracao DESC
+                ORDER BY data_alteracao_epoch DESC, id DESC
             """, (registro_id,))
             
             registros_historico = cursor.fetchall()
             logger.info(f"Encontrados {len(registros_historico)} registros no histórico para o registro {registro_id}")
             
+            # Alterações já estruturadas por campo (historico_campos)
+            campos_historico = campos_por_historico(cursor, [linha['id'] for linha in registros_historico])
+            
             # Processar cada registro do histórico
             for registro_hist in registros_historico:
                 try:
@@ -447,48 +451,22 @@ def obter_historico_alteracoes(registro_id):
                         'registro_id': registro_hist['registro_id'],
                         'usuario': registro_hist['alterado_por'],
                         'data_hora': registro_hist['data_alteracao'],
-                        'alteracoes_raw': registro_hist['alteracoes']
+                        'data_epoch': registro_hist['data_alteracao_epoch']
                     }
+                    campos = campos_historico.get(registro_hist['id'], [])
+                    tipo = next((c[3] for c in campos if c[3] is not None), None)
                     
-                    # Tentar processar as alterações como JSON
-                    try:
-                        alteracoes_json = registro_hist['alteracoes']
-                        if isinstance(alteracoes_json, str):
-                            # Usar a função de sanitização para tratar a string JSON
-                            sanitized_json = sanitize_json_string(alteracoes_json)
-                            alteracoes_obj = json.loads(sanitized_json)
-                        else:
-                            alteracoes_obj = alteracoes_json
-                        
-                        # Log para depuração
-                        logger.info(f"Processando alteração: {alteracoes_obj}")
-                        
-                        # Verificar se é uma alteração do tipo 'Edição GR'
-                        if isinstance(alteracoes_obj, dict) and 'tipo' in alteracoes_obj and alteracoes_obj['tipo'] == 'Edição GR':
-                            alteracao['tipo'] = 'Edição GR'
-                            alteracao['campos'] = alteracoes_obj.get('campos', [])
-                        # Verificar se é uma alteração do tipo 'Verificação de Alterações'
-                        elif isinstance(alteracoes_obj, dict) and 'tipo' in alteracoes_obj and alteracoes_obj['tipo'] == 'Verificação de Alterações':
-                            alteracao['tipo'] = 'Verificação de Alterações'
-                            alteracao['campos'] = alteracoes_obj.get('campos', [])
-                        else:
-                            # Processar alterações normais (campo a campo)
-                            campos_alterados = []
-                            for campo, valores in alteracoes_obj.items():
-                                if isinstance(valores, dict) and 'valor_antigo' in valores and 'valor_novo' in valores:
-                                    campos_alterados.append({
-                                        'campo': campo,
-                                        'valor_antigo': valores['valor_antigo'],
-                                        'valor_novo': valores['valor_novo']
-                                    })
-                            alteracao['campos_alterados'] = campos_alterados
-                    except json.JSONDecodeError as je:
-                        logger.error(f"Erro de parsing JSON em obter_historico_alteracoes (processamento de alterações): {je}")
-                        logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                        campos_alterados_encontrados = False
-                    except Exception as e:
-                        logger.error(f"Erro ao processar alterações: {e}")
-                        campos_alterados_encontrados = False
+                    # Alterações do tipo 'Edição GR' ou 'Verificação de Alterações' listam só os campos
+                    if tipo in ('Edição GR', 'Verificação de Alterações'):
+                        alteracao['tipo'] = tipo
+                        alteracao['campos'] = [c[0] for c in campos]
+                    elif tipo is None:
+                        # Alterações normais (campo a campo) dos campos do registro
+                        alteracao['campos_alterados'] = [
+                            {'campo': campo, 'valor_antigo': anterior, 'valor_novo': novo}
+                            for campo, anterior, novo, _tipo in campos
+                            if campo in registro.keys()
+                        ]
                     alteracoes.append(alteracao)
                 except Exception as e:
                     logger.error(f"Erro ao processar registro do histórico: {e}")
@@ -499,31 +477,7 @@ def obter_historico_alteracoes(registro_id):
         # Verificar se há campos alterados
         campos_alterados_encontrados = False
         
-        # Obter a data de inclusão de SM/AE
-        data_sm_ae = None
-        for alteracao in alteracoes:
-            try:
-                # Usar a função de sanitização para tratar a string JSON
-                sanitized_json = sanitize_json_string(alteracao.get('alteracoes_raw', '{}'))
-                try:
-                    alteracoes_obj = json.loads(sanitized_json)
-                except json.JSONDecodeError as je:
-                    logger.error(f"Erro de parsing JSON em obter_historico_alteracoes: {je}")
-                    logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                    # Tentar sanitização mais agressiva
-                    sanitized_json = sanitize_json_string(alteracao.get('alteracoes_raw', '{}'), aggressive=True)
-                    alteracoes_obj = json.loads(sanitized_json)
-                # Verificar se é uma alteração que inclui SM ou AE
-                if ('numero_sm' in alteracoes_obj or 'numero_ae' in alteracoes_obj) and alteracao.get('usuario', '').lower() in ['gr', 'admin']:
-                    data_sm_ae = alteracao.get('data_hora', '')
-                    break
-            except Exception as e:
-                logger.error(f"Erro ao processar data de SM/AE: {e}")
-        
         for alteracao in alteracoes:
-            # Processar todas as alterações, independentemente do usuário ou do momento
-            usuario = alteracao.get('usuario', '').lower()
-            
             # Processar cada campo alterado dentro da alteração
             for campo_alterado in alteracao.get('campos_alterados', []):
                 campo = campo_alterado.get('campo', '')
@@ -554,111 +508,67 @@ def obter_historico_alteracoes(registro_id):
             for alteracao in alteracoes:
                 # Verificar se é uma alteração do tipo 'Edição GR' ou 'Verificação de Alterações'
                 if 'tipo' in alteracao:
-                    if alteracao['tipo'] == 'Edição GR' or alteracao['tipo'] == 'Verificação de Alterações':
-                        for campo in alteracao.get('campos', []):
-                            # Obter o valor atual do campo do registro
-                            valor_atual = registro[campo] if campo in registro.keys() else 'Não disponível'
-                            if valor_atual is None:
-                                valor_atual = 'Não informado'
-                            
-                            # Tentar obter o valor anterior buscando no histórico
-                            valor_anterior = None
+                    for campo in alteracao.get('campos', []):
+                        # Obter o valor atual do campo do registro
+                        valor_atual = registro[campo] if campo in registro.keys() else 'Não disponível'
+                        if valor_atual is None:
+                            valor_atual = 'Não informado'
+                        
+                        # Tentar obter o valor anterior buscando no histórico
+                        valor_anterior = None
+                        
+                        # Estratégia 1: a alteração anterior mais recente deste campo
+                        try:
+                            cursor.execute(f"""
+                                SELECT valor_anterior, valor_novo, tipo FROM {TABLE_HISTORICO_CAMPOS}
+                                WHERE registro_id = ? AND campo = ? AND ts < ?
+                                ORDER BY ts DESC, historico_id DESC LIMIT 1
+                            """, (registro_id, campo, alteracao.get('data_epoch')))
                             
-                            # Estratégia 1: Buscar o valor anterior em alterações anteriores deste campo
+                            anterior = cursor.fetchone()
+                            if anterior and anterior['tipo'] is None:
+                                if anterior['valor_anterior'] is not None:
+                                    valor_anterior = anterior['valor_anterior']
+                                else:
+                                    valor_anterior = anterior['valor_novo']
+                        except Exception as e:
+                            logger.error(f"Erro ao buscar histórico anterior (estratégia 1): {e}")
+                        
+                        # Estratégia 2: Se não encontrou, o último valor novo gravado para o campo
+                        if valor_anterior is None:
                             try:
-                                # Buscar alterações anteriores para este campo
-                                cursor.execute("""
-                                    SELECT alteracoes FROM historico 
-                                    WHERE registro_id = ? AND alteracoes LIKE ? AND data_alteracao < ?
-                                    ORDER BY data_alteracao DESC LIMIT 1
-                                """, (registro_id, f'%"{campo}"%', alteracao.get('data_hora', '')))
+                                cursor.execute(f"""
+                                    SELECT valor_novo FROM {TABLE_HISTORICO_CAMPOS}
+                                    WHERE registro_id = ? AND campo = ? AND ts < ?
+                                    AND tipo IS NULL AND valor_novo IS NOT NULL
+                                    ORDER BY ts DESC, historico_id DESC LIMIT 1
+                                """, (registro_id, campo, alteracao.get('data_epoch')))
                                 
-                                hist_anterior = cursor.fetchone()
-                                if hist_anterior:
-                                    try:
-                                        # Usar a função de sanitização para tratar a string JSON
-                                        sanitized_json = sanitize_json_string(hist_anterior['alteracoes'])
-                                        try:
-                                            alt_json = json.loads(sanitized_json)
-                                            if campo in alt_json:
-                                                if isinstance(alt_json[campo], dict) and 'valor_antigo' in alt_json[campo]:
-                                                    valor_anterior = alt_json[campo].get('valor_antigo')
-                                                elif isinstance(alt_json[campo], dict) and 'valor_novo' in alt_json[campo]:
-                                                    valor_anterior = alt_json[campo].get('valor_novo')
-                                        except json.JSONDecodeError as je:
-                                            logger.error(f"Erro de parsing JSON ao buscar histórico anterior: {je}")
-                                            logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                                            # Tentar sanitização mais agressiva
-                                            sanitized_json = sanitize_json_string(hist_anterior['alteracoes'], aggressive=True)
-                                            try:
-                                                alt_json = json.loads(sanitized_json)
-                                                if campo in alt_json:
-                                                    if isinstance(alt_json[campo], dict) and 'valor_antigo' in alt_json[campo]:
-                                                        valor_anterior = alt_json[campo].get('valor_antigo')
-                                                    elif isinstance(alt_json[campo], dict) and 'valor_novo' in alt_json[campo]:
-                                                        valor_anterior = alt_json[campo].get('valor_novo')
-                                            except Exception as e2:
-                                                logger.error(f"Falha na sanitização agressiva para histórico: {e2}")
-                                    except Exception as e:
-                                        logger.error(f"Erro ao processar histórico anterior (estratégia 1): {e}")
+                                anterior = cursor.fetchone()
+                                if anterior:
+                                    valor_anterior = anterior['valor_novo']
                             except Exception as e:
-                                logger.error(f"Erro ao buscar histórico anterior (estratégia 1): {e}")
-                            
-                            # Estratégia 2: Se não encontrou, buscar o valor em qualquer alteração anterior
-                            if valor_anterior is None:
-                                try:
-                                    cursor.execute("""
-                                        SELECT alteracoes FROM historico 
-                                        WHERE registro_id = ? AND data_alteracao < ?
-                                        ORDER BY data_alteracao DESC
-                                    """, (registro_id, alteracao.get('data_hora', '')))
-                                    
-                                    historicos = cursor.fetchall()
-                                    for hist in historicos:
-                                        try:
-                                            # Usar a função de sanitização para tratar a string JSON
-                                            sanitized_json = sanitize_json_string(hist['alteracoes'])
-                                            alt_json = json.loads(sanitized_json)
-                                            if campo in alt_json:
-                                                if isinstance(alt_json[campo], dict) and 'valor_novo' in alt_json[campo]:
-                                                    valor_anterior = alt_json[campo].get('valor_novo')
-                                                    break
-                                        except json.JSONDecodeError as je:
-                                            logger.debug(f"Erro de parsing JSON ao buscar histórico anterior para campo {campo}: {je}")
-                                            # Tentar sanitização mais agressiva
-                                            try:
-                                                sanitized_json = sanitize_json_string(hist['alteracoes'], aggressive=True)
-                                                alt_json = json.loads(sanitized_json)
-                                                if campo in alt_json:
-                                                    if isinstance(alt_json[campo], dict) and 'valor_novo' in alt_json[campo]:
-                                                        valor_anterior = alt_json[campo].get('valor_novo')
-                                                        break
-                                            except Exception:
-                                                pass
-                                        except Exception:
-                                            continue
-                                except Exception as e:
-                                    logger.error(f"Erro ao buscar histórico anterior (estratégia 2): {e}")
-                            
-                            # Se ainda não encontrou, usar mensagem padrão
-                            if valor_anterior is None:
-                                valor_anterior = 'Valor anterior não disponível'
-                            
-                            # Se o campo for numero_sm ou numero_ae e o valor atual for vazio, usar 'N/A'
-                            if campo in ['numero_sm', 'numero_ae'] and (valor_atual == '' or valor_atual is None):
-                                valor_atual = 'N/A'
-                            
-                            # Se o campo for observacao_gr e o valor atual for vazio, usar 'Vazio'
-                            if campo == 'observacao_gr' and (valor_atual == '' or valor_atual is None):
-                                valor_atual = 'Vazio'
-                            
-                            alteracoes_formatadas.append({
-                                'campo': campo,
-                                'valor_antigo': str(valor_anterior),
-                                'valor_novo': str(valor_atual),
-                                'data_alteracao': alteracao.get('data_hora', ''),
-                                'usuario': alteracao.get('usuario', 'Sistema')
-                            })
+                                logger.error(f"Erro ao buscar histórico anterior (estratégia 2): {e}")
+                        
+                        # Se ainda não encontrou, usar mensagem padrão
+                        if valor_anterior is None:
+                            valor_anterior = 'Valor anterior não disponível'
+                        
+                        # Se o campo for numero_sm ou numero_ae e o valor atual for vazio, usar 'N/A'
+                        if campo in ['numero_sm', 'numero_ae'] and (valor_atual == '' or valor_atual is None):
+                            valor_atual = 'N/A'
+                        
+                        # Se o campo for observacao_gr e o valor atual for vazio, usar 'Vazio'
+                        if campo == 'observacao_gr' and (valor_atual == '' or valor_atual is None):
+                            valor_atual = 'Vazio'
+                        
+                        alteracoes_formatadas.append({
+                            'campo': campo,
+                            'valor_antigo': str(valor_anterior),
+                            'valor_novo': str(valor_atual),
+                            'data_alteracao': alteracao.get('data_hora', ''),
+                            'usuario': alteracao.get('usuario', 'Sistema')
+                        })
         
         # Se ainda não tiver alterações, criar uma entrada para cada alteração
         if not alteracoes_formatadas:
@@ -671,8 +581,9 @@ def obter_historico_alteracoes(registro_id):
                     'usuario': alteracao.get('usuario', 'Sistema')
                 })
         
-        # Ordenar alterações por data (mais recente primeiro)
-        alteracoes_formatadas.sort(key=lambda x: x.get('data_alteracao', ''), reverse=True)
+        # Ordenar alterações por data (mais recente primeiro); o texto mistura
+        # formatos, então a comparação é feita pelo epoch
+        alteracoes_formatadas.sort(key=lambda x: epoch_data(x.get('data_alteracao')) or 0, reverse=True)
         
         # Fechar a conexão com o banco de dados
         if conn:
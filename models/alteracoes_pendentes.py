@@ -0,0 +1,184 @@
+"""
+Tabela materializada de registros com alterações pendentes pós SM/AE.
+
+``registros_alteracoes_pendentes`` guarda os ids dos registros que têm ao
+menos uma alteração relevante, feita fora da GR, depois da SM/AE e ainda não
+verificada, calculada sobre o histórico estruturado (models/historico_campos.py).
+A tabela é mantida na escrita: cada gravação no histórico chama
+``atualizar_alteracoes_pendentes`` para o registro afetado, e as confirmações
+de verificação chamam ``limpar_alteracoes_pendentes``. A listagem e a
+contagem viram consultas indexadas, e ``reconstruir_alteracoes_pendentes``
+regenera tudo a partir do histórico (ver scripts/reconstruir_alteracoes_pendentes.py).
+"""
+
+import logging
+from datetime import datetime
+
+from models.historico_epoch import expr_epoch
+from models.historico_campos import TABLE_HISTORICO_CAMPOS
+
+logger = logging.getLogger(__name__)
+
+TABLE_ALTERACOES_PENDENTES = 'registros_alteracoes_pendentes'
+
+# Campos monitorados após a inclusão de SM/AE
+CAMPOS_MONITORADOS_POS_SMAE = [
+    'usuario', 'placa', 'motorista', 'cpf', 'mot_loc', 'carreta', 'carreta1', 'carreta2',
+    'carreta_loc', 'cliente', 'loc_cliente', 'arquivo', 'container_1', 'container_2',
+    'status_sm', 'tipo_carga', 'status_container', 'modalidade', 'gerenciadora',
+    'booking_di', 'pedido_referencia', 'lote_cs', 'on_time_cliente', 'horario_previsto',
+    'observacao_operacional', 'observacao_gr', 'destino_intermediario', 'destino_final',
+    'anexar_nf', 'anexar_os', 'anexar_agendamento', 'numero_nf', 'serie', 'quantidade',
+    'peso_bruto', 'valor_total_nota', 'unidade', 'arquivo_nf_nome', 'arquivo_os_nome',
+    'arquivo_agendamento_nome', 'origem'
+]
+
+# Epoch da SM/AE mais recente do registro (colunas canônicas, ver
+# models/datas_iso.py), comparável com historico.data_alteracao_epoch
+EPOCH_REFERENCIA_SMAE = expr_epoch("""
+    CASE
+        WHEN r.data_sm_iso IS NOT NULL AND (r.data_ae_iso IS NULL OR r.data_sm_iso > r.data_ae_iso) THEN r.data_sm_iso
+        ELSE r.data_ae_iso
+    END""")
+
+# Campos cuja alteração na mesma entrada do histórico indica edição de SM/AE
+CAMPOS_EDICAO_SMAE = ['numero_sm', 'numero_ae']
+
+
+def _lista_sql(valores):
+    return ", ".join(f"'{valor}'" for valor in valores)
+
+
+# Um registro tem alterações pendentes se, depois da SM/AE e fora da GR, houver
+# no histórico estruturado (historico_campos) a alteração de um campo
+# monitorado numa entrada que não seja edição da GR nem edição de SM/AE
+SQL_IDS_COM_ALTERACOES = f"""
+    WITH usuarios_gr AS (
+        SELECT username FROM usuarios WHERE nivel = 'gr'
+    )
+    SELECT r.id
+    FROM registros r
+    WHERE ((r.numero_sm IS NOT NULL AND r.numero_sm != '' AND r.numero_sm != '0')
+       OR (r.numero_ae IS NOT NULL AND r.numero_ae != '' AND r.numero_ae != '0'))
+    AND r.excluido = 0
+    AND r.alteracoes_verificadas = 0
+    AND EXISTS (
+        SELECT 1 FROM {TABLE_HISTORICO_CAMPOS} c
+        JOIN historico h ON h.id = c.historico_id
+        WHERE c.registro_id = r.id
+        AND c.ts > {EPOCH_REFERENCIA_SMAE}
+        AND c.campo IN ({_lista_sql(CAMPOS_MONITORADOS_POS_SMAE)})
+        AND (c.tipo IS NULL OR c.tipo != 'Edição GR')
+        AND h.alterado_por NOT IN usuarios_gr
+        AND NOT EXISTS (
+            SELECT 1 FROM {TABLE_HISTORICO_CAMPOS} x
+            WHERE x.historico_id = c.historico_id
+            AND x.campo IN ({_lista_sql(CAMPOS_EDICAO_SMAE)})
+        )
+    )
+"""
+
+
+def calcular_ids_com_alteracoes(cursor, registro_id=None):
+    """Calcula, a partir do histórico, os ids com alterações pendentes.
+
+    Args:
+        cursor: Cursor do banco de dados
+        registro_id: Restringe o cálculo a um único registro (opcional)
+
+    Returns:
+        list: Ids em ordem crescente
+    """
+    if registro_id is None:
+        cursor.execute(SQL_IDS_COM_ALTERACOES + " ORDER BY r.id")
+    else:
+        cursor.execute(SQL_IDS_COM_ALTERACOES + " AND r.id = ?", (registro_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def atualizar_alteracoes_pendentes(cursor, registro_id):
+    """Recalcula a marcação de um registro após uma gravação no histórico.
+
+    Não faz commit: a alteração entra na transação de quem chamou.
+
+    Returns:
+        bool: True se o registro ficou marcado como pendente
+    """
+    try:
+        pendente = bool(calcular_ids_com_alteracoes(cursor, registro_id))
+        if pendente:
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO {TABLE_ALTERACOES_PENDENTES} (registro_id, data_deteccao)
+                VALUES (?, ?)
+            """, (registro_id, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        else:
+            cursor.execute(
+                f"DELETE FROM {TABLE_ALTERACOES_PENDENTES} WHERE registro_id = ?", (registro_id,)
+            )
+        return pendente
+    except Exception as e:
+        logger.error(f"Erro ao atualizar alterações pendentes do registro {registro_id}: {e}")
+        return False
+
+
+def limpar_alteracoes_pendentes(cursor, registro_id):
+    """Remove a marcação de um registro (alterações verificadas). Não faz commit."""
+    try:
+        cursor.execute(
+            f"DELETE FROM {TABLE_ALTERACOES_PENDENTES} WHERE registro_id = ?", (registro_id,)
+        )
+    except Exception as e:
+        logger.error(f"Erro ao limpar alterações pendentes do registro {registro_id}: {e}")
+
+
+def contar_alteracoes_pendentes(cursor):
+    """Conta os registros ativos com alterações pendentes."""
+    cursor.execute(f"""
+        SELECT COUNT(*)
+        FROM {TABLE_ALTERACOES_PENDENTES} p
+        JOIN registros r ON r.id = p.registro_id
+        WHERE r.excluido = 0 AND r.alteracoes_verificadas = 0
+    """)
+    return cursor.fetchone()[0]
+
+
+def reconstruir_alteracoes_pendentes(conn, apenas_verificar=False):
+    """Regenera a tabela a partir do histórico.
+
+    Args:
+        conn: Conexão com o banco de dados
+        apenas_verificar: Se True, só compara a tabela com o cálculo completo
+
+    Returns:
+        dict: {'total', 'adicionados', 'removidos'} com as diferenças encontradas
+    """
+    cursor = conn.cursor()
+    esperados = set(calcular_ids_com_alteracoes(cursor))
+    cursor.execute(f"SELECT registro_id FROM {TABLE_ALTERACOES_PENDENTES}")
+    atuais = {row[0] for row in cursor.fetchall()}
+
+    adicionados = sorted(esperados - atuais)
+    removidos = sorted(atuais - esperados)
+
+    if not apenas_verificar and (adicionados or removidos):
+        agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            cursor.executemany(
+                f"DELETE FROM {TABLE_ALTERACOES_PENDENTES} WHERE registro_id = ?",
+                [(registro_id,) for registro_id in removidos]
+            )
+            cursor.executemany(
+                f"INSERT INTO {TABLE_ALTERACOES_PENDENTES} (registro_id, data_deteccao) VALUES (?, ?)",
+                [(registro_id, agora) for registro_id in adicionados]
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info(f"Alterações pendentes reconstruídas: +{len(adicionados)} / -{len(removidos)}")
+
+    return {
+        'total': len(esperados),
+        'adicionados': adicionados,
+        'removidos': removidos,
+    }
@@ -0,0 +1,148 @@
+"""
+Índice de texto (FTS5) dos campos pesquisáveis de registros.
+
+A busca global fazia um ``LIKE '%termo%'`` por campo (17 campos em OR), ou
+seja, uma varredura completa da tabela a cada busca e outra para contar.
+``registros_fts`` é uma tabela virtual FTS5 de conteúdo externo (lê os valores
+de ``registros``) com o tokenizador ``trigram``: uma frase entre aspas casa
+com qualquer trecho do texto, sem diferenciar maiúsculas, como o LIKE
+anterior, mas pelo índice. Termos com menos de 3 caracteres não formam
+trigramas e continuam na busca com LIKE (models/busca_global.py).
+
+O índice é mantido por triggers em todo INSERT/UPDATE/DELETE de registros;
+``reconstruir_registros_fts`` o refaz a partir da tabela
+(scripts/reconstruir_busca_fts.py).
+"""
+
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+TABLE_REGISTROS_FTS = 'registros_fts'
+
+# Campos pesquisados pela busca global (mesma lista da busca com LIKE)
+CAMPOS_BUSCA = [
+    'id', 'usuario', 'placa', 'motorista', 'cpf', 'mot_loc',
+    'carreta', 'carreta_loc', 'cliente', 'loc_cliente',
+    'container_1', 'container_2', 'numero_sm', 'numero_ae',
+    'arquivo', 'data_registro', 'status_sm'
+]
+
+TRIGGERS_REGISTROS_FTS = [
+    'registros_fts_insert',
+    'registros_fts_delete',
+    'registros_fts_update',
+]
+
+# Tamanho mínimo do termo para o tokenizador trigram
+TAMANHO_MINIMO_TERMO = 3
+
+
+def expressao_busca(termo):
+    """Expressão MATCH que casa ``termo`` como trecho contínuo (frase entre aspas)."""
+    return '"' + termo.replace('"', '""') + '"'
+
+
+def termo_indexavel(termo):
+    """Indica se o termo pode ser buscado pelo índice (tem ao menos um trigrama)."""
+    return len(termo) >= TAMANHO_MINIMO_TERMO
+
+
+def _valores(r):
+    return ", ".join(f"{r}.{campo}" for campo in CAMPOS_BUSCA)
+
+
+def sql_triggers_registros_fts():
+    """Gera o SQL dos triggers que mantêm o índice.
+
+    Com conteúdo externo, a remoção de uma linha do índice precisa dos valores
+    antigos exatamente como foram indexados (comando 'delete').
+    """
+    colunas = ", ".join(CAMPOS_BUSCA)
+    remover_antigo = f"""INSERT INTO {TABLE_REGISTROS_FTS} ({TABLE_REGISTROS_FTS}, rowid, {colunas})
+    VALUES ('delete', OLD.id, {_valores('OLD')})"""
+    inserir_novo = f"""INSERT INTO {TABLE_REGISTROS_FTS} (rowid, {colunas})
+    VALUES (NEW.id, {_valores('NEW')})"""
+    return [
+        f"""CREATE TRIGGER registros_fts_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    {inserir_novo};
+END""",
+        f"""CREATE TRIGGER registros_fts_delete
+AFTER DELETE ON registros
+FOR EACH ROW
+BEGIN
+    {remover_antigo};
+END""",
+        f"""CREATE TRIGGER registros_fts_update
+AFTER UPDATE OF {colunas} ON registros
+FOR EACH ROW
+BEGIN
+    {remover_antigo};
+    {inserir_novo};
+END""",
+    ]
+
+
+def criar_tabela_registros_fts(cursor):
+    """Cria a tabela virtual (sem triggers nem conteúdo indexado)."""
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_REGISTROS_FTS} USING fts5(
+            {", ".join(CAMPOS_BUSCA)},
+            content='registros', content_rowid='id', tokenize='trigram'
+        )
+    """)
+
+
+def reconstruir_registros_fts(cursor):
+    """Refaz o índice inteiro a partir de registros.
+
+    Returns:
+        int: Número de registros indexados
+    """
+    cursor.execute(f"INSERT INTO {TABLE_REGISTROS_FTS} ({TABLE_REGISTROS_FTS}) VALUES ('rebuild')")
+    cursor.execute("SELECT COUNT(*) FROM registros")
+    return cursor.fetchone()[0]
+
+
+def aplicar_registros_fts(cursor):
+    """Cria a tabela, (re)cria os triggers e reconstrói o índice.
+
+    Se o SQLite não tiver FTS5 (ou o tokenizador trigram, 3.34+), registra um
+    aviso e não cria nada: a busca global continua com LIKE.
+
+    Returns:
+        int: Registros indexados (0 se o FTS5 não estiver disponível)
+    """
+    try:
+        criar_tabela_registros_fts(cursor)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 indisponível ({e}); a busca global continuará usando LIKE")
+        return 0
+
+    for nome in TRIGGERS_REGISTROS_FTS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    for sql in sql_triggers_registros_fts():
+        cursor.execute(sql)
+    indexados = reconstruir_registros_fts(cursor)
+    logger.info(f"Índice de busca (FTS5) reconstruído com {indexados} registros")
+    return indexados
+
+
+def verificar_registros_fts(cursor):
+    """Confere o índice contra o conteúdo atual de registros.
+
+    Returns:
+        bool: True se o índice estiver consistente
+    """
+    try:
+        cursor.execute(
+            f"INSERT INTO {TABLE_REGISTROS_FTS} ({TABLE_REGISTROS_FTS}, rank) VALUES ('integrity-check', 1)"
+        )
+        return True
+    except sqlite3.DatabaseError as e:
+        logger.warning(f"Índice de busca inconsistente: {e}")
+        return False
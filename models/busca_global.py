@@ -1,96 +1,307 @@
 from models.database import get_db_connection
+from models.schema import get_schema
+from models.busca_fts import TABLE_REGISTROS_FTS, CAMPOS_BUSCA, expressao_busca, termo_indexavel
+from models.identificadores import TABLE_IDENTIFICADORES, normalizar_identificador, limites_prefixo
+from utils.paginacao import total_em_cache, guardar_total
+
+# Coluna com o total da busca, calculado na mesma consulta da página (função de janela)
+COLUNA_TOTAL = 'total_busca'
+_TOTAL_JANELA = f"COUNT(*) OVER () AS {COLUNA_TOTAL}"
+
+def _usar_indice(termo):
+    """Indica se a busca pode usar o índice FTS5 (índice criado e termo com trigramas)."""
+    return termo_indexavel(termo) and get_schema().tem_tabela(TABLE_REGISTROS_FTS)
+
+def _condicao_like(termo):
+    """Condição com um LIKE '%termo%' por campo (busca sem índice) e seus parâmetros."""
+    search_conditions = [f"{campo} LIKE ?" for campo in CAMPOS_BUSCA]
+    params = [f"%{termo}%"] * len(CAMPOS_BUSCA)
+    return "(" + " OR ".join(search_conditions) + ")", params
+
+def _colunas(colunas, com_total):
+    return f"{colunas}, {_TOTAL_JANELA}" if com_total else colunas
+
+def _normalizar_termo(termo):
+    """Chave do total em cache: LIKE e FTS5 não diferenciam maiúsculas (ASCII)."""
+    return ''.join(c.lower() if 'A' <= c <= 'Z' else c for c in termo.strip())
+
+def _sql_like(termo, com_total=False):
+    condicao, params = _condicao_like(termo)
+    query = f"""SELECT {_colunas('*', com_total)} FROM registros WHERE {condicao}
+        ORDER BY data_registro_iso DESC, id DESC LIMIT ? OFFSET ?"""
+    return query, params
+
+def busca_like(cursor, termo, limit=100, offset=0):
+    """
+    Busca com LIKE em cada campo (termos curtos demais para o índice ou sem FTS5)
+    """
+    query, params = _sql_like(termo)
+    cursor.execute(query, params + [limit, offset])
+    return [dict(reg) for reg in cursor.fetchall()]
+
+def contar_like(cursor, termo):
+    condicao, params = _condicao_like(termo)
+    cursor.execute(f"SELECT COUNT(*) FROM registros WHERE {condicao}", params)
+    resultado = cursor.fetchone()
+    return resultado[0] if resultado else 0
+
+def _sql_fts(termo, com_total=False):
+    query = f"""
+        SELECT {_colunas('r.*', com_total)} FROM {TABLE_REGISTROS_FTS} f
+        JOIN registros r ON r.id = f.rowid
+        WHERE {TABLE_REGISTROS_FTS} MATCH ?
+        ORDER BY f.rank, r.data_registro_iso DESC, r.id DESC
+        LIMIT ? OFFSET ?
+    """
+    return query, [expressao_busca(termo)]
+
+def busca_fts(cursor, termo, limit=100, offset=0):
+    """
+    Busca pelo índice FTS5, ordenada pela relevância (bm25) e, no empate, pelos mais recentes
+    """
+    query, params = _sql_fts(termo)
+    cursor.execute(query, params + [limit, offset])
+    return [dict(reg) for reg in cursor.fetchall()]
+
+def contar_fts(cursor, termo):
+    cursor.execute(
+        f"SELECT COUNT(*) FROM {TABLE_REGISTROS_FTS} WHERE {TABLE_REGISTROS_FTS} MATCH ?",
+        (expressao_busca(termo),)
+    )
+    resultado = cursor.fetchone()
+    return resultado[0] if resultado else 0
+
+def pagina_com_total(cursor, consulta, contar, chave_total, limit, offset, total_na_consulta=True):
+    """
+    Executa a consulta de uma página e obtém o total de resultados
+
+    O total fica em cache por ``chave_total`` (utils/paginacao.py), então as
+    páginas seguintes do mesmo termo não recontam. Sem total em cache:
+
+    - ``total_na_consulta``: a página traz o total na coluna COLUNA_TOTAL
+      (``COUNT(*) OVER ()``), na mesma varredura; só uma página vazia além do
+      fim precisa de uma contagem à parte. Usado na busca com LIKE, em que
+      cada consulta percorre a tabela inteira.
+    - senão: conta antes pelo índice (FTS5/identificadores, bem mais barato
+      que levar todas as correspondências até a janela) e dispensa a
+      consulta da página quando não há resultados a partir do offset.
+
+    Args:
+        cursor: Cursor do banco
+        consulta: Função (com_total) -> (sql, params) da página, com LIMIT ? OFFSET ?
+        contar: Função sem argumentos que conta os resultados
+        chave_total: Chave do total em cache
+        limit: Limite de resultados a retornar
+        offset: Offset para paginação
+        total_na_consulta: Calcula o total na própria consulta da página
+
+    Returns:
+        tuple: (registros, total)
+    """
+    total = total_em_cache(chave_total)
+    if total is None and not total_na_consulta:
+        total = contar()
+        guardar_total(chave_total, total)
+    if total is not None and offset >= total:
+        return [], total
+
+    com_total = total is None
+    query, params = consulta(com_total)
+    cursor.execute(query, params + [limit, offset])
+    registros = [dict(reg) for reg in cursor.fetchall()]
+    if not com_total:
+        return registros, total
+
+    if registros:
+        total = registros[0][COLUNA_TOTAL]
+        for reg in registros:
+            del reg[COLUNA_TOTAL]
+    else:
+        total = contar() if offset else 0
+    guardar_total(chave_total, total)
+    return registros, total
 
 def busca_global(termo, limit=100, offset=0):
     """
     Realiza uma busca global em múltiplos campos da tabela de registros
-    
+
+    Usa o índice FTS5 (models/busca_fts.py) com resultados por relevância;
+    termos com menos de 3 caracteres usam LIKE, do mais recente para o mais
+    antigo.
+
     Args:
         termo: Termo de busca a ser encontrado em qualquer coluna relevante
         limit: Limite de resultados a retornar
         offset: Offset para paginação
-        
+
     Returns:
         Lista de registros que correspondem à busca
     """
     try:
         if not termo or termo.strip() == '':
             return []
-            
+
         termo = termo.strip()
-        base_query = "SELECT * FROM registros WHERE "
-        
-        # Lista de campos para buscar - USANDO NOMES CORRETOS DAS COLUNAS DO BANCO DE DADOS
-        campos_busca = [
-            'id', 'usuario', 'placa', 'motorista', 'cpf', 'mot_loc',
-            'carreta', 'carreta_loc', 'cliente', 'loc_cliente',
-            'container_1', 'container_2', 'numero_sm', 'numero_ae',
-            'arquivo', 'data_registro', 'status_sm'
-        ]
-        
-        # Criar condições para cada campo
-        search_conditions = []
-        params = []
-        
-        for campo in campos_busca:
-            search_conditions.append(f"{campo} LIKE ?")
-            params.append(f"%{termo}%")
-            
-        # Combinar condições com OR
-        query = base_query + "(" + " OR ".join(search_conditions) + ") ORDER BY data_registro DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, params)
-            registros = cursor.fetchall()
-            return [dict(reg) for reg in registros]
-            
+            if _usar_indice(termo):
+                return busca_fts(cursor, termo, limit, offset)
+            return busca_like(cursor, termo, limit, offset)
+
     except Exception as e:
         print(f"Erro ao realizar busca global: {e}")
         return []
-        
+
 def contar_busca_global(termo):
     """
     Conta o número total de registros que correspondem a uma busca global
-    
+
     Args:
         termo: Termo de busca a ser encontrado
-        
+
     Returns:
         Número total de registros encontrados
     """
     try:
         if not termo or termo.strip() == '':
             return 0
-            
+
         termo = termo.strip()
-        base_query = "SELECT COUNT(*) FROM registros WHERE "
-        
-        # Lista de campos para buscar - USANDO NOMES CORRETOS DAS COLUNAS DO BANCO DE DADOS
-        campos_busca = [
-            'id', 'usuario', 'placa', 'motorista', 'cpf', 'mot_loc',
-            'carreta', 'carreta_loc', 'cliente', 'loc_cliente',
-            'container_1', 'container_2', 'numero_sm', 'numero_ae',
-            'arquivo', 'data_registro', 'status_sm'
-        ]
-        
-        # Criar condições para cada campo
-        search_conditions = []
-        params = []
-        
-        for campo in campos_busca:
-            search_conditions.append(f"{campo} LIKE ?")
-            params.append(f"%{termo}%")
-            
-        # Combinar condições com OR
-        query = base_query + "(" + " OR ".join(search_conditions) + ")"
-        
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, params)
-            resultado = cursor.fetchone()
-            return resultado[0] if resultado else 0
-            
+            if _usar_indice(termo):
+                return contar_fts(cursor, termo)
+            return contar_like(cursor, termo)
+
     except Exception as e:
         print(f"Erro ao contar resultados de busca global: {e}")
         return 0
+
+def busca_global_com_total(termo, limit=100, offset=0):
+    """
+    Busca global com a página e o total de resultados numa única consulta
+
+    Mesmos critérios de ``busca_global``. Com LIKE o total vem na mesma
+    consulta da página; com o índice FTS5 vem da contagem pelo índice. Em
+    ambos fica em cache por termo normalizado (ver ``pagina_com_total``).
+
+    Args:
+        termo: Termo de busca a ser encontrado em qualquer coluna relevante
+        limit: Limite de resultados a retornar
+        offset: Offset para paginação
+
+    Returns:
+        tuple: (registros, total)
+    """
+    try:
+        if not termo or termo.strip() == '':
+            return [], 0
+
+        termo = termo.strip()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if _usar_indice(termo):
+                return pagina_com_total(
+                    cursor, lambda com_total: _sql_fts(termo, com_total), lambda: contar_fts(cursor, termo),
+                    ('busca_global', 'fts', _normalizar_termo(termo)), limit, offset, total_na_consulta=False
+                )
+            return pagina_com_total(
+                cursor, lambda com_total: _sql_like(termo, com_total), lambda: contar_like(cursor, termo),
+                ('busca_global', 'like', _normalizar_termo(termo)), limit, offset
+            )
+
+    except Exception as e:
+        print(f"Erro ao realizar busca global: {e}")
+        return [], 0
+
+def _sql_identificador(chave, com_total=False):
+    inicio, fim = limites_prefixo(chave)
+    query = f"""
+        SELECT {_colunas('r.*', com_total)} FROM registros r
+        JOIN (
+            SELECT registro_id, MAX(chave = ?) AS exato
+            FROM {TABLE_IDENTIFICADORES}
+            WHERE chave >= ? AND chave < ?
+            GROUP BY registro_id
+        ) i ON i.registro_id = r.id
+        ORDER BY i.exato DESC, r.data_registro_iso DESC, r.id DESC
+        LIMIT ? OFFSET ?
+    """
+    return query, [chave, inicio, fim]
+
+def _contar_identificador(cursor, chave):
+    cursor.execute(
+        f"SELECT COUNT(DISTINCT registro_id) FROM {TABLE_IDENTIFICADORES} WHERE chave >= ? AND chave < ?",
+        limites_prefixo(chave)
+    )
+    resultado = cursor.fetchone()
+    return resultado[0] if resultado else 0
+
+def busca_identificador(termo, limit=100, offset=0):
+    """
+    Busca exata e por prefixo nas chaves normalizadas de placa, container, CPF, SM/AE etc.
+
+    As correspondências exatas vêm primeiro e, depois, os mais recentes.
+
+    Args:
+        termo: Identificador digitado (com ou sem pontuação, qualquer caixa)
+        limit: Limite de resultados a retornar
+        offset: Offset para paginação
+
+    Returns:
+        Lista de registros que correspondem à busca
+    """
+    try:
+        chave = normalizar_identificador((termo or '').strip())
+        if not chave or not get_schema().tem_tabela(TABLE_IDENTIFICADORES):
+            return []
+
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            query, params = _sql_identificador(chave)
+            cursor.execute(query, params + [limit, offset])
+            return [dict(reg) for reg in cursor.fetchall()]
+
+    except Exception as e:
+        print(f"Erro ao realizar busca por identificador: {e}")
+        return []
+
+def contar_busca_identificador(termo):
+    """
+    Conta os registros com algum identificador igual ou iniciado pelo termo normalizado
+    """
+    try:
+        chave = normalizar_identificador((termo or '').strip())
+        if not chave or not get_schema().tem_tabela(TABLE_IDENTIFICADORES):
+            return 0
+
+        with get_db_connection() as conn:
+            return _contar_identificador(conn.cursor(), chave)
+
+    except Exception as e:
+        print(f"Erro ao contar resultados da busca por identificador: {e}")
+        return 0
+
+def busca_identificador_com_total(termo, limit=100, offset=0):
+    """
+    Busca por identificador com a página e o total (contado pelo índice e em cache)
+
+    Returns:
+        tuple: (registros, total)
+    """
+    try:
+        chave = normalizar_identificador((termo or '').strip())
+        if not chave or not get_schema().tem_tabela(TABLE_IDENTIFICADORES):
+            return [], 0
+
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            return pagina_com_total(
+                cursor, lambda com_total: _sql_identificador(chave, com_total),
+                lambda: _contar_identificador(cursor, chave),
+                ('busca_identificador', chave), limit, offset, total_na_consulta=False
+            )
+
+    except Exception as e:
+        print(f"Erro ao realizar busca por identificador: {e}")
+        return [], 0
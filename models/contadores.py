@@ -0,0 +1,322 @@
+"""
+Contadores dos cards dos dashboards GR e comum.
+
+Os cards ficam materializados na tabela ``contadores``, com uma linha por
+grupo (o nível do usuário que criou o registro, ou '' se ele não existir em
+``usuarios``). A tabela é mantida exata por triggers em ``registros``,
+``usuarios`` e ``registros_alteracoes_pendentes``, de modo que as APIs de
+contadores leem poucas linhas em vez de varrer ``registros``.
+
+A recontagem completa usa uma única varredura agregada
+(``SUM(CASE WHEN ... THEN 1 ELSE 0 END)`` por card) e serve para popular a
+tabela e verificar sua consistência (scripts/verificar_contadores.py). As
+condições são as mesmas usadas historicamente por cada tela: a GR considera
+variações a mais de "sem NF/OS" ('0', 'None').
+"""
+
+import logging
+
+from models.alteracoes_pendentes import TABLE_ALTERACOES_PENDENTES
+
+logger = logging.getLogger(__name__)
+
+# Condição de cada card (aplicada sobre registros com excluido = 0)
+CONDICOES_CONTADORES = {
+    'registros_pendentes': "status_sm = 'Pendente'",
+    'registros_andamento': "status_sm = 'Em andamento'",
+    'registros_concluidos': "status_sm = 'Concluído'",
+    'sem_container': "container_1 IS NULL OR container_1 = ''",
+    'sem_sm': "numero_sm IS NULL OR numero_sm = ''",
+    'sem_ae': "numero_ae IS NULL OR numero_ae = ''",
+    # Definições da GR
+    'sem_nf': "anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0'",
+    'sem_os': "anexar_os IS NULL OR anexar_os = 0 OR anexar_os = ''",
+    'alteracoes_pos_smae': (
+        f"alteracoes_verificadas = 0 AND EXISTS ("
+        f"SELECT 1 FROM {TABLE_ALTERACOES_PENDENTES} p WHERE p.registro_id = registros.id)"
+    ),
+    # Definições do dashboard comum
+    'operacoes_sem_nf': "anexar_nf IS NULL OR anexar_nf = ''",
+    'operacoes_sem_os': "anexar_os IS NULL OR anexar_os = ''",
+    'operacoes_sem_container': "container_1 IS NULL OR container_1 = ''",
+    'operacoes_sem_sm': "numero_sm IS NULL OR numero_sm = ''",
+    'operacoes_sem_ae': "numero_ae IS NULL OR numero_ae = ''",
+    'operacoes_alteradas_pos_smae': (
+        "((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR "
+        "(numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND "
+        "data_modificacao IS NOT NULL AND alteracoes_verificadas = 0"
+    ),
+}
+
+# Cards exibidos por cada tela
+CONTADORES_GR = [
+    'registros_pendentes', 'registros_andamento', 'registros_concluidos',
+    'sem_container', 'sem_sm', 'sem_ae', 'sem_nf', 'sem_os', 'alteracoes_pos_smae',
+]
+CONTADORES_COMUM = [
+    'operacoes_sem_nf', 'operacoes_sem_os', 'operacoes_sem_container',
+    'operacoes_sem_sm', 'operacoes_sem_ae', 'operacoes_alteradas_pos_smae',
+]
+
+
+def calcular_contadores(cursor, nomes, restricao_sql=""):
+    """Calcula vários contadores em uma única varredura de registros.
+
+    Args:
+        cursor: Cursor do banco de dados
+        nomes: Lista de chaves de CONDICOES_CONTADORES
+        restricao_sql: Condição extra aplicada a todos os contadores,
+            começando com ``AND`` (opcional)
+
+    Returns:
+        dict: {nome: contagem}
+    """
+    colunas = ",\n".join(
+        f"COALESCE(SUM(CASE WHEN ({CONDICOES_CONTADORES[nome]}) THEN 1 ELSE 0 END), 0) AS {nome}"
+        for nome in nomes
+    )
+    cursor.execute(f"""
+        SELECT {colunas}
+        FROM registros
+        WHERE excluido = 0 {restricao_sql}
+    """)
+    linha = cursor.fetchone()
+    return {nome: (linha[i] if linha else 0) for i, nome in enumerate(nomes)}
+
+
+def contadores_gr(cursor):
+    """Cards do ambiente/dashboard GR (todos os registros)."""
+    return ler_contadores(cursor, CONTADORES_GR)
+
+
+def contadores_comum(cursor, nivel=None):
+    """Cards do dashboard comum.
+
+    Args:
+        cursor: Cursor do banco de dados
+        nivel: Nível do usuário logado; restringe aos registros de autores que
+            ele pode ver (ver GRUPOS_VISIVEIS_POR_NIVEL). None conta todos.
+    """
+    return ler_contadores(cursor, CONTADORES_COMUM, GRUPOS_VISIVEIS_POR_NIVEL.get(nivel))
+
+
+# ---------------------------------------------------------------------------
+# Tabela materializada mantida por triggers
+# ---------------------------------------------------------------------------
+
+TABLE_CONTADORES = 'contadores'
+
+# Colunas de registros usadas pelas condições dos contadores
+COLUNAS_CONDICOES = [
+    'id', 'usuario', 'excluido', 'status_sm', 'container_1', 'numero_sm', 'numero_ae',
+    'anexar_nf', 'anexar_os', 'data_modificacao', 'alteracoes_verificadas',
+]
+
+# Colunas TEXT de registros: na linha derivada de NEW/OLD elas recebem CAST para
+# manter a afinidade da coluna (sem ela, anexar_os = 0 não casaria com '0')
+COLUNAS_TEXTO = {
+    'usuario', 'status_sm', 'container_1', 'numero_sm', 'numero_ae', 'anexar_nf', 'anexar_os',
+}
+
+# Níveis cujos registros cada nível enxerga no dashboard comum (None = todos)
+GRUPOS_VISIVEIS_POR_NIVEL = {
+    'comum': ['comum'],
+    'gr': ['comum', 'gr'],
+}
+
+TRIGGERS_CONTADORES = [
+    'contadores_registros_insert',
+    'contadores_registros_update',
+    'contadores_registros_delete',
+    'contadores_usuarios_insert',
+    'contadores_usuarios_update',
+    'contadores_usuarios_delete',
+    'contadores_pendentes_insert',
+    'contadores_pendentes_delete',
+]
+
+
+def _grupo_do_usuario(expressao_usuario):
+    """Expressão SQL com o grupo (nível) do autor de um registro."""
+    return f"COALESCE((SELECT nivel FROM usuarios WHERE username = {expressao_usuario}), '')"
+
+
+def _linha_do_registro(prefixo):
+    """Tabela derivada com uma única linha (NEW/OLD) com as colunas de registros."""
+    colunas = ", ".join(
+        f"CAST({prefixo}.{coluna} AS TEXT) AS {coluna}" if coluna in COLUNAS_TEXTO
+        else f"{prefixo}.{coluna} AS {coluna}"
+        for coluna in COLUNAS_CONDICOES
+    )
+    return f"(SELECT {colunas}) AS registros"
+
+
+def _sql_mover(sinal, fonte, grupo, filtro=""):
+    """UPDATE que soma (sinal '+') ou subtrai ('-') os contadores das linhas de ``fonte``."""
+    atribuicoes = ",\n        ".join(
+        f"{nome} = {nome} {sinal} (SELECT COALESCE(SUM(CASE WHEN ({CONDICOES_CONTADORES[nome]}) "
+        f"THEN 1 ELSE 0 END), 0) FROM {fonte} WHERE registros.excluido = 0{filtro})"
+        for nome in CONDICOES_CONTADORES
+    )
+    return (
+        f"    INSERT OR IGNORE INTO {TABLE_CONTADORES} (grupo) VALUES ({grupo});\n"
+        f"    UPDATE {TABLE_CONTADORES} SET\n        {atribuicoes}\n"
+        f"    WHERE grupo = {grupo};\n"
+    )
+
+
+def _sql_pendencia(sinal, prefixo):
+    """UPDATE do card de alterações pós SM/AE quando a tabela de pendências muda."""
+    grupo = _grupo_do_usuario(f"(SELECT usuario FROM registros WHERE id = {prefixo}.registro_id)")
+    return (
+        f"    INSERT OR IGNORE INTO {TABLE_CONTADORES} (grupo) VALUES ({grupo});\n"
+        f"    UPDATE {TABLE_CONTADORES} SET alteracoes_pos_smae = alteracoes_pos_smae {sinal} ("
+        f"SELECT COUNT(*) FROM registros WHERE id = {prefixo}.registro_id "
+        f"AND excluido = 0 AND alteracoes_verificadas = 0)\n"
+        f"    WHERE grupo = {grupo};\n"
+    )
+
+
+def sql_criar_tabela_contadores():
+    colunas = ",\n    ".join(f"{nome} INTEGER NOT NULL DEFAULT 0" for nome in CONDICOES_CONTADORES)
+    return f"CREATE TABLE IF NOT EXISTS {TABLE_CONTADORES} (\n    grupo TEXT PRIMARY KEY,\n    {colunas}\n)"
+
+
+def sql_triggers_contadores():
+    """Gera o SQL dos triggers que mantêm a tabela contadores."""
+    colunas_monitoradas = ", ".join(COLUNAS_CONDICOES)
+    do_usuario = " AND registros.usuario = {}.username"
+    triggers = [
+        f"""CREATE TRIGGER contadores_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+{_sql_mover('+', _linha_do_registro('NEW'), _grupo_do_usuario('NEW.usuario'))}END""",
+        f"""CREATE TRIGGER contadores_registros_update
+AFTER UPDATE OF {colunas_monitoradas} ON registros
+FOR EACH ROW
+BEGIN
+{_sql_mover('-', _linha_do_registro('OLD'), _grupo_do_usuario('OLD.usuario'))}{_sql_mover('+', _linha_do_registro('NEW'), _grupo_do_usuario('NEW.usuario'))}END""",
+        f"""CREATE TRIGGER contadores_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW
+BEGIN
+{_sql_mover('-', _linha_do_registro('OLD'), _grupo_do_usuario('OLD.usuario'))}END""",
+        # Registros mudam de grupo quando o autor é criado, muda de nível/nome ou é removido
+        f"""CREATE TRIGGER contadores_usuarios_insert
+AFTER INSERT ON usuarios
+FOR EACH ROW
+BEGIN
+{_sql_mover('-', 'registros', "''", do_usuario.format('NEW'))}{_sql_mover('+', 'registros', "COALESCE(NEW.nivel, '')", do_usuario.format('NEW'))}END""",
+        f"""CREATE TRIGGER contadores_usuarios_update
+AFTER UPDATE OF username, nivel ON usuarios
+FOR EACH ROW
+BEGIN
+{_sql_mover('-', 'registros', "COALESCE(OLD.nivel, '')", do_usuario.format('OLD'))}{_sql_mover('+', 'registros', "''", do_usuario.format('OLD'))}{_sql_mover('-', 'registros', "''", do_usuario.format('NEW'))}{_sql_mover('+', 'registros', "COALESCE(NEW.nivel, '')", do_usuario.format('NEW'))}END""",
+        f"""CREATE TRIGGER contadores_usuarios_delete
+AFTER DELETE ON usuarios
+FOR EACH ROW
+BEGIN
+{_sql_mover('-', 'registros', "COALESCE(OLD.nivel, '')", do_usuario.format('OLD'))}{_sql_mover('+', 'registros', "''", do_usuario.format('OLD'))}END""",
+        f"""CREATE TRIGGER contadores_pendentes_insert
+AFTER INSERT ON {TABLE_ALTERACOES_PENDENTES}
+FOR EACH ROW
+BEGIN
+{_sql_pendencia('+', 'NEW')}END""",
+        f"""CREATE TRIGGER contadores_pendentes_delete
+AFTER DELETE ON {TABLE_ALTERACOES_PENDENTES}
+FOR EACH ROW
+BEGIN
+{_sql_pendencia('-', 'OLD')}END""",
+    ]
+    return triggers
+
+
+def recontar_por_grupo(cursor):
+    """Recontagem completa, agrupada pelo nível do autor (uma varredura).
+
+    Returns:
+        dict: {grupo: {nome: contagem}}
+    """
+    nomes = list(CONDICOES_CONTADORES)
+    colunas = ",\n".join(
+        f"COALESCE(SUM(CASE WHEN ({CONDICOES_CONTADORES[nome]}) THEN 1 ELSE 0 END), 0) AS {nome}"
+        for nome in nomes
+    )
+    cursor.execute(f"""
+        SELECT {_grupo_do_usuario('registros.usuario')} AS grupo, {colunas}
+        FROM registros
+        WHERE registros.excluido = 0
+        GROUP BY grupo
+    """)
+    return {
+        linha[0]: {nome: linha[i + 1] for i, nome in enumerate(nomes)}
+        for linha in cursor.fetchall()
+    }
+
+
+def aplicar_triggers_contadores(cursor):
+    """(Re)cria a tabela, os triggers e popula os contadores com a recontagem.
+
+    Deve rodar dentro de uma transação para que nenhuma escrita fique de fora
+    entre a recontagem e a criação dos triggers.
+    """
+    cursor.execute(sql_criar_tabela_contadores())
+    for nome in TRIGGERS_CONTADORES:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    for sql in sql_triggers_contadores():
+        cursor.execute(sql)
+
+    cursor.execute(f"DELETE FROM {TABLE_CONTADORES}")
+    nomes = list(CONDICOES_CONTADORES)
+    for grupo, valores in recontar_por_grupo(cursor).items():
+        cursor.execute(
+            f"INSERT INTO {TABLE_CONTADORES} (grupo, {', '.join(nomes)}) "
+            f"VALUES (?, {', '.join('?' for _ in nomes)})",
+            [grupo] + [valores[nome] for nome in nomes]
+        )
+
+
+def ler_contadores(cursor, nomes, grupos=None):
+    """Lê os contadores materializados, somando os grupos pedidos.
+
+    Args:
+        cursor: Cursor do banco de dados
+        nomes: Lista de chaves de CONDICOES_CONTADORES
+        grupos: Lista de grupos (níveis dos autores); None soma todos
+
+    Returns:
+        dict: {nome: contagem}
+    """
+    colunas = ", ".join(f"COALESCE(SUM({nome}), 0)" for nome in nomes)
+    if grupos is None:
+        cursor.execute(f"SELECT {colunas} FROM {TABLE_CONTADORES}")
+    else:
+        marcadores = ", ".join("?" for _ in grupos)
+        cursor.execute(f"SELECT {colunas} FROM {TABLE_CONTADORES} WHERE grupo IN ({marcadores})", list(grupos))
+    linha = cursor.fetchone()
+    return {nome: (linha[i] if linha else 0) for i, nome in enumerate(nomes)}
+
+
+def verificar_contadores(cursor):
+    """Compara a tabela contadores com uma recontagem completa.
+
+    Returns:
+        list: Divergências no formato (grupo, nome, valor_tabela, valor_recontado)
+    """
+    nomes = list(CONDICOES_CONTADORES)
+    recontagem = recontar_por_grupo(cursor)
+    cursor.execute(f"SELECT grupo, {', '.join(nomes)} FROM {TABLE_CONTADORES}")
+    tabela = {
+        linha[0]: {nome: linha[i + 1] for i, nome in enumerate(nomes)}
+        for linha in cursor.fetchall()
+    }
+
+    divergencias = []
+    for grupo in sorted(set(recontagem) | set(tabela)):
+        for nome in nomes:
+            valor_tabela = tabela.get(grupo, {}).get(nome, 0)
+            valor_recontado = recontagem.get(grupo, {}).get(nome, 0)
+            if valor_tabela != valor_recontado:
+                divergencias.append((grupo, nome, valor_tabela, valor_recontado))
+    return divergencias
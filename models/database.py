@@ -1,4 +1,6 @@
 import sqlite3
+import threading
+import logging
 from datetime import datetime
 from werkzeug.security import generate_password_hash
 import sys
@@ -6,17 +8,148 @@ import os
 
 # Adiciona o diretório principal ao path para importar config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DB_PATH
+from config import (
+    DB_PATH, DB_POOL_MAX_IDLE, SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE
+)
 
-def get_db_connection():
-    """Estabelece e retorna uma conexão com o banco de dados"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+logger = logging.getLogger(__name__)
+
+# Pool de conexões por thread. Cada thread mantém suas próprias conexões
+# ociosas (o sqlite3 não permite compartilhar conexões entre threads) e
+# reaproveita-as em vez de abrir e configurar uma nova a cada chamada.
+_pool_local = threading.local()
+_pool_lock = threading.Lock()
+_pool_stats = {
+    'conexoes_criadas': 0,
+    'conexoes_reutilizadas': 0,
+    'conexoes_devolvidas': 0,
+    'conexoes_descartadas': 0,
+    'conexoes_em_uso': 0,
+}
+
+
+def _incrementar_stat(chave, valor=1):
+    with _pool_lock:
+        _pool_stats[chave] += valor
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexão SQLite que volta para o pool da thread ao ser fechada.
+
+    Os chamadores continuam usando ``conn.close()`` e ``with conn:`` como
+    antes; a diferença é que a conexão física permanece aberta e configurada
+    para o próximo ``get_db_connection()`` da mesma thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool_database = None
+        self._pool_em_uso = False
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Mantém a semântica do sqlite3 (commit/rollback) e devolve ao pool
+        resultado = super().__exit__(exc_type, exc_val, exc_tb)
+        self.close()
+        return resultado
+
+    def close(self):
+        """Devolve a conexão ao pool da thread em vez de fechá-la."""
+        if not self._pool_em_uso:
+            return
+        self._pool_em_uso = False
+        _incrementar_stat('conexoes_em_uso', -1)
+
+        try:
+            # Transações abertas e não confirmadas são descartadas, como
+            # aconteceria ao fechar uma conexão comum
+            if self.in_transaction:
+                self.rollback()
+            self.row_factory = sqlite3.Row
+        except sqlite3.Error as e:
+            logger.warning(f"Descartando conexão inválida do pool: {e}")
+            self._fechar_fisicamente()
+            return
+
+        ociosas = _conexoes_ociosas(self._pool_database)
+        if len(ociosas) < DB_POOL_MAX_IDLE:
+            ociosas.append(self)
+            _incrementar_stat('conexoes_devolvidas')
+        else:
+            self._fechar_fisicamente()
+
+    def _fechar_fisicamente(self):
+        _incrementar_stat('conexoes_descartadas')
+        sqlite3.Connection.close(self)
+
+
+def _conexoes_ociosas(database):
+    """Retorna a lista de conexões ociosas da thread atual para o banco."""
+    pools = getattr(_pool_local, 'pools', None)
+    if pools is None:
+        pools = _pool_local.pools = {}
+    return pools.setdefault(database, [])
+
+
+def _configurar_conexao(conn):
+    """Aplica os PRAGMAs de desempenho uma única vez por conexão física."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+def get_db_connection(database=None):
+    """Obtém uma conexão do pool da thread atual.
+
+    Args:
+        database (str, optional): Caminho do banco. Padrão é ``DB_PATH``.
+
+    Returns:
+        PooledConnection: Conexão configurada, com ``row_factory`` sqlite3.Row.
+    """
+    database = os.path.abspath(database) if database else DB_PATH
+    ociosas = _conexoes_ociosas(database)
+
+    conn = None
+    if ociosas:
+        conn = ociosas.pop()
+        # Conexões usadas após o fim do bloco ``with`` podem ter deixado uma
+        # transação aberta; descartá-la preserva o comportamento antigo
+        if conn.in_transaction:
+            conn.rollback()
+        _incrementar_stat('conexoes_reutilizadas')
+    else:
+        conn = sqlite3.connect(database, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                               factory=PooledConnection)
+        conn.row_factory = sqlite3.Row
+        _configurar_conexao(conn)
+        conn._pool_database = database
+        _incrementar_stat('conexoes_criadas')
+
+    conn._pool_em_uso = True
+    _incrementar_stat('conexoes_em_uso')
     return conn
 
+
+def get_pool_stats():
+    """Retorna um retrato das estatísticas do pool de conexões.
+
+    ``taxa_reutilizacao`` é a fração de pedidos atendidos sem abrir uma nova
+    conexão física; sob carga ela deve ficar próxima de 1.
+    """
+    with _pool_lock:
+        stats = dict(_pool_stats)
+    pedidos = stats['conexoes_criadas'] + stats['conexoes_reutilizadas']
+    stats['pedidos'] = pedidos
+    stats['taxa_reutilizacao'] = round(stats['conexoes_reutilizadas'] / pedidos, 4) if pedidos else 0.0
+    return stats
+
 def init_db():
     """Inicializa o banco de dados criando as tabelas necessárias"""
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''CREATE TABLE IF NOT EXISTS usuarios (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -120,3 +253,7 @@ def init_db():
                           )''')
                           
         conn.commit()
+
+    # Migrações versionadas e carga do schema em memória (uma vez por boot)
+    from models.schema import inicializar_schema
+    inicializar_schema()
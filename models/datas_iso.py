@@ -0,0 +1,183 @@
+"""
+Colunas canônicas (ISO) das datas de registros.
+
+As datas de registros chegam em vários formatos ('YYYY-MM-DD HH:MM:SS',
+'DD-MM-YYYY HH:MM:SS', 'HH:MM:SS DD-MM-YYYY', 'DD/MM/YYYY - HH:MM', ...), então
+ordenar ou filtrar pelo texto cru mistura formatos e ``julianday()`` devolve
+NULL para a maioria deles. Cada coluna de data ganha uma coluna sombra
+``<coluna>_iso`` com o valor normalizado para 'YYYY-MM-DD HH:MM:SS' (ou NULL se
+não for uma data reconhecível), mantida por triggers em todo INSERT/UPDATE.
+
+Ordenação, filtros de intervalo e cálculos de tempo devem usar as colunas
+``_iso``; as colunas originais continuam sendo as exibidas e gravadas pela
+aplicação. ``utils.date_utils.normalizar_data_iso`` faz a mesma normalização
+em Python (limites de filtros, valores de formulário).
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Colunas de data de registros que ganham a coluna sombra
+COLUNAS_DATA = [
+    'data_registro',
+    'horario_previsto',
+    'on_time_cliente',
+    'data_sm',
+    'data_ae',
+    'data_modificacao',
+]
+
+SUFIXO_ISO = '_iso'
+
+TRIGGERS_DATAS_ISO = [
+    'datas_iso_registros_insert',
+    'datas_iso_registros_update',
+]
+
+# Índices sobre as colunas canônicas: (nome, colunas, condição parcial)
+INDICES_DATAS_ISO = [
+    ('idx_registros_ativos_data_registro_iso', 'data_registro_iso', 'excluido = 0'),
+    ('idx_registros_ativos_data_modificacao_iso', 'data_modificacao_iso', 'excluido = 0'),
+]
+
+# Linhas atualizadas por comando no preenchimento das colunas
+TAMANHO_LOTE_PREENCHIMENTO = 1000
+
+
+def coluna_iso(coluna):
+    """Nome da coluna canônica de uma coluna de data."""
+    return f"{coluna}{SUFIXO_ISO}"
+
+
+def expr_data_iso(valor):
+    """Expressão SQL que normaliza ``valor`` para 'YYYY-MM-DD HH:MM:SS' (ou NULL).
+
+    Formatos reconhecidos:
+        YYYY-MM-DD[ HH:MM[:SS[.fff]]] e YYYY-MM-DDTHH:MM[:SS]
+        DD-MM-YYYY[ HH:MM[:SS]], DD/MM/YYYY[ HH:MM[:SS]] e DD/MM/YYYY - HH:MM
+        HH:MM[:SS] DD-MM-YYYY
+    ``datetime()`` devolve NULL para datas inválidas (ex.: mês 13).
+    """
+    espaco = f"instr({valor}, ' ')"
+    return f"""(CASE
+    WHEN typeof({valor}) != 'text' OR length({valor}) < 10 THEN NULL
+    WHEN substr({valor}, 5, 1) = '-' THEN datetime({valor})
+    WHEN substr({valor}, 3, 1) IN ('-', '/') AND substr({valor}, 6, 1) IN ('-', '/') THEN datetime(
+        substr({valor}, 7, 4) || '-' || substr({valor}, 4, 2) || '-' || substr({valor}, 1, 2)
+        || CASE WHEN length({valor}) > 10 THEN ' ' || trim(replace(substr({valor}, 11), '- ', '')) ELSE '' END)
+    WHEN substr({valor}, 3, 1) = ':' AND {espaco} > 0 THEN datetime(
+        substr({valor}, {espaco} + 7, 4) || '-' || substr({valor}, {espaco} + 4, 2) || '-'
+        || substr({valor}, {espaco} + 1, 2) || ' ' || substr({valor}, 1, {espaco} - 1))
+END)"""
+
+
+def _sql_atribuicoes(r):
+    """``coluna_iso = expr(r.coluna)`` de todas as colunas de data."""
+    return ",\n        ".join(
+        f"{coluna_iso(coluna)} = {expr_data_iso(f'{r}.{coluna}')}" for coluna in COLUNAS_DATA
+    )
+
+
+def sql_triggers_datas_iso():
+    """Gera o SQL dos triggers que mantêm as colunas canônicas.
+
+    O UPDATE das colunas ``_iso`` dispara os triggers ``UPDATE OF`` dessas
+    colunas (agregados em models/rollups.py); ``recursive_triggers`` fica
+    desligado, então o próprio trigger não é disparado de novo.
+    """
+    colunas = ", ".join(COLUNAS_DATA)
+    return [
+        f"""CREATE TRIGGER datas_iso_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    UPDATE registros SET
+        {_sql_atribuicoes('NEW')}
+    WHERE id = NEW.id;
+END""",
+        f"""CREATE TRIGGER datas_iso_registros_update
+AFTER UPDATE OF {colunas} ON registros
+FOR EACH ROW
+BEGIN
+    UPDATE registros SET
+        {_sql_atribuicoes('NEW')}
+    WHERE id = NEW.id;
+END""",
+    ]
+
+
+def criar_colunas_datas_iso(cursor):
+    """Adiciona as colunas canônicas que ainda não existirem."""
+    cursor.execute("PRAGMA table_info(registros)")
+    existentes = {linha[1] for linha in cursor.fetchall()}
+    for coluna in COLUNAS_DATA:
+        if coluna_iso(coluna) not in existentes:
+            cursor.execute(f"ALTER TABLE registros ADD COLUMN {coluna_iso(coluna)} TEXT")
+
+
+def preencher_datas_iso(cursor, tamanho_lote=TAMANHO_LOTE_PREENCHIMENTO, ao_concluir_lote=None):
+    """Recalcula as colunas canônicas de todos os registros, em lotes de ids.
+
+    Args:
+        cursor: Cursor do banco
+        tamanho_lote: Faixa de ids atualizada por comando
+        ao_concluir_lote: Função chamada após cada lote (ex.: commit), opcional
+
+    Returns:
+        int: Número de linhas atualizadas
+    """
+    cursor.execute("SELECT MIN(id), MAX(id) FROM registros")
+    menor, maior = cursor.fetchone()
+    if menor is None:
+        return 0
+
+    atualizadas = 0
+    sql = f"""
+        UPDATE registros SET
+        {_sql_atribuicoes('registros')}
+        WHERE id BETWEEN ? AND ?
+    """
+    for inicio in range(menor, maior + 1, tamanho_lote):
+        cursor.execute(sql, (inicio, inicio + tamanho_lote - 1))
+        atualizadas += cursor.rowcount
+        if ao_concluir_lote:
+            ao_concluir_lote()
+    return atualizadas
+
+
+def aplicar_datas_iso(cursor):
+    """Cria as colunas, preenche em lotes, (re)cria os triggers e os índices.
+
+    Deve rodar dentro de uma transação para que nenhuma escrita fique de fora
+    entre o preenchimento e a criação dos triggers.
+    """
+    criar_colunas_datas_iso(cursor)
+    for nome in TRIGGERS_DATAS_ISO:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    atualizadas = preencher_datas_iso(cursor)
+    for sql in sql_triggers_datas_iso():
+        cursor.execute(sql)
+    for nome, colunas, condicao in INDICES_DATAS_ISO:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON registros ({colunas}) WHERE {condicao}")
+    logger.info(f"Colunas canônicas de data preenchidas em {atualizadas} registros")
+    return atualizadas
+
+
+def verificar_datas_iso(cursor, limite=100):
+    """Compara as colunas canônicas com a normalização das colunas originais.
+
+    Returns:
+        list: Divergências no formato (id, coluna, valor_iso, valor_esperado)
+    """
+    divergencias = []
+    for coluna in COLUNAS_DATA:
+        esperado = expr_data_iso(coluna)
+        cursor.execute(f"""
+            SELECT id, {coluna_iso(coluna)}, {esperado}
+            FROM registros
+            WHERE {coluna_iso(coluna)} IS NOT {esperado}
+            LIMIT ?
+        """, (limite,))
+        divergencias.extend((linha[0], coluna, linha[1], linha[2]) for linha in cursor.fetchall())
+    return divergencias
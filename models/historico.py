@@ -2,13 +2,14 @@ import json
 import sys
 import os
 import logging
-import re
 from datetime import datetime
 
 # Adiciona o diretório principal ao path para importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.database import get_db_connection
 from historico_utils import sanitize_json_string
+from models.alteracoes_pendentes import atualizar_alteracoes_pendentes
+from models.historico_json import alteracoes_decodificadas
 
 logger = logging.getLogger(__name__)
 
@@ -28,86 +29,22 @@ class Historico:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    "SELECT * FROM historico WHERE registro_id = ? ORDER BY data_alteracao DESC",
+                    "SELECT * FROM historico WHERE registro_id = ? ORDER BY data_alteracao_epoch DESC, id DESC",
                     (registro_id,)
                 )
                 historico = cursor.fetchall()
                 
-                # Formatar o histórico
+                # Formatar o histórico; cada texto é decodificado (e reparado) uma vez
                 historico_formatado = []
                 for h in historico:
                     item = dict(h)
                     try:
-                        # Registrar o tamanho da string JSON para depuração
-                        json_str_length = len(item['alteracoes']) if item['alteracoes'] else 0
-                        logger.debug(f"Processando JSON de tamanho {json_str_length} para histórico do registro {registro_id}")
-                        
-                        # Sanitizar o JSON antes de processá-lo - usar modo agressivo para strings grandes
-                        use_aggressive = json_str_length > 5000
-                        sanitized_json = sanitize_json_string(item['alteracoes'], aggressive=use_aggressive)
-                        
-                        try:
-                            alteracoes = json.loads(sanitized_json)
-                            item['alteracoes_dict'] = alteracoes
-                            # Contar quantos campos foram alterados
-                            item['num_alteracoes'] = len(alteracoes)
-                        except json.JSONDecodeError as je:
-                            logger.error(f"Erro ao decodificar JSON no histórico do registro {registro_id}: {je}")
-                            logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                            
-                            # Registrar um trecho do JSON em torno da posição do erro
-                            error_pos = je.pos
-                            context_start = max(0, error_pos - 50)
-                            context_end = min(len(sanitized_json), error_pos + 50)
-                            error_context = sanitized_json[context_start:context_end]
-                            logger.error(f"Contexto do erro: {error_context}")
-                            
-                            # Tentar sanitização mais agressiva
-                            try:
-                                sanitized_json = sanitize_json_string(item['alteracoes'], aggressive=True)
-                                alteracoes = json.loads(sanitized_json)
-                                item['alteracoes_dict'] = alteracoes
-                                item['num_alteracoes'] = len(alteracoes)
-                                logger.info(f"Sanitização agressiva bem-sucedida para o registro {registro_id}")
-                            except json.JSONDecodeError as je2:
-                                logger.error(f"Sanitização agressiva falhou para registro {registro_id}: {je2}")
-                                logger.error(f"Posição do erro após sanitização agressiva: {je2.pos}, linha: {je2.lineno}, coluna: {je2.colno}")
-                                
-                                # Tentar uma abordagem ainda mais radical: remover todos os caracteres de escape
-                                try:
-                                    import re
-                                    # Remover todas as barras invertidas
-                                    sanitized_extreme = re.sub(r'\\', '', item['alteracoes'])
-                                    # Substituir aspas simples por aspas duplas
-                                    sanitized_extreme = sanitized_extreme.replace("'", '"')
-                                    # Remover caracteres de controle
-                                    sanitized_extreme = re.sub(r'[\x00-\x1F\x7F]', ' ', sanitized_extreme)
-                                    
-                                    try:
-                                        alteracoes = json.loads(sanitized_extreme)
-                                        item['alteracoes_dict'] = alteracoes
-                                        item['num_alteracoes'] = len(alteracoes)
-                                        logger.info(f"Sanitização extrema bem-sucedida para registro {registro_id}")
-                                    except json.JSONDecodeError as je3:
-                                        logger.error(f"Sanitização extrema falhou: {je3}")
-                                        # Se falhar, usar um objeto vazio
-                                        item['alteracoes_dict'] = {}
-                                        item['num_alteracoes'] = 0
-                                except Exception as e3:
-                                    logger.error(f"Erro na sanitização extrema: {e3}")
-                                    # Se falhar, usar um objeto vazio
-                                    item['alteracoes_dict'] = {}
-                                    item['num_alteracoes'] = 0
-                            except Exception as e2:
-                                logger.error(f"Sanitização agressiva falhou com erro não-JSON: {e2}")
-                                # Se falhar, usar um objeto vazio
-                                item['alteracoes_dict'] = {}
-                                item['num_alteracoes'] = 0
+                        item['alteracoes_dict'] = alteracoes_decodificadas(cursor, item['id'], item['alteracoes'])
+                        item['num_alteracoes'] = len(item['alteracoes_dict'])
                     except Exception as e:
-                        logger.error(f"Erro inesperado ao processar histórico do registro {registro_id}: {e}")
+                        logger.error(f"Erro ao decodificar histórico (id: {item.get('id', 'desconhecido')}): {e}")
                         item['alteracoes_dict'] = {}
                         item['num_alteracoes'] = 0
-                    
                     historico_formatado.append(item)
                 
                 return historico_formatado
@@ -141,8 +78,10 @@ class Historico:
                     "INSERT INTO historico (registro_id, alterado_por, alteracoes, data_alteracao) VALUES (?, ?, ?, ?)",
                     (registro_id, usuario, alteracoes_json, now)
                 )
+                historico_id = cursor.lastrowid
+                atualizar_alteracoes_pendentes(cursor, registro_id)
                 conn.commit()
-                return cursor.lastrowid
+                return historico_id
                 
         except Exception as e:
             logger.error(f"Erro ao adicionar histórico: {e}")
@@ -168,88 +107,24 @@ class Historico:
                     SELECT h.*, r.usuario as registro_usuario
                     FROM historico h
                     LEFT JOIN registros r ON h.registro_id = r.id
-                    ORDER BY h.data_alteracao DESC
+                    ORDER BY h.data_alteracao_epoch DESC, h.id DESC
                     LIMIT ? OFFSET ?
                     """,
                     (limit, offset)
                 )
                 historico = cursor.fetchall()
                 
-                # Formatar o histórico
+                # Formatar o histórico; cada texto é decodificado (e reparado) uma vez
                 historico_formatado = []
                 for h in historico:
                     item = dict(h)
                     try:
-                        # Registrar o tamanho da string JSON para depuração
-                        hist_id = item.get('id', 'desconhecido')
-                        json_str_length = len(item['alteracoes']) if item['alteracoes'] else 0
-                        logger.debug(f"Processando JSON de tamanho {json_str_length} para histórico (id: {hist_id})")
-                        
-                        # Sanitizar o JSON antes de processá-lo - usar modo agressivo para strings grandes
-                        use_aggressive = json_str_length > 5000
-                        sanitized_json = sanitize_json_string(item['alteracoes'], aggressive=use_aggressive)
-                        
-                        try:
-                            alteracoes = json.loads(sanitized_json)
-                            item['alteracoes_dict'] = alteracoes
-                            # Contar quantos campos foram alterados
-                            item['num_alteracoes'] = len(alteracoes)
-                        except json.JSONDecodeError as je:
-                            logger.error(f"Erro ao decodificar JSON no histórico (id: {hist_id}): {je}")
-                            logger.error(f"Posição do erro: {je.pos}, linha: {je.lineno}, coluna: {je.colno}")
-                            
-                            # Registrar um trecho do JSON em torno da posição do erro
-                            error_pos = je.pos
-                            context_start = max(0, error_pos - 50)
-                            context_end = min(len(sanitized_json), error_pos + 50)
-                            error_context = sanitized_json[context_start:context_end]
-                            logger.error(f"Contexto do erro: {error_context}")
-                            
-                            # Tentar sanitização mais agressiva
-                            try:
-                                sanitized_json = sanitize_json_string(item['alteracoes'], aggressive=True)
-                                alteracoes = json.loads(sanitized_json)
-                                item['alteracoes_dict'] = alteracoes
-                                item['num_alteracoes'] = len(alteracoes)
-                                logger.info(f"Sanitização agressiva bem-sucedida para o histórico (id: {hist_id})")
-                            except json.JSONDecodeError as je2:
-                                logger.error(f"Sanitização agressiva falhou para histórico (id: {hist_id}): {je2}")
-                                logger.error(f"Posição do erro após sanitização agressiva: {je2.pos}, linha: {je2.lineno}, coluna: {je2.colno}")
-                                
-                                # Tentar uma abordagem ainda mais radical: remover todos os caracteres de escape
-                                try:
-                                    # Remover todas as barras invertidas
-                                    sanitized_extreme = re.sub(r'\\', '', item['alteracoes'])
-                                    # Substituir aspas simples por aspas duplas
-                                    sanitized_extreme = sanitized_extreme.replace("'", '"')
-                                    # Remover caracteres de controle
-                                    sanitized_extreme = re.sub(r'[\x00-\x1F\x7F]', ' ', sanitized_extreme)
-                                    
-                                    try:
-                                        alteracoes = json.loads(sanitized_extreme)
-                                        item['alteracoes_dict'] = alteracoes
-                                        item['num_alteracoes'] = len(alteracoes)
-                                        logger.info(f"Sanitização extrema bem-sucedida para histórico (id: {hist_id})")
-                                    except json.JSONDecodeError as je3:
-                                        logger.error(f"Sanitização extrema falhou: {je3}")
-                                        # Se falhar, usar um objeto vazio
-                                        item['alteracoes_dict'] = {}
-                                        item['num_alteracoes'] = 0
-                                except Exception as e3:
-                                    logger.error(f"Erro na sanitização extrema: {e3}")
-                                    # Se falhar, usar um objeto vazio
-                                    item['alteracoes_dict'] = {}
-                                    item['num_alteracoes'] = 0
-                            except Exception as e2:
-                                logger.error(f"Sanitização agressiva falhou com erro não-JSON: {e2}")
-                                # Se falhar, usar um objeto vazio
-                                item['alteracoes_dict'] = {}
-                                item['num_alteracoes'] = 0
+                        item['alteracoes_dict'] = alteracoes_decodificadas(cursor, item['id'], item['alteracoes'])
+                        item['num_alteracoes'] = len(item['alteracoes_dict'])
                     except Exception as e:
-                        logger.error(f"Erro inesperado ao processar histórico (id: {item.get('id', 'desconhecido')}): {e}")
+                        logger.error(f"Erro ao decodificar histórico (id: {item.get('id', 'desconhecido')}): {e}")
                         item['alteracoes_dict'] = {}
                         item['num_alteracoes'] = 0
-                    
                     historico_formatado.append(item)
                 
                 return historico_formatado
@@ -307,8 +182,10 @@ class Historico:
                     "INSERT INTO historico (registro_id, alterado_por, alteracoes, data_alteracao) VALUES (?, ?, ?, ?)",
                     (registro_id, usuario, alteracoes_json, now)
                 )
+                historico_id = cursor.lastrowid
+                atualizar_alteracoes_pendentes(cursor, registro_id)
                 conn.commit()
-                return cursor.lastrowid
+                return historico_id
                 
         except Exception as e:
             logger.error(f"Erro ao registrar ação no histórico: {e}")
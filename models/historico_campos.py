@@ -0,0 +1,313 @@
+"""
+Tabela estruturada das alterações do histórico, uma linha por campo.
+
+``historico.alteracoes`` é um JSON livre em vários formatos:
+
+    {"campo": {"anterior": a, "novo": b}}          (edição de registros)
+    {"campo": {"valor_antigo": a, "valor_novo": b}} (formato antigo)
+    {"campo": valor}                                (valor direto, ações)
+    {"tipo": "Edição GR", "campos": [...], "valores": {...}, "usuario": u}
+
+e as leituras filtravam o texto com LIKE e o reinterpretavam a cada
+requisição. ``historico_campos`` guarda (historico_id, registro_id, campo,
+valor_anterior, valor_novo, tipo, ts), mantida por triggers em todo
+INSERT/UPDATE/DELETE do histórico, de modo que detecção de alterações e telas
+de histórico consultam colunas. ``tipo`` só é preenchido nas entradas com
+``"tipo"`` (ex.: 'Edição GR'); ``ts`` é o mesmo epoch de
+``historico.data_alteracao_epoch`` (models/historico_epoch.py).
+
+Os triggers só entendem JSON válido. Os textos legados inválidos passam por
+``reparar_alteracoes`` (sanitização em etapas e, por último, extração dos
+nomes de campo) no preenchimento da migração, pelo cache de formas canônicas
+de models/historico_json.py.
+"""
+
+import re
+import json
+import logging
+
+from models.historico_epoch import expr_epoch_data_alteracao
+
+logger = logging.getLogger(__name__)
+
+TABLE_HISTORICO_CAMPOS = 'historico_campos'
+
+TRIGGERS_HISTORICO_CAMPOS = [
+    'historico_campos_insert',
+    'historico_campos_update',
+    'historico_campos_delete',
+]
+
+# Índices: (nome, colunas)
+INDICES_HISTORICO_CAMPOS = [
+    ('idx_historico_campos_historico', 'historico_id'),
+    ('idx_historico_campos_registro_ts', 'registro_id, ts'),
+]
+
+# Linhas do histórico processadas por comando no preenchimento
+TAMANHO_LOTE_PREENCHIMENTO = 5000
+
+# Nomes de campo extraídos de um texto sem JSON recuperável
+PADRAO_NOME_CAMPO = re.compile(r'''["']([A-Za-z_][A-Za-z0-9_]*)["']\s*:''')
+
+
+def _json_valido(valor):
+    """Expressão SQL com ``valor`` se for JSON válido, ou NULL (as funções json_* falham com texto inválido)."""
+    return f"(CASE WHEN json_valid({valor}) THEN {valor} END)"
+
+
+def sql_selecionar_campos(valor, historico_id, registro_id, ts, origem='', filtro='1'):
+    """Gera o SELECT das linhas de historico_campos de um JSON de alterações.
+
+    Args:
+        valor: Expressão SQL com o texto JSON (ex.: ``NEW.alteracoes``, ``h.alteracoes``, ``?``)
+        historico_id, registro_id, ts: Expressões SQL das demais colunas
+        origem: Tabelas do FROM antes do json_each, terminadas em vírgula (ex.: ``historico h,``)
+        filtro: Condição adicional (ex.: faixa de ids no preenchimento)
+
+    Returns:
+        str: SELECT com as colunas (historico_id, registro_id, campo,
+        valor_anterior, valor_novo, tipo, ts)
+    """
+    j = _json_valido(valor)
+    valor_anterior = """CASE WHEN e.type = 'object' THEN
+            CASE WHEN json_type(e.value, '$.anterior') IS NOT NULL THEN json_extract(e.value, '$.anterior')
+                 ELSE json_extract(e.value, '$.valor_antigo') END
+        END"""
+    valor_novo = """CASE
+            WHEN e.type = 'object' AND json_type(e.value, '$.novo') IS NOT NULL THEN json_extract(e.value, '$.novo')
+            WHEN e.type = 'object' AND json_type(e.value, '$.valor_novo') IS NOT NULL THEN json_extract(e.value, '$.valor_novo')
+            ELSE e.value
+        END"""
+    return f"""
+        SELECT {historico_id} AS historico_id, {registro_id} AS registro_id, e.key AS campo,
+            {valor_anterior} AS valor_anterior, {valor_novo} AS valor_novo, NULL AS tipo, {ts} AS ts
+        FROM {origem} json_each({j}) e
+        WHERE json_type({j}) = 'object' AND json_type({j}, '$.tipo') IS NULL AND {filtro}
+        UNION ALL
+        SELECT {historico_id}, {registro_id}, c.value, NULL, v.value, json_extract({j}, '$.tipo'), {ts}
+        FROM {origem} json_each({j}, '$.campos') c
+        LEFT JOIN json_each({j}, '$.valores') v ON v.key = c.value
+        WHERE json_type({j}, '$.tipo') IS NOT NULL AND c.type = 'text' AND {filtro}
+    """
+
+
+def _sql_inserir_campos(valor, historico_id, registro_id, ts, origem='', filtro='1'):
+    return f"""INSERT INTO {TABLE_HISTORICO_CAMPOS}
+        (historico_id, registro_id, campo, valor_anterior, valor_novo, tipo, ts)
+        {sql_selecionar_campos(valor, historico_id, registro_id, ts, origem, filtro)}"""
+
+
+def sql_triggers_historico_campos():
+    """Gera o SQL dos triggers que mantêm historico_campos."""
+    inserir_novo = _sql_inserir_campos(
+        'NEW.alteracoes', 'NEW.id', 'NEW.registro_id', expr_epoch_data_alteracao('NEW.data_alteracao')
+    )
+    return [
+        f"""CREATE TRIGGER historico_campos_insert
+AFTER INSERT ON historico
+FOR EACH ROW
+BEGIN
+    {inserir_novo};
+END""",
+        f"""CREATE TRIGGER historico_campos_update
+AFTER UPDATE OF registro_id, alteracoes, data_alteracao ON historico
+FOR EACH ROW
+BEGIN
+    DELETE FROM {TABLE_HISTORICO_CAMPOS} WHERE historico_id = OLD.id;
+    {inserir_novo};
+END""",
+        f"""CREATE TRIGGER historico_campos_delete
+AFTER DELETE ON historico
+FOR EACH ROW
+BEGIN
+    DELETE FROM {TABLE_HISTORICO_CAMPOS} WHERE historico_id = OLD.id;
+END""",
+    ]
+
+
+def criar_tabela_historico_campos(cursor):
+    """Cria a tabela e os índices (sem triggers nem dados)."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_HISTORICO_CAMPOS} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            historico_id INTEGER NOT NULL,
+            registro_id INTEGER,
+            campo TEXT NOT NULL,
+            valor_anterior TEXT,
+            valor_novo TEXT,
+            tipo TEXT,
+            ts INTEGER
+        )
+    """)
+    for nome, colunas in INDICES_HISTORICO_CAMPOS:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {TABLE_HISTORICO_CAMPOS} ({colunas})")
+
+
+def reparar_alteracoes(texto):
+    """Tenta transformar um texto de alterações inválido em um objeto JSON.
+
+    Aplica as mesmas etapas usadas antes na leitura (sanitização normal,
+    agressiva e extrema); se nenhuma produzir um objeto, guarda só os nomes
+    de campo encontrados no texto, sem valores.
+
+    Returns:
+        str: JSON de um objeto ou None se nada for recuperável
+    """
+    if not texto or not isinstance(texto, str):
+        return None
+
+    # Import local: historico_utils lê historico_campos
+    from historico_utils import sanitize_json_string
+
+    candidatos = [
+        lambda: sanitize_json_string(texto),
+        lambda: sanitize_json_string(texto, aggressive=True),
+        lambda: sanitize_json_string(texto, aggressive=True, extreme=True),
+        lambda: re.sub(r'[\x00-\x1F\x7F]', ' ', re.sub(r'\\', '', texto).replace("'", '"')),
+    ]
+    for candidato in candidatos:
+        try:
+            dados = json.loads(candidato())
+        except Exception:
+            continue
+        if isinstance(dados, dict) and dados:
+            return json.dumps(dados, ensure_ascii=False)
+
+    campos = list(dict.fromkeys(PADRAO_NOME_CAMPO.findall(texto)))
+    if campos:
+        return json.dumps({campo: None for campo in campos}, ensure_ascii=False)
+    return None
+
+
+def preencher_historico_campos(cursor, tamanho_lote=TAMANHO_LOTE_PREENCHIMENTO, ao_concluir_lote=None):
+    """Recria historico_campos a partir do histórico, em lotes de ids.
+
+    Os textos JSON válidos são processados pelo mesmo SQL dos triggers; os
+    inválidos usam a forma canônica de ``historico_json`` (reparada uma vez).
+
+    Args:
+        cursor: Cursor do banco
+        tamanho_lote: Faixa de ids do histórico processada por comando
+        ao_concluir_lote: Função chamada após cada lote (ex.: commit), opcional
+
+    Returns:
+        tuple: (linhas de historico_campos criadas, entradas reparadas)
+    """
+    cursor.execute("SELECT MIN(id), MAX(id) FROM historico")
+    menor, maior = cursor.fetchone()
+    if menor is None:
+        return 0, 0
+
+    sql_validos = _sql_inserir_campos(
+        'h.alteracoes', 'h.id', 'h.registro_id', 'h.data_alteracao_epoch',
+        origem='historico h,', filtro='h.id BETWEEN :inicio AND :fim'
+    )
+    sql_reparado = _sql_inserir_campos(':alteracoes', ':historico_id', ':registro_id', ':ts')
+    # Import local: historico_json depende deste módulo
+    from models.historico_json import alteracoes_canonicas
+
+    criadas = 0
+    reparadas = 0
+    for inicio in range(menor, maior + 1, tamanho_lote):
+        faixa = {'inicio': inicio, 'fim': inicio + tamanho_lote - 1}
+        cursor.execute(
+            f"DELETE FROM {TABLE_HISTORICO_CAMPOS} WHERE historico_id BETWEEN :inicio AND :fim", faixa
+        )
+        cursor.execute(sql_validos, faixa)
+        criadas += cursor.rowcount
+
+        cursor.execute("""
+            SELECT id, registro_id, alteracoes, data_alteracao_epoch FROM historico
+            WHERE id BETWEEN :inicio AND :fim AND alteracoes IS NOT NULL AND alteracoes != ''
+            AND NOT json_valid(alteracoes)
+        """, faixa)
+        for historico_id, registro_id, alteracoes, ts in cursor.fetchall():
+            texto = alteracoes_canonicas(cursor, historico_id, alteracoes)
+            if texto is None:
+                continue
+            cursor.execute(sql_reparado, {
+                'alteracoes': texto, 'historico_id': historico_id, 'registro_id': registro_id, 'ts': ts,
+            })
+            criadas += cursor.rowcount
+            reparadas += 1
+
+        if ao_concluir_lote:
+            ao_concluir_lote()
+    return criadas, reparadas
+
+
+def aplicar_historico_campos(cursor):
+    """Cria a tabela, preenche a partir do histórico e (re)cria os triggers.
+
+    Deve rodar dentro de uma transação, depois da coluna
+    ``historico.data_alteracao_epoch`` existir e estar preenchida.
+    """
+    criar_tabela_historico_campos(cursor)
+    for nome in TRIGGERS_HISTORICO_CAMPOS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    criadas, reparadas = preencher_historico_campos(cursor)
+    for sql in sql_triggers_historico_campos():
+        cursor.execute(sql)
+    logger.info(f"historico_campos preenchida com {criadas} linhas ({reparadas} entradas legadas reparadas)")
+    return criadas
+
+
+def campos_por_historico(cursor, historico_ids, tamanho_lote=500):
+    """Lê as linhas de historico_campos de várias entradas do histórico.
+
+    Args:
+        cursor: Cursor do banco
+        historico_ids: IDs das entradas do histórico
+        tamanho_lote: IDs por consulta (limite de parâmetros do SQLite)
+
+    Returns:
+        dict: {historico_id: [(campo, valor_anterior, valor_novo, tipo), ...]}
+        na ordem em que os campos aparecem no JSON original
+    """
+    historico_ids = list(dict.fromkeys(historico_ids))
+    campos = {}
+    for inicio in range(0, len(historico_ids), tamanho_lote):
+        lote = historico_ids[inicio:inicio + tamanho_lote]
+        marcadores = ", ".join("?" for _ in lote)
+        cursor.execute(f"""
+            SELECT historico_id, campo, valor_anterior, valor_novo, tipo
+            FROM {TABLE_HISTORICO_CAMPOS}
+            WHERE historico_id IN ({marcadores})
+            ORDER BY historico_id, id
+        """, lote)
+        for historico_id, campo, anterior, novo, tipo in cursor.fetchall():
+            campos.setdefault(historico_id, []).append((campo, anterior, novo, tipo))
+    return campos
+
+
+def verificar_historico_campos(cursor, limite=100):
+    """Compara historico_campos com o JSON (válido) de cada entrada do histórico.
+
+    As entradas com JSON inválido não são comparadas: o reparo é heurístico.
+
+    Returns:
+        list: ids do histórico cujas linhas divergem
+    """
+    # Os valores gravados ficam com afinidade TEXT; o esperado é convertido igual
+    esperado = f"""
+        SELECT historico_id, registro_id, campo, CAST(valor_anterior AS TEXT),
+            CAST(valor_novo AS TEXT), tipo, ts
+        FROM ({sql_selecionar_campos(
+            'h.alteracoes', 'h.id', 'h.registro_id', 'h.data_alteracao_epoch', origem='historico h,'
+        )})
+    """
+    atual = f"""
+        SELECT historico_id, registro_id, campo, valor_anterior, valor_novo, tipo, ts
+        FROM {TABLE_HISTORICO_CAMPOS}
+        WHERE historico_id IN (SELECT id FROM historico WHERE json_valid(alteracoes))
+    """
+    cursor.execute(f"""
+        SELECT DISTINCT historico_id FROM (
+            SELECT * FROM ({esperado} EXCEPT {atual})
+            UNION ALL
+            SELECT * FROM ({atual} EXCEPT {esperado})
+        )
+        LIMIT ?
+    """, (limite,))
+    return [linha[0] for linha in cursor.fetchall()]
@@ -0,0 +1,142 @@
+"""
+Coluna canônica (epoch) da data das alterações do histórico.
+
+``historico.data_alteracao`` é gravada como 'DD-MM-YYYY HH:MM:SS' pela maioria
+das rotas e como 'YYYY-MM-DD HH:MM:SS' por outras, então ordenar ou comparar o
+texto cru mistura formatos e não aproveita índice de intervalo. A coluna
+``data_alteracao_epoch`` guarda os segundos desde 1970-01-01 do horário de
+parede gravado (o horário local é tratado como UTC, sem conversão de fuso),
+mantida por triggers em todo INSERT/UPDATE, qualquer que seja a rota que
+grava. Datas não reconhecidas ficam NULL.
+
+Ordenação e filtros do histórico devem usar ``data_alteracao_epoch``; para
+comparar com as datas de registros use ``expr_epoch`` sobre as colunas ``_iso``
+(models/datas_iso.py) e, em Python, ``utils.date_utils.epoch_data``.
+"""
+
+import logging
+
+from models.datas_iso import expr_data_iso
+
+logger = logging.getLogger(__name__)
+
+COLUNA_EPOCH = 'data_alteracao_epoch'
+
+TRIGGERS_HISTORICO_EPOCH = [
+    'historico_epoch_insert',
+    'historico_epoch_update',
+]
+
+# Índices sobre a coluna canônica: (nome, colunas)
+INDICES_HISTORICO_EPOCH = [
+    ('idx_historico_registro_epoch', f'registro_id, {COLUNA_EPOCH}'),
+    ('idx_historico_data_alteracao_epoch', COLUNA_EPOCH),
+]
+
+# Índices sobre o texto cru substituídos pelos de cima
+INDICES_HISTORICO_SUBSTITUIDOS = [
+    'idx_historico_registro_data',
+    'idx_historico_data_alteracao',
+]
+
+# Linhas atualizadas por comando no preenchimento da coluna
+TAMANHO_LOTE_PREENCHIMENTO = 5000
+
+
+def expr_epoch(valor_iso):
+    """Expressão SQL com o epoch (INTEGER) de uma data 'YYYY-MM-DD HH:MM:SS' (ou NULL)."""
+    return f"CAST(strftime('%s', {valor_iso}) AS INTEGER)"
+
+
+def expr_epoch_data_alteracao(valor):
+    """Expressão SQL que normaliza ``valor`` (qualquer formato aceito) para epoch."""
+    return expr_epoch(expr_data_iso(valor))
+
+
+def sql_triggers_historico_epoch():
+    """Gera o SQL dos triggers que mantêm ``data_alteracao_epoch``."""
+    return [
+        f"""CREATE TRIGGER historico_epoch_insert
+AFTER INSERT ON historico
+FOR EACH ROW
+BEGIN
+    UPDATE historico SET {COLUNA_EPOCH} = {expr_epoch_data_alteracao('NEW.data_alteracao')}
+    WHERE id = NEW.id;
+END""",
+        f"""CREATE TRIGGER historico_epoch_update
+AFTER UPDATE OF data_alteracao ON historico
+FOR EACH ROW
+BEGIN
+    UPDATE historico SET {COLUNA_EPOCH} = {expr_epoch_data_alteracao('NEW.data_alteracao')}
+    WHERE id = NEW.id;
+END""",
+    ]
+
+
+def preencher_historico_epoch(cursor, tamanho_lote=TAMANHO_LOTE_PREENCHIMENTO, ao_concluir_lote=None):
+    """Recalcula ``data_alteracao_epoch`` de todo o histórico, em lotes de ids.
+
+    Args:
+        cursor: Cursor do banco
+        tamanho_lote: Faixa de ids atualizada por comando
+        ao_concluir_lote: Função chamada após cada lote (ex.: commit), opcional
+
+    Returns:
+        int: Número de linhas atualizadas
+    """
+    cursor.execute("SELECT MIN(id), MAX(id) FROM historico")
+    menor, maior = cursor.fetchone()
+    if menor is None:
+        return 0
+
+    atualizadas = 0
+    sql = f"""
+        UPDATE historico SET {COLUNA_EPOCH} = {expr_epoch_data_alteracao('data_alteracao')}
+        WHERE id BETWEEN ? AND ?
+    """
+    for inicio in range(menor, maior + 1, tamanho_lote):
+        cursor.execute(sql, (inicio, inicio + tamanho_lote - 1))
+        atualizadas += cursor.rowcount
+        if ao_concluir_lote:
+            ao_concluir_lote()
+    return atualizadas
+
+
+def aplicar_historico_epoch(cursor):
+    """Cria a coluna, preenche em lotes, (re)cria os triggers e troca os índices.
+
+    Deve rodar dentro de uma transação para que nenhuma escrita fique de fora
+    entre o preenchimento e a criação dos triggers.
+    """
+    cursor.execute("PRAGMA table_info(historico)")
+    if COLUNA_EPOCH not in {linha[1] for linha in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE historico ADD COLUMN {COLUNA_EPOCH} INTEGER")
+
+    for nome in TRIGGERS_HISTORICO_EPOCH:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    atualizadas = preencher_historico_epoch(cursor)
+    for sql in sql_triggers_historico_epoch():
+        cursor.execute(sql)
+
+    for nome, colunas in INDICES_HISTORICO_EPOCH:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON historico ({colunas})")
+    for nome in INDICES_HISTORICO_SUBSTITUIDOS:
+        cursor.execute(f"DROP INDEX IF EXISTS {nome}")
+    logger.info(f"Epoch das alterações preenchido em {atualizadas} linhas do histórico")
+    return atualizadas
+
+
+def verificar_historico_epoch(cursor, limite=100):
+    """Compara ``data_alteracao_epoch`` com a normalização de ``data_alteracao``.
+
+    Returns:
+        list: Divergências no formato (id, data_alteracao, epoch, epoch_esperado)
+    """
+    esperado = expr_epoch_data_alteracao('data_alteracao')
+    cursor.execute(f"""
+        SELECT id, data_alteracao, {COLUNA_EPOCH}, {esperado}
+        FROM historico
+        WHERE {COLUNA_EPOCH} IS NOT {esperado}
+        LIMIT ?
+    """, (limite,))
+    return [tuple(linha) for linha in cursor.fetchall()]
@@ -0,0 +1,212 @@
+"""
+Cache da forma decodificada de ``historico.alteracoes``.
+
+Textos legados inválidos passam por ``reparar_alteracoes`` (até três
+sanitizações e três ``json.loads``). Para cada texto ser reparado uma única
+vez, a forma canônica (JSON válido) fica gravada em ``historico_json``,
+chaveada pelo id da entrada e pelo hash do texto: se o texto mudar, o hash
+não confere e o reparo é refeito. Textos já válidos não vão para a tabela
+(ler a forma canônica custaria o mesmo ``json.loads``).
+
+Na frente da tabela há um LRU de processo com os objetos já decodificados
+das entradas mais lidas. Os objetos do LRU são compartilhados: quem chama não
+deve alterá-los. ``estatisticas_cache_historico`` expõe acertos e faltas.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from models.schema import get_schema
+from models.historico_campos import reparar_alteracoes
+
+logger = logging.getLogger(__name__)
+
+TABLE_HISTORICO_JSON = 'historico_json'
+
+TRIGGERS_HISTORICO_JSON = [
+    'historico_json_delete',
+]
+
+# Entradas decodificadas mantidas em memória por processo
+TAMANHO_MAXIMO_LRU = 2048
+
+# Linhas do histórico examinadas por comando no preenchimento
+TAMANHO_LOTE_PREENCHIMENTO = 5000
+
+_lock = threading.Lock()
+_lru = OrderedDict()
+_estatisticas = {
+    'acertos_lru': 0,
+    'acertos_tabela': 0,
+    'decodificadas': 0,
+    'reparadas': 0,
+    'irrecuperaveis': 0,
+}
+
+
+def _incrementar_stat(chave, valor=1):
+    with _lock:
+        _estatisticas[chave] += valor
+
+
+def hash_alteracoes(texto):
+    """Hash do texto de alterações (chave do cache junto com o id)."""
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def criar_tabela_historico_json(cursor):
+    """Cria a tabela e o trigger que descarta o cache de entradas excluídas."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_HISTORICO_JSON} (
+            historico_id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL,
+            alteracoes TEXT
+        )
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS historico_json_delete")
+    cursor.execute(f"""CREATE TRIGGER historico_json_delete
+AFTER DELETE ON historico
+FOR EACH ROW
+BEGIN
+    DELETE FROM {TABLE_HISTORICO_JSON} WHERE historico_id = OLD.id;
+END""")
+
+
+def _lru_obter(chave):
+    with _lock:
+        if chave not in _lru:
+            return False, None
+        _lru.move_to_end(chave)
+        _estatisticas['acertos_lru'] += 1
+        return True, _lru[chave]
+
+
+def _lru_guardar(chave, valor):
+    with _lock:
+        _lru[chave] = valor
+        _lru.move_to_end(chave)
+        while len(_lru) > TAMANHO_MAXIMO_LRU:
+            _lru.popitem(last=False)
+
+
+def alteracoes_canonicas(cursor, historico_id, texto, persistir=True):
+    """Texto JSON válido equivalente a ``texto`` (reparado uma única vez).
+
+    Args:
+        cursor: Cursor do banco
+        historico_id: ID da entrada do histórico
+        texto: Valor de ``historico.alteracoes``
+        persistir: Se False, só consulta a tabela (não grava reparos novos)
+
+    Returns:
+        str: JSON válido, ou None se nada for recuperável
+    """
+    if not texto or not isinstance(texto, str):
+        return None
+    try:
+        json.loads(texto)
+        return texto
+    except (json.JSONDecodeError, ValueError):
+        pass
+
+    hash_texto = hash_alteracoes(texto)
+    # Registro em memória do schema: nenhuma consulta a sqlite_master por entrada
+    tabela = get_schema().tem_tabela(TABLE_HISTORICO_JSON)
+    if tabela:
+        cursor.execute(
+            f"SELECT hash, alteracoes FROM {TABLE_HISTORICO_JSON} WHERE historico_id = ?", (historico_id,)
+        )
+        linha = cursor.fetchone()
+        if linha and linha[0] == hash_texto:
+            _incrementar_stat('acertos_tabela')
+            return linha[1]
+
+    canonico = reparar_alteracoes(texto)
+    _incrementar_stat('reparadas' if canonico is not None else 'irrecuperaveis')
+    if tabela and persistir:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {TABLE_HISTORICO_JSON} (historico_id, hash, alteracoes) VALUES (?, ?, ?)",
+            (historico_id, hash_texto, canonico)
+        )
+    return canonico
+
+
+def alteracoes_decodificadas(cursor, historico_id, texto):
+    """Objeto decodificado de ``historico.alteracoes`` (dict vazio se irrecuperável).
+
+    Consulta o LRU, depois a tabela de formas canônicas e só então decodifica
+    (e, se preciso, repara e grava) o texto.
+    """
+    if not texto or not isinstance(texto, str):
+        return {}
+
+    chave = (historico_id, hash_alteracoes(texto))
+    achou, valor = _lru_obter(chave)
+    if achou:
+        return valor
+
+    canonico = alteracoes_canonicas(cursor, historico_id, texto)
+    _incrementar_stat('decodificadas')
+    valor = json.loads(canonico) if canonico is not None else {}
+    _lru_guardar(chave, valor)
+    return valor
+
+
+def preencher_historico_json(cursor, tamanho_lote=TAMANHO_LOTE_PREENCHIMENTO, ao_concluir_lote=None):
+    """Grava a forma canônica de todas as entradas com JSON inválido, em lotes de ids.
+
+    Returns:
+        int: Entradas processadas
+    """
+    cursor.execute("SELECT MIN(id), MAX(id) FROM historico")
+    menor, maior = cursor.fetchone()
+    if menor is None:
+        return 0
+
+    processadas = 0
+    for inicio in range(menor, maior + 1, tamanho_lote):
+        cursor.execute("""
+            SELECT id, alteracoes FROM historico
+            WHERE id BETWEEN ? AND ? AND alteracoes IS NOT NULL AND alteracoes != ''
+            AND NOT json_valid(alteracoes)
+        """, (inicio, inicio + tamanho_lote - 1))
+        for historico_id, texto in cursor.fetchall():
+            alteracoes_canonicas(cursor, historico_id, texto)
+            processadas += 1
+        if ao_concluir_lote:
+            ao_concluir_lote()
+    return processadas
+
+
+def aplicar_historico_json(cursor):
+    """Cria a tabela e grava as formas canônicas dos textos legados inválidos."""
+    criar_tabela_historico_json(cursor)
+    processadas = preencher_historico_json(cursor)
+    logger.info(f"Forma canônica gravada para {processadas} entradas legadas do histórico")
+    return processadas
+
+
+def limpar_cache_historico():
+    """Descarta o LRU do processo (a tabela continua valendo)."""
+    with _lock:
+        _lru.clear()
+
+
+def estatisticas_cache_historico():
+    """Retorna um retrato dos acertos e faltas do cache.
+
+    ``taxa_acerto`` é a fração das leituras atendidas sem decodificar o texto
+    (LRU); ``decodificadas`` conta as faltas do LRU, das quais ``reparadas`` e
+    ``irrecuperaveis`` precisaram do reparo (as demais eram JSON válido ou
+    vieram de ``historico_json``).
+    """
+    with _lock:
+        stats = dict(_estatisticas)
+        stats['entradas_lru'] = len(_lru)
+    leituras = stats['acertos_lru'] + stats['decodificadas']
+    stats['leituras'] = leituras
+    stats['taxa_acerto'] = round(stats['acertos_lru'] / leituras, 4) if leituras else 0.0
+    return stats
@@ -0,0 +1,198 @@
+"""
+Índice de identificadores normalizados de registros.
+
+Placas, containers, CPFs e números de SM/AE são digitados com ou sem
+pontuação e em caixa mista ("ABC-1D23" x "abc1d23", CPF com pontos e traço),
+o que obrigava a busca a varrer a tabela com ``LIKE '%termo%'``.
+``registros_identificadores`` guarda, por registro e campo, a chave
+normalizada (maiúsculas, sem pontuação nem espaços), mantida por triggers em
+todo INSERT/UPDATE/DELETE de registros, com índice para busca exata e por
+prefixo.
+
+A normalização em SQL remove a pontuação de ``CARACTERES_REMOVIDOS``;
+``normalizar_identificador`` faz o mesmo com o termo buscado.
+"""
+
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+TABLE_IDENTIFICADORES = 'registros_identificadores'
+
+# Campos de registros indexados
+CAMPOS_IDENTIFICADORES = [
+    'placa', 'carreta', 'container_1', 'container_2', 'cpf',
+    'numero_sm', 'numero_ae', 'booking_di', 'lote_cs',
+]
+
+# Pontuação e espaços ignorados nas chaves
+CARACTERES_REMOVIDOS = [' ', '-', '.', '/', '\\', '_', ',', ';', ':', '(', ')', '#', '*', '+', "'", '"', '\t']
+
+TRIGGERS_IDENTIFICADORES = [
+    'identificadores_registros_insert',
+    'identificadores_registros_update',
+    'identificadores_registros_delete',
+]
+
+# Índices: (nome, colunas)
+INDICES_IDENTIFICADORES = [
+    ('idx_registros_identificadores_chave', 'chave'),
+    ('idx_registros_identificadores_registro', 'registro_id'),
+]
+
+# Tamanho mínimo (normalizado) para um termo ser tratado como identificador
+TAMANHO_MINIMO_IDENTIFICADOR = 5
+
+# Maior que qualquer caractere das chaves: limite superior da busca por prefixo
+_FIM_PREFIXO = '~'
+
+_PADRAO_IDENTIFICADOR = re.compile(r'^[A-Za-z0-9][A-Za-z0-9 .\-/]*$')
+_PADRAO_DATA = re.compile(r'^\d{1,4}[-/]\d{1,2}([-/]\d{1,4})?( .*)?$')
+
+
+def expr_chave(valor):
+    """Expressão SQL com a chave normalizada de ``valor`` (maiúsculas, sem pontuação)."""
+    expr = f"upper(CAST({valor} AS TEXT))"
+    for caractere in CARACTERES_REMOVIDOS:
+        literal = caractere.replace("'", "''")
+        expr = f"replace({expr}, '{literal}', '')"
+    return expr
+
+
+def normalizar_identificador(valor):
+    """Chave normalizada em Python (mesma regra de ``expr_chave``)."""
+    if valor is None:
+        return ''
+    chave = ''.join(c.upper() if 'a' <= c <= 'z' else c for c in str(valor))
+    for caractere in CARACTERES_REMOVIDOS:
+        chave = chave.replace(caractere, '')
+    return chave
+
+
+def parece_identificador(termo):
+    """Indica se o termo buscado parece uma placa, container, CPF ou número de SM/AE.
+
+    Exige letras/dígitos com pontuação opcional, ao menos um dígito e
+    ``TAMANHO_MINIMO_IDENTIFICADOR`` caracteres normalizados; datas
+    ('2025-06', '02/06/2025') ficam de fora.
+    """
+    if not termo:
+        return False
+    termo = termo.strip()
+    if not _PADRAO_IDENTIFICADOR.match(termo) or _PADRAO_DATA.match(termo):
+        return False
+    chave = normalizar_identificador(termo)
+    return len(chave) >= TAMANHO_MINIMO_IDENTIFICADOR and any(c.isdigit() for c in chave)
+
+
+def _sql_selecionar_chaves(r, origem=''):
+    """SELECT (registro_id, campo, chave) das chaves não vazias de ``r``.
+
+    Args:
+        r: ``NEW`` (triggers) ou ``registros``
+        origem: Cláusula FROM (vazia nos triggers)
+    """
+    selects = "\n        UNION ALL ".join(
+        f"SELECT {r}.id AS registro_id, '{campo}' AS campo, {expr_chave(f'{r}.{campo}')} AS chave {origem}"
+        for campo in CAMPOS_IDENTIFICADORES
+    )
+    return f"""SELECT registro_id, campo, chave FROM (
+        {selects}
+    ) WHERE chave IS NOT NULL AND chave != ''"""
+
+
+def _sql_inserir_chaves(r, origem=''):
+    return f"""INSERT INTO {TABLE_IDENTIFICADORES} (registro_id, campo, chave)
+    {_sql_selecionar_chaves(r, origem)}"""
+
+
+def sql_triggers_identificadores():
+    """Gera o SQL dos triggers que mantêm as chaves normalizadas."""
+    colunas = ", ".join(CAMPOS_IDENTIFICADORES)
+    inserir_novo = _sql_inserir_chaves('NEW')
+    return [
+        f"""CREATE TRIGGER identificadores_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    {inserir_novo};
+END""",
+        f"""CREATE TRIGGER identificadores_registros_update
+AFTER UPDATE OF {colunas} ON registros
+FOR EACH ROW
+BEGIN
+    DELETE FROM {TABLE_IDENTIFICADORES} WHERE registro_id = OLD.id;
+    {inserir_novo};
+END""",
+        f"""CREATE TRIGGER identificadores_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW
+BEGIN
+    DELETE FROM {TABLE_IDENTIFICADORES} WHERE registro_id = OLD.id;
+END""",
+    ]
+
+
+def criar_tabela_identificadores(cursor):
+    """Cria a tabela e os índices (sem triggers nem dados)."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_IDENTIFICADORES} (
+            registro_id INTEGER NOT NULL,
+            campo TEXT NOT NULL,
+            chave TEXT NOT NULL
+        )
+    """)
+    for nome, colunas in INDICES_IDENTIFICADORES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {TABLE_IDENTIFICADORES} ({colunas})")
+
+
+def reconstruir_identificadores(cursor):
+    """Refaz todas as chaves a partir de registros.
+
+    Returns:
+        int: Número de chaves gravadas
+    """
+    cursor.execute(f"DELETE FROM {TABLE_IDENTIFICADORES}")
+    cursor.execute(_sql_inserir_chaves('registros', 'FROM registros'))
+    return cursor.rowcount
+
+
+def aplicar_identificadores(cursor):
+    """Cria a tabela, preenche a partir de registros e (re)cria os triggers.
+
+    Deve rodar dentro de uma transação para que nenhuma escrita fique de fora
+    entre o preenchimento e a criação dos triggers.
+    """
+    criar_tabela_identificadores(cursor)
+    for nome in TRIGGERS_IDENTIFICADORES:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    chaves = reconstruir_identificadores(cursor)
+    for sql in sql_triggers_identificadores():
+        cursor.execute(sql)
+    logger.info(f"Índice de identificadores preenchido com {chaves} chaves")
+    return chaves
+
+
+def verificar_identificadores(cursor, limite=100):
+    """Compara as chaves gravadas com a normalização atual dos campos.
+
+    Returns:
+        list: IDs de registros cujas chaves divergem
+    """
+    esperado = _sql_selecionar_chaves('registros', 'FROM registros')
+    atual = f"SELECT registro_id, campo, chave FROM {TABLE_IDENTIFICADORES}"
+    cursor.execute(f"""
+        SELECT DISTINCT registro_id FROM (
+            SELECT * FROM ({esperado} EXCEPT {atual})
+            UNION ALL
+            SELECT * FROM ({atual} EXCEPT {esperado})
+        )
+        LIMIT ?
+    """, (limite,))
+    return [linha[0] for linha in cursor.fetchall()]
+
+
+def limites_prefixo(chave):
+    """Intervalo [inicio, fim) das chaves que começam com ``chave`` (inclui a exata)."""
+    return chave, chave + _FIM_PREFIXO
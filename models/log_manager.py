@@ -1,6 +1,7 @@
 import sqlite3
 from datetime import datetime
 from models.database import get_db_connection
+from models.schema import get_schema
 
 def registrar_log(usuario, nivel, acao, descricao, registro_id=None, detalhes=None, valor_anterior=None, valor_novo=None, objeto_tipo=None, ip=None):
     """
@@ -30,8 +31,7 @@ def registrar_log(usuario, nivel, acao, descricao, registro_id=None, detalhes=No
             cursor = conn.cursor()
             
             # Verificar se a tabela logs_unificados existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='logs_unificados'")
-            if not cursor.fetchone():
+            if not get_schema().tem_tabela('logs_unificados'):
                 # Tentar executar o script de migração
                 try:
                     from scripts.unificar_logs import criar_tabela_unificada
@@ -91,8 +91,7 @@ def obter_logs(filtros=None, pagina=1, itens_por_pagina=50):
             cursor = conn.cursor()
             
             # Verificar se a tabela logs_unificados existe
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='logs_unificados'")
-            if not cursor.fetchone():
+            if not get_schema().tem_tabela('logs_unificados'):
                 # Tentar executar a migração
                 try:
                     from scripts.unificar_logs import executar_migracao
@@ -0,0 +1,45 @@
+-- Tabela materializada de alterações pendentes pós SM/AE
+CREATE TABLE IF NOT EXISTS registros_alteracoes_pendentes (
+    registro_id INTEGER PRIMARY KEY,
+    data_deteccao TEXT
+);
+
+-- Registros com alterações relevantes depois da SM/AE (alteracao_pos_smae_relevante
+-- é registrada na conexão pela migração)
+INSERT OR IGNORE INTO registros_alteracoes_pendentes (registro_id, data_deteccao)
+SELECT id, :agora FROM (
+    WITH usuarios_gr AS (
+        SELECT username FROM usuarios WHERE nivel = 'gr'
+    )
+    SELECT r.id
+    FROM registros r
+    WHERE ((r.numero_sm IS NOT NULL AND r.numero_sm != '' AND r.numero_sm != '0')
+       OR (r.numero_ae IS NOT NULL AND r.numero_ae != '' AND r.numero_ae != '0'))
+    AND r.excluido = 0
+    AND r.alteracoes_verificadas = 0
+    AND EXISTS (
+        SELECT 1 FROM historico h
+        WHERE h.registro_id = r.id
+        AND h.data_alteracao > CASE
+            WHEN r.data_sm IS NOT NULL AND r.data_sm > r.data_ae THEN r.data_sm
+            WHEN r.data_ae IS NOT NULL THEN r.data_ae
+            ELSE r.data_sm
+        END
+        AND h.alterado_por NOT IN usuarios_gr
+        AND h.alteracoes NOT LIKE '%"tipo": "Edição GR"%'
+        AND h.alteracoes NOT LIKE '%numero_sm%'
+        AND h.alteracoes NOT LIKE '%numero_ae%'
+    )
+    AND EXISTS (
+        SELECT 1 FROM historico h
+        WHERE h.registro_id = r.id
+        AND h.data_alteracao > CASE
+            WHEN r.data_sm IS NOT NULL AND r.data_sm > r.data_ae THEN r.data_sm
+            WHEN r.data_ae IS NOT NULL THEN r.data_ae
+            ELSE r.data_sm
+        END
+        AND h.alterado_por NOT IN usuarios_gr
+        AND alteracao_pos_smae_relevante(h.alteracoes) = 1
+    )
+    ORDER BY r.id
+);
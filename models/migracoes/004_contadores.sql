@@ -0,0 +1,326 @@
+-- Índice do autor do registro (grupo dos contadores)
+CREATE INDEX IF NOT EXISTS idx_registros_usuario ON registros (usuario);
+
+-- Tabela contadores
+CREATE TABLE IF NOT EXISTS contadores (
+    grupo TEXT PRIMARY KEY,
+    registros_pendentes INTEGER NOT NULL DEFAULT 0,
+    registros_andamento INTEGER NOT NULL DEFAULT 0,
+    registros_concluidos INTEGER NOT NULL DEFAULT 0,
+    sem_container INTEGER NOT NULL DEFAULT 0,
+    sem_sm INTEGER NOT NULL DEFAULT 0,
+    sem_ae INTEGER NOT NULL DEFAULT 0,
+    sem_nf INTEGER NOT NULL DEFAULT 0,
+    sem_os INTEGER NOT NULL DEFAULT 0,
+    alteracoes_pos_smae INTEGER NOT NULL DEFAULT 0,
+    operacoes_sem_nf INTEGER NOT NULL DEFAULT 0,
+    operacoes_sem_os INTEGER NOT NULL DEFAULT 0,
+    operacoes_sem_container INTEGER NOT NULL DEFAULT 0,
+    operacoes_sem_sm INTEGER NOT NULL DEFAULT 0,
+    operacoes_sem_ae INTEGER NOT NULL DEFAULT 0,
+    operacoes_alteradas_pos_smae INTEGER NOT NULL DEFAULT 0
+);
+
+-- Triggers que mantêm os contadores
+DROP TRIGGER IF EXISTS contadores_registros_insert;
+DROP TRIGGER IF EXISTS contadores_registros_update;
+DROP TRIGGER IF EXISTS contadores_registros_delete;
+DROP TRIGGER IF EXISTS contadores_usuarios_insert;
+DROP TRIGGER IF EXISTS contadores_usuarios_update;
+DROP TRIGGER IF EXISTS contadores_usuarios_delete;
+DROP TRIGGER IF EXISTS contadores_pendentes_insert;
+DROP TRIGGER IF EXISTS contadores_pendentes_delete;
+
+CREATE TRIGGER contadores_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE((SELECT nivel FROM usuarios WHERE username = NEW.usuario), ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_andamento = registros_andamento + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_concluidos = registros_concluidos + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_container = sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_sm = sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_ae = sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_nf = sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_os = sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_nf = operacoes_sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_os = operacoes_sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_container = operacoes_sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_sm = operacoes_sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_ae = operacoes_sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0)
+    WHERE grupo = COALESCE((SELECT nivel FROM usuarios WHERE username = NEW.usuario), '');
+END;
+
+CREATE TRIGGER contadores_registros_update
+AFTER UPDATE OF id, usuario, excluido, status_sm, container_1, numero_sm, numero_ae, anexar_nf, anexar_os, data_modificacao, alteracoes_verificadas ON registros
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE((SELECT nivel FROM usuarios WHERE username = OLD.usuario), ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_andamento = registros_andamento - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_concluidos = registros_concluidos - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_container = sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_sm = sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_ae = sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_nf = sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_os = sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_nf = operacoes_sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_os = operacoes_sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_container = operacoes_sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_sm = operacoes_sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_ae = operacoes_sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0)
+    WHERE grupo = COALESCE((SELECT nivel FROM usuarios WHERE username = OLD.usuario), '');
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE((SELECT nivel FROM usuarios WHERE username = NEW.usuario), ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_andamento = registros_andamento + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_concluidos = registros_concluidos + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_container = sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_sm = sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_ae = sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_nf = sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_os = sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_nf = operacoes_sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_os = operacoes_sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_container = operacoes_sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_sm = operacoes_sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_ae = operacoes_sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM (SELECT NEW.id AS id, CAST(NEW.usuario AS TEXT) AS usuario, NEW.excluido AS excluido, CAST(NEW.status_sm AS TEXT) AS status_sm, CAST(NEW.container_1 AS TEXT) AS container_1, CAST(NEW.numero_sm AS TEXT) AS numero_sm, CAST(NEW.numero_ae AS TEXT) AS numero_ae, CAST(NEW.anexar_nf AS TEXT) AS anexar_nf, CAST(NEW.anexar_os AS TEXT) AS anexar_os, NEW.data_modificacao AS data_modificacao, NEW.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0)
+    WHERE grupo = COALESCE((SELECT nivel FROM usuarios WHERE username = NEW.usuario), '');
+END;
+
+CREATE TRIGGER contadores_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE((SELECT nivel FROM usuarios WHERE username = OLD.usuario), ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_andamento = registros_andamento - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        registros_concluidos = registros_concluidos - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_container = sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_sm = sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_ae = sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_nf = sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        sem_os = sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_nf = operacoes_sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_os = operacoes_sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_container = operacoes_sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_sm = operacoes_sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_sem_ae = operacoes_sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM (SELECT OLD.id AS id, CAST(OLD.usuario AS TEXT) AS usuario, OLD.excluido AS excluido, CAST(OLD.status_sm AS TEXT) AS status_sm, CAST(OLD.container_1 AS TEXT) AS container_1, CAST(OLD.numero_sm AS TEXT) AS numero_sm, CAST(OLD.numero_ae AS TEXT) AS numero_ae, CAST(OLD.anexar_nf AS TEXT) AS anexar_nf, CAST(OLD.anexar_os AS TEXT) AS anexar_os, OLD.data_modificacao AS data_modificacao, OLD.alteracoes_verificadas AS alteracoes_verificadas) AS registros WHERE registros.excluido = 0)
+    WHERE grupo = COALESCE((SELECT nivel FROM usuarios WHERE username = OLD.usuario), '');
+END;
+
+CREATE TRIGGER contadores_usuarios_insert
+AFTER INSERT ON usuarios
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES ('');
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_andamento = registros_andamento - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_concluidos = registros_concluidos - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_container = sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_sm = sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_ae = sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_nf = sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_os = sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_nf = operacoes_sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_os = operacoes_sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_container = operacoes_sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_sm = operacoes_sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_ae = operacoes_sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username)
+    WHERE grupo = '';
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE(NEW.nivel, ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_andamento = registros_andamento + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_concluidos = registros_concluidos + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_container = sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_sm = sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_ae = sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_nf = sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_os = sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_nf = operacoes_sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_os = operacoes_sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_container = operacoes_sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_sm = operacoes_sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_ae = operacoes_sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username)
+    WHERE grupo = COALESCE(NEW.nivel, '');
+END;
+
+CREATE TRIGGER contadores_usuarios_update
+AFTER UPDATE OF username, nivel ON usuarios
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE(OLD.nivel, ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_andamento = registros_andamento - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_concluidos = registros_concluidos - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_container = sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_sm = sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_ae = sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_nf = sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_os = sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_nf = operacoes_sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_os = operacoes_sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_container = operacoes_sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_sm = operacoes_sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_ae = operacoes_sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username)
+    WHERE grupo = COALESCE(OLD.nivel, '');
+    INSERT OR IGNORE INTO contadores (grupo) VALUES ('');
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_andamento = registros_andamento + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_concluidos = registros_concluidos + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_container = sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_sm = sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_ae = sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_nf = sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_os = sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_nf = operacoes_sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_os = operacoes_sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_container = operacoes_sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_sm = operacoes_sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_ae = operacoes_sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username)
+    WHERE grupo = '';
+    INSERT OR IGNORE INTO contadores (grupo) VALUES ('');
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_andamento = registros_andamento - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_concluidos = registros_concluidos - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_container = sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_sm = sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_ae = sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_nf = sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_os = sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_nf = operacoes_sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_os = operacoes_sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_container = operacoes_sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_sm = operacoes_sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_ae = operacoes_sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username)
+    WHERE grupo = '';
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE(NEW.nivel, ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_andamento = registros_andamento + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        registros_concluidos = registros_concluidos + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_container = sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_sm = sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_ae = sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_nf = sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        sem_os = sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_nf = operacoes_sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_os = operacoes_sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_container = operacoes_sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_sm = operacoes_sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_sem_ae = operacoes_sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = NEW.username)
+    WHERE grupo = COALESCE(NEW.nivel, '');
+END;
+
+CREATE TRIGGER contadores_usuarios_delete
+AFTER DELETE ON usuarios
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE(OLD.nivel, ''));
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_andamento = registros_andamento - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_concluidos = registros_concluidos - (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_container = sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_sm = sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_ae = sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_nf = sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_os = sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_nf = operacoes_sem_nf - (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_os = operacoes_sem_os - (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_container = operacoes_sem_container - (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_sm = operacoes_sem_sm - (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_ae = operacoes_sem_ae - (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae - (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username)
+    WHERE grupo = COALESCE(OLD.nivel, '');
+    INSERT OR IGNORE INTO contadores (grupo) VALUES ('');
+    UPDATE contadores SET
+        registros_pendentes = registros_pendentes + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_andamento = registros_andamento + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        registros_concluidos = registros_concluidos + (SELECT COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_container = sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_sm = sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_ae = sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_nf = sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        sem_os = sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_nf = operacoes_sem_nf + (SELECT COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_os = operacoes_sem_os + (SELECT COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_container = operacoes_sem_container + (SELECT COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_sm = operacoes_sem_sm + (SELECT COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_sem_ae = operacoes_sem_ae + (SELECT COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username),
+        operacoes_alteradas_pos_smae = operacoes_alteradas_pos_smae + (SELECT COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) FROM registros WHERE registros.excluido = 0 AND registros.usuario = OLD.username)
+    WHERE grupo = '';
+END;
+
+CREATE TRIGGER contadores_pendentes_insert
+AFTER INSERT ON registros_alteracoes_pendentes
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE((SELECT nivel FROM usuarios WHERE username = (SELECT usuario FROM registros WHERE id = NEW.registro_id)), ''));
+    UPDATE contadores SET alteracoes_pos_smae = alteracoes_pos_smae + (SELECT COUNT(*) FROM registros WHERE id = NEW.registro_id AND excluido = 0 AND alteracoes_verificadas = 0)
+    WHERE grupo = COALESCE((SELECT nivel FROM usuarios WHERE username = (SELECT usuario FROM registros WHERE id = NEW.registro_id)), '');
+END;
+
+CREATE TRIGGER contadores_pendentes_delete
+AFTER DELETE ON registros_alteracoes_pendentes
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO contadores (grupo) VALUES (COALESCE((SELECT nivel FROM usuarios WHERE username = (SELECT usuario FROM registros WHERE id = OLD.registro_id)), ''));
+    UPDATE contadores SET alteracoes_pos_smae = alteracoes_pos_smae - (SELECT COUNT(*) FROM registros WHERE id = OLD.registro_id AND excluido = 0 AND alteracoes_verificadas = 0)
+    WHERE grupo = COALESCE((SELECT nivel FROM usuarios WHERE username = (SELECT usuario FROM registros WHERE id = OLD.registro_id)), '');
+END;
+
+-- Recontagem completa, agrupada pelo nível do autor
+DELETE FROM contadores;
+
+INSERT INTO contadores (grupo, registros_pendentes, registros_andamento, registros_concluidos, sem_container, sem_sm, sem_ae, sem_nf, sem_os, alteracoes_pos_smae, operacoes_sem_nf, operacoes_sem_os, operacoes_sem_container, operacoes_sem_sm, operacoes_sem_ae, operacoes_alteradas_pos_smae)
+SELECT COALESCE((SELECT nivel FROM usuarios WHERE username = registros.usuario), '') AS grupo,
+    COALESCE(SUM(CASE WHEN (status_sm = 'Pendente') THEN 1 ELSE 0 END), 0) AS registros_pendentes,
+    COALESCE(SUM(CASE WHEN (status_sm = 'Em andamento') THEN 1 ELSE 0 END), 0) AS registros_andamento,
+    COALESCE(SUM(CASE WHEN (status_sm = 'Concluído') THEN 1 ELSE 0 END), 0) AS registros_concluidos,
+    COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) AS sem_container,
+    COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) AS sem_sm,
+    COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) AS sem_ae,
+    COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = 0 OR anexar_nf = '' OR anexar_nf = 'None' OR anexar_nf = '0') THEN 1 ELSE 0 END), 0) AS sem_nf,
+    COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = 0 OR anexar_os = '') THEN 1 ELSE 0 END), 0) AS sem_os,
+    COALESCE(SUM(CASE WHEN (alteracoes_verificadas = 0 AND EXISTS (SELECT 1 FROM registros_alteracoes_pendentes p WHERE p.registro_id = registros.id)) THEN 1 ELSE 0 END), 0) AS alteracoes_pos_smae,
+    COALESCE(SUM(CASE WHEN (anexar_nf IS NULL OR anexar_nf = '') THEN 1 ELSE 0 END), 0) AS operacoes_sem_nf,
+    COALESCE(SUM(CASE WHEN (anexar_os IS NULL OR anexar_os = '') THEN 1 ELSE 0 END), 0) AS operacoes_sem_os,
+    COALESCE(SUM(CASE WHEN (container_1 IS NULL OR container_1 = '') THEN 1 ELSE 0 END), 0) AS operacoes_sem_container,
+    COALESCE(SUM(CASE WHEN (numero_sm IS NULL OR numero_sm = '') THEN 1 ELSE 0 END), 0) AS operacoes_sem_sm,
+    COALESCE(SUM(CASE WHEN (numero_ae IS NULL OR numero_ae = '') THEN 1 ELSE 0 END), 0) AS operacoes_sem_ae,
+    COALESCE(SUM(CASE WHEN (((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND data_modificacao IS NOT NULL AND alteracoes_verificadas = 0) THEN 1 ELSE 0 END), 0) AS operacoes_alteradas_pos_smae
+FROM registros
+WHERE registros.excluido = 0
+GROUP BY grupo;
@@ -0,0 +1,105 @@
+-- Tabelas de agregados
+CREATE TABLE IF NOT EXISTS registros_rollup_dia (
+    dia TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    com_sm_ae INTEGER NOT NULL DEFAULT 0,
+    tardios INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS registros_rollup_hora (
+    dia TEXT NOT NULL,
+    hora INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, hora)
+) WITHOUT ROWID;
+
+-- Triggers que mantêm os agregados
+DROP TRIGGER IF EXISTS rollup_registros_insert;
+DROP TRIGGER IF EXISTS rollup_registros_update_antes;
+DROP TRIGGER IF EXISTS rollup_registros_update_depois;
+DROP TRIGGER IF EXISTS rollup_registros_delete;
+
+CREATE TRIGGER rollup_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN NEW.excluido = 0 AND date(NEW.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(NEW.data_registro), +1, +(CASE WHEN (NEW.numero_sm IS NOT NULL AND NEW.numero_sm != '') OR (NEW.numero_ae IS NOT NULL AND NEW.numero_ae != '') THEN 1 ELSE 0 END), +(CASE WHEN NEW.horario_previsto IS NOT NULL AND date(NEW.data_registro) = date(NEW.horario_previsto) AND strftime('%H', NEW.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(NEW.data_registro), CAST(strftime('%H', NEW.data_registro) AS INTEGER), +1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(NEW.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(NEW.data_registro) AND hora = CAST(strftime('%H', NEW.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_update_antes
+AFTER UPDATE OF data_registro, excluido, numero_sm, numero_ae, horario_previsto ON registros
+FOR EACH ROW WHEN OLD.excluido = 0 AND date(OLD.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(OLD.data_registro), -1, -(CASE WHEN (OLD.numero_sm IS NOT NULL AND OLD.numero_sm != '') OR (OLD.numero_ae IS NOT NULL AND OLD.numero_ae != '') THEN 1 ELSE 0 END), -(CASE WHEN OLD.horario_previsto IS NOT NULL AND date(OLD.data_registro) = date(OLD.horario_previsto) AND strftime('%H', OLD.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(OLD.data_registro), CAST(strftime('%H', OLD.data_registro) AS INTEGER), -1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(OLD.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(OLD.data_registro) AND hora = CAST(strftime('%H', OLD.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_update_depois
+AFTER UPDATE OF data_registro, excluido, numero_sm, numero_ae, horario_previsto ON registros
+FOR EACH ROW WHEN NEW.excluido = 0 AND date(NEW.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(NEW.data_registro), +1, +(CASE WHEN (NEW.numero_sm IS NOT NULL AND NEW.numero_sm != '') OR (NEW.numero_ae IS NOT NULL AND NEW.numero_ae != '') THEN 1 ELSE 0 END), +(CASE WHEN NEW.horario_previsto IS NOT NULL AND date(NEW.data_registro) = date(NEW.horario_previsto) AND strftime('%H', NEW.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(NEW.data_registro), CAST(strftime('%H', NEW.data_registro) AS INTEGER), +1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(NEW.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(NEW.data_registro) AND hora = CAST(strftime('%H', NEW.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW WHEN OLD.excluido = 0 AND date(OLD.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(OLD.data_registro), -1, -(CASE WHEN (OLD.numero_sm IS NOT NULL AND OLD.numero_sm != '') OR (OLD.numero_ae IS NOT NULL AND OLD.numero_ae != '') THEN 1 ELSE 0 END), -(CASE WHEN OLD.horario_previsto IS NOT NULL AND date(OLD.data_registro) = date(OLD.horario_previsto) AND strftime('%H', OLD.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(OLD.data_registro), CAST(strftime('%H', OLD.data_registro) AS INTEGER), -1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(OLD.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(OLD.data_registro) AND hora = CAST(strftime('%H', OLD.data_registro) AS INTEGER) AND total = 0;
+END;
+
+-- Backfill a partir de registros
+DELETE FROM registros_rollup_dia;
+DELETE FROM registros_rollup_hora;
+
+INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+        SELECT date(r.data_registro) AS dia, COUNT(*),
+               SUM(CASE WHEN (r.numero_sm IS NOT NULL AND r.numero_sm != '') OR (r.numero_ae IS NOT NULL AND r.numero_ae != '') THEN 1 ELSE 0 END), SUM(CASE WHEN r.horario_previsto IS NOT NULL AND date(r.data_registro) = date(r.horario_previsto) AND strftime('%H', r.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END)
+        FROM registros r
+        WHERE r.excluido = 0 AND date(r.data_registro) IS NOT NULL
+        GROUP BY dia;
+
+INSERT INTO registros_rollup_hora (dia, hora, total)
+        SELECT date(r.data_registro) AS dia, CAST(strftime('%H', r.data_registro) AS INTEGER) AS hora, COUNT(*)
+        FROM registros r
+        WHERE r.excluido = 0 AND date(r.data_registro) IS NOT NULL
+        GROUP BY dia, hora;
@@ -0,0 +1,261 @@
+-- Tabelas de agregados
+CREATE TABLE IF NOT EXISTS registros_rollup_dia (
+    dia TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    com_sm_ae INTEGER NOT NULL DEFAULT 0,
+    tardios INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS registros_rollup_hora (
+    dia TEXT NOT NULL,
+    hora INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, hora)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS registros_sla_dia (
+    dia_registro TEXT NOT NULL,
+    dia_modificacao TEXT NOT NULL,
+    linhas INTEGER NOT NULL DEFAULT 0,
+    ae_n INTEGER NOT NULL DEFAULT 0,
+    ae_soma REAL NOT NULL DEFAULT 0,
+    ae_soma_q REAL NOT NULL DEFAULT 0,
+    sm_n INTEGER NOT NULL DEFAULT 0,
+    sm_soma REAL NOT NULL DEFAULT 0,
+    sm_soma_q REAL NOT NULL DEFAULT 0,
+    habil_n INTEGER NOT NULL DEFAULT 0,
+    habil_soma REAL NOT NULL DEFAULT 0,
+    habil_soma_q REAL NOT NULL DEFAULT 0,
+    inicio_n INTEGER NOT NULL DEFAULT 0,
+    inicio_soma REAL NOT NULL DEFAULT 0,
+    inicio_soma_q REAL NOT NULL DEFAULT 0,
+    conclusao_n INTEGER NOT NULL DEFAULT 0,
+    conclusao_soma REAL NOT NULL DEFAULT 0,
+    conclusao_soma_q REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia_registro, dia_modificacao)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_registros_sla_dia_modificacao ON registros_sla_dia (dia_modificacao);
+
+-- Triggers que mantêm os agregados
+DROP TRIGGER IF EXISTS rollup_registros_insert;
+DROP TRIGGER IF EXISTS rollup_registros_update_antes;
+DROP TRIGGER IF EXISTS rollup_registros_update_depois;
+DROP TRIGGER IF EXISTS rollup_registros_delete;
+DROP TRIGGER IF EXISTS sla_registros_insert;
+DROP TRIGGER IF EXISTS sla_registros_update_antes;
+DROP TRIGGER IF EXISTS sla_registros_update_depois;
+DROP TRIGGER IF EXISTS sla_registros_delete;
+
+CREATE TRIGGER rollup_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN NEW.excluido = 0 AND date(NEW.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(NEW.data_registro), +1, +(CASE WHEN (NEW.numero_sm IS NOT NULL AND NEW.numero_sm != '') OR (NEW.numero_ae IS NOT NULL AND NEW.numero_ae != '') THEN 1 ELSE 0 END), +(CASE WHEN NEW.horario_previsto IS NOT NULL AND date(NEW.data_registro) = date(NEW.horario_previsto) AND strftime('%H', NEW.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(NEW.data_registro), CAST(strftime('%H', NEW.data_registro) AS INTEGER), +1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(NEW.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(NEW.data_registro) AND hora = CAST(strftime('%H', NEW.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_update_antes
+AFTER UPDATE OF data_registro, excluido, numero_sm, numero_ae, horario_previsto ON registros
+FOR EACH ROW WHEN OLD.excluido = 0 AND date(OLD.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(OLD.data_registro), -1, -(CASE WHEN (OLD.numero_sm IS NOT NULL AND OLD.numero_sm != '') OR (OLD.numero_ae IS NOT NULL AND OLD.numero_ae != '') THEN 1 ELSE 0 END), -(CASE WHEN OLD.horario_previsto IS NOT NULL AND date(OLD.data_registro) = date(OLD.horario_previsto) AND strftime('%H', OLD.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(OLD.data_registro), CAST(strftime('%H', OLD.data_registro) AS INTEGER), -1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(OLD.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(OLD.data_registro) AND hora = CAST(strftime('%H', OLD.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_update_depois
+AFTER UPDATE OF data_registro, excluido, numero_sm, numero_ae, horario_previsto ON registros
+FOR EACH ROW WHEN NEW.excluido = 0 AND date(NEW.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(NEW.data_registro), +1, +(CASE WHEN (NEW.numero_sm IS NOT NULL AND NEW.numero_sm != '') OR (NEW.numero_ae IS NOT NULL AND NEW.numero_ae != '') THEN 1 ELSE 0 END), +(CASE WHEN NEW.horario_previsto IS NOT NULL AND date(NEW.data_registro) = date(NEW.horario_previsto) AND strftime('%H', NEW.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(NEW.data_registro), CAST(strftime('%H', NEW.data_registro) AS INTEGER), +1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(NEW.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(NEW.data_registro) AND hora = CAST(strftime('%H', NEW.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW WHEN OLD.excluido = 0 AND date(OLD.data_registro) IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (date(OLD.data_registro), -1, -(CASE WHEN (OLD.numero_sm IS NOT NULL AND OLD.numero_sm != '') OR (OLD.numero_ae IS NOT NULL AND OLD.numero_ae != '') THEN 1 ELSE 0 END), -(CASE WHEN OLD.horario_previsto IS NOT NULL AND date(OLD.data_registro) = date(OLD.horario_previsto) AND strftime('%H', OLD.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (date(OLD.data_registro), CAST(strftime('%H', OLD.data_registro) AS INTEGER), -1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = date(OLD.data_registro) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = date(OLD.data_registro) AND hora = CAST(strftime('%H', OLD.data_registro) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER sla_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN NEW.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END, +(1), +(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), +(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), +(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), +(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN julianday(r.horario_previsto) - julianday(r.data_registro) ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN (julianday(r.horario_previsto) - julianday(r.data_registro)) * (julianday(r.horario_previsto) - julianday(r.data_registro)) ELSE 0.0 END), +(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN julianday(r.on_time_cliente) - julianday(r.horario_previsto) ELSE 0.0 END), +(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) * (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) ELSE 0.0 END)
+    FROM registros r WHERE r.id = NEW.id AND r.excluido = 0
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE linhas = 0 AND (dia_registro, dia_modificacao) IN (
+        SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END FROM registros r WHERE r.id = NEW.id
+    );
+END;
+
+CREATE TRIGGER sla_registros_update_antes
+BEFORE UPDATE OF data_registro, data_modificacao, excluido, data_ae, data_sm, horario_previsto, on_time_cliente ON registros
+FOR EACH ROW WHEN OLD.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END, -(1), -(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), -(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), -(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), -(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN julianday(r.horario_previsto) - julianday(r.data_registro) ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN (julianday(r.horario_previsto) - julianday(r.data_registro)) * (julianday(r.horario_previsto) - julianday(r.data_registro)) ELSE 0.0 END), -(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN julianday(r.on_time_cliente) - julianday(r.horario_previsto) ELSE 0.0 END), -(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) * (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) ELSE 0.0 END)
+    FROM registros r WHERE r.id = OLD.id AND r.excluido = 0
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE linhas = 0 AND (dia_registro, dia_modificacao) IN (
+        SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END FROM registros r WHERE r.id = OLD.id
+    );
+END;
+
+CREATE TRIGGER sla_registros_update_depois
+AFTER UPDATE OF data_registro, data_modificacao, excluido, data_ae, data_sm, horario_previsto, on_time_cliente ON registros
+FOR EACH ROW WHEN NEW.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END, +(1), +(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), +(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), +(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), +(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN julianday(r.horario_previsto) - julianday(r.data_registro) ELSE 0.0 END), +(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN (julianday(r.horario_previsto) - julianday(r.data_registro)) * (julianday(r.horario_previsto) - julianday(r.data_registro)) ELSE 0.0 END), +(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN julianday(r.on_time_cliente) - julianday(r.horario_previsto) ELSE 0.0 END), +(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) * (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) ELSE 0.0 END)
+    FROM registros r WHERE r.id = NEW.id AND r.excluido = 0
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE linhas = 0 AND (dia_registro, dia_modificacao) IN (
+        SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END FROM registros r WHERE r.id = NEW.id
+    );
+END;
+
+CREATE TRIGGER sla_registros_delete
+BEFORE DELETE ON registros
+FOR EACH ROW WHEN OLD.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END, -(1), -(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), -(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), -(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), -(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN julianday(r.horario_previsto) - julianday(r.data_registro) ELSE 0.0 END), -(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN (julianday(r.horario_previsto) - julianday(r.data_registro)) * (julianday(r.horario_previsto) - julianday(r.data_registro)) ELSE 0.0 END), -(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN julianday(r.on_time_cliente) - julianday(r.horario_previsto) ELSE 0.0 END), -(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) * (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) ELSE 0.0 END)
+    FROM registros r WHERE r.id = OLD.id AND r.excluido = 0
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE linhas = 0 AND (dia_registro, dia_modificacao) IN (
+        SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END FROM registros r WHERE r.id = OLD.id
+    );
+END;
+
+-- Backfill a partir de registros
+DELETE FROM registros_rollup_dia;
+DELETE FROM registros_rollup_hora;
+DELETE FROM registros_sla_dia;
+
+INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+        SELECT date(r.data_registro) AS dia, COUNT(*),
+               SUM(CASE WHEN (r.numero_sm IS NOT NULL AND r.numero_sm != '') OR (r.numero_ae IS NOT NULL AND r.numero_ae != '') THEN 1 ELSE 0 END), SUM(CASE WHEN r.horario_previsto IS NOT NULL AND date(r.data_registro) = date(r.horario_previsto) AND strftime('%H', r.data_registro) IN ('06', '07', '08') THEN 1 ELSE 0 END)
+        FROM registros r
+        WHERE r.excluido = 0 AND date(r.data_registro) IS NOT NULL
+        GROUP BY dia;
+
+INSERT INTO registros_rollup_hora (dia, hora, total)
+        SELECT date(r.data_registro) AS dia, CAST(strftime('%H', r.data_registro) AS INTEGER) AS hora, COUNT(*)
+        FROM registros r
+        WHERE r.excluido = 0 AND date(r.data_registro) IS NOT NULL
+        GROUP BY dia, hora;
+
+INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+
+SELECT CASE WHEN typeof(r.data_registro) != 'text' THEN '' WHEN length(r.data_registro) > 10 THEN substr(r.data_registro, 1, 10) || ' ' ELSE r.data_registro END AS chave_registro, CASE WHEN typeof(r.data_modificacao) != 'text' THEN '' WHEN length(r.data_modificacao) > 10 THEN substr(r.data_modificacao, 1, 10) || ' ' ELSE r.data_modificacao END AS chave_modificacao, COUNT(*), SUM(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), SUM(CASE WHEN (r.data_ae IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_ae) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_ae) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), SUM(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), SUM(CASE WHEN (r.data_sm IS NOT NULL AND r.data_registro IS NOT NULL AND julianday(r.data_sm) > CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) AND (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.data_sm) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) IS NOT NULL THEN (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) * (julianday(r.horario_previsto) - CASE WHEN r.data_modificacao IS NOT NULL AND r.data_modificacao > r.data_registro THEN julianday(r.data_modificacao) ELSE julianday(r.data_registro) END) ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN julianday(r.horario_previsto) - julianday(r.data_registro) ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto IS NOT NULL AND r.data_registro IS NOT NULL) AND (julianday(r.horario_previsto) - julianday(r.data_registro)) IS NOT NULL THEN (julianday(r.horario_previsto) - julianday(r.data_registro)) * (julianday(r.horario_previsto) - julianday(r.data_registro)) ELSE 0.0 END), SUM(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN julianday(r.on_time_cliente) - julianday(r.horario_previsto) ELSE 0.0 END), SUM(CASE WHEN (r.on_time_cliente IS NOT NULL AND r.horario_previsto IS NOT NULL) AND (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) IS NOT NULL THEN (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) * (julianday(r.on_time_cliente) - julianday(r.horario_previsto)) ELSE 0.0 END)
+FROM registros r
+WHERE r.excluido = 0
+GROUP BY chave_registro, chave_modificacao;
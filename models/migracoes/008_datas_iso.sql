@@ -0,0 +1,464 @@
+-- Colunas canônicas (ISO) de data: preenchimento e triggers
+DROP TRIGGER IF EXISTS datas_iso_registros_insert;
+DROP TRIGGER IF EXISTS datas_iso_registros_update;
+
+UPDATE registros SET
+    data_registro_iso = (CASE
+    WHEN typeof(registros.data_registro) != 'text' OR length(registros.data_registro) < 10 THEN NULL
+    WHEN substr(registros.data_registro, 5, 1) = '-' THEN datetime(registros.data_registro)
+    WHEN substr(registros.data_registro, 3, 1) IN ('-', '/') AND substr(registros.data_registro, 6, 1) IN ('-', '/') THEN datetime(
+    substr(registros.data_registro, 7, 4) || '-' || substr(registros.data_registro, 4, 2) || '-' || substr(registros.data_registro, 1, 2)
+    || CASE WHEN length(registros.data_registro) > 10 THEN ' ' || trim(replace(substr(registros.data_registro, 11), '- ', '')) ELSE '' END)
+    WHEN substr(registros.data_registro, 3, 1) = ':' AND instr(registros.data_registro, ' ') > 0 THEN datetime(
+    substr(registros.data_registro, instr(registros.data_registro, ' ') + 7, 4) || '-' || substr(registros.data_registro, instr(registros.data_registro, ' ') + 4, 2) || '-'
+    || substr(registros.data_registro, instr(registros.data_registro, ' ') + 1, 2) || ' ' || substr(registros.data_registro, 1, instr(registros.data_registro, ' ') - 1))
+END),
+    horario_previsto_iso = (CASE
+    WHEN typeof(registros.horario_previsto) != 'text' OR length(registros.horario_previsto) < 10 THEN NULL
+    WHEN substr(registros.horario_previsto, 5, 1) = '-' THEN datetime(registros.horario_previsto)
+    WHEN substr(registros.horario_previsto, 3, 1) IN ('-', '/') AND substr(registros.horario_previsto, 6, 1) IN ('-', '/') THEN datetime(
+    substr(registros.horario_previsto, 7, 4) || '-' || substr(registros.horario_previsto, 4, 2) || '-' || substr(registros.horario_previsto, 1, 2)
+    || CASE WHEN length(registros.horario_previsto) > 10 THEN ' ' || trim(replace(substr(registros.horario_previsto, 11), '- ', '')) ELSE '' END)
+    WHEN substr(registros.horario_previsto, 3, 1) = ':' AND instr(registros.horario_previsto, ' ') > 0 THEN datetime(
+    substr(registros.horario_previsto, instr(registros.horario_previsto, ' ') + 7, 4) || '-' || substr(registros.horario_previsto, instr(registros.horario_previsto, ' ') + 4, 2) || '-'
+    || substr(registros.horario_previsto, instr(registros.horario_previsto, ' ') + 1, 2) || ' ' || substr(registros.horario_previsto, 1, instr(registros.horario_previsto, ' ') - 1))
+END),
+    on_time_cliente_iso = (CASE
+    WHEN typeof(registros.on_time_cliente) != 'text' OR length(registros.on_time_cliente) < 10 THEN NULL
+    WHEN substr(registros.on_time_cliente, 5, 1) = '-' THEN datetime(registros.on_time_cliente)
+    WHEN substr(registros.on_time_cliente, 3, 1) IN ('-', '/') AND substr(registros.on_time_cliente, 6, 1) IN ('-', '/') THEN datetime(
+    substr(registros.on_time_cliente, 7, 4) || '-' || substr(registros.on_time_cliente, 4, 2) || '-' || substr(registros.on_time_cliente, 1, 2)
+    || CASE WHEN length(registros.on_time_cliente) > 10 THEN ' ' || trim(replace(substr(registros.on_time_cliente, 11), '- ', '')) ELSE '' END)
+    WHEN substr(registros.on_time_cliente, 3, 1) = ':' AND instr(registros.on_time_cliente, ' ') > 0 THEN datetime(
+    substr(registros.on_time_cliente, instr(registros.on_time_cliente, ' ') + 7, 4) || '-' || substr(registros.on_time_cliente, instr(registros.on_time_cliente, ' ') + 4, 2) || '-'
+    || substr(registros.on_time_cliente, instr(registros.on_time_cliente, ' ') + 1, 2) || ' ' || substr(registros.on_time_cliente, 1, instr(registros.on_time_cliente, ' ') - 1))
+END),
+    data_sm_iso = (CASE
+    WHEN typeof(registros.data_sm) != 'text' OR length(registros.data_sm) < 10 THEN NULL
+    WHEN substr(registros.data_sm, 5, 1) = '-' THEN datetime(registros.data_sm)
+    WHEN substr(registros.data_sm, 3, 1) IN ('-', '/') AND substr(registros.data_sm, 6, 1) IN ('-', '/') THEN datetime(
+    substr(registros.data_sm, 7, 4) || '-' || substr(registros.data_sm, 4, 2) || '-' || substr(registros.data_sm, 1, 2)
+    || CASE WHEN length(registros.data_sm) > 10 THEN ' ' || trim(replace(substr(registros.data_sm, 11), '- ', '')) ELSE '' END)
+    WHEN substr(registros.data_sm, 3, 1) = ':' AND instr(registros.data_sm, ' ') > 0 THEN datetime(
+    substr(registros.data_sm, instr(registros.data_sm, ' ') + 7, 4) || '-' || substr(registros.data_sm, instr(registros.data_sm, ' ') + 4, 2) || '-'
+    || substr(registros.data_sm, instr(registros.data_sm, ' ') + 1, 2) || ' ' || substr(registros.data_sm, 1, instr(registros.data_sm, ' ') - 1))
+END),
+    data_ae_iso = (CASE
+    WHEN typeof(registros.data_ae) != 'text' OR length(registros.data_ae) < 10 THEN NULL
+    WHEN substr(registros.data_ae, 5, 1) = '-' THEN datetime(registros.data_ae)
+    WHEN substr(registros.data_ae, 3, 1) IN ('-', '/') AND substr(registros.data_ae, 6, 1) IN ('-', '/') THEN datetime(
+    substr(registros.data_ae, 7, 4) || '-' || substr(registros.data_ae, 4, 2) || '-' || substr(registros.data_ae, 1, 2)
+    || CASE WHEN length(registros.data_ae) > 10 THEN ' ' || trim(replace(substr(registros.data_ae, 11), '- ', '')) ELSE '' END)
+    WHEN substr(registros.data_ae, 3, 1) = ':' AND instr(registros.data_ae, ' ') > 0 THEN datetime(
+    substr(registros.data_ae, instr(registros.data_ae, ' ') + 7, 4) || '-' || substr(registros.data_ae, instr(registros.data_ae, ' ') + 4, 2) || '-'
+    || substr(registros.data_ae, instr(registros.data_ae, ' ') + 1, 2) || ' ' || substr(registros.data_ae, 1, instr(registros.data_ae, ' ') - 1))
+END),
+    data_modificacao_iso = (CASE
+    WHEN typeof(registros.data_modificacao) != 'text' OR length(registros.data_modificacao) < 10 THEN NULL
+    WHEN substr(registros.data_modificacao, 5, 1) = '-' THEN datetime(registros.data_modificacao)
+    WHEN substr(registros.data_modificacao, 3, 1) IN ('-', '/') AND substr(registros.data_modificacao, 6, 1) IN ('-', '/') THEN datetime(
+    substr(registros.data_modificacao, 7, 4) || '-' || substr(registros.data_modificacao, 4, 2) || '-' || substr(registros.data_modificacao, 1, 2)
+    || CASE WHEN length(registros.data_modificacao) > 10 THEN ' ' || trim(replace(substr(registros.data_modificacao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(registros.data_modificacao, 3, 1) = ':' AND instr(registros.data_modificacao, ' ') > 0 THEN datetime(
+    substr(registros.data_modificacao, instr(registros.data_modificacao, ' ') + 7, 4) || '-' || substr(registros.data_modificacao, instr(registros.data_modificacao, ' ') + 4, 2) || '-'
+    || substr(registros.data_modificacao, instr(registros.data_modificacao, ' ') + 1, 2) || ' ' || substr(registros.data_modificacao, 1, instr(registros.data_modificacao, ' ') - 1))
+END);
+
+CREATE TRIGGER datas_iso_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    UPDATE registros SET
+        data_registro_iso = (CASE
+    WHEN typeof(NEW.data_registro) != 'text' OR length(NEW.data_registro) < 10 THEN NULL
+    WHEN substr(NEW.data_registro, 5, 1) = '-' THEN datetime(NEW.data_registro)
+    WHEN substr(NEW.data_registro, 3, 1) IN ('-', '/') AND substr(NEW.data_registro, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_registro, 7, 4) || '-' || substr(NEW.data_registro, 4, 2) || '-' || substr(NEW.data_registro, 1, 2)
+        || CASE WHEN length(NEW.data_registro) > 10 THEN ' ' || trim(replace(substr(NEW.data_registro, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_registro, 3, 1) = ':' AND instr(NEW.data_registro, ' ') > 0 THEN datetime(
+        substr(NEW.data_registro, instr(NEW.data_registro, ' ') + 7, 4) || '-' || substr(NEW.data_registro, instr(NEW.data_registro, ' ') + 4, 2) || '-'
+        || substr(NEW.data_registro, instr(NEW.data_registro, ' ') + 1, 2) || ' ' || substr(NEW.data_registro, 1, instr(NEW.data_registro, ' ') - 1))
+END),
+        horario_previsto_iso = (CASE
+    WHEN typeof(NEW.horario_previsto) != 'text' OR length(NEW.horario_previsto) < 10 THEN NULL
+    WHEN substr(NEW.horario_previsto, 5, 1) = '-' THEN datetime(NEW.horario_previsto)
+    WHEN substr(NEW.horario_previsto, 3, 1) IN ('-', '/') AND substr(NEW.horario_previsto, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.horario_previsto, 7, 4) || '-' || substr(NEW.horario_previsto, 4, 2) || '-' || substr(NEW.horario_previsto, 1, 2)
+        || CASE WHEN length(NEW.horario_previsto) > 10 THEN ' ' || trim(replace(substr(NEW.horario_previsto, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.horario_previsto, 3, 1) = ':' AND instr(NEW.horario_previsto, ' ') > 0 THEN datetime(
+        substr(NEW.horario_previsto, instr(NEW.horario_previsto, ' ') + 7, 4) || '-' || substr(NEW.horario_previsto, instr(NEW.horario_previsto, ' ') + 4, 2) || '-'
+        || substr(NEW.horario_previsto, instr(NEW.horario_previsto, ' ') + 1, 2) || ' ' || substr(NEW.horario_previsto, 1, instr(NEW.horario_previsto, ' ') - 1))
+END),
+        on_time_cliente_iso = (CASE
+    WHEN typeof(NEW.on_time_cliente) != 'text' OR length(NEW.on_time_cliente) < 10 THEN NULL
+    WHEN substr(NEW.on_time_cliente, 5, 1) = '-' THEN datetime(NEW.on_time_cliente)
+    WHEN substr(NEW.on_time_cliente, 3, 1) IN ('-', '/') AND substr(NEW.on_time_cliente, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.on_time_cliente, 7, 4) || '-' || substr(NEW.on_time_cliente, 4, 2) || '-' || substr(NEW.on_time_cliente, 1, 2)
+        || CASE WHEN length(NEW.on_time_cliente) > 10 THEN ' ' || trim(replace(substr(NEW.on_time_cliente, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.on_time_cliente, 3, 1) = ':' AND instr(NEW.on_time_cliente, ' ') > 0 THEN datetime(
+        substr(NEW.on_time_cliente, instr(NEW.on_time_cliente, ' ') + 7, 4) || '-' || substr(NEW.on_time_cliente, instr(NEW.on_time_cliente, ' ') + 4, 2) || '-'
+        || substr(NEW.on_time_cliente, instr(NEW.on_time_cliente, ' ') + 1, 2) || ' ' || substr(NEW.on_time_cliente, 1, instr(NEW.on_time_cliente, ' ') - 1))
+END),
+        data_sm_iso = (CASE
+    WHEN typeof(NEW.data_sm) != 'text' OR length(NEW.data_sm) < 10 THEN NULL
+    WHEN substr(NEW.data_sm, 5, 1) = '-' THEN datetime(NEW.data_sm)
+    WHEN substr(NEW.data_sm, 3, 1) IN ('-', '/') AND substr(NEW.data_sm, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_sm, 7, 4) || '-' || substr(NEW.data_sm, 4, 2) || '-' || substr(NEW.data_sm, 1, 2)
+        || CASE WHEN length(NEW.data_sm) > 10 THEN ' ' || trim(replace(substr(NEW.data_sm, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_sm, 3, 1) = ':' AND instr(NEW.data_sm, ' ') > 0 THEN datetime(
+        substr(NEW.data_sm, instr(NEW.data_sm, ' ') + 7, 4) || '-' || substr(NEW.data_sm, instr(NEW.data_sm, ' ') + 4, 2) || '-'
+        || substr(NEW.data_sm, instr(NEW.data_sm, ' ') + 1, 2) || ' ' || substr(NEW.data_sm, 1, instr(NEW.data_sm, ' ') - 1))
+END),
+        data_ae_iso = (CASE
+    WHEN typeof(NEW.data_ae) != 'text' OR length(NEW.data_ae) < 10 THEN NULL
+    WHEN substr(NEW.data_ae, 5, 1) = '-' THEN datetime(NEW.data_ae)
+    WHEN substr(NEW.data_ae, 3, 1) IN ('-', '/') AND substr(NEW.data_ae, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_ae, 7, 4) || '-' || substr(NEW.data_ae, 4, 2) || '-' || substr(NEW.data_ae, 1, 2)
+        || CASE WHEN length(NEW.data_ae) > 10 THEN ' ' || trim(replace(substr(NEW.data_ae, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_ae, 3, 1) = ':' AND instr(NEW.data_ae, ' ') > 0 THEN datetime(
+        substr(NEW.data_ae, instr(NEW.data_ae, ' ') + 7, 4) || '-' || substr(NEW.data_ae, instr(NEW.data_ae, ' ') + 4, 2) || '-'
+        || substr(NEW.data_ae, instr(NEW.data_ae, ' ') + 1, 2) || ' ' || substr(NEW.data_ae, 1, instr(NEW.data_ae, ' ') - 1))
+END),
+        data_modificacao_iso = (CASE
+    WHEN typeof(NEW.data_modificacao) != 'text' OR length(NEW.data_modificacao) < 10 THEN NULL
+    WHEN substr(NEW.data_modificacao, 5, 1) = '-' THEN datetime(NEW.data_modificacao)
+    WHEN substr(NEW.data_modificacao, 3, 1) IN ('-', '/') AND substr(NEW.data_modificacao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_modificacao, 7, 4) || '-' || substr(NEW.data_modificacao, 4, 2) || '-' || substr(NEW.data_modificacao, 1, 2)
+        || CASE WHEN length(NEW.data_modificacao) > 10 THEN ' ' || trim(replace(substr(NEW.data_modificacao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_modificacao, 3, 1) = ':' AND instr(NEW.data_modificacao, ' ') > 0 THEN datetime(
+        substr(NEW.data_modificacao, instr(NEW.data_modificacao, ' ') + 7, 4) || '-' || substr(NEW.data_modificacao, instr(NEW.data_modificacao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_modificacao, instr(NEW.data_modificacao, ' ') + 1, 2) || ' ' || substr(NEW.data_modificacao, 1, instr(NEW.data_modificacao, ' ') - 1))
+END)
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER datas_iso_registros_update
+AFTER UPDATE OF data_registro, horario_previsto, on_time_cliente, data_sm, data_ae, data_modificacao ON registros
+FOR EACH ROW
+BEGIN
+    UPDATE registros SET
+        data_registro_iso = (CASE
+    WHEN typeof(NEW.data_registro) != 'text' OR length(NEW.data_registro) < 10 THEN NULL
+    WHEN substr(NEW.data_registro, 5, 1) = '-' THEN datetime(NEW.data_registro)
+    WHEN substr(NEW.data_registro, 3, 1) IN ('-', '/') AND substr(NEW.data_registro, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_registro, 7, 4) || '-' || substr(NEW.data_registro, 4, 2) || '-' || substr(NEW.data_registro, 1, 2)
+        || CASE WHEN length(NEW.data_registro) > 10 THEN ' ' || trim(replace(substr(NEW.data_registro, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_registro, 3, 1) = ':' AND instr(NEW.data_registro, ' ') > 0 THEN datetime(
+        substr(NEW.data_registro, instr(NEW.data_registro, ' ') + 7, 4) || '-' || substr(NEW.data_registro, instr(NEW.data_registro, ' ') + 4, 2) || '-'
+        || substr(NEW.data_registro, instr(NEW.data_registro, ' ') + 1, 2) || ' ' || substr(NEW.data_registro, 1, instr(NEW.data_registro, ' ') - 1))
+END),
+        horario_previsto_iso = (CASE
+    WHEN typeof(NEW.horario_previsto) != 'text' OR length(NEW.horario_previsto) < 10 THEN NULL
+    WHEN substr(NEW.horario_previsto, 5, 1) = '-' THEN datetime(NEW.horario_previsto)
+    WHEN substr(NEW.horario_previsto, 3, 1) IN ('-', '/') AND substr(NEW.horario_previsto, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.horario_previsto, 7, 4) || '-' || substr(NEW.horario_previsto, 4, 2) || '-' || substr(NEW.horario_previsto, 1, 2)
+        || CASE WHEN length(NEW.horario_previsto) > 10 THEN ' ' || trim(replace(substr(NEW.horario_previsto, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.horario_previsto, 3, 1) = ':' AND instr(NEW.horario_previsto, ' ') > 0 THEN datetime(
+        substr(NEW.horario_previsto, instr(NEW.horario_previsto, ' ') + 7, 4) || '-' || substr(NEW.horario_previsto, instr(NEW.horario_previsto, ' ') + 4, 2) || '-'
+        || substr(NEW.horario_previsto, instr(NEW.horario_previsto, ' ') + 1, 2) || ' ' || substr(NEW.horario_previsto, 1, instr(NEW.horario_previsto, ' ') - 1))
+END),
+        on_time_cliente_iso = (CASE
+    WHEN typeof(NEW.on_time_cliente) != 'text' OR length(NEW.on_time_cliente) < 10 THEN NULL
+    WHEN substr(NEW.on_time_cliente, 5, 1) = '-' THEN datetime(NEW.on_time_cliente)
+    WHEN substr(NEW.on_time_cliente, 3, 1) IN ('-', '/') AND substr(NEW.on_time_cliente, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.on_time_cliente, 7, 4) || '-' || substr(NEW.on_time_cliente, 4, 2) || '-' || substr(NEW.on_time_cliente, 1, 2)
+        || CASE WHEN length(NEW.on_time_cliente) > 10 THEN ' ' || trim(replace(substr(NEW.on_time_cliente, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.on_time_cliente, 3, 1) = ':' AND instr(NEW.on_time_cliente, ' ') > 0 THEN datetime(
+        substr(NEW.on_time_cliente, instr(NEW.on_time_cliente, ' ') + 7, 4) || '-' || substr(NEW.on_time_cliente, instr(NEW.on_time_cliente, ' ') + 4, 2) || '-'
+        || substr(NEW.on_time_cliente, instr(NEW.on_time_cliente, ' ') + 1, 2) || ' ' || substr(NEW.on_time_cliente, 1, instr(NEW.on_time_cliente, ' ') - 1))
+END),
+        data_sm_iso = (CASE
+    WHEN typeof(NEW.data_sm) != 'text' OR length(NEW.data_sm) < 10 THEN NULL
+    WHEN substr(NEW.data_sm, 5, 1) = '-' THEN datetime(NEW.data_sm)
+    WHEN substr(NEW.data_sm, 3, 1) IN ('-', '/') AND substr(NEW.data_sm, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_sm, 7, 4) || '-' || substr(NEW.data_sm, 4, 2) || '-' || substr(NEW.data_sm, 1, 2)
+        || CASE WHEN length(NEW.data_sm) > 10 THEN ' ' || trim(replace(substr(NEW.data_sm, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_sm, 3, 1) = ':' AND instr(NEW.data_sm, ' ') > 0 THEN datetime(
+        substr(NEW.data_sm, instr(NEW.data_sm, ' ') + 7, 4) || '-' || substr(NEW.data_sm, instr(NEW.data_sm, ' ') + 4, 2) || '-'
+        || substr(NEW.data_sm, instr(NEW.data_sm, ' ') + 1, 2) || ' ' || substr(NEW.data_sm, 1, instr(NEW.data_sm, ' ') - 1))
+END),
+        data_ae_iso = (CASE
+    WHEN typeof(NEW.data_ae) != 'text' OR length(NEW.data_ae) < 10 THEN NULL
+    WHEN substr(NEW.data_ae, 5, 1) = '-' THEN datetime(NEW.data_ae)
+    WHEN substr(NEW.data_ae, 3, 1) IN ('-', '/') AND substr(NEW.data_ae, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_ae, 7, 4) || '-' || substr(NEW.data_ae, 4, 2) || '-' || substr(NEW.data_ae, 1, 2)
+        || CASE WHEN length(NEW.data_ae) > 10 THEN ' ' || trim(replace(substr(NEW.data_ae, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_ae, 3, 1) = ':' AND instr(NEW.data_ae, ' ') > 0 THEN datetime(
+        substr(NEW.data_ae, instr(NEW.data_ae, ' ') + 7, 4) || '-' || substr(NEW.data_ae, instr(NEW.data_ae, ' ') + 4, 2) || '-'
+        || substr(NEW.data_ae, instr(NEW.data_ae, ' ') + 1, 2) || ' ' || substr(NEW.data_ae, 1, instr(NEW.data_ae, ' ') - 1))
+END),
+        data_modificacao_iso = (CASE
+    WHEN typeof(NEW.data_modificacao) != 'text' OR length(NEW.data_modificacao) < 10 THEN NULL
+    WHEN substr(NEW.data_modificacao, 5, 1) = '-' THEN datetime(NEW.data_modificacao)
+    WHEN substr(NEW.data_modificacao, 3, 1) IN ('-', '/') AND substr(NEW.data_modificacao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_modificacao, 7, 4) || '-' || substr(NEW.data_modificacao, 4, 2) || '-' || substr(NEW.data_modificacao, 1, 2)
+        || CASE WHEN length(NEW.data_modificacao) > 10 THEN ' ' || trim(replace(substr(NEW.data_modificacao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_modificacao, 3, 1) = ':' AND instr(NEW.data_modificacao, ' ') > 0 THEN datetime(
+        substr(NEW.data_modificacao, instr(NEW.data_modificacao, ' ') + 7, 4) || '-' || substr(NEW.data_modificacao, instr(NEW.data_modificacao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_modificacao, instr(NEW.data_modificacao, ' ') + 1, 2) || ' ' || substr(NEW.data_modificacao, 1, instr(NEW.data_modificacao, ' ') - 1))
+END)
+    WHERE id = NEW.id;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_registros_ativos_data_registro_iso ON registros (data_registro_iso) WHERE excluido = 0;
+CREATE INDEX IF NOT EXISTS idx_registros_ativos_data_modificacao_iso ON registros (data_modificacao_iso) WHERE excluido = 0;
+
+-- Ordem de saída prevista pela coluna canônica
+DROP INDEX IF EXISTS idx_registros_ordem_saida;
+
+CREATE INDEX idx_registros_ordem_saida ON registros (
+    excluido,
+    (CASE WHEN horario_previsto_iso IS NULL THEN 1 ELSE 0 END),
+    horario_previsto_iso,
+    id
+);
+
+-- Agregados sobre as colunas canônicas
+CREATE TABLE IF NOT EXISTS registros_rollup_dia (
+    dia TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    com_sm_ae INTEGER NOT NULL DEFAULT 0,
+    tardios INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS registros_rollup_hora (
+    dia TEXT NOT NULL,
+    hora INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, hora)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS registros_sla_dia (
+    dia_registro TEXT NOT NULL,
+    dia_modificacao TEXT NOT NULL,
+    linhas INTEGER NOT NULL DEFAULT 0,
+    ae_n INTEGER NOT NULL DEFAULT 0,
+    ae_soma REAL NOT NULL DEFAULT 0,
+    ae_soma_q REAL NOT NULL DEFAULT 0,
+    sm_n INTEGER NOT NULL DEFAULT 0,
+    sm_soma REAL NOT NULL DEFAULT 0,
+    sm_soma_q REAL NOT NULL DEFAULT 0,
+    habil_n INTEGER NOT NULL DEFAULT 0,
+    habil_soma REAL NOT NULL DEFAULT 0,
+    habil_soma_q REAL NOT NULL DEFAULT 0,
+    inicio_n INTEGER NOT NULL DEFAULT 0,
+    inicio_soma REAL NOT NULL DEFAULT 0,
+    inicio_soma_q REAL NOT NULL DEFAULT 0,
+    conclusao_n INTEGER NOT NULL DEFAULT 0,
+    conclusao_soma REAL NOT NULL DEFAULT 0,
+    conclusao_soma_q REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia_registro, dia_modificacao)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_registros_sla_dia_modificacao ON registros_sla_dia (dia_modificacao);
+DROP TRIGGER IF EXISTS rollup_registros_insert;
+DROP TRIGGER IF EXISTS rollup_registros_update_antes;
+DROP TRIGGER IF EXISTS rollup_registros_update_depois;
+DROP TRIGGER IF EXISTS rollup_registros_delete;
+DROP TRIGGER IF EXISTS sla_registros_insert;
+DROP TRIGGER IF EXISTS sla_registros_update_antes;
+DROP TRIGGER IF EXISTS sla_registros_update_depois;
+DROP TRIGGER IF EXISTS sla_registros_delete;
+
+CREATE TRIGGER rollup_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN NEW.excluido = 0 AND NEW.data_registro_iso IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (substr(NEW.data_registro_iso, 1, 10), +1, +(CASE WHEN (NEW.numero_sm IS NOT NULL AND NEW.numero_sm != '') OR (NEW.numero_ae IS NOT NULL AND NEW.numero_ae != '') THEN 1 ELSE 0 END), +(CASE WHEN NEW.horario_previsto_iso IS NOT NULL AND substr(NEW.data_registro_iso, 1, 10) = substr(NEW.horario_previsto_iso, 1, 10) AND substr(NEW.data_registro_iso, 12, 2) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (substr(NEW.data_registro_iso, 1, 10), CAST(substr(NEW.data_registro_iso, 12, 2) AS INTEGER), +1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = substr(NEW.data_registro_iso, 1, 10) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = substr(NEW.data_registro_iso, 1, 10) AND hora = CAST(substr(NEW.data_registro_iso, 12, 2) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_update_antes
+AFTER UPDATE OF data_registro_iso, excluido, numero_sm, numero_ae, horario_previsto_iso ON registros
+FOR EACH ROW WHEN OLD.excluido = 0 AND OLD.data_registro_iso IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (substr(OLD.data_registro_iso, 1, 10), -1, -(CASE WHEN (OLD.numero_sm IS NOT NULL AND OLD.numero_sm != '') OR (OLD.numero_ae IS NOT NULL AND OLD.numero_ae != '') THEN 1 ELSE 0 END), -(CASE WHEN OLD.horario_previsto_iso IS NOT NULL AND substr(OLD.data_registro_iso, 1, 10) = substr(OLD.horario_previsto_iso, 1, 10) AND substr(OLD.data_registro_iso, 12, 2) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (substr(OLD.data_registro_iso, 1, 10), CAST(substr(OLD.data_registro_iso, 12, 2) AS INTEGER), -1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = substr(OLD.data_registro_iso, 1, 10) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = substr(OLD.data_registro_iso, 1, 10) AND hora = CAST(substr(OLD.data_registro_iso, 12, 2) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_update_depois
+AFTER UPDATE OF data_registro_iso, excluido, numero_sm, numero_ae, horario_previsto_iso ON registros
+FOR EACH ROW WHEN NEW.excluido = 0 AND NEW.data_registro_iso IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (substr(NEW.data_registro_iso, 1, 10), +1, +(CASE WHEN (NEW.numero_sm IS NOT NULL AND NEW.numero_sm != '') OR (NEW.numero_ae IS NOT NULL AND NEW.numero_ae != '') THEN 1 ELSE 0 END), +(CASE WHEN NEW.horario_previsto_iso IS NOT NULL AND substr(NEW.data_registro_iso, 1, 10) = substr(NEW.horario_previsto_iso, 1, 10) AND substr(NEW.data_registro_iso, 12, 2) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (substr(NEW.data_registro_iso, 1, 10), CAST(substr(NEW.data_registro_iso, 12, 2) AS INTEGER), +1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = substr(NEW.data_registro_iso, 1, 10) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = substr(NEW.data_registro_iso, 1, 10) AND hora = CAST(substr(NEW.data_registro_iso, 12, 2) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER rollup_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW WHEN OLD.excluido = 0 AND OLD.data_registro_iso IS NOT NULL
+BEGIN
+    INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+    VALUES (substr(OLD.data_registro_iso, 1, 10), -1, -(CASE WHEN (OLD.numero_sm IS NOT NULL AND OLD.numero_sm != '') OR (OLD.numero_ae IS NOT NULL AND OLD.numero_ae != '') THEN 1 ELSE 0 END), -(CASE WHEN OLD.horario_previsto_iso IS NOT NULL AND substr(OLD.data_registro_iso, 1, 10) = substr(OLD.horario_previsto_iso, 1, 10) AND substr(OLD.data_registro_iso, 12, 2) IN ('06', '07', '08') THEN 1 ELSE 0 END))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO registros_rollup_hora (dia, hora, total)
+    VALUES (substr(OLD.data_registro_iso, 1, 10), CAST(substr(OLD.data_registro_iso, 12, 2) AS INTEGER), -1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM registros_rollup_dia WHERE dia = substr(OLD.data_registro_iso, 1, 10) AND total = 0;
+    DELETE FROM registros_rollup_hora WHERE dia = substr(OLD.data_registro_iso, 1, 10) AND hora = CAST(substr(OLD.data_registro_iso, 12, 2) AS INTEGER) AND total = 0;
+END;
+
+CREATE TRIGGER sla_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN NEW.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    VALUES (COALESCE(substr(NEW.data_registro_iso, 1, 10), ''), COALESCE(substr(NEW.data_modificacao_iso, 1, 10), ''), +(1), +(CASE WHEN (NEW.data_ae_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_ae_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.data_ae_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_ae_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END ELSE 0.0 END), +(CASE WHEN (NEW.data_ae_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_ae_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) * (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) ELSE 0.0 END), +(CASE WHEN (NEW.data_sm_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_sm_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.data_sm_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_sm_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END ELSE 0.0 END), +(CASE WHEN (NEW.data_sm_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_sm_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) * (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) * (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) IS NOT NULL THEN julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso) ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) IS NOT NULL THEN (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) * (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) ELSE 0.0 END), +(CASE WHEN (NEW.on_time_cliente_iso IS NOT NULL AND NEW.horario_previsto_iso IS NOT NULL) AND (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.on_time_cliente_iso IS NOT NULL AND NEW.horario_previsto_iso IS NOT NULL) AND (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) IS NOT NULL THEN julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso) ELSE 0.0 END), +(CASE WHEN (NEW.on_time_cliente_iso IS NOT NULL AND NEW.horario_previsto_iso IS NOT NULL) AND (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) IS NOT NULL THEN (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) * (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) ELSE 0.0 END))
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE dia_registro = COALESCE(substr(NEW.data_registro_iso, 1, 10), '') AND dia_modificacao = COALESCE(substr(NEW.data_modificacao_iso, 1, 10), '') AND linhas = 0;
+END;
+
+CREATE TRIGGER sla_registros_update_antes
+AFTER UPDATE OF data_registro_iso, data_modificacao_iso, excluido, data_ae_iso, data_sm_iso, horario_previsto_iso, on_time_cliente_iso ON registros
+FOR EACH ROW WHEN OLD.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    VALUES (COALESCE(substr(OLD.data_registro_iso, 1, 10), ''), COALESCE(substr(OLD.data_modificacao_iso, 1, 10), ''), -(1), -(CASE WHEN (OLD.data_ae_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_ae_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.data_ae_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_ae_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END ELSE 0.0 END), -(CASE WHEN (OLD.data_ae_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_ae_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) * (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) ELSE 0.0 END), -(CASE WHEN (OLD.data_sm_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_sm_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.data_sm_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_sm_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END ELSE 0.0 END), -(CASE WHEN (OLD.data_sm_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_sm_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) * (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) * (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) IS NOT NULL THEN julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso) ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) IS NOT NULL THEN (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) * (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) ELSE 0.0 END), -(CASE WHEN (OLD.on_time_cliente_iso IS NOT NULL AND OLD.horario_previsto_iso IS NOT NULL) AND (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.on_time_cliente_iso IS NOT NULL AND OLD.horario_previsto_iso IS NOT NULL) AND (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) IS NOT NULL THEN julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso) ELSE 0.0 END), -(CASE WHEN (OLD.on_time_cliente_iso IS NOT NULL AND OLD.horario_previsto_iso IS NOT NULL) AND (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) IS NOT NULL THEN (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) * (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) ELSE 0.0 END))
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE dia_registro = COALESCE(substr(OLD.data_registro_iso, 1, 10), '') AND dia_modificacao = COALESCE(substr(OLD.data_modificacao_iso, 1, 10), '') AND linhas = 0;
+END;
+
+CREATE TRIGGER sla_registros_update_depois
+AFTER UPDATE OF data_registro_iso, data_modificacao_iso, excluido, data_ae_iso, data_sm_iso, horario_previsto_iso, on_time_cliente_iso ON registros
+FOR EACH ROW WHEN NEW.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    VALUES (COALESCE(substr(NEW.data_registro_iso, 1, 10), ''), COALESCE(substr(NEW.data_modificacao_iso, 1, 10), ''), +(1), +(CASE WHEN (NEW.data_ae_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_ae_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.data_ae_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_ae_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END ELSE 0.0 END), +(CASE WHEN (NEW.data_ae_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_ae_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) * (julianday(NEW.data_ae_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) ELSE 0.0 END), +(CASE WHEN (NEW.data_sm_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_sm_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.data_sm_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_sm_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END ELSE 0.0 END), +(CASE WHEN (NEW.data_sm_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL AND julianday(NEW.data_sm_iso) > CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) AND (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) * (julianday(NEW.data_sm_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) IS NOT NULL THEN (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) * (julianday(NEW.horario_previsto_iso) - CASE WHEN NEW.data_modificacao_iso > NEW.data_registro_iso THEN julianday(NEW.data_modificacao_iso) ELSE julianday(NEW.data_registro_iso) END) ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) IS NOT NULL THEN julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso) ELSE 0.0 END), +(CASE WHEN (NEW.horario_previsto_iso IS NOT NULL AND NEW.data_registro_iso IS NOT NULL) AND (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) IS NOT NULL THEN (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) * (julianday(NEW.horario_previsto_iso) - julianday(NEW.data_registro_iso)) ELSE 0.0 END), +(CASE WHEN (NEW.on_time_cliente_iso IS NOT NULL AND NEW.horario_previsto_iso IS NOT NULL) AND (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) IS NOT NULL THEN 1 ELSE 0 END), +(CASE WHEN (NEW.on_time_cliente_iso IS NOT NULL AND NEW.horario_previsto_iso IS NOT NULL) AND (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) IS NOT NULL THEN julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso) ELSE 0.0 END), +(CASE WHEN (NEW.on_time_cliente_iso IS NOT NULL AND NEW.horario_previsto_iso IS NOT NULL) AND (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) IS NOT NULL THEN (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) * (julianday(NEW.on_time_cliente_iso) - julianday(NEW.horario_previsto_iso)) ELSE 0.0 END))
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE dia_registro = COALESCE(substr(NEW.data_registro_iso, 1, 10), '') AND dia_modificacao = COALESCE(substr(NEW.data_modificacao_iso, 1, 10), '') AND linhas = 0;
+END;
+
+CREATE TRIGGER sla_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW WHEN OLD.excluido = 0
+BEGIN
+    INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+    VALUES (COALESCE(substr(OLD.data_registro_iso, 1, 10), ''), COALESCE(substr(OLD.data_modificacao_iso, 1, 10), ''), -(1), -(CASE WHEN (OLD.data_ae_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_ae_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.data_ae_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_ae_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END ELSE 0.0 END), -(CASE WHEN (OLD.data_ae_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_ae_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) * (julianday(OLD.data_ae_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) ELSE 0.0 END), -(CASE WHEN (OLD.data_sm_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_sm_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.data_sm_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_sm_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END ELSE 0.0 END), -(CASE WHEN (OLD.data_sm_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL AND julianday(OLD.data_sm_iso) > CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) AND (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) * (julianday(OLD.data_sm_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) IS NOT NULL THEN (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) * (julianday(OLD.horario_previsto_iso) - CASE WHEN OLD.data_modificacao_iso > OLD.data_registro_iso THEN julianday(OLD.data_modificacao_iso) ELSE julianday(OLD.data_registro_iso) END) ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) IS NOT NULL THEN julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso) ELSE 0.0 END), -(CASE WHEN (OLD.horario_previsto_iso IS NOT NULL AND OLD.data_registro_iso IS NOT NULL) AND (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) IS NOT NULL THEN (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) * (julianday(OLD.horario_previsto_iso) - julianday(OLD.data_registro_iso)) ELSE 0.0 END), -(CASE WHEN (OLD.on_time_cliente_iso IS NOT NULL AND OLD.horario_previsto_iso IS NOT NULL) AND (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) IS NOT NULL THEN 1 ELSE 0 END), -(CASE WHEN (OLD.on_time_cliente_iso IS NOT NULL AND OLD.horario_previsto_iso IS NOT NULL) AND (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) IS NOT NULL THEN julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso) ELSE 0.0 END), -(CASE WHEN (OLD.on_time_cliente_iso IS NOT NULL AND OLD.horario_previsto_iso IS NOT NULL) AND (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) IS NOT NULL THEN (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) * (julianday(OLD.on_time_cliente_iso) - julianday(OLD.horario_previsto_iso)) ELSE 0.0 END))
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        linhas = linhas + excluded.linhas,
+        ae_n = ae_n + excluded.ae_n,
+        ae_soma = ae_soma + excluded.ae_soma,
+        ae_soma_q = ae_soma_q + excluded.ae_soma_q,
+        sm_n = sm_n + excluded.sm_n,
+        sm_soma = sm_soma + excluded.sm_soma,
+        sm_soma_q = sm_soma_q + excluded.sm_soma_q,
+        habil_n = habil_n + excluded.habil_n,
+        habil_soma = habil_soma + excluded.habil_soma,
+        habil_soma_q = habil_soma_q + excluded.habil_soma_q,
+        inicio_n = inicio_n + excluded.inicio_n,
+        inicio_soma = inicio_soma + excluded.inicio_soma,
+        inicio_soma_q = inicio_soma_q + excluded.inicio_soma_q,
+        conclusao_n = conclusao_n + excluded.conclusao_n,
+        conclusao_soma = conclusao_soma + excluded.conclusao_soma,
+        conclusao_soma_q = conclusao_soma_q + excluded.conclusao_soma_q;
+    DELETE FROM registros_sla_dia
+    WHERE dia_registro = COALESCE(substr(OLD.data_registro_iso, 1, 10), '') AND dia_modificacao = COALESCE(substr(OLD.data_modificacao_iso, 1, 10), '') AND linhas = 0;
+END;
+
+DELETE FROM registros_rollup_dia;
+DELETE FROM registros_rollup_hora;
+DELETE FROM registros_sla_dia;
+
+INSERT INTO registros_rollup_dia (dia, total, com_sm_ae, tardios)
+        SELECT substr(r.data_registro_iso, 1, 10) AS dia, COUNT(*),
+               SUM(CASE WHEN (r.numero_sm IS NOT NULL AND r.numero_sm != '') OR (r.numero_ae IS NOT NULL AND r.numero_ae != '') THEN 1 ELSE 0 END), SUM(CASE WHEN r.horario_previsto_iso IS NOT NULL AND substr(r.data_registro_iso, 1, 10) = substr(r.horario_previsto_iso, 1, 10) AND substr(r.data_registro_iso, 12, 2) IN ('06', '07', '08') THEN 1 ELSE 0 END)
+        FROM registros r
+        WHERE r.excluido = 0 AND r.data_registro_iso IS NOT NULL
+        GROUP BY dia;
+
+INSERT INTO registros_rollup_hora (dia, hora, total)
+        SELECT substr(r.data_registro_iso, 1, 10) AS dia, CAST(substr(r.data_registro_iso, 12, 2) AS INTEGER) AS hora, COUNT(*)
+        FROM registros r
+        WHERE r.excluido = 0 AND r.data_registro_iso IS NOT NULL
+        GROUP BY dia, hora;
+
+INSERT INTO registros_sla_dia (dia_registro, dia_modificacao, linhas, ae_n, ae_soma, ae_soma_q, sm_n, sm_soma, sm_soma_q, habil_n, habil_soma, habil_soma_q, inicio_n, inicio_soma, inicio_soma_q, conclusao_n, conclusao_soma, conclusao_soma_q)
+
+SELECT COALESCE(substr(r.data_registro_iso, 1, 10), '') AS chave_registro, COALESCE(substr(r.data_modificacao_iso, 1, 10), '') AS chave_modificacao, COUNT(*), SUM(CASE WHEN (r.data_ae_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL AND julianday(r.data_ae_iso) > CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) AND (julianday(r.data_ae_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.data_ae_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL AND julianday(r.data_ae_iso) > CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) AND (julianday(r.data_ae_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN julianday(r.data_ae_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END ELSE 0.0 END), SUM(CASE WHEN (r.data_ae_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL AND julianday(r.data_ae_iso) > CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) AND (julianday(r.data_ae_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN (julianday(r.data_ae_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) * (julianday(r.data_ae_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) ELSE 0.0 END), SUM(CASE WHEN (r.data_sm_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL AND julianday(r.data_sm_iso) > CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) AND (julianday(r.data_sm_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.data_sm_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL AND julianday(r.data_sm_iso) > CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) AND (julianday(r.data_sm_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN julianday(r.data_sm_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END ELSE 0.0 END), SUM(CASE WHEN (r.data_sm_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL AND julianday(r.data_sm_iso) > CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) AND (julianday(r.data_sm_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN (julianday(r.data_sm_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) * (julianday(r.data_sm_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL) AND (julianday(r.horario_previsto_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.horario_previsto_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL) AND (julianday(r.horario_previsto_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN julianday(r.horario_previsto_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL) AND (julianday(r.horario_previsto_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) IS NOT NULL THEN (julianday(r.horario_previsto_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) * (julianday(r.horario_previsto_iso) - CASE WHEN r.data_modificacao_iso > r.data_registro_iso THEN julianday(r.data_modificacao_iso) ELSE julianday(r.data_registro_iso) END) ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL) AND (julianday(r.horario_previsto_iso) - julianday(r.data_registro_iso)) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.horario_previsto_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL) AND (julianday(r.horario_previsto_iso) - julianday(r.data_registro_iso)) IS NOT NULL THEN julianday(r.horario_previsto_iso) - julianday(r.data_registro_iso) ELSE 0.0 END), SUM(CASE WHEN (r.horario_previsto_iso IS NOT NULL AND r.data_registro_iso IS NOT NULL) AND (julianday(r.horario_previsto_iso) - julianday(r.data_registro_iso)) IS NOT NULL THEN (julianday(r.horario_previsto_iso) - julianday(r.data_registro_iso)) * (julianday(r.horario_previsto_iso) - julianday(r.data_registro_iso)) ELSE 0.0 END), SUM(CASE WHEN (r.on_time_cliente_iso IS NOT NULL AND r.horario_previsto_iso IS NOT NULL) AND (julianday(r.on_time_cliente_iso) - julianday(r.horario_previsto_iso)) IS NOT NULL THEN 1 ELSE 0 END), SUM(CASE WHEN (r.on_time_cliente_iso IS NOT NULL AND r.horario_previsto_iso IS NOT NULL) AND (julianday(r.on_time_cliente_iso) - julianday(r.horario_previsto_iso)) IS NOT NULL THEN julianday(r.on_time_cliente_iso) - julianday(r.horario_previsto_iso) ELSE 0.0 END), SUM(CASE WHEN (r.on_time_cliente_iso IS NOT NULL AND r.horario_previsto_iso IS NOT NULL) AND (julianday(r.on_time_cliente_iso) - julianday(r.horario_previsto_iso)) IS NOT NULL THEN (julianday(r.on_time_cliente_iso) - julianday(r.horario_previsto_iso)) * (julianday(r.on_time_cliente_iso) - julianday(r.horario_previsto_iso)) ELSE 0.0 END)
+FROM registros r
+WHERE r.excluido = 0
+GROUP BY chave_registro, chave_modificacao;
+
+-- Estatísticas
+ANALYZE registros;
@@ -0,0 +1,102 @@
+-- Epoch das alterações: preenchimento, triggers e índices
+DROP TRIGGER IF EXISTS historico_epoch_insert;
+DROP TRIGGER IF EXISTS historico_epoch_update;
+
+UPDATE historico SET data_alteracao_epoch = CAST(strftime('%s', (CASE
+    WHEN typeof(data_alteracao) != 'text' OR length(data_alteracao) < 10 THEN NULL
+    WHEN substr(data_alteracao, 5, 1) = '-' THEN datetime(data_alteracao)
+    WHEN substr(data_alteracao, 3, 1) IN ('-', '/') AND substr(data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(data_alteracao, 7, 4) || '-' || substr(data_alteracao, 4, 2) || '-' || substr(data_alteracao, 1, 2)
+        || CASE WHEN length(data_alteracao) > 10 THEN ' ' || trim(replace(substr(data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(data_alteracao, 3, 1) = ':' AND instr(data_alteracao, ' ') > 0 THEN datetime(
+        substr(data_alteracao, instr(data_alteracao, ' ') + 7, 4) || '-' || substr(data_alteracao, instr(data_alteracao, ' ') + 4, 2) || '-'
+        || substr(data_alteracao, instr(data_alteracao, ' ') + 1, 2) || ' ' || substr(data_alteracao, 1, instr(data_alteracao, ' ') - 1))
+END)) AS INTEGER);
+
+CREATE TRIGGER historico_epoch_insert
+AFTER INSERT ON historico
+FOR EACH ROW
+BEGIN
+    UPDATE historico SET data_alteracao_epoch = CAST(strftime('%s', (CASE
+    WHEN typeof(NEW.data_alteracao) != 'text' OR length(NEW.data_alteracao) < 10 THEN NULL
+    WHEN substr(NEW.data_alteracao, 5, 1) = '-' THEN datetime(NEW.data_alteracao)
+    WHEN substr(NEW.data_alteracao, 3, 1) IN ('-', '/') AND substr(NEW.data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_alteracao, 7, 4) || '-' || substr(NEW.data_alteracao, 4, 2) || '-' || substr(NEW.data_alteracao, 1, 2)
+        || CASE WHEN length(NEW.data_alteracao) > 10 THEN ' ' || trim(replace(substr(NEW.data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_alteracao, 3, 1) = ':' AND instr(NEW.data_alteracao, ' ') > 0 THEN datetime(
+        substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 7, 4) || '-' || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 1, 2) || ' ' || substr(NEW.data_alteracao, 1, instr(NEW.data_alteracao, ' ') - 1))
+END)) AS INTEGER)
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER historico_epoch_update
+AFTER UPDATE OF data_alteracao ON historico
+FOR EACH ROW
+BEGIN
+    UPDATE historico SET data_alteracao_epoch = CAST(strftime('%s', (CASE
+    WHEN typeof(NEW.data_alteracao) != 'text' OR length(NEW.data_alteracao) < 10 THEN NULL
+    WHEN substr(NEW.data_alteracao, 5, 1) = '-' THEN datetime(NEW.data_alteracao)
+    WHEN substr(NEW.data_alteracao, 3, 1) IN ('-', '/') AND substr(NEW.data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_alteracao, 7, 4) || '-' || substr(NEW.data_alteracao, 4, 2) || '-' || substr(NEW.data_alteracao, 1, 2)
+        || CASE WHEN length(NEW.data_alteracao) > 10 THEN ' ' || trim(replace(substr(NEW.data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_alteracao, 3, 1) = ':' AND instr(NEW.data_alteracao, ' ') > 0 THEN datetime(
+        substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 7, 4) || '-' || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 1, 2) || ' ' || substr(NEW.data_alteracao, 1, instr(NEW.data_alteracao, ' ') - 1))
+END)) AS INTEGER)
+    WHERE id = NEW.id;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_historico_registro_epoch ON historico (registro_id, data_alteracao_epoch);
+CREATE INDEX IF NOT EXISTS idx_historico_data_alteracao_epoch ON historico (data_alteracao_epoch);
+DROP INDEX IF EXISTS idx_historico_registro_data;
+DROP INDEX IF EXISTS idx_historico_data_alteracao;
+
+-- Pendências pós SM/AE comparando datas canônicas, por diferença para que os
+-- triggers de contadores acompanhem (alteracao_pos_smae_relevante é registrada
+-- na conexão pela migração)
+CREATE TEMP TABLE alteracoes_pendentes_calculadas AS
+WITH usuarios_gr AS (
+    SELECT username FROM usuarios WHERE nivel = 'gr'
+)
+SELECT r.id
+FROM registros r
+WHERE ((r.numero_sm IS NOT NULL AND r.numero_sm != '' AND r.numero_sm != '0')
+   OR (r.numero_ae IS NOT NULL AND r.numero_ae != '' AND r.numero_ae != '0'))
+AND r.excluido = 0
+AND r.alteracoes_verificadas = 0
+AND EXISTS (
+    SELECT 1 FROM historico h
+    WHERE h.registro_id = r.id
+    AND h.data_alteracao_epoch > CAST(strftime('%s', CASE
+        WHEN r.data_sm_iso IS NOT NULL AND (r.data_ae_iso IS NULL OR r.data_sm_iso > r.data_ae_iso) THEN r.data_sm_iso
+        ELSE r.data_ae_iso
+    END) AS INTEGER)
+    AND h.alterado_por NOT IN usuarios_gr
+    AND h.alteracoes NOT LIKE '%"tipo": "Edição GR"%'
+    AND h.alteracoes NOT LIKE '%numero_sm%'
+    AND h.alteracoes NOT LIKE '%numero_ae%'
+)
+AND EXISTS (
+    SELECT 1 FROM historico h
+    WHERE h.registro_id = r.id
+    AND h.data_alteracao_epoch > CAST(strftime('%s', CASE
+        WHEN r.data_sm_iso IS NOT NULL AND (r.data_ae_iso IS NULL OR r.data_sm_iso > r.data_ae_iso) THEN r.data_sm_iso
+        ELSE r.data_ae_iso
+    END) AS INTEGER)
+    AND h.alterado_por NOT IN usuarios_gr
+    AND alteracao_pos_smae_relevante(h.alteracoes) = 1
+);
+
+DELETE FROM registros_alteracoes_pendentes
+WHERE registro_id NOT IN (SELECT id FROM temp.alteracoes_pendentes_calculadas);
+
+INSERT INTO registros_alteracoes_pendentes (registro_id, data_deteccao)
+SELECT id, :agora FROM temp.alteracoes_pendentes_calculadas
+WHERE id NOT IN (SELECT registro_id FROM registros_alteracoes_pendentes)
+ORDER BY id;
+
+DROP TABLE temp.alteracoes_pendentes_calculadas;
+
+-- Estatísticas
+ANALYZE historico;
@@ -0,0 +1,199 @@
+-- Tabela estruturada por campo
+CREATE TABLE IF NOT EXISTS historico_campos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    historico_id INTEGER NOT NULL,
+    registro_id INTEGER,
+    campo TEXT NOT NULL,
+    valor_anterior TEXT,
+    valor_novo TEXT,
+    tipo TEXT,
+    ts INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_historico_campos_historico ON historico_campos (historico_id);
+CREATE INDEX IF NOT EXISTS idx_historico_campos_registro_ts ON historico_campos (registro_id, ts);
+DROP TRIGGER IF EXISTS historico_campos_insert;
+DROP TRIGGER IF EXISTS historico_campos_update;
+DROP TRIGGER IF EXISTS historico_campos_delete;
+
+-- Entradas com JSON válido, pelo mesmo SQL dos triggers
+DELETE FROM historico_campos;
+
+INSERT INTO historico_campos (historico_id, registro_id, campo, valor_anterior, valor_novo, tipo, ts)
+SELECT h.id AS historico_id, h.registro_id AS registro_id, e.key AS campo,
+    CASE WHEN e.type = 'object' THEN
+        CASE WHEN json_type(e.value, '$.anterior') IS NOT NULL THEN json_extract(e.value, '$.anterior')
+             ELSE json_extract(e.value, '$.valor_antigo') END
+    END AS valor_anterior,
+    CASE
+        WHEN e.type = 'object' AND json_type(e.value, '$.novo') IS NOT NULL THEN json_extract(e.value, '$.novo')
+        WHEN e.type = 'object' AND json_type(e.value, '$.valor_novo') IS NOT NULL THEN json_extract(e.value, '$.valor_novo')
+        ELSE e.value
+    END AS valor_novo, NULL AS tipo, h.data_alteracao_epoch AS ts
+FROM historico h, json_each((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END)) e
+WHERE json_type((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END)) = 'object' AND json_type((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.tipo') IS NULL
+UNION ALL
+SELECT h.id, h.registro_id, c.value, NULL, v.value, json_extract((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.tipo'), h.data_alteracao_epoch
+FROM historico h, json_each((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.campos') c
+LEFT JOIN json_each((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.valores') v ON v.key = c.value
+WHERE json_type((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.tipo') IS NOT NULL AND c.type = 'text';
+
+-- Entradas legadas inválidas, reparadas pela migração
+INSERT INTO historico_campos (historico_id, registro_id, campo, valor_anterior, valor_novo, tipo, ts)
+SELECT h.historico_id AS historico_id, h.registro_id AS registro_id, e.key AS campo,
+    CASE WHEN e.type = 'object' THEN
+        CASE WHEN json_type(e.value, '$.anterior') IS NOT NULL THEN json_extract(e.value, '$.anterior')
+             ELSE json_extract(e.value, '$.valor_antigo') END
+    END AS valor_anterior,
+    CASE
+        WHEN e.type = 'object' AND json_type(e.value, '$.novo') IS NOT NULL THEN json_extract(e.value, '$.novo')
+        WHEN e.type = 'object' AND json_type(e.value, '$.valor_novo') IS NOT NULL THEN json_extract(e.value, '$.valor_novo')
+        ELSE e.value
+    END AS valor_novo, NULL AS tipo, h.ts AS ts
+FROM temp.historico_reparado h, json_each((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END)) e
+WHERE json_type((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END)) = 'object' AND json_type((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.tipo') IS NULL
+UNION ALL
+SELECT h.historico_id, h.registro_id, c.value, NULL, v.value, json_extract((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.tipo'), h.ts
+FROM temp.historico_reparado h, json_each((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.campos') c
+LEFT JOIN json_each((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.valores') v ON v.key = c.value
+WHERE json_type((CASE WHEN json_valid(h.alteracoes) THEN h.alteracoes END), '$.tipo') IS NOT NULL AND c.type = 'text';
+
+-- Triggers que mantêm historico_campos
+CREATE TRIGGER historico_campos_insert
+AFTER INSERT ON historico
+FOR EACH ROW
+BEGIN
+    INSERT INTO historico_campos
+        (historico_id, registro_id, campo, valor_anterior, valor_novo, tipo, ts)
+
+        SELECT NEW.id AS historico_id, NEW.registro_id AS registro_id, e.key AS campo,
+            CASE WHEN e.type = 'object' THEN
+            CASE WHEN json_type(e.value, '$.anterior') IS NOT NULL THEN json_extract(e.value, '$.anterior')
+                 ELSE json_extract(e.value, '$.valor_antigo') END
+        END AS valor_anterior, CASE
+            WHEN e.type = 'object' AND json_type(e.value, '$.novo') IS NOT NULL THEN json_extract(e.value, '$.novo')
+            WHEN e.type = 'object' AND json_type(e.value, '$.valor_novo') IS NOT NULL THEN json_extract(e.value, '$.valor_novo')
+            ELSE e.value
+        END AS valor_novo, NULL AS tipo, CAST(strftime('%s', (CASE
+    WHEN typeof(NEW.data_alteracao) != 'text' OR length(NEW.data_alteracao) < 10 THEN NULL
+    WHEN substr(NEW.data_alteracao, 5, 1) = '-' THEN datetime(NEW.data_alteracao)
+    WHEN substr(NEW.data_alteracao, 3, 1) IN ('-', '/') AND substr(NEW.data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_alteracao, 7, 4) || '-' || substr(NEW.data_alteracao, 4, 2) || '-' || substr(NEW.data_alteracao, 1, 2)
+        || CASE WHEN length(NEW.data_alteracao) > 10 THEN ' ' || trim(replace(substr(NEW.data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_alteracao, 3, 1) = ':' AND instr(NEW.data_alteracao, ' ') > 0 THEN datetime(
+        substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 7, 4) || '-' || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 1, 2) || ' ' || substr(NEW.data_alteracao, 1, instr(NEW.data_alteracao, ' ') - 1))
+END)) AS INTEGER) AS ts
+        FROM  json_each((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END)) e
+        WHERE json_type((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END)) = 'object' AND json_type((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.tipo') IS NULL AND 1
+        UNION ALL
+        SELECT NEW.id, NEW.registro_id, c.value, NULL, v.value, json_extract((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.tipo'), CAST(strftime('%s', (CASE
+    WHEN typeof(NEW.data_alteracao) != 'text' OR length(NEW.data_alteracao) < 10 THEN NULL
+    WHEN substr(NEW.data_alteracao, 5, 1) = '-' THEN datetime(NEW.data_alteracao)
+    WHEN substr(NEW.data_alteracao, 3, 1) IN ('-', '/') AND substr(NEW.data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_alteracao, 7, 4) || '-' || substr(NEW.data_alteracao, 4, 2) || '-' || substr(NEW.data_alteracao, 1, 2)
+        || CASE WHEN length(NEW.data_alteracao) > 10 THEN ' ' || trim(replace(substr(NEW.data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_alteracao, 3, 1) = ':' AND instr(NEW.data_alteracao, ' ') > 0 THEN datetime(
+        substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 7, 4) || '-' || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 1, 2) || ' ' || substr(NEW.data_alteracao, 1, instr(NEW.data_alteracao, ' ') - 1))
+END)) AS INTEGER)
+        FROM  json_each((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.campos') c
+        LEFT JOIN json_each((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.valores') v ON v.key = c.value
+        WHERE json_type((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.tipo') IS NOT NULL AND c.type = 'text' AND 1
+    ;
+END;
+
+CREATE TRIGGER historico_campos_update
+AFTER UPDATE OF registro_id, alteracoes, data_alteracao ON historico
+FOR EACH ROW
+BEGIN
+    DELETE FROM historico_campos WHERE historico_id = OLD.id;
+    INSERT INTO historico_campos
+        (historico_id, registro_id, campo, valor_anterior, valor_novo, tipo, ts)
+
+        SELECT NEW.id AS historico_id, NEW.registro_id AS registro_id, e.key AS campo,
+            CASE WHEN e.type = 'object' THEN
+            CASE WHEN json_type(e.value, '$.anterior') IS NOT NULL THEN json_extract(e.value, '$.anterior')
+                 ELSE json_extract(e.value, '$.valor_antigo') END
+        END AS valor_anterior, CASE
+            WHEN e.type = 'object' AND json_type(e.value, '$.novo') IS NOT NULL THEN json_extract(e.value, '$.novo')
+            WHEN e.type = 'object' AND json_type(e.value, '$.valor_novo') IS NOT NULL THEN json_extract(e.value, '$.valor_novo')
+            ELSE e.value
+        END AS valor_novo, NULL AS tipo, CAST(strftime('%s', (CASE
+    WHEN typeof(NEW.data_alteracao) != 'text' OR length(NEW.data_alteracao) < 10 THEN NULL
+    WHEN substr(NEW.data_alteracao, 5, 1) = '-' THEN datetime(NEW.data_alteracao)
+    WHEN substr(NEW.data_alteracao, 3, 1) IN ('-', '/') AND substr(NEW.data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_alteracao, 7, 4) || '-' || substr(NEW.data_alteracao, 4, 2) || '-' || substr(NEW.data_alteracao, 1, 2)
+        || CASE WHEN length(NEW.data_alteracao) > 10 THEN ' ' || trim(replace(substr(NEW.data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_alteracao, 3, 1) = ':' AND instr(NEW.data_alteracao, ' ') > 0 THEN datetime(
+        substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 7, 4) || '-' || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 1, 2) || ' ' || substr(NEW.data_alteracao, 1, instr(NEW.data_alteracao, ' ') - 1))
+END)) AS INTEGER) AS ts
+        FROM  json_each((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END)) e
+        WHERE json_type((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END)) = 'object' AND json_type((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.tipo') IS NULL AND 1
+        UNION ALL
+        SELECT NEW.id, NEW.registro_id, c.value, NULL, v.value, json_extract((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.tipo'), CAST(strftime('%s', (CASE
+    WHEN typeof(NEW.data_alteracao) != 'text' OR length(NEW.data_alteracao) < 10 THEN NULL
+    WHEN substr(NEW.data_alteracao, 5, 1) = '-' THEN datetime(NEW.data_alteracao)
+    WHEN substr(NEW.data_alteracao, 3, 1) IN ('-', '/') AND substr(NEW.data_alteracao, 6, 1) IN ('-', '/') THEN datetime(
+        substr(NEW.data_alteracao, 7, 4) || '-' || substr(NEW.data_alteracao, 4, 2) || '-' || substr(NEW.data_alteracao, 1, 2)
+        || CASE WHEN length(NEW.data_alteracao) > 10 THEN ' ' || trim(replace(substr(NEW.data_alteracao, 11), '- ', '')) ELSE '' END)
+    WHEN substr(NEW.data_alteracao, 3, 1) = ':' AND instr(NEW.data_alteracao, ' ') > 0 THEN datetime(
+        substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 7, 4) || '-' || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 4, 2) || '-'
+        || substr(NEW.data_alteracao, instr(NEW.data_alteracao, ' ') + 1, 2) || ' ' || substr(NEW.data_alteracao, 1, instr(NEW.data_alteracao, ' ') - 1))
+END)) AS INTEGER)
+        FROM  json_each((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.campos') c
+        LEFT JOIN json_each((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.valores') v ON v.key = c.value
+        WHERE json_type((CASE WHEN json_valid(NEW.alteracoes) THEN NEW.alteracoes END), '$.tipo') IS NOT NULL AND c.type = 'text' AND 1
+    ;
+END;
+
+CREATE TRIGGER historico_campos_delete
+AFTER DELETE ON historico
+FOR EACH ROW
+BEGIN
+    DELETE FROM historico_campos WHERE historico_id = OLD.id;
+END;
+
+-- A detecção de alterações pós SM/AE passa a ler historico_campos
+CREATE TEMP TABLE alteracoes_pendentes_calculadas AS
+WITH usuarios_gr AS (
+    SELECT username FROM usuarios WHERE nivel = 'gr'
+)
+SELECT r.id
+FROM registros r
+WHERE ((r.numero_sm IS NOT NULL AND r.numero_sm != '' AND r.numero_sm != '0')
+   OR (r.numero_ae IS NOT NULL AND r.numero_ae != '' AND r.numero_ae != '0'))
+AND r.excluido = 0
+AND r.alteracoes_verificadas = 0
+AND EXISTS (
+    SELECT 1 FROM historico_campos c
+    JOIN historico h ON h.id = c.historico_id
+    WHERE c.registro_id = r.id
+    AND c.ts > CAST(strftime('%s',
+CASE
+    WHEN r.data_sm_iso IS NOT NULL AND (r.data_ae_iso IS NULL OR r.data_sm_iso > r.data_ae_iso) THEN r.data_sm_iso
+    ELSE r.data_ae_iso
+END) AS INTEGER)
+    AND c.campo IN ('usuario', 'placa', 'motorista', 'cpf', 'mot_loc', 'carreta', 'carreta1', 'carreta2', 'carreta_loc', 'cliente', 'loc_cliente', 'arquivo', 'container_1', 'container_2', 'status_sm', 'tipo_carga', 'status_container', 'modalidade', 'gerenciadora', 'booking_di', 'pedido_referencia', 'lote_cs', 'on_time_cliente', 'horario_previsto', 'observacao_operacional', 'observacao_gr', 'destino_intermediario', 'destino_final', 'anexar_nf', 'anexar_os', 'anexar_agendamento', 'numero_nf', 'serie', 'quantidade', 'peso_bruto', 'valor_total_nota', 'unidade', 'arquivo_nf_nome', 'arquivo_os_nome', 'arquivo_agendamento_nome', 'origem')
+    AND (c.tipo IS NULL OR c.tipo != 'Edição GR')
+    AND h.alterado_por NOT IN usuarios_gr
+    AND NOT EXISTS (
+        SELECT 1 FROM historico_campos x
+        WHERE x.historico_id = c.historico_id
+        AND x.campo IN ('numero_sm', 'numero_ae')
+    )
+);
+
+DELETE FROM registros_alteracoes_pendentes
+WHERE registro_id NOT IN (SELECT id FROM temp.alteracoes_pendentes_calculadas);
+
+INSERT INTO registros_alteracoes_pendentes (registro_id, data_deteccao)
+SELECT id, :agora FROM temp.alteracoes_pendentes_calculadas
+WHERE id NOT IN (SELECT registro_id FROM registros_alteracoes_pendentes)
+ORDER BY id;
+
+DROP TABLE temp.alteracoes_pendentes_calculadas;
+
+-- Estatísticas
+ANALYZE historico_campos;
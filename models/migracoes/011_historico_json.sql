@@ -0,0 +1,19 @@
+-- Cache das formas canônicas e trigger de descarte
+CREATE TABLE IF NOT EXISTS historico_json (
+    historico_id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    alteracoes TEXT
+);
+
+DROP TRIGGER IF EXISTS historico_json_delete;
+
+CREATE TRIGGER historico_json_delete
+AFTER DELETE ON historico
+FOR EACH ROW
+BEGIN
+    DELETE FROM historico_json WHERE historico_id = OLD.id;
+END;
+
+-- Formas canônicas das entradas legadas inválidas, reparadas pela migração
+INSERT OR REPLACE INTO historico_json (historico_id, hash, alteracoes)
+SELECT historico_id, hash, alteracoes FROM temp.historico_reparado;
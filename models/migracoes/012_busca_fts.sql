@@ -0,0 +1,33 @@
+-- Triggers que mantêm o índice de busca
+DROP TRIGGER IF EXISTS registros_fts_insert;
+DROP TRIGGER IF EXISTS registros_fts_delete;
+DROP TRIGGER IF EXISTS registros_fts_update;
+
+CREATE TRIGGER registros_fts_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    INSERT INTO registros_fts (rowid, id, usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente, loc_cliente, container_1, container_2, numero_sm, numero_ae, arquivo, data_registro, status_sm)
+    VALUES (NEW.id, NEW.id, NEW.usuario, NEW.placa, NEW.motorista, NEW.cpf, NEW.mot_loc, NEW.carreta, NEW.carreta_loc, NEW.cliente, NEW.loc_cliente, NEW.container_1, NEW.container_2, NEW.numero_sm, NEW.numero_ae, NEW.arquivo, NEW.data_registro, NEW.status_sm);
+END;
+
+CREATE TRIGGER registros_fts_delete
+AFTER DELETE ON registros
+FOR EACH ROW
+BEGIN
+    INSERT INTO registros_fts (registros_fts, rowid, id, usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente, loc_cliente, container_1, container_2, numero_sm, numero_ae, arquivo, data_registro, status_sm)
+    VALUES ('delete', OLD.id, OLD.id, OLD.usuario, OLD.placa, OLD.motorista, OLD.cpf, OLD.mot_loc, OLD.carreta, OLD.carreta_loc, OLD.cliente, OLD.loc_cliente, OLD.container_1, OLD.container_2, OLD.numero_sm, OLD.numero_ae, OLD.arquivo, OLD.data_registro, OLD.status_sm);
+END;
+
+CREATE TRIGGER registros_fts_update
+AFTER UPDATE OF id, usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente, loc_cliente, container_1, container_2, numero_sm, numero_ae, arquivo, data_registro, status_sm ON registros
+FOR EACH ROW
+BEGIN
+    INSERT INTO registros_fts (registros_fts, rowid, id, usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente, loc_cliente, container_1, container_2, numero_sm, numero_ae, arquivo, data_registro, status_sm)
+    VALUES ('delete', OLD.id, OLD.id, OLD.usuario, OLD.placa, OLD.motorista, OLD.cpf, OLD.mot_loc, OLD.carreta, OLD.carreta_loc, OLD.cliente, OLD.loc_cliente, OLD.container_1, OLD.container_2, OLD.numero_sm, OLD.numero_ae, OLD.arquivo, OLD.data_registro, OLD.status_sm);
+    INSERT INTO registros_fts (rowid, id, usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente, loc_cliente, container_1, container_2, numero_sm, numero_ae, arquivo, data_registro, status_sm)
+    VALUES (NEW.id, NEW.id, NEW.usuario, NEW.placa, NEW.motorista, NEW.cpf, NEW.mot_loc, NEW.carreta, NEW.carreta_loc, NEW.cliente, NEW.loc_cliente, NEW.container_1, NEW.container_2, NEW.numero_sm, NEW.numero_ae, NEW.arquivo, NEW.data_registro, NEW.status_sm);
+END;
+
+-- Reconstrução do índice a partir de registros
+INSERT INTO registros_fts (registros_fts) VALUES ('rebuild');
@@ -0,0 +1,76 @@
+-- Índice de identificadores normalizados
+CREATE TABLE IF NOT EXISTS registros_identificadores (
+    registro_id INTEGER NOT NULL,
+    campo TEXT NOT NULL,
+    chave TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_registros_identificadores_chave ON registros_identificadores (chave);
+CREATE INDEX IF NOT EXISTS idx_registros_identificadores_registro ON registros_identificadores (registro_id);
+DROP TRIGGER IF EXISTS identificadores_registros_insert;
+DROP TRIGGER IF EXISTS identificadores_registros_update;
+DROP TRIGGER IF EXISTS identificadores_registros_delete;
+
+-- Chaves de todos os registros
+DELETE FROM registros_identificadores;
+
+INSERT INTO registros_identificadores (registro_id, campo, chave)
+    SELECT registro_id, campo, chave FROM (
+        SELECT registros.id AS registro_id, 'placa' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.placa AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'carreta' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.carreta AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'container_1' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.container_1 AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'container_2' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.container_2 AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'cpf' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.cpf AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'numero_sm' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.numero_sm AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'numero_ae' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.numero_ae AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'booking_di' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.booking_di AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+        UNION ALL SELECT registros.id AS registro_id, 'lote_cs' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(registros.lote_cs AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave FROM registros
+    ) WHERE chave IS NOT NULL AND chave != '';
+
+-- Triggers que mantêm as chaves
+CREATE TRIGGER identificadores_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW
+BEGIN
+    INSERT INTO registros_identificadores (registro_id, campo, chave)
+    SELECT registro_id, campo, chave FROM (
+        SELECT NEW.id AS registro_id, 'placa' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.placa AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'carreta' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.carreta AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'container_1' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.container_1 AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'container_2' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.container_2 AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'cpf' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.cpf AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'numero_sm' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.numero_sm AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'numero_ae' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.numero_ae AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'booking_di' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.booking_di AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'lote_cs' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.lote_cs AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+    ) WHERE chave IS NOT NULL AND chave != '';
+END;
+
+CREATE TRIGGER identificadores_registros_update
+AFTER UPDATE OF placa, carreta, container_1, container_2, cpf, numero_sm, numero_ae, booking_di, lote_cs ON registros
+FOR EACH ROW
+BEGIN
+    DELETE FROM registros_identificadores WHERE registro_id = OLD.id;
+    INSERT INTO registros_identificadores (registro_id, campo, chave)
+    SELECT registro_id, campo, chave FROM (
+        SELECT NEW.id AS registro_id, 'placa' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.placa AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'carreta' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.carreta AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'container_1' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.container_1 AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'container_2' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.container_2 AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'cpf' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.cpf AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'numero_sm' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.numero_sm AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'numero_ae' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.numero_ae AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'booking_di' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.booking_di AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+        UNION ALL SELECT NEW.id AS registro_id, 'lote_cs' AS campo, replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(upper(CAST(NEW.lote_cs AS TEXT)), ' ', ''), '-', ''), '.', ''), '/', ''), '\', ''), '_', ''), ',', ''), ';', ''), ':', ''), '(', ''), ')', ''), '#', ''), '*', ''), '+', ''), '''', ''), '"', ''), '	', '') AS chave
+    ) WHERE chave IS NOT NULL AND chave != '';
+END;
+
+CREATE TRIGGER identificadores_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW
+BEGIN
+    DELETE FROM registros_identificadores WHERE registro_id = OLD.id;
+END;
+
+-- Estatísticas
+ANALYZE registros_identificadores;
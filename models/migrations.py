@@ -0,0 +1,537 @@
+"""
+Migrações versionadas do banco de dados.
+
+Cada migração é uma função que recebe um cursor e leva o schema da versão
+anterior para a sua versão. A versão aplicada fica em ``PRAGMA user_version``,
+então cada migração roda uma única vez por banco, no boot da aplicação
+(ver ``models.schema.inicializar_schema``), e nunca durante as requisições.
+
+As migrações são só de acréscimo: uma migração publicada não muda, e uma
+correção vira uma migração nova. Por isso o SQL de cada uma fica congelado em
+``models/migracoes/NNN_nome.sql``, como era quando ela foi publicada, em vez
+de vir dos geradores de ``models/`` (que continuam evoluindo e servem aos
+scripts de reconstrução e verificação).
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Arquivo com a lista canônica de colunas da tabela registros
+REGISTROS_COLUMNS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'registros_columns.json'
+)
+
+# Tipos das colunas de registros que não são TEXT
+TIPOS_COLUNAS_REGISTROS = {
+    'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+    'quantidade': 'INTEGER',
+    'peso_bruto': 'REAL',
+    'valor_total_nota': 'REAL',
+    'excluido': 'INTEGER DEFAULT 0',
+    'data_modificacao': 'TIMESTAMP',
+    'alteracoes_verificadas': 'INTEGER DEFAULT 0',
+}
+
+# Colunas usadas pelo código mas ausentes do registros_columns.json
+COLUNAS_EXTRAS_REGISTROS = ['modificado_por']
+
+# Diretório com o SQL congelado das migrações
+DIRETORIO_SQL_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migracoes')
+
+
+def _colunas_existentes(cursor, tabela):
+    cursor.execute(f"PRAGMA table_info({tabela})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def _adicionar_colunas(cursor, tabela, colunas):
+    """Adiciona as colunas ausentes. ``colunas`` é uma lista de (nome, tipo)."""
+    existentes = _colunas_existentes(cursor, tabela)
+    for nome, tipo in colunas:
+        if nome not in existentes:
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {nome} {tipo}")
+            logger.info(f"Coluna '{nome}' adicionada à tabela {tabela}")
+
+
+def _executar_script(cursor, nome, parametros=None):
+    """Executa, comando a comando, um arquivo de SQL congelado de migração.
+
+    ``executescript`` faria COMMIT da transação da migração e não aceita
+    parâmetros; aqui cada comando roda no próprio cursor, com os
+    ``parametros`` nomeados (ex.: ``:agora``).
+    """
+    with open(os.path.join(DIRETORIO_SQL_MIGRACOES, nome), 'r', encoding='utf-8') as f:
+        linhas = f.readlines()
+
+    comando = ''
+    for linha in linhas:
+        comando += linha
+        if sqlite3.complete_statement(comando):
+            cursor.execute(comando, parametros or {})
+            comando = ''
+    restante = [l for l in comando.splitlines() if l.strip() and not l.strip().startswith('--')]
+    if restante:
+        raise ValueError(f"Comando incompleto no fim de {nome}")
+
+
+# Campos monitorados pela detecção de alterações pós SM/AE das migrações 003 e 009
+CAMPOS_MONITORADOS_POS_SMAE_MIGRACOES = [
+    'usuario', 'placa', 'motorista', 'cpf', 'mot_loc', 'carreta', 'carreta1', 'carreta2',
+    'carreta_loc', 'cliente', 'loc_cliente', 'arquivo', 'container_1', 'container_2',
+    'status_sm', 'tipo_carga', 'status_container', 'modalidade', 'gerenciadora',
+    'booking_di', 'pedido_referencia', 'lote_cs', 'on_time_cliente', 'horario_previsto',
+    'observacao_operacional', 'observacao_gr', 'destino_intermediario', 'destino_final',
+    'anexar_nf', 'anexar_os', 'anexar_agendamento', 'numero_nf', 'serie', 'quantidade',
+    'peso_bruto', 'valor_total_nota', 'unidade', 'arquivo_nf_nome', 'arquivo_os_nome',
+    'arquivo_agendamento_nome', 'origem'
+]
+
+# Nomes de campo extraídos de um texto de alterações sem JSON recuperável
+PADRAO_NOME_CAMPO_MIGRACOES = re.compile(r'''["']([A-Za-z_][A-Za-z0-9_]*)["']\s*:''')
+
+
+def _alteracao_pos_smae_relevante(alteracoes_json):
+    """Função SQL ``alteracao_pos_smae_relevante`` usada pelas migrações 003 e 009.
+
+    Cópia da detecção da época: a de models/alteracoes_pendentes.py passou a
+    ler historico_campos. ``sanitize_json_string`` vem de historico_utils.
+
+    Returns:
+        int: 1 se a alteração toca um campo monitorado e não é edição de SM/AE
+        nem edição feita pela GR; 0 caso contrário (inclusive JSON inválido)
+    """
+    from historico_utils import sanitize_json_string
+
+    try:
+        # Primeiro tentar sanitização normal
+        alteracoes_json_sanitizado = sanitize_json_string(alteracoes_json)
+
+        # Se falhar, aplicar sanitização extrema
+        if not alteracoes_json_sanitizado or alteracoes_json_sanitizado == '{}':
+            alteracoes_json_sanitizado = re.sub(r'\\', '', alteracoes_json)
+            alteracoes_json_sanitizado = re.sub(r'[\x00-\x1F\x7F]', '', alteracoes_json_sanitizado)
+
+        # Verificar se não contém campos a serem excluídos
+        if 'numero_sm' in alteracoes_json_sanitizado or 'numero_ae' in alteracoes_json_sanitizado:
+            return 0
+        if 'tipo' in alteracoes_json_sanitizado and 'Edição GR' in alteracoes_json_sanitizado:
+            return 0
+
+        # Verificar se contém campos relevantes
+        for campo in CAMPOS_MONITORADOS_POS_SMAE_MIGRACOES:
+            if campo in alteracoes_json_sanitizado:
+                return 1
+        return 0
+    except Exception as e:
+        logger.debug(f"Erro ao processar JSON do histórico: {e}")
+        return 0
+
+
+def _registrar_funcoes_migracao(cursor):
+    """Registra na conexão as funções SQL chamadas pelo SQL congelado."""
+    cursor.connection.create_function(
+        'alteracao_pos_smae_relevante', 1, _alteracao_pos_smae_relevante, deterministic=True
+    )
+
+
+def _reparar_alteracoes(texto):
+    """Reparo dos textos de alterações inválidos usado pelas migrações 010 e 011.
+
+    Cópia do ``reparar_alteracoes`` da época (models/historico_campos.py):
+    sanitização normal, agressiva e extrema; se nenhuma produzir um objeto,
+    guarda só os nomes de campo encontrados no texto, sem valores.
+
+    Returns:
+        str: JSON de um objeto ou None se nada for recuperável
+    """
+    if not texto or not isinstance(texto, str):
+        return None
+
+    from historico_utils import sanitize_json_string
+
+    candidatos = [
+        lambda: sanitize_json_string(texto),
+        lambda: sanitize_json_string(texto, aggressive=True),
+        lambda: sanitize_json_string(texto, aggressive=True, extreme=True),
+        lambda: re.sub(r'[\x00-\x1F\x7F]', ' ', re.sub(r'\\', '', texto).replace("'", '"')),
+    ]
+    for candidato in candidatos:
+        try:
+            dados = json.loads(candidato())
+        except Exception:
+            continue
+        if isinstance(dados, dict) and dados:
+            return json.dumps(dados, ensure_ascii=False)
+
+    campos = list(dict.fromkeys(PADRAO_NOME_CAMPO_MIGRACOES.findall(texto)))
+    if campos:
+        return json.dumps({campo: None for campo in campos}, ensure_ascii=False)
+    return None
+
+
+def _criar_historico_reparado(cursor, linhas):
+    """Cria a tabela temporária lida pelo SQL congelado com as formas reparadas.
+
+    ``linhas``: (historico_id, registro_id, ts, hash, alteracoes).
+    """
+    cursor.execute("DROP TABLE IF EXISTS temp.historico_reparado")
+    cursor.execute("""
+        CREATE TEMP TABLE historico_reparado (
+            historico_id INTEGER PRIMARY KEY,
+            registro_id INTEGER,
+            ts INTEGER,
+            hash TEXT,
+            alteracoes TEXT
+        )
+    """)
+    cursor.executemany("INSERT INTO temp.historico_reparado VALUES (?, ?, ?, ?, ?)", linhas)
+
+
+def carregar_colunas_registros():
+    """Lê a lista de colunas de registros do registros_columns.json."""
+    with open(REGISTROS_COLUMNS_FILE, 'r', encoding='utf-8') as f:
+        colunas = json.load(f)['columns']
+    return colunas + [c for c in COLUNAS_EXTRAS_REGISTROS if c not in colunas]
+
+
+def _migracao_001_schema_base(cursor):
+    """Garante as colunas de registros/historico e as tabelas auxiliares (logs, sessões, solicitações)."""
+    colunas = [
+        (nome, TIPOS_COLUNAS_REGISTROS.get(nome, 'TEXT'))
+        for nome in carregar_colunas_registros()
+        if nome != 'id'
+    ]
+    _adicionar_colunas(cursor, 'registros', colunas)
+
+    _adicionar_colunas(cursor, 'historico', [
+        ('verificado', 'INTEGER DEFAULT 0'),
+        ('data_verificacao', 'TEXT'),
+    ])
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS logs_unificados (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_hora TEXT,
+            usuario TEXT,
+            nivel TEXT,
+            acao TEXT NOT NULL,
+            descricao TEXT,
+            detalhes TEXT,
+            registro_id INTEGER,
+            ip TEXT,
+            origem TEXT,
+            objeto_tipo TEXT,
+            valor_anterior TEXT,
+            valor_novo TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessoes_ativas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            username TEXT NOT NULL,
+            device_id TEXT NOT NULL,
+            nivel TEXT NOT NULL,
+            last_activity INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS solicitacoes_registro (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT NOT NULL,
+            setor TEXT NOT NULL,
+            justificativa TEXT,
+            data_solicitacao TEXT,
+            status TEXT DEFAULT 'pendente',
+            processado_por TEXT,
+            data_processamento TEXT,
+            motivo_rejeicao TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS log_atividades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_hora TEXT,
+            usuario TEXT,
+            nivel TEXT,
+            acao TEXT,
+            registro_id INTEGER,
+            descricao TEXT
+        )
+    """)
+
+
+# Índices dos predicados quentes: (nome, tabela, colunas, condição parcial)
+# Os índices parciais ``WHERE excluido = 0`` só são escolhidos pelo SQLite
+# quando a consulta traz o literal ``excluido = 0``, como fazem as listagens
+# e contadores do sistema.
+INDICES_PREDICADOS_QUENTES = [
+    ('idx_registros_excluido', 'registros', 'excluido', None),
+    ('idx_registros_ativos_data_registro', 'registros', 'data_registro', 'excluido = 0'),
+    ('idx_registros_ativos_numero_sm', 'registros', 'numero_sm', 'excluido = 0'),
+    ('idx_registros_ativos_numero_ae', 'registros', 'numero_ae', 'excluido = 0'),
+    ('idx_registros_ativos_container_1', 'registros', 'container_1', 'excluido = 0'),
+    ('idx_registros_ativos_anexar_nf', 'registros', 'anexar_nf', 'excluido = 0'),
+    ('idx_registros_ativos_anexar_os', 'registros', 'anexar_os', 'excluido = 0'),
+    ('idx_registros_ativos_unidade', 'registros', 'unidade', 'excluido = 0'),
+    ('idx_registros_ativos_horario_previsto', 'registros', 'horario_previsto', 'excluido = 0'),
+    ('idx_registros_ativos_status_sm', 'registros', 'status_sm', 'excluido = 0'),
+    ('idx_historico_registro_data', 'historico', 'registro_id, data_alteracao', None),
+    ('idx_historico_data_alteracao', 'historico', 'data_alteracao', None),
+    ('idx_historico_alterado_por', 'historico', 'alterado_por', None),
+    ('idx_logs_unificados_data_hora', 'logs_unificados', 'data_hora', None),
+    ('idx_logs_unificados_usuario_data', 'logs_unificados', 'usuario, data_hora', None),
+    ('idx_logs_unificados_acao_data', 'logs_unificados', 'acao, data_hora', None),
+    ('idx_logs_unificados_nivel_data', 'logs_unificados', 'nivel, data_hora', None),
+    ('idx_logs_unificados_registro_id', 'logs_unificados', 'registro_id', None),
+    ('idx_sessoes_ativas_username', 'sessoes_ativas', 'username', None),
+    ('idx_sessoes_ativas_last_activity', 'sessoes_ativas', 'last_activity', None),
+]
+
+# Índices de coluna única substituídos pelos compostos acima
+INDICES_SUBSTITUIDOS = [
+    'idx_logs_unificados_usuario',
+    'idx_logs_unificados_acao',
+    'idx_logs_unificados_nivel',
+]
+
+
+def _migracao_002_indices_predicados_quentes(cursor):
+    """Cria os índices compostos/parciais usados pelas listagens e contadores."""
+    for nome, tabela, colunas, condicao in INDICES_PREDICADOS_QUENTES:
+        sql = f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({colunas})"
+        if condicao:
+            sql += f" WHERE {condicao}"
+        cursor.execute(sql)
+    for nome in INDICES_SUBSTITUIDOS:
+        cursor.execute(f"DROP INDEX IF EXISTS {nome}")
+    cursor.execute("ANALYZE")
+
+
+def _migracao_003_alteracoes_pendentes(cursor):
+    """Cria e popula a tabela materializada de alterações pendentes pós SM/AE."""
+    _registrar_funcoes_migracao(cursor)
+    agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    _executar_script(cursor, '003_alteracoes_pendentes.sql', {'agora': agora})
+
+
+def _migracao_004_contadores(cursor):
+    """Cria a tabela contadores, os triggers que a mantêm e a popula."""
+    _executar_script(cursor, '004_contadores.sql')
+
+
+def _migracao_005_rollups(cursor):
+    """Cria as tabelas de agregados diários/por hora, os triggers e faz o backfill."""
+    _executar_script(cursor, '005_rollups.sql')
+
+
+def _migracao_006_sla(cursor):
+    """Recria os agregados de registros incluindo a tabela de tempos (SLA)."""
+    _executar_script(cursor, '006_sla.sql')
+
+
+def _migracao_007_ordem_saida(cursor):
+    """Cria o índice na ordem de saída prevista usada pela paginação do dashboard.
+
+    Com ``excluido`` como primeira coluna o SQLite percorre o índice já na
+    ordem do ORDER BY e para no LIMIT, sem ordenar a tabela inteira.
+    """
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_registros_ordem_saida ON registros (
+            excluido,
+            (CASE WHEN horario_previsto IS NULL THEN 1 ELSE 0 END),
+            horario_previsto,
+            id
+        )
+    """)
+    cursor.execute("ANALYZE registros")
+
+
+def _migracao_008_datas_iso(cursor):
+    """Cria as colunas canônicas de data e passa ordenação e agregados para elas.
+
+    Os agregados das migrações 005/006 liam as colunas cruas; aqui os triggers
+    e o backfill são refeitos sobre as colunas ``_iso``.
+    """
+    _adicionar_colunas(cursor, 'registros', [
+        ('data_registro_iso', 'TEXT'),
+        ('horario_previsto_iso', 'TEXT'),
+        ('on_time_cliente_iso', 'TEXT'),
+        ('data_sm_iso', 'TEXT'),
+        ('data_ae_iso', 'TEXT'),
+        ('data_modificacao_iso', 'TEXT'),
+    ])
+    _executar_script(cursor, '008_datas_iso.sql')
+
+
+def _migracao_009_historico_epoch(cursor):
+    """Cria a coluna canônica (epoch) de historico.data_alteracao e seus índices.
+
+    As pendências pós SM/AE passam a comparar as datas canônicas e são
+    recalculadas por diferença, para que os triggers de contadores acompanhem.
+    """
+    _adicionar_colunas(cursor, 'historico', [('data_alteracao_epoch', 'INTEGER')])
+    _registrar_funcoes_migracao(cursor)
+    agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    _executar_script(cursor, '009_historico_epoch.sql', {'agora': agora})
+
+
+def _migracao_010_historico_campos(cursor):
+    """Cria historico_campos a partir do histórico e recalcula as pendências pós SM/AE.
+
+    Os textos JSON válidos são processados pelo SQL dos triggers; os inválidos
+    são reparados aqui e lidos pelo SQL congelado da tabela temporária.
+    """
+    cursor.execute("""
+        SELECT id, registro_id, alteracoes, data_alteracao_epoch FROM historico
+        WHERE alteracoes IS NOT NULL AND alteracoes != '' AND NOT json_valid(alteracoes)
+        ORDER BY id
+    """)
+    linhas = []
+    for historico_id, registro_id, alteracoes, ts in cursor.fetchall():
+        texto = _reparar_alteracoes(alteracoes)
+        if texto is not None:
+            linhas.append((historico_id, registro_id, ts, None, texto))
+
+    _criar_historico_reparado(cursor, linhas)
+    agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    _executar_script(cursor, '010_historico_campos.sql', {'agora': agora})
+    cursor.execute("DROP TABLE temp.historico_reparado")
+    logger.info(f"historico_campos preenchida ({len(linhas)} entradas legadas reparadas)")
+
+
+def _migracao_011_historico_json(cursor):
+    """Grava a forma canônica (reparada) dos textos de alterações legados inválidos.
+
+    Os textos que o ``json`` do Python já aceita ficam de fora, como na leitura.
+    """
+    cursor.execute("""
+        SELECT id, alteracoes FROM historico
+        WHERE alteracoes IS NOT NULL AND alteracoes != '' AND NOT json_valid(alteracoes)
+    """)
+    linhas = []
+    for historico_id, texto in cursor.fetchall():
+        if not isinstance(texto, str):
+            continue
+        try:
+            json.loads(texto)
+            continue
+        except ValueError:
+            pass
+        hash_texto = hashlib.sha1(texto.encode('utf-8')).hexdigest()
+        linhas.append((historico_id, None, None, hash_texto, _reparar_alteracoes(texto)))
+
+    _criar_historico_reparado(cursor, linhas)
+    _executar_script(cursor, '011_historico_json.sql')
+    cursor.execute("DROP TABLE temp.historico_reparado")
+
+
+def _migracao_012_busca_fts(cursor):
+    """Cria o índice FTS5 da busca global e os triggers que o mantêm.
+
+    Sem FTS5 (ou sem o tokenizador trigram, SQLite 3.34+) nada é criado e a
+    busca global continua com LIKE.
+    """
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS registros_fts USING fts5(
+                id, usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente, loc_cliente,
+                container_1, container_2, numero_sm, numero_ae, arquivo, data_registro, status_sm,
+                content='registros', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 indisponível ({e}); a busca global continuará usando LIKE")
+        return
+    _executar_script(cursor, '012_busca_fts.sql')
+
+
+def _migracao_013_identificadores(cursor):
+    """Cria o índice de identificadores normalizados (placa, container, CPF, SM/AE...)."""
+    _executar_script(cursor, '013_identificadores.sql')
+
+
+def _migracao_014_indices_excluido(cursor):
+    """Troca índices que o planejador preferia aos parciais de ``excluido = 0``.
+
+    ``idx_registros_excluido`` (só ``excluido``, quase sempre 0) era escolhido
+    no lugar de ``idx_registros_ativos_status_sm``. Nos filtros em OR
+    (``anexar_nf IS NULL OR anexar_nf = ''``) o SQLite não usa índices parciais
+    em cada ramo e caía em ``idx_registros_ordem_saida (excluido=?)``; os
+    compostos ``(excluido, coluna)`` atendem os dois ramos e cobrem o COUNT.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_registros_excluido")
+    for coluna in ('anexar_nf', 'anexar_os', 'horario_previsto'):
+        cursor.execute(f"DROP INDEX IF EXISTS idx_registros_ativos_{coluna}")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_registros_excluido_{coluna} ON registros (excluido, {coluna})"
+        )
+    cursor.execute("ANALYZE registros")
+
+
+# Lista ordenada de migrações: (versão, descrição, função)
+MIGRACOES = [
+    (1, 'schema base de registros, historico e tabelas auxiliares', _migracao_001_schema_base),
+    (2, 'índices dos predicados quentes de registros, historico, logs e sessões', _migracao_002_indices_predicados_quentes),
+    (3, 'tabela materializada registros_alteracoes_pendentes', _migracao_003_alteracoes_pendentes),
+    (4, 'tabela contadores mantida por triggers', _migracao_004_contadores),
+    (5, 'agregados diários e por hora de registros', _migracao_005_rollups),
+    (6, 'agregados de tempos médios (SLA) por dia', _migracao_006_sla),
+    (7, 'índice da ordem de saída prevista para a paginação do dashboard', _migracao_007_ordem_saida),
+    (8, 'colunas canônicas (ISO) das datas de registros', _migracao_008_datas_iso),
+    (9, 'coluna canônica (epoch) da data das alterações do histórico', _migracao_009_historico_epoch),
+    (10, 'histórico estruturado por campo (historico_campos)', _migracao_010_historico_campos),
+    (11, 'cache das formas canônicas das alterações do histórico', _migracao_011_historico_json),
+    (12, 'índice de texto (FTS5) da busca global', _migracao_012_busca_fts),
+    (13, 'índice de identificadores normalizados de registros', _migracao_013_identificadores),
+    (14, 'índices (excluido, coluna) no lugar dos que ofuscavam os parciais', _migracao_014_indices_excluido),
+]
+
+
+def versao_atual(conn):
+    """Retorna a versão de schema gravada no banco."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes(conn):
+    """Aplica, em ordem, as migrações ainda não aplicadas.
+
+    Cada migração roda em sua própria transação junto com a atualização de
+    ``user_version``; uma falha interrompe o processo sem avançar a versão.
+
+    Returns:
+        int: Versão do schema após as migrações.
+    """
+    versao = versao_atual(conn)
+    for numero, descricao, migracao in MIGRACOES:
+        if numero <= versao:
+            continue
+        logger.info(f"Aplicando migração {numero:03d}: {descricao}")
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            migracao(cursor)
+            # PRAGMA não aceita parâmetros; o número vem da lista acima
+            cursor.execute(f"PRAGMA user_version = {int(numero)}")
+            cursor.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error(f"Erro ao aplicar migração {numero:03d}: {e}")
+            raise
+        versao = numero
+    return versao
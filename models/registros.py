@@ -7,6 +7,21 @@ import os
 # Adiciona o diretório principal ao path para importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.database import get_db_connection
+from utils.paginacao import paginar_keyset, contar_com_cache
+
+# Ordenação das listagens: primeiro os horários previstos futuros mais
+# próximos, depois os passados ou sem horário pela data de registro; o id
+# desempata para a paginação por cursor. Usa as colunas canônicas (_iso) e a
+# hora local, a mesma das datas gravadas pela aplicação
+CHAVE_ORDENACAO_REGISTROS = [
+    "CASE WHEN horario_previsto_iso IS NULL THEN 1 "
+    "WHEN horario_previsto_iso < datetime('now', 'localtime') THEN 2 "
+    "ELSE 0 END",
+    "COALESCE(CASE WHEN horario_previsto_iso IS NULL THEN data_registro_iso "
+    "WHEN horario_previsto_iso < datetime('now', 'localtime') THEN data_registro_iso "
+    "ELSE horario_previsto_iso END, '')",
+    "id",
+]
 
 class Registro:
     @staticmethod
@@ -172,6 +187,45 @@ class Registro:
             print(f"Erro ao realizar exclusão lógica do registro: {e}")
             return False
     
+    @staticmethod
+    def _condicoes_filtros(filters):
+        """
+        Monta as condições SQL dos filtros das listagens
+        
+        Args:
+            filters: Dicionário com filtros a serem aplicados
+            
+        Returns:
+            Tupla (condição WHERE, parâmetros)
+        """
+        where_query = "excluido = 0"
+        params = []
+        filter_conditions = []
+        for campo, valor in (filters or {}).items():
+            # Filtros especiais dos cards
+            if campo == 'sem_nf' and valor:
+                filter_conditions.append("(anexar_nf IS NULL OR anexar_nf = '')")
+            elif campo == 'sem_os' and valor:
+                filter_conditions.append("(anexar_os IS NULL OR anexar_os = '')")
+            elif campo == 'sem_container' and valor:
+                filter_conditions.append("(container_1 IS NULL OR container_1 = '')")
+            elif campo == 'sem_sm' and valor:
+                filter_conditions.append("(numero_sm IS NULL OR numero_sm = '')")
+            elif campo == 'sem_ae' and valor:
+                filter_conditions.append("(numero_ae IS NULL OR numero_ae = '')")
+            elif campo == 'alteracoes_pos_smae' and valor:
+                filter_conditions.append("data_modificacao_iso > data_registro_iso AND (numero_sm IS NOT NULL OR numero_ae IS NOT NULL)")
+            elif campo == 'status_sm' and valor == 'Pendente':
+                filter_conditions.append("(status_sm = 'Pendente' OR status_sm IS NULL OR status_sm = '')")
+            # Filtros regulares
+            elif valor and campo != 'alteracoes_pos_smae':  # Evitar adicionar o parâmetro para filtros especiais
+                filter_conditions.append(f"{campo} = ?")
+                params.append(valor)
+        
+        if filter_conditions:
+            where_query += " AND " + " AND ".join(filter_conditions)
+        return where_query, params
+    
     @staticmethod
     def get_all(limit=100, offset=0, filters=None):
         """
@@ -186,47 +240,9 @@ class Registro:
             Lista de registros
         """
         try:
-            filters = filters or {}
-            base_query = "SELECT * FROM registros WHERE excluido = 0"
-            params = []
-            
-            # Aplicar filtros se existirem
-            if filters:
-                filter_conditions = []
-                for campo, valor in filters.items():
-                    # Filtros especiais dos cards
-                    if campo == 'sem_nf' and valor:
-                        filter_conditions.append("(anexar_nf IS NULL OR anexar_nf = '')")
-                    elif campo == 'sem_os' and valor:
-                        filter_conditions.append("(anexar_os IS NULL OR anexar_os = '')")
-                    elif campo == 'sem_container' and valor:
-                        filter_conditions.append("(container_1 IS NULL OR container_1 = '')")
-                    elif campo == 'sem_sm' and valor:
-                        filter_conditions.append("(numero_sm IS NULL OR numero_sm = '')")
-                    elif campo == 'sem_ae' and valor:
-                        filter_conditions.append("(numero_ae IS NULL OR numero_ae = '')")
-                    elif campo == 'alteracoes_pos_smae' and valor:
-                        filter_conditions.append("data_modificacao > data_registro AND (numero_sm IS NOT NULL OR numero_ae IS NOT NULL)")
-                    elif campo == 'status_sm' and valor == 'Pendente':
-                        filter_conditions.append("(status_sm = 'Pendente' OR status_sm IS NULL OR status_sm = '')")
-                    # Filtros regulares
-                    elif valor and campo != 'alteracoes_pos_smae':  # Evitar adicionar o parâmetro para filtros especiais
-                        filter_conditions.append(f"{campo} = ?")
-                        params.append(valor)
-            
-                if filter_conditions:
-                    base_query += " AND " + " AND ".join(filter_conditions)
-        
-            # Ordenar primeiro por registros com horário previsto futuro mais próximo
-            # Depois por registros com horário previsto passado ou sem horário
-            query = f"{base_query} ORDER BY "
-            query += "CASE WHEN horario_previsto IS NULL OR horario_previsto = '' THEN 1 "
-            query += "WHEN horario_previsto < datetime('now') THEN 2 "
-            query += "ELSE 0 END ASC, "
-            query += "CASE WHEN horario_previsto IS NULL OR horario_previsto = '' THEN data_registro "
-            query += "WHEN horario_previsto < datetime('now') THEN data_registro "
-            query += "ELSE horario_previsto END ASC "
-            query += "LIMIT ? OFFSET ?"
+            where_query, params = Registro._condicoes_filtros(filters)
+            order_by = ", ".join(f"{expr} ASC" for expr in CHAVE_ORDENACAO_REGISTROS)
+            query = f"SELECT * FROM registros WHERE {where_query} ORDER BY {order_by} LIMIT ? OFFSET ?"
             params.extend([limit, offset])
             
             with get_db_connection() as conn:
@@ -239,11 +255,41 @@ class Registro:
             print(f"Erro ao recuperar registros: {e}")
             return []
     
+    @staticmethod
+    def get_pagina(per_page, page=1, filters=None, cursor=None):
+        """
+        Recupera uma página de registros na mesma ordem de get_all
+        
+        Com o cursor recebido da página anterior a consulta começa direto na
+        chave de ordenação, sem OFFSET; sem cursor usa a posição da página.
+        
+        Args:
+            per_page: Quantidade de registros por página
+            page: Número da página (usado quando não há cursor)
+            filters: Dicionário com filtros a serem aplicados
+            cursor: Token de paginação (cursor_anterior/cursor_proximo)
+            
+        Returns:
+            Tupla (registros, cursor_anterior, cursor_proximo)
+        """
+        try:
+            where_query, params = Registro._condicoes_filtros(filters)
+            with get_db_connection() as conn:
+                return paginar_keyset(
+                    conn.cursor(), "*", "registros", where_query, params,
+                    CHAVE_ORDENACAO_REGISTROS, cursor, page, per_page, descendente=False
+                )
+        except Exception as e:
+            print(f"Erro ao recuperar página de registros: {e}")
+            return [], None, None
+    
     @staticmethod
     def count(filters=None):
         """
         Conta o número total de registros com filtros opcionais
         
+        O total fica em cache por alguns segundos (utils.paginacao).
+        
         Args:
             filters: Dicionário com filtros a serem aplicados
             
@@ -251,41 +297,9 @@ class Registro:
             Número total de registros
         """
         try:
-            base_query = "SELECT COUNT(*) FROM registros WHERE excluido = 0"
-            params = []
-            
-            # Aplicar filtros se existirem
-            if filters:
-                filter_conditions = []
-                for campo, valor in filters.items():
-                    # Filtros especiais dos cards
-                    if campo == 'sem_nf' and valor:
-                        filter_conditions.append("(arquivo IS NULL OR arquivo = '')")
-                    elif campo == 'sem_os' and valor:
-                        filter_conditions.append("(numero_ae IS NULL OR numero_ae = '')")
-                    elif campo == 'sem_container' and valor:
-                        filter_conditions.append("(container_1 IS NULL OR container_1 = '')")
-                    elif campo == 'sem_sm' and valor:
-                        filter_conditions.append("(numero_sm IS NULL OR numero_sm = '')")
-                    elif campo == 'sem_ae' and valor:
-                        filter_conditions.append("(numero_ae IS NULL OR numero_ae = '')")
-                    elif campo == 'alteracoes_pos_smae' and valor:
-                        filter_conditions.append("data_modificacao > data_registro AND (numero_sm IS NOT NULL OR numero_ae IS NOT NULL)")
-                    elif campo == 'status_sm' and valor == 'Pendente':
-                        filter_conditions.append("(status_sm = 'Pendente' OR status_sm IS NULL OR status_sm = '')")
-                    # Filtros regulares
-                    elif valor and campo != 'alteracoes_pos_smae':  # Evitar adicionar o parâmetro para filtros especiais
-                        filter_conditions.append(f"{campo} = ?")
-                        params.append(valor)
-                
-                if filter_conditions:
-                    base_query += " AND " + " AND ".join(filter_conditions)
-            
+            where_query, params = Registro._condicoes_filtros(filters)
             with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(base_query, params)
-                count = cursor.fetchone()[0]
-                return count
+                return contar_com_cache(conn.cursor(), f"SELECT COUNT(*) FROM registros WHERE {where_query}", params)
                 
         except Exception as e:
             print(f"Erro ao contar registros: {e}")
@@ -0,0 +1,452 @@
+"""
+Agregados diários e por hora dos registros para o dashboard da GR.
+
+``registros_rollup_dia`` guarda, por dia de ``data_registro``, o total de
+registros ativos, quantos têm SM ou AE e quantos foram criados entre 6h e 8h
+do próprio dia da saída prevista (mapa de registros tardios).
+``registros_rollup_hora`` guarda o total por dia e hora (mapa de calor).
+
+As tabelas são mantidas por triggers em ``registros`` e o dashboard lê apenas
+o intervalo de dias pedido. Dias, horas e tempos vêm das colunas canônicas
+``_iso`` (models/datas_iso.py), então todos os formatos de data gravados
+entram nos agregados; registros sem data reconhecível ficam de fora.
+
+``registros_sla_dia`` guarda contagem, soma e soma dos quadrados (para a
+variância) dos tempos de AE, SM, tempo hábil, início e conclusão, agrupados
+pelo dia de ``data_registro`` e de ``data_modificacao`` ('' quando não há
+data). O filtro do dashboard (registro ou modificação no intervalo de dias)
+vira uma soma sobre poucas linhas.
+
+``reconstruir_rollups`` refaz tudo a partir de ``registros`` (ver
+scripts/reconstruir_rollups.py).
+"""
+
+import logging
+
+from utils.date_utils import normalizar_data_iso
+
+logger = logging.getLogger(__name__)
+
+TABLE_ROLLUP_DIA = 'registros_rollup_dia'
+TABLE_ROLLUP_HORA = 'registros_rollup_hora'
+TABLE_SLA_DIA = 'registros_sla_dia'
+
+# Colunas de registros que alteram os agregados; as colunas ``_iso`` são
+# atualizadas pelos triggers de models/datas_iso.py, o que dispara estes
+COLUNAS_ROLLUP = ['data_registro_iso', 'excluido', 'numero_sm', 'numero_ae', 'horario_previsto_iso']
+COLUNAS_SLA = [
+    'data_registro_iso', 'data_modificacao_iso', 'excluido', 'data_ae_iso', 'data_sm_iso',
+    'horario_previsto_iso', 'on_time_cliente_iso',
+]
+
+TRIGGERS_ROLLUP = [
+    'rollup_registros_insert',
+    'rollup_registros_update_antes',
+    'rollup_registros_update_depois',
+    'rollup_registros_delete',
+    'sla_registros_insert',
+    'sla_registros_update_antes',
+    'sla_registros_update_depois',
+    'sla_registros_delete',
+]
+
+# Expressões sobre uma linha de registros; {r} é o alias (r, NEW ou OLD)
+EXPR_DIA = "substr({r}.data_registro_iso, 1, 10)"
+EXPR_HORA = "CAST(substr({r}.data_registro_iso, 12, 2) AS INTEGER)"
+EXPR_COM_SM_AE = (
+    "CASE WHEN ({r}.numero_sm IS NOT NULL AND {r}.numero_sm != '') "
+    "OR ({r}.numero_ae IS NOT NULL AND {r}.numero_ae != '') THEN 1 ELSE 0 END"
+)
+EXPR_TARDIO = (
+    "CASE WHEN {r}.horario_previsto_iso IS NOT NULL "
+    "AND substr({r}.data_registro_iso, 1, 10) = substr({r}.horario_previsto_iso, 1, 10) "
+    "AND substr({r}.data_registro_iso, 12, 2) IN ('06', '07', '08') THEN 1 ELSE 0 END"
+)
+# A linha entra nos agregados se está ativa e tem data de registro
+EXPR_PARTICIPA = "{r}.excluido = 0 AND {r}.data_registro_iso IS NOT NULL"
+
+# Chave de dia de uma coluna de data ('' sem data) para o filtro do dashboard
+EXPR_CHAVE_DIA = "COALESCE(substr({r}.{coluna}_iso, 1, 10), '')"
+
+# Base dos tempos: última modificação, se posterior ao registro, ou o registro
+EXPR_BASE_SLA = (
+    "CASE WHEN {r}.data_modificacao_iso > {r}.data_registro_iso "
+    "THEN julianday({r}.data_modificacao_iso) ELSE julianday({r}.data_registro_iso) END"
+)
+
+# Métricas de tempo (em dias): (valor, condição para entrar na média)
+METRICAS_SLA = {
+    # Tempo até a AE / SM, só tempos positivos
+    'ae': (
+        "julianday({r}.data_ae_iso) - " + EXPR_BASE_SLA,
+        "{r}.data_ae_iso IS NOT NULL AND {r}.data_registro_iso IS NOT NULL "
+        "AND julianday({r}.data_ae_iso) > " + EXPR_BASE_SLA,
+    ),
+    'sm': (
+        "julianday({r}.data_sm_iso) - " + EXPR_BASE_SLA,
+        "{r}.data_sm_iso IS NOT NULL AND {r}.data_registro_iso IS NOT NULL "
+        "AND julianday({r}.data_sm_iso) > " + EXPR_BASE_SLA,
+    ),
+    # Tempo hábil para criação da SM (até o horário previsto)
+    'habil': (
+        "julianday({r}.horario_previsto_iso) - " + EXPR_BASE_SLA,
+        "{r}.horario_previsto_iso IS NOT NULL AND {r}.data_registro_iso IS NOT NULL",
+    ),
+    # Tempos médios do ambiente GR (calcular_tempos_medios)
+    'inicio': (
+        "julianday({r}.horario_previsto_iso) - julianday({r}.data_registro_iso)",
+        "{r}.horario_previsto_iso IS NOT NULL AND {r}.data_registro_iso IS NOT NULL",
+    ),
+    'conclusao': (
+        "julianday({r}.on_time_cliente_iso) - julianday({r}.horario_previsto_iso)",
+        "{r}.on_time_cliente_iso IS NOT NULL AND {r}.horario_previsto_iso IS NOT NULL",
+    ),
+}
+
+# Limites usados quando o filtro de dias não tem início ou fim válido
+DIA_MINIMO = '0001-01-01'
+DIA_MAXIMO = '9999-12-31'
+
+
+def _limites_dia(data_inicio, data_fim):
+    """Converte os limites do filtro (qualquer formato de data) em dias 'YYYY-MM-DD'.
+
+    Um limite vazio ou não reconhecido deixa aquele lado do intervalo aberto.
+    """
+    limites = []
+    for valor, padrao in ((data_inicio, DIA_MINIMO), (data_fim, DIA_MAXIMO)):
+        normalizada = normalizar_data_iso(valor)
+        if normalizada is None and valor:
+            logger.warning(f"Data de filtro não reconhecida, intervalo aberto: {valor}")
+        limites.append(normalizada[:10] if normalizada else padrao)
+    return tuple(limites)
+
+
+def _colunas_sla():
+    """Nomes das colunas de agregados de cada métrica (n, soma, soma dos quadrados)."""
+    return [f"{metrica}_{sufixo}" for metrica in METRICAS_SLA for sufixo in ('n', 'soma', 'soma_q')]
+
+
+def _expr_valores_sla(r):
+    """Expressões (n, valor, valor²) de cada métrica para a linha ``r``."""
+    expressoes = []
+    for valor, condicao in METRICAS_SLA.values():
+        valor = valor.format(r=r)
+        entra = f"({condicao.format(r=r)}) AND ({valor}) IS NOT NULL"
+        expressoes.append(f"CASE WHEN {entra} THEN 1 ELSE 0 END")
+        expressoes.append(f"CASE WHEN {entra} THEN {valor} ELSE 0.0 END")
+        expressoes.append(f"CASE WHEN {entra} THEN ({valor}) * ({valor}) ELSE 0.0 END")
+    return expressoes
+
+
+def _chaves_sla(r):
+    return (
+        EXPR_CHAVE_DIA.format(r=r, coluna='data_registro'),
+        EXPR_CHAVE_DIA.format(r=r, coluna='data_modificacao'),
+    )
+
+
+def sql_criar_tabelas_rollup():
+    colunas_sla = ",\n    ".join(
+        f"{nome} INTEGER NOT NULL DEFAULT 0" if nome.endswith('_n') else f"{nome} REAL NOT NULL DEFAULT 0"
+        for nome in _colunas_sla()
+    )
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {TABLE_ROLLUP_DIA} (
+    dia TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    com_sm_ae INTEGER NOT NULL DEFAULT 0,
+    tardios INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID""",
+        f"""CREATE TABLE IF NOT EXISTS {TABLE_ROLLUP_HORA} (
+    dia TEXT NOT NULL,
+    hora INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, hora)
+) WITHOUT ROWID""",
+        f"""CREATE TABLE IF NOT EXISTS {TABLE_SLA_DIA} (
+    dia_registro TEXT NOT NULL,
+    dia_modificacao TEXT NOT NULL,
+    linhas INTEGER NOT NULL DEFAULT 0,
+    {colunas_sla},
+    PRIMARY KEY (dia_registro, dia_modificacao)
+) WITHOUT ROWID""",
+        f"CREATE INDEX IF NOT EXISTS idx_{TABLE_SLA_DIA}_modificacao ON {TABLE_SLA_DIA} (dia_modificacao)",
+    ]
+
+
+def _sql_somar(sinal, r):
+    """Soma (sinal '+') ou subtrai ('-') a linha ``r`` (NEW/OLD) dos agregados."""
+    dia = EXPR_DIA.format(r=r)
+    hora = EXPR_HORA.format(r=r)
+    return f"""    INSERT INTO {TABLE_ROLLUP_DIA} (dia, total, com_sm_ae, tardios)
+    VALUES ({dia}, {sinal}1, {sinal}({EXPR_COM_SM_AE.format(r=r)}), {sinal}({EXPR_TARDIO.format(r=r)}))
+    ON CONFLICT (dia) DO UPDATE SET
+        total = total + excluded.total,
+        com_sm_ae = com_sm_ae + excluded.com_sm_ae,
+        tardios = tardios + excluded.tardios;
+    INSERT INTO {TABLE_ROLLUP_HORA} (dia, hora, total)
+    VALUES ({dia}, {hora}, {sinal}1)
+    ON CONFLICT (dia, hora) DO UPDATE SET total = total + excluded.total;
+    DELETE FROM {TABLE_ROLLUP_DIA} WHERE dia = {dia} AND total = 0;
+    DELETE FROM {TABLE_ROLLUP_HORA} WHERE dia = {dia} AND hora = {hora} AND total = 0;
+"""
+
+
+def _sql_somar_sla(sinal, r):
+    """Soma (sinal '+') ou subtrai ('-') os tempos da linha ``r`` (NEW/OLD)."""
+    dia_registro, dia_modificacao = _chaves_sla(r)
+    colunas = ["linhas"] + _colunas_sla()
+    valores = ["1"] + _expr_valores_sla(r)
+    atualizacoes = ",\n        ".join(f"{c} = {c} + excluded.{c}" for c in colunas)
+    return f"""    INSERT INTO {TABLE_SLA_DIA} (dia_registro, dia_modificacao, {', '.join(colunas)})
+    VALUES ({dia_registro}, {dia_modificacao}, {', '.join(f"{sinal}({v})" for v in valores)})
+    ON CONFLICT (dia_registro, dia_modificacao) DO UPDATE SET
+        {atualizacoes};
+    DELETE FROM {TABLE_SLA_DIA}
+    WHERE dia_registro = {dia_registro} AND dia_modificacao = {dia_modificacao} AND linhas = 0;
+"""
+
+
+def sql_triggers_rollup():
+    """Gera o SQL dos triggers que mantêm as tabelas de agregados."""
+    colunas = ", ".join(COLUNAS_ROLLUP)
+    colunas_sla = ", ".join(COLUNAS_SLA)
+    return [
+        f"""CREATE TRIGGER rollup_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN {EXPR_PARTICIPA.format(r='NEW')}
+BEGIN
+{_sql_somar('+', 'NEW')}END""",
+        f"""CREATE TRIGGER rollup_registros_update_antes
+AFTER UPDATE OF {colunas} ON registros
+FOR EACH ROW WHEN {EXPR_PARTICIPA.format(r='OLD')}
+BEGIN
+{_sql_somar('-', 'OLD')}END""",
+        f"""CREATE TRIGGER rollup_registros_update_depois
+AFTER UPDATE OF {colunas} ON registros
+FOR EACH ROW WHEN {EXPR_PARTICIPA.format(r='NEW')}
+BEGIN
+{_sql_somar('+', 'NEW')}END""",
+        f"""CREATE TRIGGER rollup_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW WHEN {EXPR_PARTICIPA.format(r='OLD')}
+BEGIN
+{_sql_somar('-', 'OLD')}END""",
+        # Tempos (SLA): todas as linhas ativas, com ou sem data interpretável
+        f"""CREATE TRIGGER sla_registros_insert
+AFTER INSERT ON registros
+FOR EACH ROW WHEN NEW.excluido = 0
+BEGIN
+{_sql_somar_sla('+', 'NEW')}END""",
+        f"""CREATE TRIGGER sla_registros_update_antes
+AFTER UPDATE OF {colunas_sla} ON registros
+FOR EACH ROW WHEN OLD.excluido = 0
+BEGIN
+{_sql_somar_sla('-', 'OLD')}END""",
+        f"""CREATE TRIGGER sla_registros_update_depois
+AFTER UPDATE OF {colunas_sla} ON registros
+FOR EACH ROW WHEN NEW.excluido = 0
+BEGIN
+{_sql_somar_sla('+', 'NEW')}END""",
+        f"""CREATE TRIGGER sla_registros_delete
+AFTER DELETE ON registros
+FOR EACH ROW WHEN OLD.excluido = 0
+BEGIN
+{_sql_somar_sla('-', 'OLD')}END""",
+    ]
+
+
+def _sql_recontagem_dia():
+    return f"""
+        SELECT {EXPR_DIA.format(r='r')} AS dia, COUNT(*),
+               SUM({EXPR_COM_SM_AE.format(r='r')}), SUM({EXPR_TARDIO.format(r='r')})
+        FROM registros r
+        WHERE {EXPR_PARTICIPA.format(r='r')}
+        GROUP BY dia
+    """
+
+
+def _sql_recontagem_hora():
+    return f"""
+        SELECT {EXPR_DIA.format(r='r')} AS dia, {EXPR_HORA.format(r='r')} AS hora, COUNT(*)
+        FROM registros r
+        WHERE {EXPR_PARTICIPA.format(r='r')}
+        GROUP BY dia, hora
+    """
+
+
+def _sql_recontagem_sla():
+    dia_registro, dia_modificacao = _chaves_sla('r')
+    somas = ", ".join(f"SUM({expr})" for expr in _expr_valores_sla('r'))
+    return f"""
+        SELECT {dia_registro} AS chave_registro, {dia_modificacao} AS chave_modificacao, COUNT(*), {somas}
+        FROM registros r
+        WHERE r.excluido = 0
+        GROUP BY chave_registro, chave_modificacao
+    """
+
+
+def reconstruir_rollups(cursor):
+    """Recalcula os agregados a partir de registros (backfill). Não faz commit.
+
+    Returns:
+        dict: {'dias', 'horas', 'sla'} com o número de linhas geradas em cada tabela
+    """
+    cursor.execute(f"DELETE FROM {TABLE_ROLLUP_DIA}")
+    cursor.execute(f"DELETE FROM {TABLE_ROLLUP_HORA}")
+    cursor.execute(f"DELETE FROM {TABLE_SLA_DIA}")
+    cursor.execute(f"INSERT INTO {TABLE_ROLLUP_DIA} (dia, total, com_sm_ae, tardios) {_sql_recontagem_dia()}")
+    dias = cursor.rowcount
+    cursor.execute(f"INSERT INTO {TABLE_ROLLUP_HORA} (dia, hora, total) {_sql_recontagem_hora()}")
+    horas = cursor.rowcount
+    cursor.execute(f"""
+        INSERT INTO {TABLE_SLA_DIA} (dia_registro, dia_modificacao, linhas, {', '.join(_colunas_sla())})
+        {_sql_recontagem_sla()}
+    """)
+    return {'dias': dias, 'horas': horas, 'sla': cursor.rowcount}
+
+
+def criar_tabelas_rollup(cursor):
+    """Cria as tabelas de agregados (sem triggers nem backfill)."""
+    for sql in sql_criar_tabelas_rollup():
+        cursor.execute(sql)
+
+
+def aplicar_triggers_rollup(cursor):
+    """(Re)cria as tabelas e os triggers e faz o backfill.
+
+    Requer as colunas canônicas de data (models/datas_iso.py). Deve rodar
+    dentro de uma transação para que nenhuma escrita fique de fora entre o
+    backfill e a criação dos triggers.
+    """
+    criar_tabelas_rollup(cursor)
+    for nome in TRIGGERS_ROLLUP:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    for sql in sql_triggers_rollup():
+        cursor.execute(sql)
+    return reconstruir_rollups(cursor)
+
+
+def verificar_rollups(cursor):
+    """Compara as tabelas de agregados com uma recontagem completa.
+
+    Returns:
+        list: Divergências no formato (tabela, chave, valor_tabela, valor_recontado)
+    """
+    divergencias = []
+    consultas = (
+        (TABLE_ROLLUP_DIA, _sql_recontagem_dia(),
+         f"SELECT dia, total, com_sm_ae, tardios FROM {TABLE_ROLLUP_DIA}", 1),
+        (TABLE_ROLLUP_HORA, _sql_recontagem_hora(),
+         f"SELECT dia, hora, total FROM {TABLE_ROLLUP_HORA}", 2),
+        (TABLE_SLA_DIA, _sql_recontagem_sla(),
+         f"SELECT dia_registro, dia_modificacao, linhas, {', '.join(_colunas_sla())} FROM {TABLE_SLA_DIA}", 2),
+    )
+    for tabela, sql_recontagem, sql_tabela, tamanho_chave in consultas:
+        cursor.execute(sql_recontagem)
+        recontagem = {tuple(l[:tamanho_chave]): tuple(l[tamanho_chave:]) for l in cursor.fetchall()}
+        cursor.execute(sql_tabela)
+        atual = {tuple(l[:tamanho_chave]): tuple(l[tamanho_chave:]) for l in cursor.fetchall()}
+        for chave in sorted(set(recontagem) | set(atual)):
+            if not _valores_iguais(recontagem.get(chave), atual.get(chave)):
+                divergencias.append((tabela, chave, atual.get(chave), recontagem.get(chave)))
+    return divergencias
+
+
+def _valores_iguais(a, b):
+    """Compara linhas de agregados.
+
+    Contagens são exatas; somas de tempos (REAL) acumulam erro de arredondamento
+    a cada soma/subtração (maior com datas absurdas, de milhares de dias), por
+    isso admitem uma pequena diferença relativa. A reconstrução zera o erro.
+    """
+    if a is None or b is None:
+        return a == b
+    return len(a) == len(b) and all(
+        x == y if isinstance(x, int) and isinstance(y, int) else abs(x - y) <= max(1e-2, 1e-4 * max(abs(x), abs(y)))
+        for x, y in zip(a, b)
+    )
+
+
+def totais_por_dia(cursor, data_inicio, data_fim):
+    """Total de registros e total com SM/AE de cada dia do intervalo.
+
+    Returns:
+        dict: {'YYYY-MM-DD': (total, com_sm_ae)}; dias sem registros não aparecem
+    """
+    cursor.execute(f"""
+        SELECT dia, total, com_sm_ae FROM {TABLE_ROLLUP_DIA}
+        WHERE dia BETWEEN ? AND ?
+    """, _limites_dia(data_inicio, data_fim))
+    return {linha[0]: (linha[1], linha[2]) for linha in cursor.fetchall()}
+
+
+def mapa_calor_horas(cursor, data_inicio, data_fim):
+    """Registros por dia da semana e hora no intervalo.
+
+    Returns:
+        list: Matriz 7x24 (0 = segunda)
+    """
+    mapa = [[0 for _ in range(24)] for _ in range(7)]
+    cursor.execute(f"""
+        SELECT strftime('%w', dia) AS dia_semana, hora, SUM(total)
+        FROM {TABLE_ROLLUP_HORA}
+        WHERE dia BETWEEN ? AND ?
+        GROUP BY dia_semana, hora
+    """, _limites_dia(data_inicio, data_fim))
+    for dia_semana, hora, total in cursor.fetchall():
+        # Converter de 0=domingo para 0=segunda
+        mapa[(int(dia_semana) - 1) % 7][hora] = total
+    return mapa
+
+
+def mapa_calor_tardios(cursor, data_inicio, data_fim):
+    """Registros criados entre 6h e 8h do dia da saída prevista, por dia da semana.
+
+    Returns:
+        list: 7 totais (0 = segunda)
+    """
+    mapa = [0 for _ in range(7)]
+    cursor.execute(f"""
+        SELECT strftime('%w', dia) AS dia_semana, SUM(tardios)
+        FROM {TABLE_ROLLUP_DIA}
+        WHERE dia BETWEEN ? AND ?
+        GROUP BY dia_semana
+    """, _limites_dia(data_inicio, data_fim))
+    for dia_semana, total in cursor.fetchall():
+        mapa[(int(dia_semana) - 1) % 7] = total
+    return mapa
+
+
+def estatisticas_sla(cursor, metrica, data_inicio=None, data_fim=None):
+    """Média e desvio padrão (em dias) de uma métrica de METRICAS_SLA.
+
+    Sem intervalo considera todos os registros ativos. Com intervalo aplica o
+    filtro do dashboard: dia de registro ou de modificação dentro do intervalo
+    (limites em qualquer formato aceito por normalizar_data_iso).
+
+    Returns:
+        dict: {'n', 'media', 'desvio_padrao'}; media/desvio_padrao são None sem dados
+    """
+    if metrica not in METRICAS_SLA:
+        raise ValueError(f"Métrica de SLA desconhecida: {metrica}")
+    if data_inicio is None or data_fim is None:
+        cursor.execute(f"""
+            SELECT SUM({metrica}_n), SUM({metrica}_soma), SUM({metrica}_soma_q)
+            FROM {TABLE_SLA_DIA}
+        """)
+    else:
+        inicio, fim = _limites_dia(data_inicio, data_fim)
+        cursor.execute(f"""
+            SELECT SUM({metrica}_n), SUM({metrica}_soma), SUM({metrica}_soma_q)
+            FROM {TABLE_SLA_DIA}
+            WHERE dia_registro BETWEEN ? AND ? OR dia_modificacao BETWEEN ? AND ?
+        """, (inicio, fim, inicio, fim))
+
+    n, soma, soma_q = cursor.fetchone()
+    if not n:
+        return {'n': 0, 'media': None, 'desvio_padrao': None}
+    media = soma / n
+    variancia = max(soma_q / n - media * media, 0.0)
+    return {'n': n, 'media': media, 'desvio_padrao': variancia ** 0.5}
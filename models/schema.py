@@ -0,0 +1,102 @@
+"""
+Registro em memória do schema do banco.
+
+O schema é levado à versão mais recente uma única vez (``inicializar_schema``,
+chamado por ``init_db`` no boot) e depois fotografado em um objeto imutável.
+Os caminhos quentes consultam esse objeto em vez de executar
+``PRAGMA table_info`` ou ``SELECT ... FROM sqlite_master`` a cada requisição.
+"""
+
+import threading
+import logging
+from types import MappingProxyType
+
+from models.database import get_db_connection
+from models.migrations import aplicar_migracoes
+
+logger = logging.getLogger(__name__)
+
+
+class Schema:
+    """Fotografia imutável das tabelas, colunas e índices do banco."""
+
+    __slots__ = ('versao', '_tabelas', '_conjuntos', 'indices')
+
+    def __init__(self, versao, tabelas, indices):
+        object.__setattr__(self, 'versao', versao)
+        object.__setattr__(self, '_tabelas', MappingProxyType(
+            {nome: tuple(colunas) for nome, colunas in tabelas.items()}
+        ))
+        object.__setattr__(self, '_conjuntos', MappingProxyType(
+            {nome: frozenset(colunas) for nome, colunas in tabelas.items()}
+        ))
+        object.__setattr__(self, 'indices', frozenset(indices))
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Schema é imutável; use recarregar_schema()")
+
+    @property
+    def tabelas(self):
+        return frozenset(self._tabelas)
+
+    def tem_tabela(self, tabela):
+        return tabela in self._tabelas
+
+    def colunas(self, tabela):
+        """Colunas da tabela na ordem do banco (tupla vazia se não existir)."""
+        return self._tabelas.get(tabela, ())
+
+    def tem_coluna(self, tabela, coluna):
+        return coluna in self._conjuntos.get(tabela, ())
+
+    def tem_indice(self, indice):
+        return indice in self.indices
+
+    def __repr__(self):
+        return f"<Schema v{self.versao}: {len(self._tabelas)} tabelas, {len(self.indices)} índices>"
+
+
+_schema = None
+_schema_lock = threading.Lock()
+
+
+def _ler_schema(conn):
+    cursor = conn.cursor()
+    versao = cursor.execute("PRAGMA user_version").fetchone()[0]
+    cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
+    nomes = [row[0] for row in cursor.fetchall()]
+    tabelas = {}
+    for nome in nomes:
+        cursor.execute(f'PRAGMA table_info("{nome}")')
+        tabelas[nome] = [col[1] for col in cursor.fetchall()]
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    indices = [row[0] for row in cursor.fetchall()]
+    return Schema(versao, tabelas, indices)
+
+
+def inicializar_schema():
+    """Aplica as migrações pendentes e carrega o schema em memória."""
+    global _schema
+    with _schema_lock:
+        with get_db_connection() as conn:
+            aplicar_migracoes(conn)
+            _schema = _ler_schema(conn)
+        logger.info(f"Schema carregado: {_schema!r}")
+        return _schema
+
+
+def recarregar_schema():
+    """Relê o schema do banco (após DDL executado fora das migrações)."""
+    global _schema
+    with _schema_lock:
+        with get_db_connection() as conn:
+            _schema = _ler_schema(conn)
+        return _schema
+
+
+def get_schema():
+    """Retorna o schema em memória, inicializando-o no primeiro acesso."""
+    schema = _schema
+    if schema is None:
+        schema = inicializar_schema()
+    return schema
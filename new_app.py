@@ -211,6 +211,9 @@ def index():
 # Inicialização do banco de dados
 init_db()
 
+# Revalidação da planilha do OneDrive em segundo plano
+excel_processor.iniciar_atualizacao()
+
 # Executar a aplicação
 if __name__ == '__main__':
     app.run(debug=DEBUG, host=HOST, port=PORT)
\ No newline at end of file
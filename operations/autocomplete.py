@@ -0,0 +1,249 @@
+"""
+Autocompletar de motorista, placa, carreta e cliente por prefixo.
+
+Os formulários de registro traziam embutidas as listas completas de
+motoristas, placas e carretas da planilha (e os mapas MOTORISTA -> CPF e de
+placas), então o tamanho da página e o tempo de renderização cresciam com a
+frota. Agora a página só traz os valores já escolhidos e as opções vêm de
+/comum/api/autocomplete/<campo>?q=, respondidas por índices em memória: listas
+ordenadas de chaves normalizadas (sem acentos, minúsculas) em que a busca por
+prefixo é um ``bisect`` e devolve no máximo ``limite`` itens.
+
+Cada valor entra no índice pelo início do texto e pelo início de cada palavra
+("silva" encontra "JOSE SILVA", depois dos que começam com o termo); placas e
+carretas são comparadas sem espaços nem pontuação ("abc1d" encontra
+"ABC-1D23").
+
+Os índices da planilha são refeitos quando o ExcelProcessor troca o estado
+(nova versão baixada ou cache carregado). O de clientes vem de
+``SELECT DISTINCT cliente FROM registros`` e é refeito depois de escritas em
+registros neste processo (``versao_alteracoes`` do notificador) ou a cada
+TEMPO_CACHE_CLIENTES segundos, para pegar as escritas de outros processos.
+"""
+
+import time
+import bisect
+import logging
+import threading
+import unicodedata
+
+from models.database import get_db_connection
+from utils.notificador import versao_alteracoes
+from operations.excel import excel_processor
+
+logger = logging.getLogger(__name__)
+
+# Campos atendidos por /api/autocomplete/<campo>
+CAMPOS_AUTOCOMPLETE = ('motorista', 'placa', 'carreta', 'cliente')
+
+# Itens devolvidos por busca (padrão e máximo aceito em ?limite=)
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 50
+
+# Tempo (segundos) até reler os clientes de registros mesmo sem escritas vistas
+TEMPO_CACHE_CLIENTES = 300
+
+# Maior que qualquer caractere das chaves: limite superior da busca por prefixo
+_FIM_PREFIXO = '\U0010ffff'
+
+_lock = threading.Lock()
+_indices = {}
+_fonte_planilha = None  # EstadoPlanilha a partir do qual os índices foram montados
+_versao_clientes = None  # (versao_alteracoes, time.time()) da última leitura dos clientes
+
+
+def normalizar(texto, compacto=False):
+    """Chave de comparação: sem acentos, minúsculas e pontuação trocada por espaço.
+
+    Args:
+        texto: Valor ou termo buscado
+        compacto: Remove também os espaços (placas e carretas)
+    """
+    texto = str(texto)
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto)
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = texto.casefold()
+    if compacto:
+        return ''.join(c for c in texto if c.isalnum())
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in texto).split())
+
+
+class IndicePrefixo:
+    """Itens ordenados pela chave normalizada, para busca por prefixo com bisect."""
+
+    def __init__(self, itens, compacto=False):
+        """
+        Args:
+            itens: Dicionários com 'valor' (texto exibido) e os dados extras do campo
+            compacto: Chaves sem espaços nem pontuação (ver ``normalizar``)
+        """
+        self.compacto = compacto
+        self.itens = []
+        inicios = []  # (chave do texto inteiro, posição do item)
+        palavras = []  # (chave a partir da 2ª, 3ª... palavra, posição do item)
+        vistos = set()
+        for item in itens:
+            valor = item['valor']
+            if not valor or valor in vistos:
+                continue
+            chave = normalizar(valor, compacto)
+            if not chave:
+                continue
+            vistos.add(valor)
+            posicao = len(self.itens)
+            self.itens.append(item)
+            inicios.append((chave, posicao))
+            if not compacto:
+                partes = chave.split(' ')
+                for i in range(1, len(partes)):
+                    palavras.append((' '.join(partes[i:]), posicao))
+
+        inicios.sort()
+        palavras.sort()
+        self._chaves_inicio = [chave for chave, _ in inicios]
+        self._posicoes_inicio = [posicao for _, posicao in inicios]
+        self._chaves_palavra = [chave for chave, _ in palavras]
+        self._posicoes_palavra = [posicao for _, posicao in palavras]
+
+    def __len__(self):
+        return len(self.itens)
+
+    def buscar(self, termo, limite=LIMITE_PADRAO):
+        """Itens cujo texto (ou alguma palavra dele) começa com ``termo``.
+
+        Os que começam com o termo vêm primeiro, cada grupo em ordem alfabética.
+        """
+        prefixo = normalizar(termo, self.compacto)
+        if not prefixo or limite <= 0:
+            return []
+
+        resultado = []
+        vistos = set()
+        for chaves, posicoes in ((self._chaves_inicio, self._posicoes_inicio),
+                                 (self._chaves_palavra, self._posicoes_palavra)):
+            inicio = bisect.bisect_left(chaves, prefixo)
+            fim = bisect.bisect_left(chaves, prefixo + _FIM_PREFIXO, inicio)
+            for i in range(inicio, fim):
+                posicao = posicoes[i]
+                if posicao in vistos:
+                    continue
+                vistos.add(posicao)
+                resultado.append(self.itens[posicao])
+                if len(resultado) >= limite:
+                    return resultado
+        return resultado
+
+
+def item_motorista(nome, estado):
+    return {'valor': nome, 'cpf': estado.MOTORISTA_CPF_MAP.get(nome, '')}
+
+
+def item_placa(placa, estado):
+    dados = estado.PLACA_MAP.get(placa, {})
+    motorista = dados.get('motorista', '')
+    return {
+        'valor': placa,
+        'motorista': motorista,
+        'cpf': estado.MOTORISTA_CPF_MAP.get(motorista, '') if motorista else '',
+        'carreta': dados.get('carreta', ''),
+    }
+
+
+def item_carreta(carreta, estado):
+    placa = estado.CARRETA_PLACA_MAP.get(carreta, '')
+    item = item_placa(placa, estado) if placa else {'motorista': '', 'cpf': ''}
+    return {'valor': carreta, 'placa': placa, 'motorista': item['motorista'], 'cpf': item['cpf']}
+
+
+def indices_planilha(estado):
+    """Monta os índices de motorista, placa e carreta a partir de um EstadoPlanilha."""
+    opcoes = estado.COMBOBOX_OPTIONS or {}
+    return {
+        'motorista': IndicePrefixo(item_motorista(nome, estado) for nome in opcoes.get('MOTORISTA', [])),
+        'placa': IndicePrefixo((item_placa(placa, estado) for placa in opcoes.get('CAVALO', [])), compacto=True),
+        'carreta': IndicePrefixo((item_carreta(carreta, estado) for carreta in opcoes.get('CARRETAS', [])),
+                                 compacto=True),
+    }
+
+
+def indice_clientes(cursor):
+    """Monta o índice de clientes com os valores distintos de registros não excluídos."""
+    cursor.execute("""
+        SELECT DISTINCT TRIM(cliente) FROM registros
+        WHERE excluido = 0 AND cliente IS NOT NULL AND TRIM(cliente) != ''
+    """)
+    return IndicePrefixo({'valor': linha[0]} for linha in cursor.fetchall())
+
+
+def _indice(campo):
+    """Índice atual do campo, refeito antes se os dados de origem mudaram."""
+    global _fonte_planilha, _versao_clientes
+
+    if campo == 'cliente':
+        versao = versao_alteracoes()
+        atual = _versao_clientes
+        if atual is None or atual[0] != versao or time.time() - atual[1] > TEMPO_CACHE_CLIENTES:
+            with _lock:
+                if _versao_clientes is atual:
+                    inicio = time.perf_counter()
+                    with get_db_connection() as conn:
+                        _indices['cliente'] = indice_clientes(conn.cursor())
+                    _versao_clientes = (versao, time.time())
+                    logger.info(f"Índice de clientes refeito: {len(_indices['cliente'])} valores "
+                                f"em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return _indices['cliente']
+
+    fonte = excel_processor.estado
+    atual = _fonte_planilha
+    if fonte is not atual:
+        with _lock:
+            if _fonte_planilha is atual:
+                inicio = time.perf_counter()
+                _indices.update(indices_planilha(fonte))
+                _fonte_planilha = fonte
+                logger.info(f"Índices da planilha refeitos: {len(_indices['motorista'])} motoristas, "
+                            f"{len(_indices['placa'])} placas, {len(_indices['carreta'])} carretas "
+                            f"em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return _indices[campo]
+
+
+def buscar(campo, termo, limite=LIMITE_PADRAO):
+    """Opções do campo que começam com ``termo`` (ou têm palavra que começa).
+
+    Args:
+        campo: Um de CAMPOS_AUTOCOMPLETE
+        termo: Texto digitado
+        limite: Máximo de itens (até LIMITE_MAXIMO)
+
+    Returns:
+        list: Dicionários com 'valor' e os dados extras do campo
+            (motorista: cpf; placa: motorista, cpf, carreta; carreta: placa, motorista, cpf)
+    """
+    if campo not in CAMPOS_AUTOCOMPLETE:
+        raise ValueError(f"Campo sem autocompletar: {campo}")
+    return _indice(campo).buscar(termo, max(1, min(limite, LIMITE_MAXIMO)))
+
+
+def opcoes_formulario(registro):
+    """Opções já escolhidas no registro, para os selects do formulário.
+
+    Os selects de MOTORISTA, CAVALO e CARRETA 1/2 só trazem o valor atual (com
+    os dados usados no preenchimento automático); as demais opções vêm da API.
+    Registro com CPF mas sem motorista tem o motorista recuperado pelo CPF.
+
+    Returns:
+        dict: Nome do campo no formulário -> lista de itens (vazia ou com um item)
+    """
+    registro = registro or {}
+    estado = excel_processor.estado
+    motorista = registro.get('MOTORISTA') or ''
+    if not motorista and registro.get('CPF MOTORISTA'):
+        cpf = str(registro['CPF MOTORISTA']).replace('.', '').replace('-', '').replace(' ', '')
+        motorista = estado.CPF_MOTORISTA_MAP.get(cpf, '')
+
+    opcoes = {'MOTORISTA': [item_motorista(motorista, estado)] if motorista else []}
+    opcoes['CAVALO'] = [item_placa(registro['CAVALO'], estado)] if registro.get('CAVALO') else []
+    for campo in ('CARRETA 1', 'CARRETA 2'):
+        opcoes[campo] = [item_carreta(registro[campo], estado)] if registro.get(campo) else []
+    return opcoes
@@ -1,28 +1,311 @@
+"""
+Dados da planilha do OneDrive usados no formulário (dropdowns e MOTORISTA -> CPF).
+
+A planilha é baixada por uma thread em segundo plano, iniciada pela
+aplicação (``iniciar_atualizacao``), com requisição condicional
+(ETag/Last-Modified): se não mudou, o servidor responde 304 e nada é
+reprocessado. As tabelas ficam num ``EstadoPlanilha`` imutável, trocado de
+uma vez a cada nova versão. As tabelas processadas ficam gravadas em
+ONEDRIVE_CACHE_PATH, então a aplicação sobe com os dados do último download
+sem esperar a rede, e os formulários usam sempre o que está em memória (mesmo
+vencido) enquanto a revalidação acontece em segundo plano.
+
+Só as colunas usadas (COLUNAS_PRINCIPAL e COLUNAS_ABA_PLACAS) são lidas, por
+streaming do XML da planilha (utils/leitor_xlsx.py). O cache é um arquivo
+compacto (cabeçalho JSON com o hash do conteúdo da planilha + tabelas em JSON
+comprimido com gzip): uma planilha baixada de novo sem alterações custa um
+hash e uma leitura do cache, sem nova leitura do Excel.
+"""
+
 import pandas as pd
 import requests
+import openpyxl
 from io import BytesIO
 import sys
 import os
+import json
+import gzip
+import time
+import hashlib
+import logging
+import threading
 
 # Adiciona o diretório principal ao path para importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import ONEDRIVE_URL
+from config import ONEDRIVE_URL, ONEDRIVE_CACHE_PATH, ONEDRIVE_INTERVALO_ATUALIZACAO
+from utils.leitor_xlsx import LeitorXlsx
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do arquivo de cache (caches de outra versão são ignorados)
+VERSAO_CACHE = 3
+
+# Colunas lidas de cada aba (as demais não são carregadas)
+COLUNAS_PRINCIPAL = ['TIPO DE CARGA']
+ABA_PLACAS = 'PLACAS'
+COLUNAS_ABA_PLACAS = ['PLACA', 'MOTORISTA', 'CPF', 'CARRETA']
+
+# Espera (segundos) antes de tentar de novo após uma falha no download
+INTERVALO_NOVA_TENTATIVA = 60
+
+# Tabelas que formam os dados carregados da planilha (ver EstadoPlanilha)
+ATRIBUTOS_ESTADO = [
+    'df', 'df_placas', 'CAMPOS_OBRIGATORIOS', 'COMBOBOX_OPTIONS', 'MOTORISTA_CPF_MAP',
+    'CPF_MOTORISTA_MAP', 'PLACA_MAP', 'CARRETA_PLACA_MAP',
+    'COLUNAS_PLACAS', 'CONTAINER_MAP', 'TIPOS_DE_DADOS', 'CAMPOS_FORM',
+]
+
+# Tabelas gravadas no cache além das abas
+TABELAS_CACHE = [
+    'CAMPOS_OBRIGATORIOS', 'COMBOBOX_OPTIONS', 'MOTORISTA_CPF_MAP', 'CPF_MOTORISTA_MAP',
+    'PLACA_MAP', 'CARRETA_PLACA_MAP', 'COLUNAS_PLACAS', 'CONTAINER_MAP',
+]
+
+
+def url_download(url):
+    """Adiciona o parâmetro de download direto à URL de compartilhamento."""
+    if '?download=1' not in url and 'download=1' not in url:
+        # Adicionar parâmetro de download se não estiver presente
+        if '?' in url:
+            url += '&download=1'
+        else:
+            url += '?download=1'
+    return url
+
+
+def _texto_celula(valor):
+    """Valor da célula como texto limpo (equivale ao antigo fillna('') + astype(str) + strip)."""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        # Números inteiros (CPF, por exemplo) sem o '.0'
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _df_texto(colunas, linhas):
+    """DataFrame com os valores em texto, sem as linhas vazias em todas as colunas lidas."""
+    dados = []
+    for linha in linhas:
+        valores = [_texto_celula(valor) for valor in linha]
+        if any(valores):
+            dados.append(valores)
+    return pd.DataFrame(dados, columns=colunas, dtype=object)
+
+
+def _ler_colunas_openpyxl(aba, colunas):
+    """Lê só as ``colunas`` de uma aba do openpyxl aberta em modo somente leitura.
+
+    Usada quando o arquivo não pode ser lido por ``LeitorXlsx``. A primeira
+    linha é o cabeçalho; colunas ausentes ficam de fora do resultado.
+
+    Returns:
+        tuple: (colunas encontradas na ordem de ``colunas``, linhas com os valores)
+    """
+    # Ignorar a dimensão gravada no arquivo (nem sempre correta) e ler as linhas como estão
+    aba.reset_dimensions()
+    linhas = aba.iter_rows(values_only=True)
+    cabecalho = next(linhas, None) or ()
+
+    posicoes = {}
+    for indice, nome in enumerate(cabecalho):
+        if nome in colunas and nome not in posicoes:
+            posicoes[nome] = indice
+    presentes = [coluna for coluna in colunas if coluna in posicoes]
+    indices = [posicoes[coluna] for coluna in presentes]
+    return presentes, [[linha[i] if i < len(linha) else None for i in indices] for linha in linhas]
+
+
+def _ler_planilha_openpyxl(conteudo):
+    workbook = openpyxl.load_workbook(BytesIO(conteudo), read_only=True, data_only=True)
+    try:
+        principal = _ler_colunas_openpyxl(workbook.worksheets[0], COLUNAS_PRINCIPAL)
+        placas = None
+        if ABA_PLACAS in workbook.sheetnames:
+            placas = _ler_colunas_openpyxl(workbook[ABA_PLACAS], COLUNAS_ABA_PLACAS)
+        return workbook.sheetnames, principal, placas
+    finally:
+        workbook.close()
+
+
+def ler_planilha(conteudo):
+    """Lê a aba principal (primeira) e a aba PLACAS, só com as colunas usadas.
+
+    Usa a leitura por streaming (utils/leitor_xlsx.py); se o arquivo fugir do
+    formato esperado, recorre ao openpyxl em modo somente leitura.
+
+    Returns:
+        tuple: (df, df_placas); df_placas é None se a aba não existir
+    """
+    try:
+        with LeitorXlsx(conteudo) as leitor:
+            abas = leitor.nomes_abas
+            principal = leitor.ler_colunas(0, COLUNAS_PRINCIPAL)
+            placas = leitor.ler_colunas(ABA_PLACAS, COLUNAS_ABA_PLACAS) if ABA_PLACAS in abas else None
+    except Exception as e:
+        logger.warning(f"Leitura por streaming da planilha falhou ({e}); usando openpyxl")
+        abas, principal, placas = _ler_planilha_openpyxl(conteudo)
+
+    print(f"Abas disponíveis no Excel: {abas}")
+    df = _df_texto(*principal)
+    df_placas = _df_texto(*placas) if placas is not None else None
+    return df, df_placas
+
+
+def normalizar_cpfs(cpfs):
+    """Normaliza uma coluna de CPFs (vetorizado).
+
+    Remove pontos, traços e espaços; valores só com dígitos ficam com
+    exatamente 11 (truncados ou completados com zeros à esquerda) e os demais
+    viram ''.
+
+    Diferença em relação à leitura anterior (pandas): numa coluna de CPFs
+    numéricos com células vazias o pandas lia floats, e o CPF 1234567890
+    chegava como '1234567890.0' e virava '12345678900' (outro CPF). Agora os
+    inteiros chegam sem o '.0' (``_texto_celula``) e ele fica '01234567890'.
+    """
+    cpfs = cpfs.astype(str).str.strip()
+    for caractere in ('.', '-', ' '):
+        cpfs = cpfs.str.replace(caractere, '', regex=False)
+    return cpfs.str[:11].str.zfill(11).where(cpfs.str.isdigit(), '')
+
+
+def _ultimo_por_chave(chaves, valores):
+    """Dicionário chave -> valor da última linha de cada chave, com as chaves na
+    ordem da primeira ocorrência (o mesmo que atribuir linha a linha num dict)."""
+    ultimos = pd.Series(valores.values, index=chaves.values).groupby(level=0, sort=False).last()
+    return dict(zip(ultimos.index, ultimos.values))
+
+
+def mapas_motorista_cpf(df_placas, motorista_col, cpf_col):
+    """Monta MOTORISTA -> CPF e CPF -> MOTORISTA a partir da aba PLACAS.
+
+    Só entram linhas com motorista e CPF válido (ver ``normalizar_cpfs``);
+    quando uma chave se repete, vale a última linha.
+
+    Returns:
+        tuple: (motorista_cpf_map, cpf_motorista_map)
+    """
+    motoristas = df_placas[motorista_col].astype(str).str.strip()
+    cpfs = normalizar_cpfs(df_placas[cpf_col])
+    validos = (motoristas != '') & (cpfs != '')
+    motoristas, cpfs = motoristas[validos], cpfs[validos]
+    return _ultimo_por_chave(motoristas, cpfs), _ultimo_por_chave(cpfs, motoristas)
+
+
+def indices_placas(df_placas, placa_col, motorista_col, carreta_col):
+    """Monta PLACA -> {'motorista', 'carreta'} e CARRETA -> PLACA a partir da aba PLACAS.
+
+    Colunas ausentes ficam vazias nos índices; quando uma chave se repete,
+    vale a última linha.
+
+    Returns:
+        tuple: (placa_map, carreta_placa_map)
+    """
+    if df_placas is None or not placa_col or placa_col not in df_placas.columns:
+        return {}, {}
+
+    vazio = pd.Series('', index=df_placas.index)
+    placas = df_placas[placa_col].astype(str).str.strip()
+    motoristas = df_placas[motorista_col].astype(str).str.strip() \
+        if motorista_col and motorista_col in df_placas.columns else vazio
+    carretas = df_placas[carreta_col].astype(str).str.strip() \
+        if carreta_col and carreta_col in df_placas.columns else vazio
+
+    com_placa = placas != ''
+    motorista_por_placa = _ultimo_por_chave(placas[com_placa], motoristas[com_placa])
+    carreta_por_placa = _ultimo_por_chave(placas[com_placa], carretas[com_placa])
+    placa_map = {
+        placa: {'motorista': motorista, 'carreta': carreta_por_placa[placa]}
+        for placa, motorista in motorista_por_placa.items()
+    }
+
+    com_carreta = com_placa & (carretas != '')
+    carreta_placa_map = _ultimo_por_chave(carretas[com_carreta], placas[com_carreta])
+    return placa_map, carreta_placa_map
+
+
+def _df_para_cache(df):
+    if df is None:
+        return None
+    return {'colunas': df.columns.tolist(), 'linhas': df.values.tolist()}
+
+
+def _df_do_cache(dados):
+    if dados is None:
+        return None
+    return pd.DataFrame(dados['linhas'], columns=dados['colunas'], dtype=object)
+
+
+class EstadoPlanilha:
+    """Tabelas carregadas da planilha, num objeto imutável trocado de uma vez.
+
+    As tabelas (listas, dicionários e DataFrames) também não são alteradas
+    depois de publicadas: uma nova versão da planilha gera um estado novo.
+    """
+
+    __slots__ = tuple(ATRIBUTOS_ESTADO)
+
+    def __init__(self, **tabelas):
+        for nome in ATRIBUTOS_ESTADO:
+            object.__setattr__(self, nome, tabelas[nome])
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("EstadoPlanilha é imutável; use substituir()")
+
+    def substituir(self, **tabelas):
+        """Novo estado com ``tabelas`` no lugar das atuais."""
+        return EstadoPlanilha(**{nome: tabelas.get(nome, getattr(self, nome)) for nome in ATRIBUTOS_ESTADO})
+
+
+def _tabela_estado(nome):
+    """Propriedade somente leitura com a tabela ``nome`` do estado atual."""
+    return property(lambda self: getattr(self.estado, nome))
+
 
 class ExcelProcessor:
     """Classe simplificada para processar dados da planilha do OneDrive"""
+
+    # Tabelas do estado atual; quem usa várias juntas deve ler ``estado`` uma vez
+    df = _tabela_estado('df')
+    df_placas = _tabela_estado('df_placas')
+    CAMPOS_OBRIGATORIOS = _tabela_estado('CAMPOS_OBRIGATORIOS')
+    COMBOBOX_OPTIONS = _tabela_estado('COMBOBOX_OPTIONS')
+    MOTORISTA_CPF_MAP = _tabela_estado('MOTORISTA_CPF_MAP')
+    CPF_MOTORISTA_MAP = _tabela_estado('CPF_MOTORISTA_MAP')
+    PLACA_MAP = _tabela_estado('PLACA_MAP')
+    CARRETA_PLACA_MAP = _tabela_estado('CARRETA_PLACA_MAP')
+    COLUNAS_PLACAS = _tabela_estado('COLUNAS_PLACAS')
+    CONTAINER_MAP = _tabela_estado('CONTAINER_MAP')
+    TIPOS_DE_DADOS = _tabela_estado('TIPOS_DE_DADOS')
+    CAMPOS_FORM = _tabela_estado('CAMPOS_FORM')
     
-    def __init__(self):
-        # Inicializar variáveis
-        self.df = None  # DataFrame principal
-        self.df_placas = None  # DataFrame de placas
-        self.CAMPOS_OBRIGATORIOS = []  # Lista de campos obrigatórios simplificada
-        self.COMBOBOX_OPTIONS = {}  # Opções para os dropdowns
-        self.MOTORISTA_CPF_MAP = {}  # Mapeamento de motoristas para CPFs
-        self.COLUNAS_PLACAS = {}  # Mapeamento de colunas na aba PLACAS
-        self.CONTAINER_MAP = {}  # Mapeamento de campos para categorias (adicionado para compatibilidade)
-        
+    def __init__(self, url=None, caminho_cache=ONEDRIVE_CACHE_PATH,
+                 intervalo_atualizacao=ONEDRIVE_INTERVALO_ATUALIZACAO, timeout=15):
+        """
+        Args:
+            url: URL da planilha (padrão: ONEDRIVE_URL)
+            caminho_cache: Arquivo de cache das tabelas processadas (None desativa)
+            intervalo_atualizacao: Segundos entre revalidações em segundo plano (0 desativa)
+            timeout: Timeout (segundos) do download
+        """
+        self.url = url_download(url or ONEDRIVE_URL)
+        self.caminho_cache = caminho_cache
+        self.intervalo_atualizacao = intervalo_atualizacao
+        self.timeout = timeout
+
+        # Validadores da última versão baixada (requisição condicional)
+        self.etag = None
+        self.last_modified = None
+        self.hash_planilha = None
+        self.atualizado_em = None  # time.time() do último download/revalidação bem-sucedido
+
+        self._lock_download = threading.Lock()
+        self._evento_atualizar = threading.Event()
+        self._thread = None
+
         # Inicializar TIPOS_DE_DADOS com valores padrão
-        self.TIPOS_DE_DADOS = {
+        tipos_de_dados = {
             'UNIDADE': 'text',
             'CLIENTE': 'text',
             'MOTORISTA': 'text',
@@ -54,64 +337,218 @@ class ExcelProcessor:
             'ANEXAR AGENDAMENTO': 'file'
         }
         
-        # Inicializar CAMPOS_FORM
-        self.CAMPOS_FORM = list(self.TIPOS_DE_DADOS.keys())
-        
-        # Carregar os dados do OneDrive
-        self.load_data()
-    
-    def load_data(self):
-        """Carrega os dados da planilha do OneDrive (versão simplificada)"""
+        # Estado inicial, vazio até o cache ou o primeiro download
+        self.estado = EstadoPlanilha(
+            df=pd.DataFrame(),  # DataFrame principal
+            df_placas=None,  # DataFrame de placas
+            CAMPOS_OBRIGATORIOS=[],  # Lista de campos obrigatórios simplificada
+            COMBOBOX_OPTIONS={},  # Opções para os dropdowns
+            MOTORISTA_CPF_MAP={},  # Mapeamento de motoristas para CPFs
+            CPF_MOTORISTA_MAP={},  # Mapeamento inverso (CPF -> motorista)
+            PLACA_MAP={},  # Placa -> {'motorista', 'carreta'} (preenchimento automático)
+            CARRETA_PLACA_MAP={},  # Carreta -> placa (preenchimento automático)
+            COLUNAS_PLACAS={},  # Mapeamento de colunas na aba PLACAS
+            CONTAINER_MAP={},  # Mapeamento de campos para categorias (adicionado para compatibilidade)
+            TIPOS_DE_DADOS=tipos_de_dados,
+            CAMPOS_FORM=list(tipos_de_dados.keys()),
+        )
+
+        # Dados do último download (cache local); a revalidação em segundo plano
+        # é iniciada pela aplicação (``iniciar_atualizacao``)
+        self.carregar_cache()
+
+    def _aplicar_estado(self, estado):
+        # Uma única atribuição: quem leu ``self.estado`` continua com uma versão
+        # consistente de todas as tabelas
+        self.estado = estado
+
+    def _processar_planilha(self, conteudo):
+        """Lê as abas do arquivo baixado e processa as tabelas.
+
+        Returns:
+            EstadoPlanilha: Estado resultante (não altera o estado atual)
+        """
+        # Carregar a aba principal (primeira aba) e a aba PLACAS, só com as colunas usadas
+        df, df_placas = ler_planilha(conteudo)
+        print(f"Carregada primeira aba com {len(df)} linhas e colunas {df.columns.tolist()}")
+        if df_placas is not None:
+            print(f"Carregada aba PLACAS com {len(df_placas)} linhas e colunas {df_placas.columns.tolist()}")
+
+        # Processar os dados de forma simplificada
+        return self._process_data_simple(df, df_placas)
+
+    def _baixar_planilha(self, forcar=False):
+        """Baixa a planilha com requisição condicional.
+
+        Returns:
+            tuple: (conteudo, etag, last_modified); conteudo None se não mudou (304)
+        """
+        headers = {}
+        if not forcar:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+
+        print(f"Tentando acessar URL: {self.url}")
+        response = requests.get(self.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None, self.etag, self.last_modified
+        response.raise_for_status()
+        return response.content, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+    def load_data(self, forcar=False):
+        """Revalida a planilha do OneDrive e, se ela mudou, reprocessa e grava o cache
+
+        Bloqueia durante o download: as rotas não devem chamá-lo (ver
+        ``solicitar_atualizacao``). Em caso de falha os dados atuais (do
+        cache ou do último download) continuam valendo.
+
+        Args:
+            forcar: Ignora os validadores e baixa a planilha inteira
+
+        Returns:
+            bool: True se os dados estão atualizados
+        """
+        with self._lock_download:
+            try:
+                conteudo, etag, last_modified = self._baixar_planilha(forcar)
+                if conteudo is None:
+                    print("Planilha do OneDrive não mudou (304), mantendo os dados atuais")
+                    self.atualizado_em = time.time()
+                    return True
+
+                hash_planilha = hashlib.sha1(conteudo).hexdigest()
+                if hash_planilha == self.hash_planilha and not forcar:
+                    print("Planilha do OneDrive baixada sem alterações, mantendo os dados atuais")
+                elif forcar or not self.carregar_cache(hash_planilha):
+                    # Planilha nova (ou cache gravado por outra versão dela): ler o Excel
+                    self._aplicar_estado(self._processar_planilha(conteudo))
+
+                self.etag, self.last_modified, self.hash_planilha = etag, last_modified, hash_planilha
+                self.atualizado_em = time.time()
+                self.salvar_cache()
+                return True
+
+            except Exception as e:
+                print(f"Erro ao processar planilha do OneDrive: {e}")
+                return False
+
+    def carregar_cache(self, hash_planilha=None):
+        """Carrega as tabelas gravadas pelo último download.
+
+        Args:
+            hash_planilha: Se informado, só carrega se o cache for desse conteúdo
+                (sem descomprimir as tabelas quando não for)
+
+        Returns:
+            bool: True se o cache existia e era válido para a URL (e o hash)
+        """
+        if not self.caminho_cache or not os.path.exists(self.caminho_cache):
+            return False
         try:
-            # Adicionar parâmetro para download direto
-            url = ONEDRIVE_URL
-            if '?download=1' not in url and 'download=1' not in url:
-                # Adicionar parâmetro de download se não estiver presente
-                if '?' in url:
-                    url += '&download=1'
-                else:
-                    url += '?download=1'
-            
-            print(f"Tentando acessar URL: {url}")
-            response = requests.get(url, timeout=15)  # Aumentar timeout para 15 segundos
-            response.raise_for_status()
-            
-            # Carregar as abas do Excel usando openpyxl
-            print("Tentando carregar o arquivo Excel com openpyxl...")
-            excel_file = pd.ExcelFile(BytesIO(response.content), engine='openpyxl')
-            
-            print(f"Abas disponíveis no Excel: {excel_file.sheet_names}")
-            
-            # Carregar a aba principal (assumindo que é a primeira aba)
-            self.df = excel_file.parse(0)
-            # Limpeza básica dos dados
-            for col in self.df.columns:
-                self.df[col] = self.df[col].fillna('').astype(str).str.strip()
-            print(f"Carregada primeira aba com {len(self.df)} linhas e {len(self.df.columns)} colunas")
-            print(f"Colunas na primeira aba: {self.df.columns.tolist()}")
-            
-            # Carregar a aba PLACAS se existir
-            if "PLACAS" in excel_file.sheet_names:
-                self.df_placas = excel_file.parse("PLACAS")
-                # Limpeza básica dos dados
-                for col in self.df_placas.columns:
-                    self.df_placas[col] = self.df_placas[col].fillna('').astype(str).str.strip()
-                print(f"Carregada aba PLACAS com {len(self.df_placas)} linhas e {len(self.df_placas.columns)} colunas")
-                print(f"Colunas na aba PLACAS: {self.df_placas.columns.tolist()}")
-            
-            # Processar os dados de forma simplificada
-            self._process_data_simple()
-            
+            with open(self.caminho_cache, 'rb') as f:
+                cabecalho = json.loads(f.readline())
+                if cabecalho.get('versao') != VERSAO_CACHE or cabecalho.get('url') != self.url:
+                    logger.info("Cache da planilha ignorado (versão ou URL diferente)")
+                    return False
+                if hash_planilha is not None and cabecalho.get('hash') != hash_planilha:
+                    return False
+                dados = json.loads(gzip.decompress(f.read()))
+
+            estado = dict(dados['tabelas'])
+            estado['df'] = _df_do_cache(dados['df'])
+            estado['df_placas'] = _df_do_cache(dados['df_placas'])
+            self._aplicar_estado(self.estado.substituir(**estado))
+            self.hash_planilha = cabecalho.get('hash')
+            if hash_planilha is None:
+                # Na inicialização, os validadores e a data também vêm do cache
+                self.etag = cabecalho.get('etag')
+                self.last_modified = cabecalho.get('last_modified')
+                self.atualizado_em = cabecalho.get('atualizado_em')
+            logger.info(f"Dados da planilha carregados do cache ({self.caminho_cache})")
             return True
-            
         except Exception as e:
-            print(f"Erro ao processar planilha do OneDrive: {e}")
-            # Definir valores padrão em caso de falha
-            self.CAMPOS_OBRIGATORIOS = []
-            self.COMBOBOX_OPTIONS = {}
-            self.MOTORISTA_CPF_MAP = {}
-            # Não precisamos definir TIPOS_DE_DADOS aqui, pois já foi inicializado no __init__
+            logger.warning(f"Cache da planilha inválido, ignorado: {e}")
             return False
+
+    def salvar_cache(self):
+        """Grava as tabelas processadas e os validadores (troca atômica do arquivo).
+
+        Formato: uma linha JSON de cabeçalho (versão, URL, hash do conteúdo,
+        validadores) seguida das tabelas em JSON comprimido com gzip.
+        """
+        if not self.caminho_cache:
+            return
+        cabecalho = {
+            'versao': VERSAO_CACHE,
+            'url': self.url,
+            'hash': self.hash_planilha,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'atualizado_em': self.atualizado_em,
+        }
+        estado = self.estado
+        dados = {
+            'df': _df_para_cache(estado.df),
+            'df_placas': _df_para_cache(estado.df_placas),
+            'tabelas': {nome: getattr(estado, nome) for nome in TABELAS_CACHE},
+        }
+        temporario = f"{self.caminho_cache}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, 'wb') as f:
+                f.write(json.dumps(cabecalho).encode('utf-8') + b'\n')
+                f.write(gzip.compress(json.dumps(dados, ensure_ascii=False, default=str).encode('utf-8'), 6))
+            os.replace(temporario, self.caminho_cache)
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar o cache da planilha: {e}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def dados_vencidos(self):
+        """Indica se a última revalidação tem mais de ``intervalo_atualizacao`` segundos."""
+        if self.atualizado_em is None:
+            return True
+        return time.time() - self.atualizado_em >= (self.intervalo_atualizacao or 0)
+
+    def iniciar_atualizacao(self):
+        """Inicia a thread que revalida a planilha a cada ``intervalo_atualizacao`` segundos.
+
+        Chamado na inicialização da aplicação (new_app.py, app_ubuntu.py), não
+        na importação; com ``intervalo_atualizacao`` 0 não faz nada.
+        """
+        if not self.intervalo_atualizacao:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._loop_atualizacao, name='atualizacao-planilha-onedrive', daemon=True
+        )
+        self._thread.start()
+
+    def _loop_atualizacao(self):
+        while True:
+            if self.atualizado_em is None:
+                espera = 0
+            else:
+                espera = max(0, self.atualizado_em + self.intervalo_atualizacao - time.time())
+            if espera and self._evento_atualizar.wait(espera):
+                self._evento_atualizar.clear()
+
+            if not self.load_data():
+                # Falha: mantém os dados atuais e tenta de novo mais cedo (pedidos
+                # de atualização durante a espera não antecipam a nova tentativa)
+                time.sleep(INTERVALO_NOVA_TENTATIVA)
+                self._evento_atualizar.clear()
+
+    def solicitar_atualizacao(self):
+        """Pede uma revalidação em segundo plano se os dados estiverem vencidos (não bloqueia).
+
+        Só acorda a thread iniciada por ``iniciar_atualizacao``; sem ela não faz nada.
+        """
+        if not self.intervalo_atualizacao or not self.dados_vencidos():
+            return
+        self._evento_atualizar.set()
     
     def _process_column(self, df, column_name):
         """Processa uma coluna do DataFrame para obter valores únicos e formatados."""
@@ -130,21 +567,29 @@ class ExcelProcessor:
         
         return values
     
-    def _process_data_simple(self):
-        """Processa os dados da planilha de forma simplificada"""
+    def _process_data_simple(self, df, df_placas):
+        """Processa os dados da planilha de forma simplificada
+
+        Returns:
+            EstadoPlanilha: Tabelas do formulário montadas a partir das abas
+        """
         print("Usando dados da aba PLACAS para popular dropdowns")
+        combobox_options = {}
+        colunas_placas = {}
+        motorista_cpf_map, cpf_motorista_map = {}, {}
+        placa_map, carreta_placa_map = {}, {}
         
         # Definir campos obrigatórios simplificados
-        self.CAMPOS_OBRIGATORIOS = [
+        campos_obrigatorios = [
             'UNIDADE', 'CLIENTE', 'MOTORISTA', 'CPF MOTORISTA', 'CAVALO'
         ]
         
         # Processar dados da aba PLACAS se estiver disponível
-        if self.df_placas is not None:
-            print(f"Colunas disponíveis na aba PLACAS: {self.df_placas.columns.tolist()}")
+        if df_placas is not None:
+            print(f"Colunas disponíveis na aba PLACAS: {df_placas.columns.tolist()}")
             
             # Mapear colunas da aba PLACAS
-            self.COLUNAS_PLACAS = {
+            colunas_placas = {
                 'PLACA': 'PLACA',  # Coluna PLACA -> Campo CAVALO
                 'MOTORISTA': 'MOTORISTA',  # Coluna MOTORISTA -> Campo MOTORISTA
                 'CPF': 'CPF',  # Coluna CPF -> Campo CPF MOTORISTA
@@ -152,86 +597,72 @@ class ExcelProcessor:
             }
             
             # Processar coluna PLACA (para o campo CAVALO)
-            placa_col = self.COLUNAS_PLACAS.get('PLACA')
-            if placa_col and placa_col in self.df_placas.columns:
-                placas = self.df_placas[placa_col].dropna().unique().tolist()
+            placa_col = colunas_placas.get('PLACA')
+            if placa_col and placa_col in df_placas.columns:
+                placas = df_placas[placa_col].dropna().unique().tolist()
                 placas = [p for p in placas if p and p.strip()]
                 print(f"Processada coluna PLACA: {len(placas)} valores únicos")
                 print(f"Exemplos de placas: {placas[:5]}")
-                self.COMBOBOX_OPTIONS['CAVALO'] = placas
+                combobox_options['CAVALO'] = placas
             
             # Processar coluna CARRETA (para os campos CARRETA 1 e CARRETA 2)
-            carreta_col = self.COLUNAS_PLACAS.get('CARRETA')
-            if carreta_col and carreta_col in self.df_placas.columns:
-                carretas = self.df_placas[carreta_col].dropna().unique().tolist()
+            carreta_col = colunas_placas.get('CARRETA')
+            if carreta_col and carreta_col in df_placas.columns:
+                carretas = df_placas[carreta_col].dropna().unique().tolist()
                 carretas = [c for c in carretas if c and c.strip()]
                 print(f"Processada coluna CARRETA: {len(carretas)} valores únicos")
                 print(f"Exemplos de carretas: {carretas[:5]}")
                 # Usar a mesma lista para ambos os campos
-                self.COMBOBOX_OPTIONS['CARRETA 1'] = carretas
-                self.COMBOBOX_OPTIONS['CARRETA 2'] = carretas
-                self.COMBOBOX_OPTIONS['CARRETAS'] = carretas
+                combobox_options['CARRETA 1'] = carretas
+                combobox_options['CARRETA 2'] = carretas
+                combobox_options['CARRETAS'] = carretas
             
             # Processar coluna MOTORISTA
-            motorista_col = self.COLUNAS_PLACAS.get('MOTORISTA')
-            if motorista_col and motorista_col in self.df_placas.columns:
-                motoristas = self.df_placas[motorista_col].dropna().unique().tolist()
+            motorista_col = colunas_placas.get('MOTORISTA')
+            if motorista_col and motorista_col in df_placas.columns:
+                motoristas = df_placas[motorista_col].dropna().unique().tolist()
                 motoristas = [m for m in motoristas if m and m.strip()]
                 print(f"Processada coluna MOTORISTA: {len(motoristas)} valores únicos")
                 print(f"Exemplos de motoristas: {motoristas[:5]}")
-                self.COMBOBOX_OPTIONS['MOTORISTA'] = motoristas
+                combobox_options['MOTORISTA'] = motoristas
                 
-                # Criar mapeamento MOTORISTA -> CPF simplificado
-                cpf_col = self.COLUNAS_PLACAS.get('CPF')
-                if cpf_col and cpf_col in self.df_placas.columns:
-                    # Criar mapeamento simplificado
-                    motorista_cpf_map = {}
-                    for _, row in self.df_placas.iterrows():
-                        motorista = str(row[motorista_col]).strip()
-                        cpf = str(row[cpf_col]).strip()
-                        
-                        # Remover pontos, traços e espaços do CPF
-                        cpf = cpf.replace('.', '').replace('-', '').replace(' ', '')
-                        
-                        # Garantir que o CPF tenha exatamente 11 dígitos
-                        if cpf.isdigit():
-                            # Se tiver mais de 11 dígitos, truncar para 11
-                            if len(cpf) > 11:
-                                cpf = cpf[:11]
-                            # Se tiver menos de 11 dígitos, adicionar zeros à esquerda
-                            elif len(cpf) < 11:
-                                cpf = cpf.zfill(11)  # Adiciona zeros à esquerda se necessário para completar 11 dígitos
-                            # Se já tiver exatamente 11 dígitos, manter como está
-                            
-                            if motorista and cpf:
-                                motorista_cpf_map[motorista] = cpf
-                    
-                    self.MOTORISTA_CPF_MAP = motorista_cpf_map
+                # Criar mapeamento MOTORISTA -> CPF (e o inverso CPF -> MOTORISTA)
+                cpf_col = colunas_placas.get('CPF')
+                if cpf_col and cpf_col in df_placas.columns:
+                    motorista_cpf_map, cpf_motorista_map = mapas_motorista_cpf(
+                        df_placas, motorista_col, cpf_col
+                    )
                     print(f"Mapeamento MOTORISTA -> CPF criado com {len(motorista_cpf_map)} entradas")
                     print(f"Exemplos de mapeamento (motorista -> CPF): {list(motorista_cpf_map.items())[:5]}")
+            
+            # Índices para preenchimento automático: PLACA -> MOTORISTA/CARRETA e CARRETA -> PLACA
+            placa_map, carreta_placa_map = indices_placas(
+                df_placas, placa_col, colunas_placas.get('MOTORISTA'), carreta_col
+            )
+            print(f"Índices de placas criados: {len(placa_map)} placas, {len(carreta_placa_map)} carretas")
         
         # Definir valores para os comboboxes
-        self.COMBOBOX_OPTIONS['UNIDADE'] = ['Rio de Janeiro', 'Floriano', 'Suzano']
-        self.COMBOBOX_OPTIONS['MODALIDADE'] = ['IMPORTAÇÃO', 'EXPORTAÇÃO', 'CABOTAGEM', 'CST']
-        self.COMBOBOX_OPTIONS['STATUS CONTAINER'] = ['CHEIO', 'VAZIO']
+        combobox_options['UNIDADE'] = ['Rio de Janeiro', 'Floriano', 'Suzano']
+        combobox_options['MODALIDADE'] = ['IMPORTAÇÃO', 'EXPORTAÇÃO', 'CABOTAGEM', 'CST']
+        combobox_options['STATUS CONTAINER'] = ['CHEIO', 'VAZIO']
         
         # Processar TIPO DE CARGA da aba principal
-        if 'TIPO DE CARGA' in self.df.columns:
-            tipos_carga = self.df['TIPO DE CARGA'].dropna().unique().tolist()
+        if 'TIPO DE CARGA' in df.columns:
+            tipos_carga = df['TIPO DE CARGA'].dropna().unique().tolist()
             tipos_carga = [t for t in tipos_carga if t and t.strip()]
             if tipos_carga:
-                self.COMBOBOX_OPTIONS['TIPO DE CARGA'] = tipos_carga
+                combobox_options['TIPO DE CARGA'] = tipos_carga
                 print(f"Tipos de carga carregados da planilha: {tipos_carga}")
             else:
                 # Para campos digitáveis, definimos uma lista vazia para indicar que não são dropdowns
-                self.COMBOBOX_OPTIONS['TIPO DE CARGA'] = []
+                combobox_options['TIPO DE CARGA'] = []
         
         # Adicionar manualmente o campo Requisitante nas opções se não estiver presente
-        if 'Requisitante' not in self.COMBOBOX_OPTIONS:
-            self.COMBOBOX_OPTIONS['Requisitante'] = []
+        if 'Requisitante' not in combobox_options:
+            combobox_options['Requisitante'] = []
             
         # Inicializar CONTAINER_MAP com categorias básicas para compatibilidade
-        self.CONTAINER_MAP = {
+        container_map = {
             'UNIDADE': 'dados da unidade',
             'Requisitante': 'dados da unidade',
             'ANEXAR NF': 'documentos',
@@ -249,11 +680,11 @@ class ExcelProcessor:
         
         # Remover esses campos do COMBOBOX_OPTIONS para que não sejam exibidos como dropdowns
         for campo in campos_digitaveis:
-            if campo in self.COMBOBOX_OPTIONS:
-                self.COMBOBOX_OPTIONS.pop(campo)
+            if campo in combobox_options:
+                combobox_options.pop(campo)
         
         # Definir tipos de dados para cada campo
-        self.TIPOS_DE_DADOS = {
+        tipos_de_dados = {
             'UNIDADE': 'text',
             'CLIENTE': 'text',
             'MOTORISTA': 'text',
@@ -287,7 +718,22 @@ class ExcelProcessor:
         
         # Definir a lista de campos do formulário (CAMPOS_FORM)
         # Esta lista é usada em várias partes do código para iterar sobre todos os campos
-        self.CAMPOS_FORM = list(self.TIPOS_DE_DADOS.keys())
+        campos_form = list(tipos_de_dados.keys())
+
+        return EstadoPlanilha(
+            df=df,
+            df_placas=df_placas,
+            CAMPOS_OBRIGATORIOS=campos_obrigatorios,
+            COMBOBOX_OPTIONS=combobox_options,
+            MOTORISTA_CPF_MAP=motorista_cpf_map,
+            CPF_MOTORISTA_MAP=cpf_motorista_map,
+            PLACA_MAP=placa_map,
+            CARRETA_PLACA_MAP=carreta_placa_map,
+            COLUNAS_PLACAS=colunas_placas,
+            CONTAINER_MAP=container_map,
+            TIPOS_DE_DADOS=tipos_de_dados,
+            CAMPOS_FORM=campos_form,
+        )
     
     def convert_to_db_format(self, data):
         """Converte os dados do formulário para o formato do banco de dados"""
@@ -334,5 +780,6 @@ class ExcelProcessor:
         return db_data
 
 # Criar uma instância da classe ExcelProcessor para ser importada por outros módulos
+# (a thread de revalidação é iniciada pela aplicação, não na importação)
 excel_processor = ExcelProcessor()
 
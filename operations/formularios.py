@@ -10,6 +10,9 @@ from models.registros import Registro
 from utils.file_utils import save_uploaded_file, allowed_file
 from operations.excel import excel_processor
 
+# Campos obrigatórios do formulário de novo registro (e da importação em lote)
+CAMPOS_OBRIGATORIOS_NOVO_REGISTRO = ['UNIDADE', 'CLIENTE', 'MOTORISTA', 'CPF MOTORISTA', 'CAVALO', 'CONTAINER 1']
+
 def processar_formulario():
     """
     Processa o formulário de registro submetido pelo usuário
@@ -101,19 +104,22 @@ def processar_formulario():
         flash("Erro ao criar o registro. Tente novamente.", "danger")
         return redirect(url_for('comum.novo_registro'))
 
-def validar_campos_obrigatorios(dados):
+def validar_campos_obrigatorios(dados, campos=None):
     """
     Valida se todos os campos obrigatórios foram preenchidos
     
     Args:
         dados: Dicionário com os dados do formulário
+        campos: Campos obrigatórios (padrão: os da planilha do OneDrive)
         
     Returns:
         Tupla (válido, mensagem de erro)
     """
     campos_faltantes = []
     
-    for campo in excel_processor.CAMPOS_OBRIGATORIOS:
+    if campos is None:
+        campos = excel_processor.CAMPOS_OBRIGATORIOS
+    for campo in campos:
         if campo not in dados or not dados[campo]:
             campos_faltantes.append(campo)
     
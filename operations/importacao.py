@@ -0,0 +1,417 @@
+"""
+Importação em lote de registros a partir de uma planilha (XLSX ou CSV).
+
+A primeira linha é o cabeçalho, com os nomes de campo do formulário
+(``ExcelProcessor.TIPOS_DE_DADOS``: UNIDADE, CLIENTE, MOTORISTA, CPF
+MOTORISTA, CAVALO...); colunas desconhecidas ou de anexo são ignoradas e
+informadas no relatório. As linhas são lidas por streaming (openpyxl em modo
+somente leitura, ou ``csv``), sem carregar o arquivo inteiro, e cada uma passa
+pelas mesmas regras do formulário: campos obrigatórios do novo registro
+(``CAMPOS_OBRIGATORIOS_NOVO_REGISTRO``), CPF com 11 dígitos e datas no formato
+DD-MM-YYYY HH:MM:SS do banco. Uma planilha sem alguma das colunas
+obrigatórias é recusada antes de ler as linhas.
+
+As linhas válidas são gravadas em lotes de TAMANHO_LOTE, cada lote numa
+transação com um ``executemany`` em registros e outro no histórico (uma
+entrada de importação por registro). Se um lote falhar no banco, ele
+é gravado de novo em partes cada vez menores (SAVEPOINTs na mesma transação)
+até isolar as linhas recusadas, que vão para o relatório. O relatório
+traz, por linha da planilha, os erros encontrados.
+"""
+
+import io
+import csv
+import json
+import time
+import sqlite3
+import logging
+import zipfile
+from datetime import datetime, date
+
+import openpyxl
+from openpyxl.utils.exceptions import InvalidFileException
+
+from models.database import get_db_connection
+from models.schema import get_schema
+from historico_utils import sanitize_json_string
+from access_control import mapear_campo_para_db
+from utils.notificador import notificar_alteracao_registro
+from operations.excel import excel_processor
+from operations.formularios import CAMPOS_OBRIGATORIOS_NOVO_REGISTRO, validar_campos_obrigatorios
+
+logger = logging.getLogger(__name__)
+
+# Linhas gravadas por transação
+TAMANHO_LOTE = 500
+
+# Colunas de data sem correspondência em access_control.CAMPO_MAPPING
+COLUNAS_DB_EXTRAS = {'DT CRIACAO SM': 'data_sm', 'DT CRIACAO AE': 'data_ae'}
+
+# Campos gravados como NULL quando vazios (como em novo_registro)
+CAMPOS_NULOS_SE_VAZIOS = ['numero_sm', 'numero_ae', 'tipo_carga', 'status_container', 'modalidade']
+
+FORMATO_DATA_BANCO = '%d-%m-%Y %H:%M:%S'
+FORMATOS_DATA = [
+    '%Y-%m-%d %H:%M:%S',  # 2025-05-30 14:19:00
+    '%Y-%m-%d %H:%M',     # 2025-05-30 14:19
+    '%Y-%m-%dT%H:%M',     # 2025-05-30T14:19
+    '%Y-%m-%dT%H:%M:%S',  # 2025-05-30T14:19:00
+    '%d-%m-%Y %H:%M:%S',  # 30-05-2025 14:19:00
+    '%d-%m-%Y %H:%M',     # 30-05-2025 14:19
+    '%d/%m/%Y %H:%M:%S',  # 30/05/2025 14:19:00
+    '%d/%m/%Y %H:%M',     # 30/05/2025 14:19
+    '%d/%m/%Y',           # 30/05/2025
+    '%d-%m-%Y',           # 30-05-2025
+    '%Y-%m-%d',           # 2025-05-30
+]
+
+# Separadores aceitos no CSV (o Excel em português exporta com ';')
+DELIMITADORES_CSV = ';,\t'
+
+
+def _texto(valor):
+    """Texto de uma célula: números inteiros sem '.0', vazios como ''."""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def converter_data(valor):
+    """Converte uma célula de data/hora para DD-MM-YYYY HH:MM:SS.
+
+    Raises:
+        ValueError: Texto em formato não reconhecido
+    """
+    if isinstance(valor, datetime):
+        return valor.strftime(FORMATO_DATA_BANCO)
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day).strftime(FORMATO_DATA_BANCO)
+    texto = _texto(valor)
+    for fmt in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, fmt).strftime(FORMATO_DATA_BANCO)
+        except ValueError:
+            continue
+    raise ValueError(f"data/hora inválida: {texto}")
+
+
+def normalizar_cpf(valor):
+    """Remove pontuação e deixa o CPF com 11 dígitos (mesma regra de novo_registro).
+
+    Raises:
+        ValueError: CPF com caracteres que não são dígitos
+    """
+    cpf = _texto(valor).replace('.', '').replace('-', '').replace(' ', '')
+    if not cpf:
+        return ''
+    if not cpf.isdigit():
+        raise ValueError(f"CPF inválido: {_texto(valor)}")
+    return cpf[:11].zfill(11)
+
+
+def linhas_xlsx(arquivo):
+    """Linhas (tuplas de valores) da primeira aba, por streaming."""
+    workbook = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        for linha in workbook.worksheets[0].iter_rows(values_only=True):
+            yield linha
+    finally:
+        workbook.close()
+
+
+def linhas_csv(arquivo):
+    """Linhas de um CSV (UTF-8, separado por ';', ',' ou tabulação), por streaming."""
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    try:
+        # Amostra terminada numa quebra de linha: o csv.reader trata cada
+        # trecho como uma linha, então não pode haver registro partido ao meio
+        amostra = texto.read(64 * 1024)
+        amostra += texto.readline()
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=DELIMITADORES_CSV)
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.reader(_concatenar(amostra, texto), dialeto)
+    finally:
+        # O arquivo é de quem chamou: não fechá-lo junto com o wrapper
+        texto.detach()
+
+
+def _concatenar(amostra, texto):
+    """Releitura da amostra usada para detectar o separador, seguida do resto do arquivo."""
+    yield from io.StringIO(amostra)
+    yield from texto
+
+
+def ler_linhas(arquivo, nome_arquivo):
+    """Linhas da planilha conforme a extensão do arquivo (.xlsx ou .csv).
+
+    Args:
+        arquivo: Arquivo binário aberto
+        nome_arquivo: Nome original, usado para identificar o formato
+    """
+    extensao = nome_arquivo.rsplit('.', 1)[-1].lower() if '.' in nome_arquivo else ''
+    if extensao == 'xlsx':
+        return linhas_xlsx(arquivo)
+    if extensao == 'csv':
+        return linhas_csv(arquivo)
+    raise ValueError(f"Formato não suportado: {nome_arquivo} (use .xlsx ou .csv)")
+
+
+def mapear_cabecalho(cabecalho, colunas_tabela):
+    """Associa as colunas da planilha aos campos do formulário e do banco.
+
+    Returns:
+        tuple: (lista de (posição, campo do formulário, coluna do banco, tipo),
+                nomes de colunas ignoradas)
+    """
+    tipos = excel_processor.TIPOS_DE_DADOS
+    por_nome = {campo.upper(): campo for campo in tipos}
+    colunas, ignoradas, vistas = [], [], set()
+    for posicao, nome in enumerate(cabecalho):
+        nome = _texto(nome)
+        if not nome:
+            continue
+        campo = por_nome.get(nome.upper())
+        coluna_db = (COLUNAS_DB_EXTRAS.get(campo) or mapear_campo_para_db(campo)) if campo else None
+        if campo is None or tipos[campo] == 'file' or coluna_db not in colunas_tabela or coluna_db in vistas:
+            ignoradas.append(nome)
+            continue
+        vistas.add(coluna_db)
+        colunas.append((posicao, campo, coluna_db, tipos[campo]))
+    return colunas, ignoradas
+
+
+def preparar_linha(valores, colunas):
+    """Converte e valida uma linha da planilha.
+
+    Returns:
+        tuple: (valores na ordem de ``colunas``, lista de erros)
+    """
+    dados = {}  # campos do formulário, para a validação de obrigatórios
+    convertidos = []
+    erros = []
+    for posicao, campo, coluna_db, tipo in colunas:
+        valor = valores[posicao] if posicao < len(valores) else None
+        try:
+            if tipo in ('datetime', 'date'):
+                texto = converter_data(valor) if _texto(valor) else ''
+            elif tipo == 'cpf':
+                texto = normalizar_cpf(valor)
+            else:
+                texto = _texto(valor)
+        except ValueError as e:
+            erros.append(f"{campo}: {e}")
+            texto = ''
+        dados[campo] = texto
+        if not texto and (tipo in ('datetime', 'date') or coluna_db in CAMPOS_NULOS_SE_VAZIOS):
+            convertidos.append(None)
+        else:
+            convertidos.append(texto)
+
+    # Lista fixa: a da planilha do OneDrive fica vazia até o primeiro download
+    valido, mensagem = validar_campos_obrigatorios(dados, CAMPOS_OBRIGATORIOS_NOVO_REGISTRO)
+    if not valido:
+        erros.append(mensagem)
+    return convertidos, erros
+
+
+def _entrada_historico(registro_id, usuario, nome_arquivo, numero_linha, data_alteracao):
+    alteracoes = {
+        "acao": "importação",
+        "tabela": "registros",
+        "detalhes": f"Importado de {nome_arquivo} (linha {numero_linha})",
+    }
+    return (registro_id, usuario, sanitize_json_string(json.dumps(alteracoes, ensure_ascii=False)), data_alteracao)
+
+
+def _inserir_registros(cursor, sql_registros, lote):
+    """Insere o lote com um ``executemany`` e devolve os IDs criados, na ordem do lote.
+
+    Deve ser chamada com a trava de escrita já obtida (BEGIN IMMEDIATE), para
+    que nenhuma outra gravação entre entre a leitura do maior id e os INSERTs.
+    """
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM registros")
+    ultimo_id = cursor.fetchone()[0]
+    cursor.executemany(sql_registros, [valores for _, valores in lote])
+    cursor.execute("SELECT id FROM registros WHERE id > ? ORDER BY id", (ultimo_id,))
+    ids = [linha[0] for linha in cursor.fetchall()]
+    if len(ids) != len(lote):
+        raise sqlite3.DatabaseError(f"{len(ids)} ids lidos para {len(lote)} registros inseridos")
+    return ids
+
+
+def _inserir_separando(cursor, sql_registros, lote, criados, erros):
+    """Insere um lote que o banco recusou, separando as linhas que falham.
+
+    O lote é dividido ao meio e cada metade tentada num SAVEPOINT; só as
+    metades recusadas são divididas de novo, até a linha que falha (ex.: CHECK
+    de unidade), que é registrada em ``erros``. Com poucas linhas ruins são
+    alguns ``executemany`` em vez de um INSERT por linha.
+
+    Args:
+        criados: Lista que recebe os pares (id, número da linha) inseridos
+        erros: Lista que recebe {'linha', 'erros'} das linhas recusadas
+    """
+    cursor.execute("SAVEPOINT lote_importacao")
+    try:
+        ids = _inserir_registros(cursor, sql_registros, lote)
+    except sqlite3.Error as e:
+        cursor.execute("ROLLBACK TO lote_importacao")
+        cursor.execute("RELEASE lote_importacao")
+        if len(lote) == 1:
+            erros.append({'linha': lote[0][0], 'erros': [f"Erro ao gravar: {e}"]})
+        else:
+            meio = len(lote) // 2
+            _inserir_separando(cursor, sql_registros, lote[:meio], criados, erros)
+            _inserir_separando(cursor, sql_registros, lote[meio:], criados, erros)
+        return
+    cursor.execute("RELEASE lote_importacao")
+    criados.extend(zip(ids, (numero_linha for numero_linha, _ in lote)))
+
+
+def _gravar_lote(conn, sql_registros, lote, usuario, nome_arquivo, erros=None):
+    """Grava um lote numa transação: registros e uma entrada de histórico por registro.
+
+    Args:
+        lote: Lista de (número da linha, valores para ``sql_registros``)
+        erros: Se informada, as linhas recusadas pelo banco são separadas e
+            registradas nela (``_inserir_separando``); sem ela, uma linha
+            recusada desfaz o lote inteiro e a exceção é propagada
+
+    Returns:
+        list: IDs criados, na ordem do lote
+    """
+    cursor = conn.cursor()
+    # Trava de escrita desde o início da transação (ver _inserir_registros)
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        if erros is None:
+            ids = _inserir_registros(cursor, sql_registros, lote)
+            criados = list(zip(ids, (numero_linha for numero_linha, _ in lote)))
+        else:
+            criados = []
+            _inserir_separando(cursor, sql_registros, lote, criados, erros)
+
+        _gravar_historico(cursor, criados, usuario, nome_arquivo)
+        conn.commit()
+        return [registro_id for registro_id, _ in criados]
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _gravar_historico(cursor, criados, usuario, nome_arquivo):
+    """Uma entrada de histórico por registro importado.
+
+    Args:
+        criados: Pares (id do registro, número da linha na planilha)
+    """
+    agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor.executemany(
+        "INSERT INTO historico (registro_id, alterado_por, alteracoes, data_alteracao) VALUES (?, ?, ?, ?)",
+        [_entrada_historico(registro_id, usuario, nome_arquivo, numero_linha, agora)
+         for registro_id, numero_linha in criados]
+    )
+
+
+def importar_registros(arquivo, nome_arquivo, usuario, simular=False, tamanho_lote=TAMANHO_LOTE):
+    """Importa os registros de uma planilha XLSX/CSV.
+
+    Args:
+        arquivo: Arquivo binário aberto (ex.: ``request.files[...].stream``)
+        nome_arquivo: Nome original do arquivo (define o formato)
+        usuario: Usuário gravado como criador dos registros e autor do histórico
+        simular: Só valida, sem gravar
+        tamanho_lote: Linhas gravadas por transação
+
+    Returns:
+        dict: Relatório com 'linhas', 'importados', 'ids', 'erros' (lista de
+            {'linha', 'erros'}), 'colunas_ignoradas', 'simulacao' e 'tempo'
+
+    Raises:
+        ValueError: Formato não suportado, cabeçalho sem colunas reconhecidas
+            ou sem alguma das colunas obrigatórias
+    """
+    inicio = time.perf_counter()
+    linhas = ler_linhas(arquivo, nome_arquivo)
+    try:
+        return _importar_linhas(linhas, nome_arquivo, usuario, simular, tamanho_lote, inicio)
+    finally:
+        # Fecha o workbook (ou solta o CSV) mesmo se a importação parar no meio
+        linhas.close()
+
+
+def _importar_linhas(linhas, nome_arquivo, usuario, simular, tamanho_lote, inicio):
+    try:
+        cabecalho = next(linhas, None)
+    except (zipfile.BadZipFile, InvalidFileException, UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(f"Arquivo inválido ou corrompido: {nome_arquivo} ({e})")
+    if cabecalho is None:
+        raise ValueError("Planilha vazia")
+
+    colunas_tabela = set(get_schema().colunas('registros'))
+    colunas, ignoradas = mapear_cabecalho(cabecalho, colunas_tabela)
+    if not colunas:
+        raise ValueError("Nenhuma coluna da planilha corresponde aos campos do formulário")
+    presentes = {campo for _, campo, _, _ in colunas}
+    ausentes = [campo for campo in CAMPOS_OBRIGATORIOS_NOVO_REGISTRO if campo not in presentes]
+    if ausentes:
+        raise ValueError(f"Colunas obrigatórias ausentes na planilha: {', '.join(ausentes)}")
+
+    nomes_db = [coluna_db for _, _, coluna_db, _ in colunas] + ['usuario', 'data_registro', 'excluido']
+    sql_registros = f"INSERT INTO registros ({', '.join(nomes_db)}) VALUES ({', '.join('?' for _ in nomes_db)})"
+
+    relatorio = {
+        'arquivo': nome_arquivo,
+        'linhas': 0,
+        'importados': 0,
+        'ids': [],
+        'erros': [],
+        'colunas_ignoradas': ignoradas,
+        'simulacao': simular,
+    }
+
+    def gravar(conn, lote):
+        if simular or not lote:
+            relatorio['importados'] += len(lote)
+            return
+        try:
+            ids = _gravar_lote(conn, sql_registros, lote, usuario, nome_arquivo)
+        except sqlite3.Error as e:
+            # Lote recusado pelo banco: gravar de novo separando as linhas que falham
+            logger.warning(f"Lote da importação de {nome_arquivo} falhou ({e}); separando as linhas recusadas")
+            ids = _gravar_lote(conn, sql_registros, lote, usuario, nome_arquivo, erros=relatorio['erros'])
+        relatorio['importados'] += len(ids)
+        relatorio['ids'].extend(ids)
+        if ids:
+            # Um evento por lote (não por registro) para os fluxos SSE e caches
+            notificar_alteracao_registro(ids[-1], 'criado')
+
+    with get_db_connection() as conn:
+        lote = []
+        for numero_linha, valores in enumerate(linhas, start=2):
+            if not any(_texto(valor) for valor in valores):
+                continue  # linha em branco
+            relatorio['linhas'] += 1
+
+            convertidos, erros = preparar_linha(valores, colunas)
+            if erros:
+                relatorio['erros'].append({'linha': numero_linha, 'erros': erros})
+                continue
+
+            data_registro = datetime.now().strftime(FORMATO_DATA_BANCO)
+            lote.append((numero_linha, convertidos + [usuario, data_registro, 0]))
+            if len(lote) >= tamanho_lote:
+                gravar(conn, lote)
+                lote = []
+        gravar(conn, lote)
+
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    relatorio['tempo'] = round(time.perf_counter() - inicio, 3)
+    logger.info(f"Importação de {nome_arquivo} por {usuario}: {relatorio['importados']} de {relatorio['linhas']} "
+                f"linhas{' (simulação)' if simular else ''}, {len(relatorio['erros'])} com erro, "
+                f"em {relatorio['tempo']} s")
+    return relatorio
@@ -11,8 +11,12 @@ from werkzeug.utils import secure_filename
 # Adiciona o diretório principal ao path para importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.database import get_db_connection
+from models.schema import get_schema
+from models.alteracoes_pendentes import atualizar_alteracoes_pendentes
+from utils.notificador import notificar_alteracao_registro
 from models.registros import Registro
 from operations.excel import excel_processor
+from operations.autocomplete import opcoes_formulario
 from access_control import (
     CAMPOS_POR_NIVEL, SECOES_VISIVEIS, CAMPOS_SOMENTE_LEITURA, CAMPOS_OCULTOS,
     CAMPO_MAPPING, ICONES_SECOES, TITULOS_SECOES, CAMPOS_SECAO,
@@ -22,6 +26,7 @@ from access_control import (
 from models.historico import Historico
 from models.admin.logs import log_admin_action
 from utils.file_utils import save_uploaded_file, allowed_file
+from utils.date_utils import normalizar_data_iso
 from operations.excel import excel_processor
 
 def processar_edicao_registro(registro_id):
@@ -461,21 +466,9 @@ def processar_edicao_registro(registro_id):
             # Função para calcular SLA em horas entre duas datas
             def calcular_sla(data_reg_str):
                 try:
-                    # Detectar formato da data_registro
-                    if '-' in data_reg_str and data_reg_str[2] == '-':
-                        # Formato DD-MM-YYYY
-                        data_reg = datetime.strptime(data_reg_str, "%d-%m-%Y %H:%M:%S")
-                    else:
-                        # Formato YYYY-MM-DD
-                        data_reg = datetime.strptime(data_reg_str, "%Y-%m-%d %H:%M:%S")
-                    
-                    # Detectar formato da data_sm
-                    if '-' in dados_form['data_sm'] and dados_form['data_sm'][2] == '-':
-                        # Formato DD-MM-YYYY
-                        data_sm = datetime.strptime(dados_form['data_sm'], "%d-%m-%Y %H:%M:%S")
-                    else:
-                        # Formato YYYY-MM-DD
-                        data_sm = datetime.strptime(dados_form['data_sm'], "%Y-%m-%d %H:%M:%S")
+                    # Datas em qualquer formato gravado, normalizadas como as colunas _iso
+                    data_reg = datetime.strptime(normalizar_data_iso(data_reg_str), "%Y-%m-%d %H:%M:%S")
+                    data_sm = datetime.strptime(normalizar_data_iso(dados_form['data_sm']), "%Y-%m-%d %H:%M:%S")
                     
                     delta = data_sm - data_reg
                     horas = delta.total_seconds() / 3600
@@ -491,21 +484,8 @@ def processar_edicao_registro(registro_id):
         # Calcular SLA AE se temos data_ae e data_sm
         if 'data_ae' in dados_form and dados_form['data_ae'] and 'data_sm' in dados_form and dados_form['data_sm']:
             try:
-                # Detectar formato da data_sm
-                if '-' in dados_form['data_sm'] and dados_form['data_sm'][2] == '-':
-                    # Formato DD-MM-YYYY
-                    data_sm = datetime.strptime(dados_form['data_sm'], "%d-%m-%Y %H:%M:%S")
-                else:
-                    # Formato YYYY-MM-DD
-                    data_sm = datetime.strptime(dados_form['data_sm'], "%Y-%m-%d %H:%M:%S")
-                
-                # Detectar formato da data_ae
-                if '-' in dados_form['data_ae'] and dados_form['data_ae'][2] == '-':
-                    # Formato DD-MM-YYYY
-                    data_ae = datetime.strptime(dados_form['data_ae'], "%d-%m-%Y %H:%M:%S")
-                else:
-                    # Formato YYYY-MM-DD
-                    data_ae = datetime.strptime(dados_form['data_ae'], "%Y-%m-%d %H:%M:%S")
+                data_sm = datetime.strptime(normalizar_data_iso(dados_form['data_sm']), "%Y-%m-%d %H:%M:%S")
+                data_ae = datetime.strptime(normalizar_data_iso(dados_form['data_ae']), "%Y-%m-%d %H:%M:%S")
                 
                 delta = data_ae - data_sm
                 horas = delta.total_seconds() / 3600
@@ -626,6 +606,7 @@ def processar_edicao_registro(registro_id):
             print("\n=== REALIZANDO COMMIT DAS ALTERAÇÕES ===\n")
             conn.commit()
             print("Commit realizado com sucesso!")
+            notificar_alteracao_registro(registro_id, 'alterado')
             
             # Verificar imediatamente se as alterações foram salvas
             print("\n=== VERIFICANDO SE AS ALTERAÇÕES FORAM SALVAS ===\n")
@@ -684,6 +665,7 @@ def processar_edicao_registro(registro_id):
                 "INSERT INTO historico (registro_id, alterado_por, alteracoes, data_alteracao) VALUES (?, ?, ?, ?)",
                 (registro_id, usuario, alteracoes_json, now)
             )
+            atualizar_alteracoes_pendentes(cursor, registro_id)
             print("Histórico atualizado com sucesso.")
             
             # Registrar no log administrativo se for admin ou GR
@@ -712,6 +694,7 @@ def processar_edicao_registro(registro_id):
             print("Tentando realizar commit das alterações...")
             conn.commit()
             print("Commit realizado com sucesso.")
+            notificar_alteracao_registro(registro_id, 'alterado')
             
             # Verificar se as alterações foram realmente salvas
             print("Verificando se as alterações foram salvas...")
@@ -791,11 +774,10 @@ def exibir_formulario_edicao(registro_id):
         registro_row = cursor.fetchone()
         
         # Verificar todas as colunas da tabela registros
-        cursor.execute("PRAGMA table_info(registros)")
-        colunas = cursor.fetchall()
+        colunas = get_schema().colunas('registros')
         print("\nColunas na tabela registros:")
         for col in colunas:
-            print(f"  - {col[1]} ({col[2]})")
+            print(f"  - {col}")
         
         # Converter o objeto sqlite3.Row para um dicionário
         if registro_row:
@@ -1269,7 +1251,7 @@ def exibir_formulario_edicao(registro_id):
             tipos=excel_processor.TIPOS_DE_DADOS,
             campos=excel_processor.COMBOBOX_OPTIONS,
             COMBOBOX_OPTIONS=excel_processor.COMBOBOX_OPTIONS,
-            MOTORISTA_CPF_MAP=excel_processor.MOTORISTA_CPF_MAP,
+            OPCOES_ATUAIS=opcoes_formulario(form_registro),
             modo_visualizacao=False,
             tem_anexos=tem_anexos  # Adicionar a variável tem_anexos ao contexto
         )
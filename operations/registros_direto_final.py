@@ -13,6 +13,9 @@ from access_control import mapear_db_para_campo
 # Adiciona o diretório principal ao path para importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.database import get_db_connection
+from models.schema import get_schema
+from models.alteracoes_pendentes import atualizar_alteracoes_pendentes
+from utils.notificador import notificar_alteracao_registro
 from utils.file_utils import save_uploaded_file, allowed_file
 
 # Configurar logging
@@ -423,9 +426,7 @@ def processar_edicao_registro_direto(registro_id, custom_request=None):
             cursor = conn.cursor()
             
             # Verificar se a tabela registros existe e quais colunas ela tem
-            cursor.execute("PRAGMA table_info(registros)")
-            colunas_tabela = cursor.fetchall()
-            nomes_colunas = [coluna[1] for coluna in colunas_tabela]
+            nomes_colunas = list(get_schema().colunas('registros'))
             
             print(f"\n=== COLUNAS DA TABELA REGISTROS ===\n")
             print(f"Total de colunas na tabela: {len(nomes_colunas)}")
@@ -634,6 +635,7 @@ def processar_edicao_registro_direto(registro_id, custom_request=None):
                                 "INSERT INTO historico (registro_id, alterado_por, alteracoes, data_alteracao) VALUES (?, ?, ?, ?)",
                                 (registro_id, usuario, json.dumps(alteracoes), now)
                             )
+                            atualizar_alteracoes_pendentes(cursor, registro_id)
                             print(f"Histórico de alterações registrado para {len(alteracoes)} campos")
                         except Exception as e:
                             print(f"Erro ao registrar histórico: {e}")
@@ -663,6 +665,7 @@ def processar_edicao_registro_direto(registro_id, custom_request=None):
                     
                     conn.commit()
                     print("Commit realizado com sucesso")
+                    notificar_alteracao_registro(registro_id, 'alterado')
                     return True
                 else:
                     print("Nenhuma linha foi atualizada. Verificando se o registro existe...")
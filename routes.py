@@ -10,9 +10,17 @@ from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 import werkzeug.wrappers
 from models.database import get_db_connection
+from models.schema import get_schema
+from models.alteracoes_pendentes import atualizar_alteracoes_pendentes
+from models.contadores import contadores_comum
+from utils.notificador import fluxo_eventos, notificar_alteracao_registro
 from models.historico import Historico
 from models.registros import Registro
 from operations.excel import excel_processor
+from operations.autocomplete import CAMPOS_AUTOCOMPLETE, LIMITE_PADRAO, opcoes_formulario
+from operations.autocomplete import buscar as buscar_autocomplete
+from operations.importacao import importar_registros
+from operations.formularios import CAMPOS_OBRIGATORIOS_NOVO_REGISTRO
 from operations.registros import processar_edicao_registro
 
 # Importar decoradores de autenticação do novo arquivo auth.routes.py
@@ -236,13 +244,27 @@ def log_admin_action(usuario, acao, detalhes):
     except Exception as e:
         logging.error(f"Erro ao registrar log: {e}")
 
-def paginate_list(lista, page, per_page):
-    total = len(lista)
-    start = (page - 1) * per_page
-    end = start + per_page
+def paginate_query(cursor, select_sql, where_sql, params, order_by, page, per_page):
+    """Pagina uma consulta no próprio SQLite.
+
+    Conta as linhas com ``SELECT COUNT(*)`` sobre o mesmo WHERE e busca só a
+    página pedida com LIMIT/OFFSET. ``order_by`` deve terminar numa coluna
+    única (ex.: id) para que as páginas não repitam nem pulem linhas.
+    A página é limitada ao intervalo [1, total_pages].
+
+    Returns:
+        tuple: (linhas da página como dicts, total, total_pages, page)
+    """
+    cursor.execute(f"SELECT COUNT(*) FROM registros WHERE {where_sql}", params)
+    total = cursor.fetchone()[0]
     total_pages = (total + per_page - 1) // per_page if total > 0 else 1
     page = max(1, min(page, total_pages))
-    return lista[start:end], total, total_pages, page
+
+    cursor.execute(f"{select_sql} WHERE {where_sql} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                   list(params) + [per_page, (page - 1) * per_page])
+    colunas = [d[0] for d in cursor.description]
+    linhas = [dict(zip(colunas, row)) for row in cursor.fetchall()]
+    return linhas, total, total_pages, page
 
 def fetchone_dict(cursor):
     row = cursor.fetchone()
@@ -284,8 +306,7 @@ def dashboard_comum():
             # Buscar todas as unidades disponíveis no banco de dados
             try:
                 # Verificar se a coluna existe na tabela
-                cursor.execute("PRAGMA table_info(registros)")
-                colunas = [col[1] for col in cursor.fetchall()]
+                colunas = get_schema().colunas('registros')
                 print(f"Colunas da tabela registros: {colunas}")
                 
                 if 'unidade' in colunas:
@@ -331,7 +352,7 @@ def dashboard_comum():
                 """
             # Admins podem ver todos os registros (sem restrição adicional)
             
-            base_query = """
+            select_query = """
                 SELECT 
                     id, 
                     unidade,
@@ -360,36 +381,39 @@ def dashboard_comum():
                     observacao_gr,
                     data_modificacao,
                     alteracoes_verificadas
-                FROM registros 
-                WHERE excluido = 0
-                {}
-            """.format(restricoes_nivel)
+                FROM registros
+            """
+            where_query = "excluido = 0 {}".format(restricoes_nivel)
+            params = []
             
             if filtro == 'sem_nf':
-                base_query = base_query + " AND (anexar_nf IS NULL OR anexar_nf = '')"
+                where_query += " AND (anexar_nf IS NULL OR anexar_nf = '')"
             elif filtro == 'sem_os':
-                base_query = base_query + " AND (anexar_os IS NULL OR anexar_os = '')"
+                where_query += " AND (anexar_os IS NULL OR anexar_os = '')"
             elif filtro == 'sem_container':
-                base_query = base_query + " AND (container_1 IS NULL OR container_1 = '')"
+                where_query += " AND (container_1 IS NULL OR container_1 = '')"
             elif filtro == 'sem_ae':
-                base_query = base_query + " AND (numero_ae IS NULL OR numero_ae = '')"
+                where_query += " AND (numero_ae IS NULL OR numero_ae = '')"
             elif filtro == 'sem_sm':
-                base_query = base_query + " AND (numero_sm IS NULL OR numero_sm = '')"
+                where_query += " AND (numero_sm IS NULL OR numero_sm = '')"
             # Filtro de alterações pós SM/AE removido - exclusivo para usuários GR
             
             # Aplicar filtro de unidade se não for 'todas'
             if filtro_unidade != 'todas':
                 # Usar LIKE para corresponder parcialmente
-                base_query = base_query + f" AND unidade LIKE '%{filtro_unidade}%'"
+                where_query += " AND unidade LIKE ?"
+                params.append(f"%{filtro_unidade}%")
                 print(f"Aplicando filtro de unidade: {filtro_unidade}")
-            # Ordenar por horario_previsto (saída prevista) mais próximo do horário atual
-            base_query += " ORDER BY CASE WHEN horario_previsto IS NULL THEN 1 ELSE 0 END, horario_previsto ASC"
-            print(f"Executando query: {base_query}")
-            cursor.execute(base_query)
-            rows = cursor.fetchall()
-            print(f"Registros encontrados: {len(rows)}")
-            # Converter os resultados para dicionários
-            registros = [dict((cursor.description[i][0], value) for i, value in enumerate(row)) for row in rows]
+            # Ordenar por horario_previsto (saída prevista) mais próximo do horário atual,
+            # pela coluna canônica; o id desempata para a paginação ser estável
+            # (índice idx_registros_ordem_saida)
+            order_by = "CASE WHEN horario_previsto_iso IS NULL THEN 1 ELSE 0 END, horario_previsto_iso ASC, id ASC"
+            
+            # Contagem e página calculadas no SQLite: só as linhas da página são lidas
+            registros, total_registros, total_pages, page = paginate_query(
+                cursor, select_query, where_query, params, order_by, page, per_page
+            )
+            print(f"Registros encontrados: {total_registros} (página {page}/{total_pages})")
             
             # Processar as datas para garantir o formato correto
             for registro in registros:
@@ -425,26 +449,16 @@ def dashboard_comum():
             else:
                 print("Nenhum registro encontrado na consulta.")
 
-            # Contagem por condição
-            def count_condicao(cond_sql):
-                cursor.execute(f"SELECT COUNT(*) as total FROM registros WHERE excluido = 0 AND ({cond_sql})")
-                res = cursor.fetchone()
-                return res[0] if res else 0
-
-            operacoes_sem_nf = count_condicao("anexar_nf IS NULL OR anexar_nf = ''")
-            operacoes_sem_os = count_condicao("anexar_os IS NULL OR anexar_os = ''")
-            operacoes_sem_container = count_condicao("container_1 IS NULL OR container_1 = ''")
-            operacoes_sem_sm = count_condicao("numero_sm IS NULL OR numero_sm = ''")
-            operacoes_sem_ae = count_condicao("numero_ae IS NULL OR numero_ae = ''")
+            # Contagens dos cards em uma única varredura agregada
+            contadores = contadores_comum(cursor)
+            operacoes_sem_nf = contadores['operacoes_sem_nf']
+            operacoes_sem_os = contadores['operacoes_sem_os']
+            operacoes_sem_container = contadores['operacoes_sem_container']
+            operacoes_sem_sm = contadores['operacoes_sem_sm']
+            operacoes_sem_ae = contadores['operacoes_sem_ae']
             
             # Contagem de alterações pós SM/AE
-            alteracoes_pos_smae = count_condicao("((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0') OR \
-                                               (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0')) AND \
-                                               data_modificacao IS NOT NULL AND \
-                                               alteracoes_verificadas = 0")
-
-            total_registros = len(registros)
-            registros_pagina, total, total_pages, page = paginate_list(registros, page, per_page)
+            alteracoes_pos_smae = contadores['operacoes_alteradas_pos_smae']
 
             # Importar funções e constantes do módulo de controle de acesso
             from access_control import campo_visivel, get_campos_permitidos
@@ -483,7 +497,7 @@ def dashboard_comum():
                     colunas_visiveis[coluna_db] = campo_form
             
             return render_template('dashboard.html',
-                                   registros=registros_pagina,
+                                   registros=registros,
                                    operacoes_sem_nf=operacoes_sem_nf,
                                    operacoes_sem_os=operacoes_sem_os,
                                    operacoes_sem_container=operacoes_sem_container,
@@ -613,7 +627,7 @@ def view_registros():
                 base_query = base_query.replace('WHERE excluido = 0', 'WHERE excluido = 0 AND (numero_sm IS NULL OR numero_sm = "")')
 
             # Ordenar por horario_previsto (saída prevista) mais próximo do horário atual
-            base_query += " ORDER BY CASE WHEN horario_previsto IS NULL THEN 1 ELSE 0 END, horario_previsto ASC"
+            base_query += " ORDER BY CASE WHEN horario_previsto_iso IS NULL THEN 1 ELSE 0 END, horario_previsto_iso ASC, id ASC"
             cursor.execute(base_query)
             registros = [dict(row) for row in cursor.fetchall()]
 
@@ -1032,14 +1046,13 @@ def novo_registro():
                     cursor = conn.cursor()
                     
                     # Verificar se a tabela registros existe
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='registros'")
-                    if not cursor.fetchone():
+                    schema = get_schema()
+                    if not schema.tem_tabela('registros'):
                         print("ERRO: Tabela 'registros' não existe no banco de dados!")
                         raise Exception("Tabela 'registros' não existe no banco de dados")
                     
                     # Obter estrutura da tabela para verificar colunas
-                    cursor.execute("PRAGMA table_info(registros)")
-                    colunas_tabela = [info[1] for info in cursor.fetchall()]
+                    colunas_tabela = schema.colunas('registros')
                     print(f"Colunas na tabela registros: {colunas_tabela}")
                     
                     # Remover campos vazios e campos que não existem na tabela
@@ -1067,6 +1080,7 @@ def novo_registro():
                     cursor.execute(query, valores)
                     registro_id = cursor.lastrowid
                     conn.commit()
+                    notificar_alteracao_registro(registro_id, 'criado')
                     print(f"Registro inserido com sucesso! ID: {registro_id}")
                     
                     # Verificar se o registro foi realmente inserido
@@ -1167,15 +1181,12 @@ def novo_registro():
             logging.error(f"Erro ao buscar registro: {e}")
             flash('Erro ao carregar o registro para edição.', 'danger')
 
-    # Recarregar dados do Excel para garantir que estão atualizados
-    try:
-        excel_processor.load_data()
-    except Exception as e:
-        logging.error(f"Erro ao carregar dados do Excel: {e}")
-        flash('Erro ao carregar dados do Excel. Alguns campos podem não estar disponíveis.', 'warning')
+    # Dados da planilha já em memória; se estiverem vencidos, a revalidação
+    # acontece em segundo plano (o formulário não espera o OneDrive)
+    excel_processor.solicitar_atualizacao()
 
     # Campos obrigatórios
-    campos_obrigatorios = ['UNIDADE', 'CLIENTE', 'MOTORISTA', 'CPF MOTORISTA', 'CAVALO', 'CONTAINER 1']
+    campos_obrigatorios = CAMPOS_OBRIGATORIOS_NOVO_REGISTRO
 
     # Tipos de campos
     tipos = {}
@@ -1199,26 +1210,8 @@ def novo_registro():
         else:
             campos['TIPO DE CARGA'] = ['GERAL', 'PERIGOSA', 'REFRIGERADA']  # Valores padrão caso não encontre na planilha
 
-    # Adicionar dados do Excel para os dropdowns
-    if excel_processor.df_placas is not None:
-        # Motoristas - usado para o campo MOTORISTA
-        motorista_col = excel_processor.COLUNAS_PLACAS.get('MOTORISTA')
-        if motorista_col:
-            motoristas = excel_processor.df_placas[motorista_col].dropna().unique().tolist()
-            campos['MOTORISTA'] = motoristas
-            
-        # Cavalos (placas) - usado para o campo CAVALO
-        placa_col = excel_processor.COLUNAS_PLACAS.get('PLACA')
-        if placa_col:
-            placas = excel_processor.df_placas[placa_col].dropna().unique().tolist()
-            campos['CAVALO'] = placas
-            
-        # Carretas - usado para os campos CARRETA 1 e CARRETA 2
-        carreta_col = excel_processor.COLUNAS_PLACAS.get('CARRETA')
-        if carreta_col:
-            carretas = excel_processor.df_placas[carreta_col].dropna().unique().tolist()
-            # Usar a mesma lista de carretas para ambos os campos
-            campos['CARRETAS'] = carretas
+    # MOTORISTA, CAVALO e CARRETA 1/2 não levam as listas da planilha: o select
+    # traz só o valor atual e as opções vêm de /api/autocomplete/<campo>
 
     # Determinar se estamos no modo de visualizau00e7u00e3o (quando registro_id estu00e1 presente)
     modo_visualizacao = True if request.args.get('registro_id') else False
@@ -1231,7 +1224,7 @@ def novo_registro():
                            tipos=tipos,
                            campos=campos,
                            COMBOBOX_OPTIONS=campos,
-                           MOTORISTA_CPF_MAP=excel_processor.MOTORISTA_CPF_MAP,
+                           OPCOES_ATUAIS=opcoes_formulario(registro),
                            modo_visualizacao=modo_visualizacao)
 
 @comum_bp.route('/visualizar_registro/<int:registro_id>', methods=['GET', 'POST'])
@@ -1297,7 +1290,7 @@ def visualizar_registro(registro_id):
                     SELECT id, registro_id, alterado_por, alteracoes, data_alteracao
                     FROM historico
                     WHERE registro_id = ?
-                    ORDER BY data_alteracao DESC
+                    ORDER BY data_alteracao_epoch DESC, id DESC
                 """, (registro_id,))
                 
                 # Verificar se a tabela historico existe
@@ -1390,6 +1383,7 @@ def delete_registro(registro_id):
                 registro_id
             ))
             conn.commit()
+            notificar_alteracao_registro(registro_id, 'excluido')
             
             # Tentativa de registrar no histórico (simplificado)
             try:
@@ -1403,6 +1397,7 @@ def delete_registro(registro_id):
                     '{"acao": "exclusao", "detalhes": "Registro excluido"}',
                     datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 ))
+                atualizar_alteracoes_pendentes(cursor, registro_id)
                 conn.commit()
             except Exception as hist_error:
                 # Ignorar erros de histórico, apenas registrar
@@ -1444,7 +1439,8 @@ def delete_registro(registro_id):
 from auth.routes import redirecionar_por_nivel
 
 # Nova rota específica para visualização de registros
-from models.busca_global import busca_global, contar_busca_global
+from models.busca_global import busca_global_com_total, busca_identificador_com_total
+from models.identificadores import parece_identificador
 
 @main_bp.route('/view_registros')
 @login_required
@@ -1475,13 +1471,22 @@ def view_registros():
         
         registros = []
         total = 0
+        cursor_anterior = None
+        cursor_proximo = None
         
         # Verificar se estamos fazendo uma busca global
         if termo_busca and termo_busca.strip() != '':
-            # Usar nossa nova função de busca global
-            registros = busca_global(termo_busca, per_page, offset)
-            total = contar_busca_global(termo_busca)
-            logging.info(f"Busca global por '{termo_busca}' encontrou {total} registros")
+            # Placa, container, CPF, SM/AE...: busca exata/prefixo nas chaves normalizadas
+            # (página e total numa só consulta; o total fica em cache entre as páginas)
+            if parece_identificador(termo_busca):
+                registros, total = busca_identificador_com_total(termo_busca, per_page, offset)
+                if total:
+                    logging.info(f"Busca por identificador '{termo_busca}' encontrou {total} registros")
+            
+            # Demais termos (ou identificador sem correspondência): busca global
+            if not total:
+                registros, total = busca_global_com_total(termo_busca, per_page, offset)
+                logging.info(f"Busca global por '{termo_busca}' encontrou {total} registros")
         else:
             # Construir as condições de filtro padrão
             filtros = {}
@@ -1504,8 +1509,10 @@ def view_registros():
             elif tipo_filtro == 'sem_ae':
                 filtros['sem_ae'] = True
                 
-            # Usar o método get_all original para filtros padrão
-            registros = Registro.get_all(per_page, offset, filtros)
+            # Página pela chave de ordenação (cursor) ou pela posição; total em cache
+            registros, cursor_anterior, cursor_proximo = Registro.get_pagina(
+                per_page, page, filtros, request.args.get('cursor')
+            )
             total = Registro.count(filtros)
     except Exception as e:
         logging.error(f"Erro ao carregar registros: {str(e)}")
@@ -1537,6 +1544,17 @@ def view_registros():
         # Calcular total de páginas para paginação
         total_pages = (total + per_page - 1) // per_page  # Arredondar para cima
         
+        # Anterior/próxima levam o cursor da página atual (sem OFFSET)
+        def gerar_url_paginacao(pagina):
+            args = request.args.copy()
+            args['page'] = pagina
+            args.pop('cursor', None)
+            if pagina == page + 1 and cursor_proximo:
+                args['cursor'] = cursor_proximo
+            elif pagina == page - 1 and cursor_anterior:
+                args['cursor'] = cursor_anterior
+            return url_for('main.view_registros', **args)
+        
         # Obter lista de placas e motoristas para filtros
         placas = []
         motoristas = []
@@ -1601,6 +1619,12 @@ def view_registros():
             registros=registros,
             page=page,
             total_pages=total_pages,
+            pagina_atual=page,
+            total_paginas=total_pages,
+            total_registros=total,
+            gerar_url_paginacao=gerar_url_paginacao,
+            cursor_anterior=cursor_anterior,
+            cursor_proximo=cursor_proximo,
             placas=placas,
             motoristas=motoristas,
             placa_filtro=placa,
@@ -1846,6 +1870,7 @@ def delete(registro_id):
         cursor.execute("UPDATE registros SET excluido = 1, data_exclusao = ?, excluido_por = ? WHERE id = ?", 
                     (data_exclusao, usuario, registro_id))
         conn.commit()
+        notificar_alteracao_registro(registro_id, 'excluido')
         
         # Registrar a ação no log de administração (para GR e admin)
         if nivel_usuario in ['gr', 'admin']:
@@ -1886,8 +1911,7 @@ def handle_anexo(registro_id, tipo, download=False):
                 coluna_nome = 'arquivo_nf_nome'
             
             # Obter todas as colunas para debug
-            cursor.execute("PRAGMA table_info(registros)")
-            colunas = [info[1] for info in cursor.fetchall()]
+            colunas = get_schema().colunas('registros')
             print(f"Colunas na tabela registros: {colunas}")
             
             # Se tiver coluna de nome, buscar também
@@ -2287,6 +2311,7 @@ def editar_anexo(registro_id, tipo):
                         )
                     
                     conn.commit()
+                    notificar_alteracao_registro(registro_id, 'alterado')
                     
                     # Excluir o arquivo antigo se existir
                     if caminho_antigo:
@@ -2362,32 +2387,14 @@ def api_contadores_comum():
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Função para contar registros com uma condição específica
-            def count_condicao(cond_sql):
-                cursor.execute(f"SELECT COUNT(*) as total FROM registros WHERE excluido = 0 AND ({cond_sql})")
-                res = cursor.fetchone()
-                return res[0] if res else 0
-            
             # Obter nível do usuário
             nivel = session.get('nivel', 'comum')
             
-            # Restrições de acesso por nível
-            restricoes_nivel = ""
-            if nivel == 'comum':
-                # Usuários comuns só podem ver registros criados por usuários comuns
-                restricoes_nivel = "AND (usuario IN (SELECT username FROM usuarios WHERE nivel = 'comum'))"
-            elif nivel == 'gr':
-                # GRs podem ver registros de usuários comuns e GRs, mas não de admins
-                restricoes_nivel = "AND (usuario IN (SELECT username FROM usuarios WHERE nivel IN ('comum', 'gr')))"
-            
-            # Contadores para os cards
-            contadores = {
-                'operacoes_sem_nf': count_condicao(f"(anexar_nf IS NULL OR anexar_nf = '') {restricoes_nivel}"),
-                'operacoes_sem_os': count_condicao(f"(anexar_os IS NULL OR anexar_os = '') {restricoes_nivel}"),
-                'operacoes_sem_container': count_condicao(f"(container_1 IS NULL OR container_1 = '') {restricoes_nivel}"),
-                'operacoes_sem_sm': count_condicao(f"(numero_sm IS NULL OR numero_sm = '') {restricoes_nivel}"),
-                'operacoes_sem_ae': count_condicao(f"(numero_ae IS NULL OR numero_ae = '') {restricoes_nivel}")
-            }
+            # Contadores para os cards: leitura das linhas da tabela contadores
+            # visíveis para o nível (comum vê só registros de comuns, GR vê
+            # comuns e GRs, admin vê tudo)
+            contadores = contadores_comum(cursor, nivel)
+            contadores.pop('operacoes_alteradas_pos_smae', None)
             
             return jsonify(contadores)
             
@@ -2395,6 +2402,64 @@ def api_contadores_comum():
         logging.error(f"Erro ao obter contadores: {e}")
         return jsonify({'error': str(e)}), 500
 
+# API de autocompletar para os campos com listas grandes
+@comum_bp.route('/api/autocomplete/<campo>')
+@login_required
+def api_autocomplete(campo):
+    """Opções de motorista, placa, carreta ou cliente que começam com ?q= (até ?limite=)"""
+    if campo not in CAMPOS_AUTOCOMPLETE:
+        return jsonify({'error': f'Campo sem autocompletar: {campo}'}), 404
+    try:
+        limite = request.args.get('limite', LIMITE_PADRAO, type=int)
+        return jsonify(buscar_autocomplete(campo, request.args.get('q', ''), limite))
+    except Exception as e:
+        logging.error(f"Erro no autocompletar de {campo}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# Importação em lote de registros (planilha XLSX/CSV no layout do formulário)
+@comum_bp.route('/api/importar_registros', methods=['POST'])
+@login_required
+def api_importar_registros():
+    """Importa os registros do arquivo enviado e devolve o relatório de erros por linha"""
+    if session.get('nivel') == 'gr':
+        return jsonify({'error': 'Usuários GR não podem criar registros.'}), 403
+
+    arquivo = request.files.get('arquivo')
+    if not arquivo or not arquivo.filename:
+        return jsonify({'error': 'Nenhum arquivo enviado'}), 400
+
+    try:
+        relatorio = importar_registros(
+            arquivo.stream, arquivo.filename, session.get('user'),
+            simular=request.form.get('simular') in ('1', 'true', 'on')
+        )
+        return jsonify(relatorio)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Erro ao importar registros de {arquivo.filename}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# Fluxo Server-Sent Events com contadores e registros alterados
+@comum_bp.route('/stream')
+@login_required
+def stream_comum():
+    """Envia os contadores na conexão e depois só quando algum registro muda"""
+    # O gerador roda depois do fim da requisição: capturar o nível agora
+    nivel = session.get('nivel', 'comum')
+
+    def ler_contadores():
+        with get_db_connection() as conn:
+            contadores = contadores_comum(conn.cursor(), nivel)
+        contadores.pop('operacoes_alteradas_pos_smae', None)
+        return contadores
+
+    return Response(
+        fluxo_eventos(ler_contadores),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # Rota para excluir anexos
 @comum_bp.route('/excluir_anexo/<int:registro_id>/<tipo>', methods=['GET'])
 @login_required
@@ -2441,6 +2506,7 @@ def excluir_anexo(registro_id, tipo):
             )
             
             conn.commit()
+            notificar_alteracao_registro(registro_id, 'alterado')
             
             # Excluir o arquivo físico
             try:
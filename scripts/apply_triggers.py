@@ -21,6 +21,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar a função de conexão com o banco de dados
 from models.database import get_db_connection
+from models.contadores import aplicar_triggers_contadores
+from models.rollups import aplicar_triggers_rollup
+from models.datas_iso import aplicar_datas_iso
+from models.historico_epoch import aplicar_historico_epoch
+from models.historico_campos import aplicar_historico_campos
+from models.busca_fts import aplicar_registros_fts
+from models.identificadores import aplicar_identificadores
 
 def apply_sql_file(file_path):
     """
@@ -67,5 +74,82 @@ def main():
     else:
         logger.error(f"Arquivo de triggers não encontrado: {trigger_file}")
 
+    # Triggers que mantêm a tabela contadores (gerados a partir das condições dos cards)
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers da tabela contadores")
+            aplicar_triggers_contadores(conn.cursor())
+            conn.commit()
+            logger.info("Triggers da tabela contadores aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers da tabela contadores: {e}")
+            conn.rollback()
+
+    # Colunas canônicas de data (com preenchimento); os agregados dependem delas
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers das colunas canônicas de data")
+            aplicar_datas_iso(conn.cursor())
+            conn.commit()
+            logger.info("Triggers das colunas canônicas de data aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers das colunas canônicas de data: {e}")
+            conn.rollback()
+
+    # Coluna canônica (epoch) da data das alterações do histórico
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers da coluna canônica do histórico")
+            aplicar_historico_epoch(conn.cursor())
+            conn.commit()
+            logger.info("Triggers da coluna canônica do histórico aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers da coluna canônica do histórico: {e}")
+            conn.rollback()
+
+    # Tabela estruturada das alterações do histórico (depende do epoch acima)
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers da tabela historico_campos")
+            aplicar_historico_campos(conn.cursor())
+            conn.commit()
+            logger.info("Triggers da tabela historico_campos aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers da tabela historico_campos: {e}")
+            conn.rollback()
+
+    # Índice de texto (FTS5) da busca global (com reconstrução)
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers do índice de busca (FTS5)")
+            aplicar_registros_fts(conn.cursor())
+            conn.commit()
+            logger.info("Triggers do índice de busca aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers do índice de busca: {e}")
+            conn.rollback()
+
+    # Índice de identificadores normalizados (placa, container, CPF, SM/AE...)
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers do índice de identificadores")
+            aplicar_identificadores(conn.cursor())
+            conn.commit()
+            logger.info("Triggers do índice de identificadores aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers do índice de identificadores: {e}")
+            conn.rollback()
+
+    # Triggers das tabelas de agregados diários/por hora (com backfill)
+    with get_db_connection() as conn:
+        try:
+            logger.info("Aplicando triggers dos agregados de registros")
+            aplicar_triggers_rollup(conn.cursor())
+            conn.commit()
+            logger.info("Triggers dos agregados aplicados com sucesso")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao aplicar triggers dos agregados: {e}")
+            conn.rollback()
+
 if __name__ == "__main__":
     main()
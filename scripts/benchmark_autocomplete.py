@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark do autocompletar de motorista, placa e carreta
+
+Gera uma aba PLACAS sintética (por padrão 50.000 linhas), processa-a como a
+planilha do OneDrive e mede:
+
+- a montagem dos índices de prefixo (feita uma vez por versão da planilha);
+- a busca por prefixo com ``bisect`` x a varredura da lista inteira com
+  ``startswith`` (o que o navegador faria com a lista embutida na página).
+
+Confere também que as duas buscas devolvem os mesmos valores, na mesma ordem.
+
+Uso:
+    python scripts/benchmark_autocomplete.py [--linhas N] [--repeticoes N]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import contextlib
+from io import StringIO
+
+import pandas as pd
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.excel import ExcelProcessor
+from operations.autocomplete import LIMITE_PADRAO, indices_planilha, normalizar
+
+NOMES = ['JOSÉ', 'JOÃO', 'ANTÔNIO', 'MARCOS', 'PAULO', 'CARLOS', 'LUIZ', 'ANDRÉ', 'FÁBIO', 'SÉRGIO']
+SOBRENOMES = ['SILVA', 'OLIVEIRA', 'SOUZA', 'SANTOS', 'PEREIRA', 'CONCEIÇÃO', 'ARAÚJO', 'GONÇALVES', 'LIMA']
+
+# Termos buscados: (campo, termo)
+TERMOS = [
+    ('motorista', 'jose'), ('motorista', 'Joao Si'), ('motorista', 'conceicao'), ('motorista', 'a'),
+    ('placa', 'abc'), ('placa', 'k-r'), ('placa', 'zzz9'),
+    ('carreta', '1'), ('carreta', '5a-'),
+]
+
+def gerar_processador(linhas, seed):
+    """ExcelProcessor com uma aba PLACAS sintética já processada."""
+    rnd = random.Random(seed)
+    letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    placas, motoristas, cpfs, carretas = [], [], [], []
+    for i in range(linhas):
+        placa = ''.join(rnd.choice(letras) for _ in range(3)) + f"-{rnd.randint(0, 9)}{rnd.choice(letras)}{rnd.randint(0, 99):02d}"
+        placas.append(placa)
+        motoristas.append(f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)} {rnd.randint(0, linhas // 5)}")
+        cpfs.append(f"{rnd.randint(0, 10 ** 11 - 1):011d}")
+        carretas.append(placa[::-1])
+
+    processador = ExcelProcessor(caminho_cache=None, intervalo_atualizacao=0)
+    df = pd.DataFrame({'TIPO DE CARGA': ['GERAL']}, dtype=object)
+    df_placas = pd.DataFrame({'PLACA': placas, 'MOTORISTA': motoristas, 'CPF': cpfs, 'CARRETA': carretas},
+                             dtype=object)
+    with contextlib.redirect_stdout(StringIO()):
+        processador._aplicar_estado(processador._process_data_simple(df, df_placas))
+    return processador
+
+def buscar_varrendo(valores, termo, compacto, limite):
+    """Busca anterior: percorre a lista inteira (início do texto, depois início de palavra).
+
+    Empates na chave ficam na ordem da lista, como no índice.
+    """
+    prefixo = normalizar(termo, compacto)
+    if not prefixo:
+        return []
+    chaves = [(normalizar(valor, compacto), posicao, valor)
+              for posicao, valor in enumerate(dict.fromkeys(valores)) if valor]
+    resultado = [valor for chave, _, valor in sorted(chaves) if chave.startswith(prefixo)]
+    if not compacto:
+        encontrados = set(resultado)
+        por_palavra = []
+        for chave, posicao, valor in chaves:
+            partes = chave.split(' ')
+            sufixos = [sufixo for sufixo in (' '.join(partes[i:]) for i in range(1, len(partes)))
+                       if sufixo.startswith(prefixo)]
+            if sufixos and valor not in encontrados:
+                por_palavra.append((min(sufixos), posicao, valor))
+        resultado += [valor for _, _, valor in sorted(por_palavra)]
+    return resultado[:limite]
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Benchmark do autocompletar de motorista, placa e carreta")
+    parser.add_argument('--linhas', type=int, default=50000, help="Linhas da aba PLACAS")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logger.info(f"Gerando aba PLACAS com {args.linhas} linhas")
+    processador = gerar_processador(args.linhas, args.seed)
+
+    indices, tempo_montagem = medir(lambda: indices_planilha(processador.estado), 1)
+    logger.info(f"Índices montados em {tempo_montagem * 1000:.0f} ms: {len(indices['motorista'])} motoristas, "
+                f"{len(indices['placa'])} placas, {len(indices['carreta'])} carretas")
+
+    listas = {
+        'motorista': processador.COMBOBOX_OPTIONS.get('MOTORISTA', []),
+        'placa': processador.COMBOBOX_OPTIONS.get('CAVALO', []),
+        'carreta': processador.COMBOBOX_OPTIONS.get('CARRETAS', []),
+    }
+
+    falhas = 0
+    total_varredura = total_indice = 0
+    for campo, termo in TERMOS:
+        indice = indices[campo]
+        esperado, tempo_varredura = medir(
+            lambda: buscar_varrendo(listas[campo], termo, indice.compacto, LIMITE_PADRAO), 1)
+        itens, tempo_indice = medir(lambda: indice.buscar(termo, LIMITE_PADRAO), args.repeticoes)
+        encontrados = [item['valor'] for item in itens]
+        total_varredura += tempo_varredura
+        total_indice += tempo_indice
+
+        if encontrados != esperado:
+            logger.error(f"Resultados diferentes para {campo} '{termo}': {encontrados[:5]} x {esperado[:5]}")
+            falhas += 1
+        logger.info(f"{campo:<9} '{termo}': {len(encontrados):>2} itens | varredura {tempo_varredura * 1000:7.1f} ms | "
+                    f"bisect {tempo_indice * 1000:6.3f} ms")
+
+    logger.info(f"Total: varredura {total_varredura * 1000:.0f} ms | bisect {total_indice * 1000:.2f} ms "
+                f"(ganho: {total_varredura / total_indice:.0f}x)")
+
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
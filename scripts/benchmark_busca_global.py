@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca global: LIKE em cada campo x índice FTS5
+
+Cria um banco temporário com registros sintéticos (por padrão 100.000; o
+índice é mantido pelos triggers durante a carga), executa a contagem e a
+primeira página de cada termo da forma anterior (17 LIKE '%termo%' em OR) e
+pelo índice FTS5, confere que os dois encontram exatamente os mesmos
+registros e mostra o ganho. Na busca com LIKE mede também a página com o
+total na mesma consulta (``COUNT(*) OVER ()``, sem o cache de totais), que
+percorre a tabela uma vez em vez de duas.
+
+Uso:
+    python scripts/benchmark_busca_global.py [--registros N] [--repeticoes N]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import models.database
+from models.busca_fts import TABLE_REGISTROS_FTS, expressao_busca, verificar_registros_fts
+from models.busca_global import _condicao_like, _sql_like, busca_like, contar_like, busca_fts, contar_fts, \
+    pagina_com_total
+from utils.paginacao import limpar_cache_totais
+
+CLIENTES = ['IBRAME', 'PIRELLI', 'MAERSK', 'DOW BRASIL', 'ICONIC', 'BASF', 'UNILEVER', 'AMBEV']
+MOTORISTAS = ['JOSE SILVA', 'MARCOS OLIVEIRA', 'ANTONIO SOUZA', 'PAULO SANTOS', 'CARLOS PEREIRA']
+LOCAIS = ['RIO DE JANEIRO', 'DUQUE DE CAXIAS', 'ITAGUAI', 'SAO PAULO', 'NOVA IGUACU']
+STATUS = ['Pendente', 'Em andamento', 'Concluído', None, '']
+
+# Termos buscados: trechos de placa, SM, container, nomes e datas (termos com menos
+# de 3 caracteres usam LIKE também na busca global e ficam fora da comparação)
+TERMOS = ['KRT', 'ABC1D', '15642', 'MRKU90', 'oliveira', 'ibrame', 'caxias', '2025-03-1', 'ZZZ9Q']
+
+def popular_registros(conn, total, seed):
+    """Insere registros sintéticos com os campos pesquisados pela busca global."""
+    rnd = random.Random(seed)
+    letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    linhas = []
+    for i in range(total):
+        placa = ''.join(rnd.choice(letras) for _ in range(3)) + str(rnd.randint(0, 9)) \
+            + rnd.choice(letras) + f"{rnd.randint(0, 99):02d}"
+        data = f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00"
+        linhas.append((
+            f"usuario{rnd.randint(1, 20)}",
+            placa,
+            rnd.choice(MOTORISTAS),
+            f"{rnd.randint(0, 99999999999):011d}",
+            rnd.choice(LOCAIS),
+            placa[::-1],
+            rnd.choice(LOCAIS),
+            rnd.choice(CLIENTES),
+            rnd.choice(LOCAIS),
+            rnd.choice([None, '', f"MRKU{rnd.randint(0, 9999999):07d}"]),
+            rnd.choice([None, '', f"MSCU{rnd.randint(0, 9999999):07d}"]),
+            rnd.choice([None, '', str(rnd.randint(1560000, 1569999))]),
+            rnd.choice([None, '', str(rnd.randint(1, 99999))]),
+            rnd.choice([None, f"os_{i}.pdf"]),
+            data,
+            rnd.choice(STATUS),
+        ))
+    conn.executemany("""
+        INSERT INTO registros (usuario, placa, motorista, cpf, mot_loc, carreta, carreta_loc, cliente,
+                               loc_cliente, container_1, container_2, numero_sm, numero_ae, arquivo,
+                               data_registro, status_sm)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, linhas)
+    conn.commit()
+
+def ids_like(cursor, termo):
+    condicao, params = _condicao_like(termo)
+    cursor.execute(f"SELECT id FROM registros WHERE {condicao}", params)
+    return {linha[0] for linha in cursor.fetchall()}
+
+def ids_fts(cursor, termo):
+    cursor.execute(
+        f"SELECT rowid FROM {TABLE_REGISTROS_FTS} WHERE {TABLE_REGISTROS_FTS} MATCH ?", (expressao_busca(termo),)
+    )
+    return {linha[0] for linha in cursor.fetchall()}
+
+def pagina_like_com_total(cursor, termo):
+    """Primeira página com o total na mesma consulta, sem aproveitar o cache de totais."""
+    limpar_cache_totais()
+    registros, total = pagina_com_total(
+        cursor, lambda com_total: _sql_like(termo, com_total), lambda: contar_like(cursor, termo),
+        ('benchmark', termo), 15, 0
+    )
+    return total, registros
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Benchmark da busca global (LIKE x FTS5)")
+    parser.add_argument('--registros', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Apontar o pool de conexões para o banco temporário
+        caminho = os.path.join(diretorio, 'benchmark.db')
+        config.DB_PATH = caminho
+        models.database.DB_PATH = caminho
+        models.database.init_db()
+
+        with models.database.get_db_connection() as conn:
+            logger.info(f"Populando {args.registros} registros")
+            inicio = time.perf_counter()
+            popular_registros(conn, args.registros, args.seed)
+            logger.info(f"Carga com os triggers do índice: {time.perf_counter() - inicio:.1f} s")
+            cursor = conn.cursor()
+
+            falhas = 0
+            if not verificar_registros_fts(cursor):
+                logger.error("Índice de busca inconsistente após a carga")
+                falhas += 1
+
+            total_like = total_fts = total_unica = 0.0
+            for termo in TERMOS:
+                if ids_like(cursor, termo) != ids_fts(cursor, termo):
+                    logger.error(f"[{termo}] LIKE e FTS5 encontraram registros diferentes")
+                    falhas += 1
+
+                (quantidade, _), tempo_like = medir(
+                    lambda: (contar_like(cursor, termo), busca_like(cursor, termo, 15, 0)), args.repeticoes)
+                (quantidade_fts, _), tempo_fts = medir(
+                    lambda: (contar_fts(cursor, termo), busca_fts(cursor, termo, 15, 0)), args.repeticoes)
+                (quantidade_unica, _), tempo_unica = medir(
+                    lambda: pagina_like_com_total(cursor, termo), args.repeticoes)
+                if quantidade_unica != quantidade:
+                    logger.error(f"[{termo}] Total da consulta única ({quantidade_unica}) difere da contagem")
+                    falhas += 1
+                total_like += tempo_like
+                total_fts += tempo_fts
+                total_unica += tempo_unica
+                logger.info(f"[{termo}] {quantidade} registro(s) | LIKE: {tempo_like * 1000:.1f} ms | "
+                            f"FTS5: {tempo_fts * 1000:.1f} ms ({quantidade_fts}) | "
+                            f"LIKE consulta única: {tempo_unica * 1000:.1f} ms | "
+                            f"ganho: {tempo_like / tempo_fts:.1f}x")
+
+            logger.info(f"Total (contagem + primeira página de {len(TERMOS)} termos): "
+                        f"LIKE {total_like * 1000:.1f} ms | FTS5 {total_fts * 1000:.1f} ms | "
+                        f"LIKE consulta única {total_unica * 1000:.1f} ms | "
+                        f"ganho: {total_like / total_fts:.1f}x")
+
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
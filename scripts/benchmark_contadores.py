@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos contadores dos dashboards GR e comum
+
+Cria um banco temporário com registros sintéticos (por padrão 100.000),
+calcula os cards da forma anterior (um COUNT(*) por card, mais as consultas
+de diagnóstico da GR) e com a leitura da tabela contadores (mantida pelos
+triggers durante a carga), confere que os valores são idênticos e mostra o
+ganho.
+
+Uso:
+    python scripts/benchmark_contadores.py [--registros N] [--repeticoes N]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import models.database
+from models.contadores import CONDICOES_CONTADORES, CONTADORES_GR, CONTADORES_COMUM, contadores_gr, contadores_comum
+
+def popular_registros(conn, total, seed):
+    """Insere registros sintéticos com a distribuição de valores vista em produção."""
+    rnd = random.Random(seed)
+    linhas = []
+    for i in range(total):
+        linhas.append((
+            f"usuario{rnd.randint(1, 20)}",
+            rnd.choice(['Pendente', 'Em andamento', 'Concluído', None, '']),
+            rnd.choice([None, '', f"CONT{i:07d}"]),
+            rnd.choice([None, '', '0', str(rnd.randint(1, 99999))]),
+            rnd.choice([None, '', '0', str(rnd.randint(1, 99999))]),
+            rnd.choice([None, '', '0', 'None', f"nf_{i}.pdf"]),
+            rnd.choice([None, '', '0', f"os_{i}.pdf"]),
+            rnd.choice([None, '2025-01-01 10:00:00']),
+            rnd.choice([0, 0, 1]),
+            1 if rnd.random() < 0.05 else 0,
+        ))
+    conn.executemany("""
+        INSERT INTO registros (usuario, status_sm, container_1, numero_sm, numero_ae,
+                               anexar_nf, anexar_os, data_modificacao, alteracoes_verificadas, excluido)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, linhas)
+    # Marcar uma parte dos registros como tendo alterações pendentes pós SM/AE
+    conn.execute("""
+        INSERT INTO registros_alteracoes_pendentes (registro_id, data_deteccao)
+        SELECT id, '2025-01-01 10:00:00' FROM registros WHERE id % 7 = 0
+    """)
+    conn.commit()
+
+def contadores_anteriores(cursor, nomes):
+    """Forma anterior: um COUNT(*) por card."""
+    resultado = {}
+    for nome in nomes:
+        cursor.execute(f"SELECT COUNT(*) FROM registros WHERE excluido = 0 AND ({CONDICOES_CONTADORES[nome]})")
+        resultado[nome] = cursor.fetchone()[0]
+    return resultado
+
+def contadores_anteriores_gr(cursor):
+    resultado = contadores_anteriores(cursor, CONTADORES_GR)
+    # Consultas de diagnóstico que rodavam a cada chamada
+    cursor.execute("SELECT DISTINCT anexar_nf FROM registros WHERE excluido = 0")
+    cursor.fetchall()
+    cursor.execute("SELECT id, anexar_nf FROM registros WHERE excluido = 0 LIMIT 10")
+    cursor.fetchall()
+    return resultado
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Benchmark dos contadores dos dashboards")
+    parser.add_argument('--registros', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Apontar o pool de conexões para o banco temporário
+        caminho = os.path.join(diretorio, 'benchmark.db')
+        config.DB_PATH = caminho
+        models.database.DB_PATH = caminho
+        models.database.init_db()
+
+        with models.database.get_db_connection() as conn:
+            logger.info(f"Populando {args.registros} registros")
+            popular_registros(conn, args.registros, args.seed)
+            cursor = conn.cursor()
+
+            falhas = 0
+            for tela, anterior, atual in (
+                ('GR', lambda: contadores_anteriores_gr(cursor), lambda: contadores_gr(cursor)),
+                ('comum', lambda: contadores_anteriores(cursor, CONTADORES_COMUM), lambda: contadores_comum(cursor)),
+            ):
+                esperado, tempo_anterior = medir(anterior, args.repeticoes)
+                obtido, tempo_atual = medir(atual, args.repeticoes)
+                logger.info(f"[{tela}] um COUNT por card: {tempo_anterior * 1000:.1f} ms | "
+                            f"tabela contadores: {tempo_atual * 1000:.1f} ms | "
+                            f"ganho: {tempo_anterior / tempo_atual:.1f}x")
+                if esperado != obtido:
+                    logger.error(f"[{tela}] Contadores divergentes: {esperado} != {obtido}")
+                    falhas += 1
+                else:
+                    logger.info(f"[{tela}] Contadores idênticos: {obtido}")
+
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
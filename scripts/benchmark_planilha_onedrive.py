@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark da leitura da planilha do OneDrive
+
+Gera uma planilha de exemplo com a aba PLACAS grande (por padrão 50.000
+linhas) e várias colunas que o formulário não usa, e mede:
+
+- a leitura anterior (``pd.ExcelFile(...).parse`` de todas as colunas e
+  limpeza coluna a coluna);
+- a leitura atual (streaming do XML, só as colunas usadas);
+- o carregamento do cache de uma planilha já processada (hash + leitura);
+- a montagem do mapa MOTORISTA -> CPF linha a linha (``iterrows``) e
+  vetorizada.
+
+Confere também que as duas leituras produzem os mesmos dropdowns e o mesmo
+mapa MOTORISTA -> CPF, e que o mapa vetorizado é idêntico ao linha a linha
+(inclusive na ordem das chaves).
+
+A única diferença esperada entre as leituras é a correção dos CPFs numéricos
+numa coluna com células vazias (CASOS_CPF_NUMERICO): a leitura anterior lia a
+coluna como float e o CPF de 10 dígitos 1234567890 virava '12345678900'; a
+atual dá '01234567890'. Esse caso é conferido numa planilha à parte.
+
+Uso:
+    python scripts/benchmark_planilha_onedrive.py [--linhas N] [--repeticoes N]
+"""
+
+import os
+import sys
+import time
+import random
+import hashlib
+import logging
+import argparse
+import tempfile
+import contextlib
+from io import BytesIO, StringIO
+
+import openpyxl
+import pandas as pd
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.excel import ExcelProcessor, ler_planilha, mapas_motorista_cpf
+
+# Colunas da aba PLACAS que o formulário não usa
+COLUNAS_EXTRAS = ['PROPRIETARIO', 'RENAVAM', 'CHASSI', 'MARCA', 'MODELO', 'ANO', 'COR', 'UF', 'TIPO', 'OBSERVACAO']
+
+# CPFs numéricos numa coluna com vazios: (motorista, célula, CPF na leitura anterior, CPF na atual)
+CASOS_CPF_NUMERICO = [
+    ('MOTORISTA 10 DIGITOS', 1234567890, '12345678900', '01234567890'),
+    ('MOTORISTA 11 DIGITOS', 12345678901, '12345678901', '12345678901'),
+    ('MOTORISTA SEM CPF', None, None, None),
+]
+
+def gerar_planilha(linhas, seed):
+    """Planilha no formato da do OneDrive, com a aba PLACAS de ``linhas`` linhas.
+
+    Gravada no modo normal do openpyxl (textos compartilhados e dimensão da
+    aba), como um arquivo salvo pelo Excel.
+    """
+    rnd = random.Random(seed)
+    letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    workbook = openpyxl.Workbook()
+
+    principal = workbook.active
+    principal.title = 'Página1'
+    principal.append(['CLIENTE', 'TIPO DE CARGA', 'ORIGEM', 'DESTINO'] + [f"COLUNA {i}" for i in range(16)])
+    for i in range(2000):
+        principal.append([f"CLIENTE {i % 50}", rnd.choice(['GERAL', 'PERIGOSA', 'REFRIGERADA', None]),
+                          'RIO DE JANEIRO', 'SAO PAULO'] + [f"valor {i}-{j}" for j in range(16)])
+
+    placas = workbook.create_sheet('PLACAS')
+    placas.append(['PLACA', 'MOTORISTA', 'CPF', 'CARRETA'] + COLUNAS_EXTRAS)
+    for i in range(linhas):
+        placa = ''.join(rnd.choice(letras) for _ in range(3)) + f"{rnd.randint(0, 9)}{rnd.choice(letras)}{rnd.randint(0, 99):02d}"
+        # CPFs como número (às vezes com menos de 11 dígitos) ou texto com pontuação, e alguns vazios
+        cpf = rnd.choice([rnd.randint(10 ** 9, 10 ** 11 - 1), f"{rnd.randint(0, 999):03d}.{rnd.randint(0, 999):03d}."
+                          f"{rnd.randint(0, 999):03d}-{rnd.randint(0, 99):02d}", None])
+        placas.append([placa, f"MOTORISTA {rnd.randint(0, linhas // 5)}", cpf, placa[::-1]]
+                      + [f"{coluna} {i}" for coluna in COLUNAS_EXTRAS[:5]] + [2000 + i % 25, 'BRANCO', 'RJ', 'CAVALO', None])
+
+    saida = BytesIO()
+    workbook.save(saida)
+    return saida.getvalue()
+
+def gerar_planilha_cpfs_numericos():
+    """Planilha pequena com a coluna CPF da aba PLACAS só numérica e com vazios."""
+    workbook = openpyxl.Workbook()
+    principal = workbook.active
+    principal.title = 'Página1'
+    principal.append(['CLIENTE', 'TIPO DE CARGA'])
+    principal.append(['CLIENTE 0', 'GERAL'])
+
+    placas = workbook.create_sheet('PLACAS')
+    placas.append(['PLACA', 'MOTORISTA', 'CPF', 'CARRETA'])
+    for i, (motorista, cpf, _, _) in enumerate(CASOS_CPF_NUMERICO):
+        placas.append([f"ABC1D{i:02d}", motorista, cpf, f"KRT2E{i:02d}"])
+
+    saida = BytesIO()
+    workbook.save(saida)
+    return saida.getvalue()
+
+def ler_planilha_pandas(conteudo):
+    """Leitura anterior: todas as colunas das duas abas, limpas coluna a coluna."""
+    excel_file = pd.ExcelFile(BytesIO(conteudo), engine='openpyxl')
+    df = excel_file.parse(0)
+    for col in df.columns:
+        df[col] = df[col].fillna('').astype(str).str.strip()
+    df_placas = None
+    if 'PLACAS' in excel_file.sheet_names:
+        df_placas = excel_file.parse('PLACAS')
+        for col in df_placas.columns:
+            df_placas[col] = df_placas[col].fillna('').astype(str).str.strip()
+    return df, df_placas
+
+def mapa_motorista_cpf_iterrows(df_placas, motorista_col, cpf_col):
+    """Montagem anterior do mapa MOTORISTA -> CPF, linha a linha."""
+    motorista_cpf_map = {}
+    for _, row in df_placas.iterrows():
+        motorista = str(row[motorista_col]).strip()
+        cpf = str(row[cpf_col]).strip()
+        cpf = cpf.replace('.', '').replace('-', '').replace(' ', '')
+        if cpf.isdigit():
+            if len(cpf) > 11:
+                cpf = cpf[:11]
+            elif len(cpf) < 11:
+                cpf = cpf.zfill(11)
+            if motorista and cpf:
+                motorista_cpf_map[motorista] = cpf
+    return motorista_cpf_map
+
+def processar(df, df_placas):
+    """Tabelas do formulário a partir das abas lidas (saída dos prints suprimida)."""
+    processador = ExcelProcessor(caminho_cache=None, intervalo_atualizacao=0)
+    with contextlib.redirect_stdout(StringIO()):
+        processador._aplicar_estado(processador._process_data_simple(df, df_placas))
+    return processador
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Benchmark da leitura da planilha do OneDrive")
+    parser.add_argument('--linhas', type=int, default=50000, help="Linhas da aba PLACAS")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logger.info(f"Gerando planilha com {args.linhas} linhas na aba PLACAS")
+    conteudo = gerar_planilha(args.linhas, args.seed)
+    logger.info(f"Planilha gerada: {len(conteudo) / 1024:.0f} KB")
+
+    with contextlib.redirect_stdout(StringIO()):
+        abas_pandas, tempo_pandas = medir(lambda: ler_planilha_pandas(conteudo), args.repeticoes)
+    with contextlib.redirect_stdout(StringIO()):
+        abas, tempo_leitura = medir(lambda: ler_planilha(conteudo), args.repeticoes)
+
+    anterior = processar(*abas_pandas)
+    atual = processar(*abas)
+
+    falhas = 0
+    if anterior.COMBOBOX_OPTIONS != atual.COMBOBOX_OPTIONS:
+        logger.error("Dropdowns diferentes entre a leitura anterior e a atual")
+        falhas += 1
+    if anterior.MOTORISTA_CPF_MAP != atual.MOTORISTA_CPF_MAP:
+        logger.error("Mapa MOTORISTA -> CPF diferente entre a leitura anterior e a atual")
+        falhas += 1
+
+    # CPFs numéricos com vazios: a leitura atual corrige o valor da anterior
+    conteudo_cpfs = gerar_planilha_cpfs_numericos()
+    with contextlib.redirect_stdout(StringIO()):
+        cpfs_anterior = processar(*ler_planilha_pandas(conteudo_cpfs)).MOTORISTA_CPF_MAP
+        cpfs_atual = processar(*ler_planilha(conteudo_cpfs)).MOTORISTA_CPF_MAP
+    esperado_anterior = {motorista: cpf for motorista, _, cpf, _ in CASOS_CPF_NUMERICO if cpf}
+    esperado_atual = {motorista: cpf for motorista, _, _, cpf in CASOS_CPF_NUMERICO if cpf}
+    if cpfs_anterior != esperado_anterior or cpfs_atual != esperado_atual:
+        logger.error(f"CPFs numéricos com vazios: anterior {cpfs_anterior}, atual {cpfs_atual}")
+        falhas += 1
+    else:
+        logger.info("CPFs numéricos com vazios: 1234567890 era '12345678900' na leitura anterior "
+                    "e agora é '01234567890' (correção esperada)")
+
+    mapa_anterior, tempo_iterrows = medir(
+        lambda: mapa_motorista_cpf_iterrows(atual.df_placas, 'MOTORISTA', 'CPF'), args.repeticoes)
+    (mapa_vetorizado, _), tempo_vetorizado = medir(
+        lambda: mapas_motorista_cpf(atual.df_placas, 'MOTORISTA', 'CPF'), args.repeticoes)
+    if list(mapa_anterior.items()) != list(mapa_vetorizado.items()):
+        logger.error("Mapa MOTORISTA -> CPF vetorizado difere do montado linha a linha")
+        falhas += 1
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        atual.caminho_cache = os.path.join(diretorio, 'planilha_cache.bin')
+        atual.hash_planilha = hashlib.sha1(conteudo).hexdigest()
+        atual.salvar_cache()
+        tamanho_cache = os.path.getsize(atual.caminho_cache)
+
+        do_cache = ExcelProcessor(url=atual.url, caminho_cache=atual.caminho_cache, intervalo_atualizacao=0)
+
+        def carregar_do_cache():
+            return do_cache.carregar_cache(hashlib.sha1(conteudo).hexdigest())
+
+        carregado, tempo_cache = medir(carregar_do_cache, args.repeticoes)
+        if not carregado or do_cache.MOTORISTA_CPF_MAP != atual.MOTORISTA_CPF_MAP \
+                or not do_cache.df_placas.equals(atual.df_placas):
+            logger.error("Cache não reproduz as tabelas processadas")
+            falhas += 1
+
+    logger.info(f"Leitura anterior (pandas, todas as colunas): {tempo_pandas * 1000:.0f} ms")
+    logger.info(f"Leitura atual (streaming, colunas usadas): {tempo_leitura * 1000:.0f} ms "
+                f"(ganho: {tempo_pandas / tempo_leitura:.1f}x)")
+    logger.info(f"Planilha sem alterações (hash + cache de {tamanho_cache / 1024:.0f} KB): "
+                f"{tempo_cache * 1000:.0f} ms (ganho: {tempo_pandas / tempo_cache:.1f}x)")
+    logger.info(f"Mapa MOTORISTA -> CPF ({len(mapa_vetorizado)} motoristas): iterrows {tempo_iterrows * 1000:.0f} ms | "
+                f"vetorizado {tempo_vetorizado * 1000:.0f} ms (ganho: {tempo_iterrows / tempo_vetorizado:.1f}x)")
+
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Script para importar registros em lote de uma planilha XLSX ou CSV
+
+A primeira linha da planilha é o cabeçalho, com os nomes de campo do
+formulário (UNIDADE, CLIENTE, MOTORISTA, CPF MOTORISTA, CAVALO...). Cada linha
+passa pelas mesmas validações do formulário; as válidas são gravadas em lotes,
+com uma entrada de histórico por registro. Com --simular apenas valida.
+
+Sai com código 1 se alguma linha tiver erro.
+
+Uso:
+    python scripts/importar_registros.py planilha.xlsx --usuario NOME [--simular] [--lote N] [--relatorio saida.json]
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.importacao import TAMANHO_LOTE, importar_registros
+
+# Erros mostrados no log (o relatório JSON traz todos)
+ERROS_EXIBIDOS = 20
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Importa registros em lote de uma planilha XLSX ou CSV")
+    parser.add_argument('arquivo', help="Planilha .xlsx ou .csv")
+    parser.add_argument('--usuario', required=True, help="Usuário gravado como criador dos registros")
+    parser.add_argument('--simular', action='store_true', help="Apenas valida, sem gravar")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Linhas gravadas por transação")
+    parser.add_argument('--relatorio', help="Caminho para gravar o relatório completo em JSON")
+    args = parser.parse_args()
+
+    try:
+        with open(args.arquivo, 'rb') as arquivo:
+            relatorio = importar_registros(arquivo, os.path.basename(args.arquivo), args.usuario,
+                                           simular=args.simular, tamanho_lote=max(1, args.lote))
+    except (OSError, ValueError) as e:
+        logger.error(f"Não foi possível importar {args.arquivo}: {e}")
+        return 2
+
+    if relatorio['colunas_ignoradas']:
+        logger.warning(f"Colunas ignoradas: {', '.join(relatorio['colunas_ignoradas'])}")
+    for erro in relatorio['erros'][:ERROS_EXIBIDOS]:
+        logger.warning(f"Linha {erro['linha']}: {'; '.join(erro['erros'])}")
+    if len(relatorio['erros']) > ERROS_EXIBIDOS:
+        logger.warning(f"... e mais {len(relatorio['erros']) - ERROS_EXIBIDOS} linhas com erro")
+
+    acao = "validados (simulação)" if args.simular else "importados"
+    logger.info(f"{relatorio['importados']} de {relatorio['linhas']} registros {acao} em {relatorio['tempo']} s; "
+                f"{len(relatorio['erros'])} linhas com erro")
+
+    if args.relatorio:
+        with open(args.relatorio, 'w', encoding='utf-8') as saida:
+            json.dump(relatorio, saida, ensure_ascii=False, indent=2)
+        logger.info(f"Relatório gravado em {args.relatorio}")
+
+    return 1 if relatorio['erros'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Script de paridade para a detecção de "alterações pós SM/AE".
+
+Cria um banco temporário com registros e histórico sintéticos (por padrão
+50.000 registros e 500.000 linhas de histórico), reconstrói a tabela
+materializada registros_alteracoes_pendentes (consulta única), lê o
+resultado por gr_routes.get_registros_com_alteracoes_pos_smae e compara ids
+e linhas com uma implementação de referência (uma consulta de histórico por
+registro, com o JSON lido em Python em vez de historico_campos). Também
+recalcula registro a registro uma amostra, como faz a manutenção na escrita,
+e confere que nada muda.
+
+Uso:
+    python scripts/paridade_alteracoes_pos_smae.py [--registros N] [--historico N] [--seed S]
+
+Sai com código 1 se os resultados divergirem.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import tempfile
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import models.database
+from models.migrations import aplicar_migracoes
+from models.alteracoes_pendentes import reconstruir_alteracoes_pendentes, atualizar_alteracoes_pendentes
+from utils.date_utils import epoch_data
+
+USUARIOS_GR = ['gr1', 'gr2']
+USUARIOS_COMUNS = ['joao', 'maria', 'admin', None]
+
+# Conteúdos de histórico que exercitam os casos de borda da detecção
+MODELOS_ALTERACOES = [
+    lambda: json.dumps({'placa': {'anterior': 'ABC1234', 'novo': 'XYZ9876'}}),
+    lambda: json.dumps({'motorista': {'anterior': 'A', 'novo': 'B'}, 'cpf': {'anterior': '1', 'novo': '2'}}),
+    lambda: json.dumps({'numero_sm': {'anterior': '', 'novo': '123'}}),
+    lambda: json.dumps({'numero_ae': {'anterior': '', 'novo': '456'}, 'placa': {'anterior': 'A', 'novo': 'B'}}),
+    lambda: json.dumps({'tipo': 'Edição GR', 'observacao_gr': 'ok'}, ensure_ascii=False),
+    lambda: json.dumps({'tipo': 'Edição GR', 'observacao_gr': 'ok'}),
+    lambda: json.dumps({'NUMERO_SM': 'x', 'cliente': 'y'}),
+    lambda: json.dumps({'numero-sm': 'x', 'container_1': 'y'}),
+    lambda: json.dumps({'observacao_operacional': 'z' * random.randint(4900, 5100)}),
+    lambda: "{'placa': 'sem aspas duplas'}",
+    lambda: '{"placa": "quebrado\\q", "cli\\ente": 1',
+    lambda: '{"mot\x01orista": "controle"',
+    lambda: '{"carreta": "valor com \\\\ barra"}',
+    lambda: '',
+    lambda: None,
+    lambda: '{}',
+    lambda: json.dumps({'acao': 'exclusao', 'detalhes': 'Registro excluido'}),
+    lambda: json.dumps({'status_sm': {'anterior': 'Pendente', 'novo': 'Concluído'}}, ensure_ascii=False),
+]
+
+MODELOS_DATAS = [
+    lambda d: f"2025-{d[1]:02d}-{d[2]:02d} {d[3]:02d}:{d[4]:02d}:00",
+    lambda d: f"{d[2]:02d}-{d[1]:02d}-2025 {d[3]:02d}:{d[4]:02d}:00",
+    lambda d: f"{d[3]:02d}:{d[4]:02d}:00 {d[2]:02d}-{d[1]:02d}-2025",
+]
+
+
+def _data_aleatoria(rnd, nula=0.0):
+    if rnd.random() < nula:
+        return None
+    partes = (2025, rnd.randint(1, 12), rnd.randint(1, 28), rnd.randint(0, 23), rnd.randint(0, 59))
+    return rnd.choice(MODELOS_DATAS)(partes)
+
+
+def criar_banco_sintetico(caminho, total_registros, total_historico, seed):
+    """Cria e popula o banco de dados sintético."""
+    rnd = random.Random(seed)
+    random.seed(seed)
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE usuarios (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, password TEXT, nivel TEXT)")
+    conn.execute("""CREATE TABLE registros (id INTEGER PRIMARY KEY AUTOINCREMENT, usuario TEXT, placa TEXT,
+                    numero_sm TEXT, numero_ae TEXT, data_sm TEXT, data_ae TEXT, data_registro TEXT,
+                    excluido INTEGER DEFAULT 0, alteracoes_verificadas INTEGER DEFAULT 0)""")
+    conn.execute("""CREATE TABLE historico (id INTEGER PRIMARY KEY AUTOINCREMENT, registro_id INTEGER,
+                    alterado_por TEXT, alteracoes TEXT, data_alteracao TEXT)""")
+
+    usuarios = [(u, 'x', 'gr') for u in USUARIOS_GR] + [(u, 'x', 'comum') for u in ('joao', 'maria')] + [('admin', 'x', 'admin')]
+    conn.executemany("INSERT INTO usuarios (username, password, nivel) VALUES (?, ?, ?)", usuarios)
+
+    registros = []
+    for i in range(total_registros):
+        registros.append((
+            rnd.choice(['joao', 'maria']),
+            f"PLC{i:05d}",
+            rnd.choice(['', '0', None, str(rnd.randint(1, 99999)), str(rnd.randint(1, 99999))]),
+            rnd.choice(['', '0', None, str(rnd.randint(1, 99999))]),
+            _data_aleatoria(rnd, nula=0.3),
+            _data_aleatoria(rnd, nula=0.4),
+            _data_aleatoria(rnd),
+            1 if rnd.random() < 0.05 else 0,
+            1 if rnd.random() < 0.1 else 0,
+        ))
+    conn.executemany("""INSERT INTO registros (usuario, placa, numero_sm, numero_ae, data_sm, data_ae,
+                        data_registro, excluido, alteracoes_verificadas) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                     registros)
+
+    historico = []
+    for _ in range(total_historico):
+        historico.append((
+            rnd.randint(1, total_registros),
+            rnd.choice(USUARIOS_COMUNS + USUARIOS_GR),
+            rnd.choice(MODELOS_ALTERACOES)(),
+            _data_aleatoria(rnd, nula=0.02),
+        ))
+    conn.executemany("INSERT INTO historico (registro_id, alterado_por, alteracoes, data_alteracao) VALUES (?, ?, ?, ?)",
+                     historico)
+    conn.commit()
+
+    # Migrar depois de popular, como um banco legado (preenchimentos e reparos)
+    aplicar_migracoes(conn)
+    conn.close()
+
+
+def _campos_da_entrada(alteracoes_json):
+    """Lê em Python o tipo e os campos de uma entrada do histórico (sem historico_campos)."""
+    from models.historico_campos import reparar_alteracoes
+
+    try:
+        dados = json.loads(alteracoes_json)
+    except (TypeError, ValueError):
+        texto = reparar_alteracoes(alteracoes_json)
+        dados = json.loads(texto) if texto else {}
+    if not isinstance(dados, dict):
+        return None, []
+    if 'tipo' in dados:
+        campos = dados.get('campos')
+        return dados['tipo'], [c for c in campos if isinstance(c, str)] if isinstance(campos, list) else []
+    return None, list(dados)
+
+
+def referencia_alteracoes_pos_smae(cursor):
+    """Implementação de referência (uma consulta de histórico por registro, JSON lido em Python)."""
+    from models.alteracoes_pendentes import CAMPOS_MONITORADOS_POS_SMAE, CAMPOS_EDICAO_SMAE
+
+    cursor.execute("SELECT username FROM usuarios WHERE nivel = 'gr'")
+    usuarios_gr = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT * FROM registros
+        WHERE ((numero_sm IS NOT NULL AND numero_sm != '' AND numero_sm != '0')
+           OR (numero_ae IS NOT NULL AND numero_ae != '' AND numero_ae != '0'))
+        AND excluido = 0
+        AND alteracoes_verificadas = 0
+        ORDER BY id
+    """)
+    registros_dict = [
+        dict((col[0], registro[i]) for i, col in enumerate(cursor.description))
+        for registro in cursor.fetchall()
+    ]
+
+    registros_filtrados = []
+    ids_filtrados = []
+    for registro_dict in registros_dict:
+        # Referência calculada em Python a partir das datas originais
+        epocas_smae = [e for e in (epoch_data(registro_dict.get('data_sm')), epoch_data(registro_dict.get('data_ae')))
+                       if e is not None]
+        if not epocas_smae:
+            continue
+        referencia = max(epocas_smae)
+
+        cursor.execute(
+            "SELECT alterado_por, alteracoes, data_alteracao FROM historico WHERE registro_id = ?",
+            (registro_dict['id'],)
+        )
+        tem_alteracao_relevante = False
+        for alterado_por, alteracoes_json, data_alteracao in cursor.fetchall():
+            momento = epoch_data(data_alteracao)
+            if momento is None or momento <= referencia:
+                continue
+            if alterado_por is None or alterado_por in usuarios_gr:
+                continue
+            tipo, campos = _campos_da_entrada(alteracoes_json)
+            if tipo == 'Edição GR' or any(campo in CAMPOS_EDICAO_SMAE for campo in campos):
+                continue
+            if any(campo in CAMPOS_MONITORADOS_POS_SMAE for campo in campos):
+                tem_alteracao_relevante = True
+                break
+
+        if tem_alteracao_relevante:
+            registros_filtrados.append(registro_dict)
+            ids_filtrados.append(str(registro_dict['id']))
+
+    return registros_filtrados, ids_filtrados
+
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Paridade da detecção de alterações pós SM/AE")
+    parser.add_argument('--registros', type=int, default=50000)
+    parser.add_argument('--historico', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Silenciar o log de depuração do sanitizador durante as comparações
+    logging.getLogger('historico_utils').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'paridade.db')
+        logger.info(f"Criando banco sintético: {args.registros} registros, {args.historico} históricos")
+        criar_banco_sintetico(caminho, args.registros, args.historico, args.seed)
+
+        # Apontar o pool de conexões para o banco temporário
+        config.DB_PATH = caminho
+        models.database.DB_PATH = caminho
+        import gr_routes
+        logging.getLogger('gr_routes').setLevel(logging.WARNING)
+
+        conn = sqlite3.connect(caminho)
+        try:
+            cursor = conn.cursor()
+            colunas = [col[1] for col in cursor.execute("PRAGMA table_info(registros)").fetchall()]
+
+            inicio = time.perf_counter()
+            esperado_registros, esperado_ids = referencia_alteracoes_pos_smae(cursor)
+            tempo_referencia = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            reconstruir_alteracoes_pendentes(conn)
+            tempo_reconstrucao = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            obtido_registros, obtido_ids = gr_routes.get_registros_com_alteracoes_pos_smae(cursor, colunas)
+            tempo_atual = time.perf_counter() - inicio
+
+            # Manutenção na escrita: recalcular uma amostra não deve alterar a tabela
+            amostra = random.Random(args.seed).sample(range(1, args.registros + 1), min(500, args.registros))
+            for registro_id in amostra:
+                atualizar_alteracoes_pendentes(cursor, registro_id)
+            conn.commit()
+            divergencias_escrita = reconstruir_alteracoes_pendentes(conn, apenas_verificar=True)
+        finally:
+            conn.close()
+
+    logger.info(f"Referência: {len(esperado_ids)} registros em {tempo_referencia:.2f}s")
+    logger.info(f"Reconstrução (consulta única): {tempo_reconstrucao:.2f}s")
+    logger.info(f"Leitura da tabela materializada: {len(obtido_ids)} registros em {tempo_atual:.3f}s")
+
+    if divergencias_escrita['adicionados'] or divergencias_escrita['removidos']:
+        logger.error(f"Manutenção na escrita divergiu da reconstrução: {divergencias_escrita}")
+        return 1
+
+    if esperado_ids != obtido_ids or esperado_registros != obtido_registros:
+        faltando = set(esperado_ids) - set(obtido_ids)
+        sobrando = set(obtido_ids) - set(esperado_ids)
+        logger.error(f"Divergência: {len(faltando)} ausentes, {len(sobrando)} a mais")
+        logger.error(f"Exemplos ausentes: {sorted(faltando)[:10]} / a mais: {sorted(sobrando)[:10]}")
+        return 1
+
+    logger.info("Resultados idênticos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir a tabela registros_alteracoes_pendentes
+
+Recalcula, a partir do histórico, quais registros têm alterações pendentes
+pós SM/AE e sincroniza a tabela materializada. Com --verificar apenas compara
+a tabela com o cálculo completo (verificação de consistência) e sai com
+código 1 se houver divergência.
+
+Uso:
+    python scripts/reconstruir_alteracoes_pendentes.py [--verificar]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.alteracoes_pendentes import reconstruir_alteracoes_pendentes
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Reconstrói a tabela de alterações pendentes pós SM/AE")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Apenas verifica a consistência, sem alterar a tabela")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e a própria tabela) estejam aplicadas
+    inicializar_schema()
+
+    with get_db_connection() as conn:
+        resultado = reconstruir_alteracoes_pendentes(conn, apenas_verificar=args.verificar)
+
+    divergencias = len(resultado['adicionados']) + len(resultado['removidos'])
+    logger.info(f"Registros com alterações pendentes: {resultado['total']}")
+    if divergencias:
+        logger.warning(f"Ausentes na tabela: {resultado['adicionados'][:20]}")
+        logger.warning(f"Sobrando na tabela: {resultado['removidos'][:20]}")
+
+    if args.verificar:
+        if divergencias:
+            logger.error(f"Tabela inconsistente: {divergencias} divergência(s)")
+            return 1
+        logger.info("Tabela consistente com o histórico")
+    elif divergencias:
+        logger.info(f"Tabela sincronizada: {divergencias} correção(ões) aplicada(s)")
+    else:
+        logger.info("Nenhuma correção necessária")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
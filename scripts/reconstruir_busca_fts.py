@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir o índice de texto (FTS5) da busca global
+
+Recria os triggers e refaz registros_fts a partir da tabela registros. Com
+--verificar apenas confere o índice contra o conteúdo de registros e sai com
+código 1 se houver divergência.
+
+Uso:
+    python scripts/reconstruir_busca_fts.py [--verificar]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema, recarregar_schema
+from models.busca_fts import TABLE_REGISTROS_FTS, aplicar_registros_fts, verificar_registros_fts
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Reconstrói o índice de texto (FTS5) da busca global")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Apenas verifica a consistência, sem alterar o índice")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e o próprio índice) estejam aplicadas
+    schema = inicializar_schema()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        if args.verificar:
+            if not schema.tem_tabela(TABLE_REGISTROS_FTS):
+                logger.error("Índice de busca não existe (FTS5 indisponível?)")
+                return 1
+            if not verificar_registros_fts(cursor):
+                logger.error("Índice de busca inconsistente com a tabela registros")
+                return 1
+            logger.info("Índice de busca consistente com a tabela registros")
+            return 0
+
+        try:
+            indexados = aplicar_registros_fts(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao reconstruir o índice de busca: {e}")
+            return 1
+
+    recarregar_schema()
+    logger.info(f"Índice de busca reconstruído com {indexados} registros")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir o índice de identificadores normalizados
+
+Recria os triggers e refaz registros_identificadores (placa, carreta,
+containers, CPF, SM/AE, booking e lote) a partir da tabela registros. Com
+--verificar apenas compara as chaves gravadas com a normalização atual e sai
+com código 1 se houver divergência.
+
+Uso:
+    python scripts/reconstruir_identificadores.py [--verificar]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.identificadores import aplicar_identificadores, verificar_identificadores
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Reconstrói o índice de identificadores normalizados")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Apenas verifica a consistência, sem alterar o índice")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e o próprio índice) estejam aplicadas
+    inicializar_schema()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        if args.verificar:
+            divergencias = verificar_identificadores(cursor)
+            if divergencias:
+                logger.error(f"Índice de identificadores inconsistente em {len(divergencias)} registro(s) "
+                             f"(até 100): {divergencias[:20]}")
+                return 1
+            logger.info("Índice de identificadores consistente com a tabela registros")
+            return 0
+
+        try:
+            chaves = aplicar_identificadores(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao reconstruir o índice de identificadores: {e}")
+            return 1
+
+    logger.info(f"Índice de identificadores reconstruído com {chaves} chaves")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir os agregados diários e por hora de registros
+
+Refaz registros_rollup_dia, registros_rollup_hora e registros_sla_dia a partir da tabela
+registros (backfill) e recria os triggers que os mantêm. Com --verificar
+apenas compara as tabelas com uma recontagem completa e sai com código 1 se
+houver divergência.
+
+Uso:
+    python scripts/reconstruir_rollups.py [--verificar]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.rollups import aplicar_triggers_rollup, verificar_rollups
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Reconstrói os agregados diários e por hora de registros")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Apenas verifica a consistência, sem alterar as tabelas")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e as próprias tabelas) estejam aplicadas
+    inicializar_schema()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        if args.verificar:
+            divergencias = verificar_rollups(cursor)
+            for tabela, chave, atual, recontado in divergencias[:50]:
+                logger.warning(f"[{tabela}] {chave}: tabela={atual} recontagem={recontado}")
+            if divergencias:
+                logger.error(f"Agregados inconsistentes: {len(divergencias)} divergência(s)")
+                return 1
+            logger.info("Agregados consistentes com a tabela registros")
+            return 0
+
+        try:
+            resultado = aplicar_triggers_rollup(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao reconstruir os agregados: {e}")
+            return 1
+
+    logger.info(f"Agregados reconstruídos: {resultado['dias']} dia(s), {resultado['horas']} linha(s) por hora, "
+                f"{resultado['sla']} linha(s) de tempos (SLA)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script para verificar a tabela contadores
+
+Compara os valores mantidos pelos triggers na tabela contadores com uma
+recontagem completa da tabela registros e sai com código 1 se houver
+divergência. Com --corrigir recria os triggers e repopula a tabela.
+
+Uso:
+    python scripts/verificar_contadores.py [--corrigir]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.contadores import verificar_contadores, aplicar_triggers_contadores
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Verifica a tabela contadores contra uma recontagem completa")
+    parser.add_argument('--corrigir', action='store_true',
+                        help="Recria os triggers e repopula a tabela em caso de divergência")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e a própria tabela) estejam aplicadas
+    inicializar_schema()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        divergencias = verificar_contadores(cursor)
+
+        for grupo, nome, tabela, recontado in divergencias[:50]:
+            logger.warning(f"[{grupo or 'sem nível'}] {nome}: tabela={tabela} recontagem={recontado}")
+
+        if not divergencias:
+            logger.info("Tabela contadores consistente com a recontagem")
+            return 0
+
+        logger.error(f"Tabela contadores inconsistente: {len(divergencias)} divergência(s)")
+        if not args.corrigir:
+            return 1
+
+        try:
+            aplicar_triggers_contadores(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao corrigir a tabela contadores: {e}")
+            return 1
+
+        restantes = verificar_contadores(cursor)
+        if restantes:
+            logger.error(f"Ainda há {len(restantes)} divergência(s) após a correção")
+            return 1
+        logger.info("Tabela contadores repopulada e triggers recriados")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script para verificar as colunas canônicas de data
+
+Compara as colunas ``<coluna>_iso`` de registros e ``data_alteracao_epoch`` do
+histórico com a normalização das colunas originais e sai com código 1 se
+houver divergência. Com --corrigir recria os triggers e recalcula as colunas
+em lotes, com um commit por lote (não bloqueia o banco durante todo o
+preenchimento).
+
+Uso:
+    python scripts/verificar_datas_iso.py [--corrigir] [--lote N]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.datas_iso import (
+    verificar_datas_iso, preencher_datas_iso, sql_triggers_datas_iso,
+    TRIGGERS_DATAS_ISO, TAMANHO_LOTE_PREENCHIMENTO,
+)
+from models.historico_epoch import (
+    verificar_historico_epoch, preencher_historico_epoch, sql_triggers_historico_epoch,
+    TRIGGERS_HISTORICO_EPOCH,
+)
+
+def _recriar_triggers(cursor, nomes, sqls):
+    """Remove e recria os triggers de uma coluna canônica."""
+    for nome in nomes:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    for sql in sqls:
+        cursor.execute(sql)
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Verifica as colunas canônicas das datas de registros e do histórico")
+    parser.add_argument('--corrigir', action='store_true',
+                        help="Recria os triggers e recalcula as colunas em caso de divergência")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PREENCHIMENTO,
+                        help="Faixa de ids recalculada por commit")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e as próprias colunas) estejam aplicadas
+    inicializar_schema()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        divergencias = verificar_datas_iso(cursor)
+        divergencias_historico = verificar_historico_epoch(cursor)
+
+        for registro_id, coluna, atual, esperado in divergencias[:50]:
+            logger.warning(f"Registro {registro_id} {coluna}: _iso={atual!r} esperado={esperado!r}")
+        for historico_id, data_alteracao, atual, esperado in divergencias_historico[:50]:
+            logger.warning(f"Histórico {historico_id} ({data_alteracao!r}): epoch={atual!r} esperado={esperado!r}")
+
+        if not divergencias and not divergencias_historico:
+            logger.info("Colunas canônicas de data consistentes")
+            return 0
+
+        logger.error(
+            f"Colunas canônicas de data inconsistentes: {len(divergencias)} em registros, "
+            f"{len(divergencias_historico)} no histórico (até 100 por coluna)"
+        )
+        if not args.corrigir:
+            return 1
+
+        try:
+            atualizadas = 0
+            if divergencias:
+                _recriar_triggers(cursor, TRIGGERS_DATAS_ISO, sql_triggers_datas_iso())
+                conn.commit()
+                atualizadas += preencher_datas_iso(cursor, args.lote, ao_concluir_lote=conn.commit)
+            if divergencias_historico:
+                _recriar_triggers(cursor, TRIGGERS_HISTORICO_EPOCH, sql_triggers_historico_epoch())
+                conn.commit()
+                atualizadas += preencher_historico_epoch(cursor, args.lote, ao_concluir_lote=conn.commit)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao corrigir as colunas canônicas de data: {e}")
+            return 1
+
+        restantes = verificar_datas_iso(cursor) + verificar_historico_epoch(cursor)
+        if restantes:
+            logger.error(f"Ainda há {len(restantes)} divergência(s) após a correção")
+            return 1
+        logger.info(f"Triggers recriados e colunas recalculadas em {atualizadas} linhas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Script para verificar a tabela historico_campos
+
+Compara as linhas de historico_campos com o JSON de cada entrada do histórico
+e sai com código 1 se houver divergência. Com --corrigir recria os triggers e
+refaz a tabela em lotes (inclusive o reparo dos textos legados inválidos), com
+um commit por lote.
+
+Uso:
+    python scripts/verificar_historico_campos.py [--corrigir] [--lote N]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.historico_campos import (
+    verificar_historico_campos, preencher_historico_campos, sql_triggers_historico_campos,
+    TRIGGERS_HISTORICO_CAMPOS, TAMANHO_LOTE_PREENCHIMENTO,
+)
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Verifica a tabela historico_campos")
+    parser.add_argument('--corrigir', action='store_true',
+                        help="Recria os triggers e refaz a tabela em caso de divergência")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PREENCHIMENTO,
+                        help="Faixa de ids do histórico refeita por commit")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e a própria tabela) estejam aplicadas
+    inicializar_schema()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        divergencias = verificar_historico_campos(cursor)
+
+        if not divergencias:
+            logger.info("historico_campos consistente com o histórico")
+            return 0
+
+        logger.error(
+            f"historico_campos inconsistente em {len(divergencias)} entrada(s) do histórico (até 100): "
+            f"{divergencias[:20]}"
+        )
+        if not args.corrigir:
+            return 1
+
+        try:
+            for nome in TRIGGERS_HISTORICO_CAMPOS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+            for sql in sql_triggers_historico_campos():
+                cursor.execute(sql)
+            conn.commit()
+            criadas, reparadas = preencher_historico_campos(cursor, args.lote, ao_concluir_lote=conn.commit)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao refazer historico_campos: {e}")
+            return 1
+
+        restantes = verificar_historico_campos(cursor)
+        if restantes:
+            logger.error(f"Ainda há {len(restantes)} divergência(s) após a correção")
+            return 1
+        logger.info(f"Triggers recriados e historico_campos refeita com {criadas} linhas ({reparadas} entradas reparadas)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script para verificar o cache das alterações decodificadas do histórico
+
+Para as entradas do histórico com JSON inválido (textos legados), confere:
+
+- a forma canônica lida de historico_json é um JSON válido;
+- a decodificação, mesmo com o LRU do processo vazio, não consulta
+  ``sqlite_master`` (a existência da tabela vem do registro em memória do
+  schema);
+- a segunda leitura de cada entrada é atendida pelo LRU, sem nenhuma consulta
+  ao banco.
+
+Nada é gravado: as formas canônicas ausentes não são persistidas.
+
+Sai com código 1 se alguma verificação falhar.
+
+Uso:
+    python scripts/verificar_historico_json.py [--limite N]
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import get_db_connection
+from models.schema import inicializar_schema
+from models.historico_json import (
+    TABLE_HISTORICO_JSON, alteracoes_canonicas, alteracoes_decodificadas, limpar_cache_historico,
+)
+
+def conferir(condicao, mensagem):
+    if condicao:
+        logger.info(f"OK: {mensagem}")
+        return 0
+    logger.error(f"FALHA: {mensagem}")
+    return 1
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Verifica o cache das alterações decodificadas do histórico")
+    parser.add_argument('--limite', type=int, default=200, help="Entradas com JSON inválido examinadas")
+    args = parser.parse_args()
+
+    # Garantir que as migrações (e a tabela historico_json) estejam aplicadas
+    schema = inicializar_schema()
+    falhas = conferir(schema.tem_tabela(TABLE_HISTORICO_JSON), f"{TABLE_HISTORICO_JSON} no registro do schema")
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, alteracoes FROM historico
+            WHERE alteracoes IS NOT NULL AND alteracoes != '' AND NOT json_valid(alteracoes)
+            ORDER BY id LIMIT ?
+        """, (args.limite,))
+        entradas = cursor.fetchall()
+        logger.info(f"{len(entradas)} entradas com JSON inválido examinadas")
+
+        invalidas = []
+        for historico_id, texto in entradas:
+            canonico = alteracoes_canonicas(cursor, historico_id, texto, persistir=False)
+            if canonico is not None:
+                try:
+                    json.loads(canonico)
+                except ValueError:
+                    invalidas.append(historico_id)
+        falhas += conferir(not invalidas, f"formas canônicas válidas ({len(invalidas)} inválidas)")
+
+        comandos = []
+        conn.set_trace_callback(comandos.append)
+        try:
+            limpar_cache_historico()
+            for historico_id, texto in entradas:
+                alteracoes_decodificadas(cursor, historico_id, texto)
+            primeira = len(comandos)
+            metadados = [sql for sql in comandos if 'sqlite_master' in sql]
+            for historico_id, texto in entradas:
+                alteracoes_decodificadas(cursor, historico_id, texto)
+            repetida = len(comandos) - primeira
+        finally:
+            conn.set_trace_callback(None)
+            # A decodificação grava os reparos ausentes: nada deve ficar no banco
+            conn.rollback()
+
+        falhas += conferir(not metadados,
+                           f"decodificação com o LRU vazio sem consultar sqlite_master "
+                           f"({primeira} comandos, {len(metadados)} em sqlite_master)")
+        falhas += conferir(repetida == 0, f"decodificação repetida atendida pelo LRU ({repetida} comandos)")
+
+    if falhas:
+        logger.error(f"{falhas} verificação(ões) falharam")
+    else:
+        logger.info("Todas as verificações passaram")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
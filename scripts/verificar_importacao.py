@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Verifica a validação da importação em lote de registros
+
+Monta planilhas CSV de exemplo em memória e as importa em modo simulação
+(nada é gravado no banco), conferindo:
+
+- uma linha completa é aceita;
+- linhas sem algum campo obrigatório do novo registro (CLIENTE, CONTAINER 1)
+  são recusadas com o campo no erro, mesmo com a planilha do OneDrive ainda
+  não carregada (lista de obrigatórios dela vazia);
+- uma linha com CPF inválido é recusada;
+- uma planilha sem alguma coluna obrigatória (CAVALO) é recusada inteira.
+
+Sai com código 1 se alguma verificação falhar.
+
+Uso:
+    python scripts/verificar_importacao.py
+"""
+
+import io
+import os
+import sys
+import logging
+import argparse
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.excel import excel_processor
+from operations.importacao import importar_registros
+from operations.formularios import CAMPOS_OBRIGATORIOS_NOVO_REGISTRO
+
+CABECALHO = ['UNIDADE', 'CLIENTE', 'MOTORISTA', 'CPF MOTORISTA', 'CAVALO', 'CONTAINER 1', 'TIPO DE CARGA']
+LINHA_VALIDA = ['Suzano', 'CLIENTE TESTE', 'JOSE SILVA', '123.456.789-00', 'ABC1D23', 'MSCU1234567', 'GERAL']
+
+def gerar_csv(cabecalho, linhas):
+    """CSV com ';' (como o exportado pelo Excel em português)."""
+    texto = '\n'.join(';'.join(linha) for linha in [cabecalho] + linhas)
+    return io.BytesIO(texto.encode('utf-8'))
+
+def com_valor(campo, valor):
+    """Cópia da linha válida com ``campo`` trocado por ``valor``."""
+    linha = list(LINHA_VALIDA)
+    linha[CABECALHO.index(campo)] = valor
+    return linha
+
+def conferir(condicao, mensagem):
+    if condicao:
+        logger.info(f"OK: {mensagem}")
+        return 0
+    logger.error(f"FALHA: {mensagem}")
+    return 1
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Verifica a validação da importação em lote de registros")
+    parser.add_argument('--usuario', default='verificacao', help="Usuário informado na importação simulada")
+    args = parser.parse_args()
+
+    falhas = 0
+    logger.info(f"Obrigatórios da planilha do OneDrive: {excel_processor.CAMPOS_OBRIGATORIOS or 'nenhum (não carregada)'}; "
+                f"da importação: {', '.join(CAMPOS_OBRIGATORIOS_NOVO_REGISTRO)}")
+
+    linhas = [
+        LINHA_VALIDA,                                  # linha 2
+        com_valor('CLIENTE', ''),                      # linha 3
+        com_valor('CONTAINER 1', ''),                  # linha 4
+        com_valor('CPF MOTORISTA', '123.ABC.789-00'),  # linha 5
+    ]
+    relatorio = importar_registros(gerar_csv(CABECALHO, linhas), 'verificacao.csv', args.usuario, simular=True)
+    erros = {erro['linha']: '; '.join(erro['erros']) for erro in relatorio['erros']}
+
+    falhas += conferir(relatorio['linhas'] == 4 and relatorio['importados'] == 1 and 2 not in erros,
+                       "linha completa aceita")
+    falhas += conferir('CLIENTE' in erros.get(3, ''), f"linha sem CLIENTE recusada ({erros.get(3)})")
+    falhas += conferir('CONTAINER 1' in erros.get(4, ''), f"linha sem CONTAINER 1 recusada ({erros.get(4)})")
+    falhas += conferir('CPF MOTORISTA' in erros.get(5, ''), f"linha com CPF inválido recusada ({erros.get(5)})")
+
+    sem_cavalo = [campo for campo in CABECALHO if campo != 'CAVALO']
+    linha_sem_cavalo = [valor for campo, valor in zip(CABECALHO, LINHA_VALIDA) if campo != 'CAVALO']
+    try:
+        importar_registros(gerar_csv(sem_cavalo, [linha_sem_cavalo]), 'sem_cavalo.csv', args.usuario, simular=True)
+        falhas += conferir(False, "planilha sem a coluna CAVALO recusada")
+    except ValueError as e:
+        falhas += conferir('CAVALO' in str(e), f"planilha sem a coluna CAVALO recusada ({e})")
+
+    if falhas:
+        logger.error(f"{falhas} verificação(ões) falharam")
+    else:
+        logger.info("Todas as verificações passaram")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Script para verificar se as consultas quentes usam índices.
+
+Executa EXPLAIN QUERY PLAN em cada consulta de CONSULTAS_QUENTES e falha
+(código de saída 1) se alguma delas regredir para uma varredura completa
+da tabela (``SCAN tabela`` sem ``USING INDEX``) ou se o plano não usar os
+índices esperados para ela. Um índice pouco seletivo (só ``excluido``)
+também evita o SCAN, por isso não basta checar a ausência de varredura.
+
+Uso:
+    python scripts/verificar_indices.py [caminho_do_banco]
+
+As migrações pendentes são aplicadas antes da verificação, como no boot.
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import logging
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DB_PATH
+from models.migrations import aplicar_migracoes
+from utils.date_utils import epoch_data
+
+# Consultas quentes: (descrição, sql, parâmetros, índices esperados no plano)
+CONSULTAS_QUENTES = [
+    ("registros sem SM",
+     "SELECT COUNT(*) FROM registros WHERE (numero_sm IS NULL OR numero_sm = '') AND excluido = 0", (),
+     ('idx_registros_ativos_numero_sm',)),
+    ("registros sem AE",
+     "SELECT COUNT(*) FROM registros WHERE (numero_ae IS NULL OR numero_ae = '') AND excluido = 0", (),
+     ('idx_registros_ativos_numero_ae',)),
+    ("registros sem container",
+     "SELECT COUNT(*) FROM registros WHERE (container_1 IS NULL OR container_1 = '') AND excluido = 0", (),
+     ('idx_registros_ativos_container_1',)),
+    ("registros sem NF",
+     "SELECT COUNT(*) FROM registros WHERE (anexar_nf IS NULL OR anexar_nf = '') AND excluido = 0", (),
+     ('idx_registros_excluido_anexar_nf',)),
+    ("registros sem OS",
+     "SELECT COUNT(*) FROM registros WHERE (anexar_os IS NULL OR anexar_os = '') AND excluido = 0", (),
+     ('idx_registros_excluido_anexar_os',)),
+    ("registros por status SM",
+     "SELECT COUNT(*) FROM registros WHERE status_sm = 'Pendente' AND excluido = 0", (),
+     ('idx_registros_ativos_status_sm',)),
+    ("registros por unidade",
+     "SELECT * FROM registros WHERE unidade = ? AND excluido = 0", ('Rio de Janeiro',),
+     ('idx_registros_ativos_unidade',)),
+    ("unidades disponíveis",
+     "SELECT DISTINCT unidade FROM registros WHERE unidade IS NOT NULL AND unidade != '' AND excluido = 0", (),
+     ('idx_registros_ativos_unidade',)),
+    ("registros por período",
+     "SELECT * FROM registros WHERE data_registro_iso >= ? AND data_registro_iso <= ? AND excluido = 0",
+     ('2025-01-01', '2025-01-31 23:59:59'),
+     ('idx_registros_ativos_data_registro_iso',)),
+    ("registros modificados no período",
+     "SELECT COUNT(*) FROM registros WHERE data_modificacao_iso >= ? AND excluido = 0", ('2025-01-01',),
+     ('idx_registros_ativos_data_modificacao_iso',)),
+    ("dashboard por saída prevista",
+     """SELECT id FROM registros WHERE excluido = 0
+        ORDER BY CASE WHEN horario_previsto_iso IS NULL THEN 1 ELSE 0 END, horario_previsto_iso ASC, id ASC
+        LIMIT 20""", (),
+     ('idx_registros_ordem_saida',)),
+    ("registros com horário previsto",
+     "SELECT COUNT(*) FROM registros WHERE horario_previsto IS NOT NULL AND horario_previsto != '' AND excluido = 0", (),
+     ('idx_registros_excluido_horario_previsto',)),
+    ("busca por SM",
+     "SELECT * FROM registros WHERE numero_sm = ? AND excluido = 0", ('123',),
+     ('idx_registros_ativos_numero_sm',)),
+    ("busca por container",
+     "SELECT * FROM registros WHERE container_1 = ? AND excluido = 0", ('ABCU1234567',),
+     ('idx_registros_ativos_container_1',)),
+    ("histórico do registro",
+     "SELECT * FROM historico WHERE registro_id = ? ORDER BY data_alteracao_epoch DESC, id DESC", (1,),
+     ('idx_historico_registro_epoch',)),
+    ("histórico por período",
+     "SELECT COUNT(*) FROM historico WHERE data_alteracao_epoch >= ?", (epoch_data('2025-01-01'),),
+     ('idx_historico_data_alteracao_epoch',)),
+    ("histórico por usuário",
+     "SELECT * FROM historico WHERE alterado_por = ?", ('admin',),
+     ('idx_historico_alterado_por',)),
+    ("histórico junto com registros",
+     """SELECT r.id FROM registros r
+        JOIN historico h ON h.registro_id = r.id
+        WHERE r.numero_sm = ? AND r.excluido = 0""", ('123',),
+     ('idx_registros_ativos_numero_sm', 'idx_historico_registro_epoch')),
+    ("logs por período",
+     "SELECT * FROM logs_unificados WHERE data_hora >= ? ORDER BY data_hora DESC LIMIT 20", ('2025-01-01',),
+     ('idx_logs_unificados_data_hora',)),
+    ("logs por usuário",
+     "SELECT * FROM logs_unificados WHERE usuario = ? ORDER BY data_hora DESC", ('admin',),
+     ('idx_logs_unificados_usuario_data',)),
+    ("logs por ação",
+     "SELECT * FROM logs_unificados WHERE acao = ? ORDER BY data_hora DESC", ('LOGIN',),
+     ('idx_logs_unificados_acao_data',)),
+    ("logs por nível",
+     "SELECT * FROM logs_unificados WHERE nivel = ? ORDER BY data_hora DESC", ('admin',),
+     ('idx_logs_unificados_nivel_data',)),
+    ("sessão pelo session_id",
+     "SELECT * FROM sessoes_ativas WHERE session_id = ?", ('abc',),
+     ('sqlite_autoindex_sessoes_ativas_1',)),
+    ("limpeza de sessões inativas",
+     "SELECT COUNT(*) FROM sessoes_ativas WHERE last_activity < ?", (0,),
+     ('idx_sessoes_ativas_last_activity',)),
+]
+
+# "SCAN registros" ou "SCAN r" (com alias), sem "USING ... INDEX"
+PADRAO_SCAN_COMPLETO = re.compile(r'^SCAN (\w+)$')
+
+# "USING INDEX idx" ou "USING COVERING INDEX idx"
+PADRAO_INDICE_USADO = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+
+def plano_da_consulta(conn, sql, params):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN."""
+    cursor = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def verificar(conn):
+    """Verifica todas as consultas e retorna a lista de regressões."""
+    regressoes = []
+    for descricao, sql, params, esperados in CONSULTAS_QUENTES:
+        plano = plano_da_consulta(conn, sql, params)
+        scans = [linha for linha in plano if PADRAO_SCAN_COMPLETO.match(linha)]
+        usados = {m.group(1) for linha in plano for m in PADRAO_INDICE_USADO.finditer(linha)}
+        faltando = [indice for indice in esperados if indice not in usados]
+        if scans or faltando:
+            logger.error(f"[FALHA] {descricao}: {' | '.join(plano)}")
+            if faltando:
+                logger.error(f"        índice(s) esperado(s) fora do plano: {', '.join(faltando)}")
+            regressoes.append((descricao, plano))
+        else:
+            logger.info(f"[OK] {descricao}: {' | '.join(plano)}")
+    return regressoes
+
+
+def main():
+    """
+    Função principal
+    """
+    caminho = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    if not os.path.exists(caminho):
+        logger.error(f"Banco de dados não encontrado: {caminho}")
+        return 2
+
+    conn = sqlite3.connect(caminho)
+    try:
+        versao = aplicar_migracoes(conn)
+        logger.info(f"Schema na versão {versao}")
+        regressoes = verificar(conn)
+    finally:
+        conn.close()
+
+    if regressoes:
+        logger.error(f"{len(regressoes)} consulta(s) sem os índices esperados")
+        return 1
+    logger.info(f"Todas as {len(CONSULTAS_QUENTES)} consultas usam os índices esperados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Verifica o carregamento da planilha do OneDrive contra um servidor HTTP local
+
+Gera uma planilha de exemplo (aba principal com TIPO DE CARGA e aba PLACAS),
+serve-a num servidor HTTP local que responde 304 às requisições condicionais
+(ETag/Last-Modified) e confere:
+
+- importar operations.excel não inicia a thread de revalidação;
+- o primeiro download processa as abas e grava o cache local;
+- a revalidação sem mudanças recebe 304 e não reprocessa;
+- uma nova instância sobe com os dados do cache sem acessar a rede;
+- uma planilha alterada é baixada, reprocessada e o estado (imutável) é
+  trocado por inteiro;
+- a atualização em segundo plano revalida sozinha e ``solicitar_atualizacao``
+  não bloqueia.
+
+Uso:
+    python scripts/verificar_planilha_onedrive.py
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+from io import BytesIO
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Adicionar o diretório principal ao path para importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.excel import ExcelProcessor, EstadoPlanilha
+
+# Nome da thread de revalidação (não deve existir só por importar operations.excel)
+THREAD_ATUALIZACAO = 'atualizacao-planilha-onedrive'
+
+def gerar_planilha(motoristas, tipos_carga):
+    """Planilha de exemplo no formato da planilha do OneDrive."""
+    principal = pd.DataFrame({'CLIENTE': ['IBRAME'] * len(tipos_carga), 'TIPO DE CARGA': tipos_carga})
+    placas = pd.DataFrame({
+        'PLACA': [f"ABC1D{i:02d}" for i in range(len(motoristas))],
+        'MOTORISTA': motoristas,
+        'CPF': [f"123.456.789-{i:02d}" for i in range(len(motoristas))],
+        'CARRETA': [f"KRT2E{i:02d}" for i in range(len(motoristas))],
+    })
+    saida = BytesIO()
+    with pd.ExcelWriter(saida, engine='openpyxl') as writer:
+        principal.to_excel(writer, sheet_name='Página1', index=False)
+        placas.to_excel(writer, sheet_name='PLACAS', index=False)
+    return saida.getvalue()
+
+class ServidorPlanilha:
+    """Servidor HTTP local que imita o download da planilha (com ETag e 304)."""
+
+    def __init__(self, conteudo):
+        self.respostas = []
+        self.publicar(conteudo)
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.headers.get('If-None-Match') == servidor.etag:
+                    servidor.respostas.append(304)
+                    self.send_response(304)
+                    self.send_header('ETag', servidor.etag)
+                    self.end_headers()
+                    return
+                servidor.respostas.append(200)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+                self.send_header('Content-Length', str(len(servidor.conteudo)))
+                self.send_header('ETag', servidor.etag)
+                self.send_header('Last-Modified', servidor.last_modified)
+                self.end_headers()
+                self.wfile.write(servidor.conteudo)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/planilha.xlsx"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publicar(self, conteudo):
+        self.conteudo = conteudo
+        self.etag = '"' + hashlib.sha1(conteudo).hexdigest() + '"'
+        self.last_modified = formatdate(usegmt=True)
+
+    def parar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def conferir(condicao, mensagem):
+    if condicao:
+        logger.info(f"OK: {mensagem}")
+        return 0
+    logger.error(f"FALHA: {mensagem}")
+    return 1
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Verifica o cache e a revalidação da planilha do OneDrive")
+    parser.add_argument('--timeout', type=float, default=10, help="Espera máxima pela atualização em segundo plano")
+    args = parser.parse_args()
+
+    falhas = 0
+    falhas += conferir(all(thread.name != THREAD_ATUALIZACAO for thread in threading.enumerate()),
+                       "importação sem iniciar a thread de revalidação")
+    motoristas = ['JOSE SILVA', 'MARCOS OLIVEIRA', 'ANTONIO SOUZA']
+    servidor = ServidorPlanilha(gerar_planilha(motoristas, ['GERAL', 'PERIGOSA']))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_cache = os.path.join(diretorio, 'planilha_cache.json')
+
+        processador = ExcelProcessor(url=servidor.url, caminho_cache=caminho_cache, intervalo_atualizacao=0)
+        falhas += conferir(processador.load_data() and servidor.respostas == [200], "primeiro download (200)")
+        falhas += conferir(processador.COMBOBOX_OPTIONS.get('MOTORISTA') == motoristas, "motoristas da aba PLACAS")
+        falhas += conferir(processador.MOTORISTA_CPF_MAP.get('JOSE SILVA') == '12345678900', "mapa MOTORISTA -> CPF")
+        falhas += conferir(processador.COMBOBOX_OPTIONS.get('TIPO DE CARGA') == ['GERAL', 'PERIGOSA'],
+                           "tipos de carga da aba principal")
+        falhas += conferir(os.path.exists(caminho_cache), "cache gravado")
+
+        estado_anterior = processador.estado
+        falhas += conferir(processador.load_data() and servidor.respostas[-1] == 304, "revalidação sem mudança (304)")
+        falhas += conferir(processador.estado is estado_anterior, "planilha não reprocessada após 304")
+
+        # Nova instância: dados do cache, sem requisições
+        requisicoes = len(servidor.respostas)
+        do_cache = ExcelProcessor(url=servidor.url, caminho_cache=caminho_cache, intervalo_atualizacao=0)
+        falhas += conferir(len(servidor.respostas) == requisicoes, "inicialização sem acessar a rede")
+        falhas += conferir(do_cache.COMBOBOX_OPTIONS == processador.COMBOBOX_OPTIONS
+                           and do_cache.MOTORISTA_CPF_MAP == processador.MOTORISTA_CPF_MAP
+                           and do_cache.df.equals(processador.df) and do_cache.df_placas.equals(processador.df_placas),
+                           "tabelas do cache iguais às processadas")
+        falhas += conferir(do_cache.load_data() and servidor.respostas[-1] == 304,
+                           "validadores do cache usados na revalidação (304)")
+
+        # Planilha alterada
+        motoristas.append('PAULO SANTOS')
+        servidor.publicar(gerar_planilha(motoristas, ['GERAL', 'PERIGOSA', 'REFRIGERADA']))
+        estado_anterior = do_cache.estado
+        falhas += conferir(do_cache.load_data() and servidor.respostas[-1] == 200, "planilha alterada baixada (200)")
+        falhas += conferir(do_cache.COMBOBOX_OPTIONS.get('MOTORISTA') == motoristas, "dados novos aplicados")
+        falhas += conferir(do_cache.estado is not estado_anterior
+                           and estado_anterior.COMBOBOX_OPTIONS.get('MOTORISTA') == motoristas[:-1],
+                           "estado trocado por inteiro (o anterior fica intacto)")
+        try:
+            do_cache.estado.df = None
+            falhas += conferir(False, "estado imutável")
+        except AttributeError:
+            falhas += conferir(isinstance(do_cache.estado, EstadoPlanilha), "estado imutável")
+
+        # Atualização em segundo plano
+        servidor.publicar(gerar_planilha(motoristas + ['CARLOS PEREIRA'], ['GERAL']))
+        inicio = time.perf_counter()
+        em_segundo_plano = ExcelProcessor(url=servidor.url, caminho_cache=caminho_cache, intervalo_atualizacao=1)
+        falhas += conferir(em_segundo_plano._thread is None, "thread iniciada só por iniciar_atualizacao")
+        em_segundo_plano.iniciar_atualizacao()
+        em_segundo_plano.solicitar_atualizacao()
+        tempo_solicitacao = time.perf_counter() - inicio
+        falhas += conferir(tempo_solicitacao < 0.5, f"inicialização e solicitação sem bloquear ({tempo_solicitacao * 1000:.1f} ms)")
+
+        limite = time.time() + args.timeout
+        while time.time() < limite and 'CARLOS PEREIRA' not in em_segundo_plano.COMBOBOX_OPTIONS.get('MOTORISTA', []):
+            time.sleep(0.05)
+        falhas += conferir('CARLOS PEREIRA' in em_segundo_plano.COMBOBOX_OPTIONS.get('MOTORISTA', []),
+                           "planilha revalidada em segundo plano")
+
+        # Servidor fora do ar: os dados atuais continuam valendo
+        servidor.parar()
+        falhas += conferir(not em_segundo_plano.load_data()
+                           and 'CARLOS PEREIRA' in em_segundo_plano.COMBOBOX_OPTIONS.get('MOTORISTA', []),
+                           "falha no download mantém os dados anteriores")
+
+    if falhas:
+        logger.error(f"{falhas} verificação(ões) falharam")
+    else:
+        logger.info("Todas as verificações passaram")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import calendar
 from datetime import datetime
 
 # Formato padrão do projeto para datas
@@ -74,3 +75,63 @@ def ensure_date_format(date_str):
     if dt:
         return format_date(dt)
     return date_str
+
+# Formatos reconhecidos pelas colunas canônicas de data (models/datas_iso.py)
+FORMATOS_DATA_ISO = [
+    '%Y-%m-%d %H:%M:%S',  # YYYY-MM-DD HH:MM:SS
+    '%Y-%m-%d %H:%M',     # YYYY-MM-DD HH:MM
+    '%Y-%m-%dT%H:%M:%S',  # YYYY-MM-DDTHH:MM:SS
+    '%Y-%m-%dT%H:%M',     # YYYY-MM-DDTHH:MM
+    '%Y-%m-%d',           # YYYY-MM-DD
+    '%d-%m-%Y %H:%M:%S',  # DD-MM-YYYY HH:MM:SS (padrão do projeto)
+    '%d-%m-%Y %H:%M',     # DD-MM-YYYY HH:MM
+    '%d-%m-%Y',           # DD-MM-YYYY
+    '%d/%m/%Y %H:%M:%S',  # DD/MM/YYYY HH:MM:SS
+    '%d/%m/%Y %H:%M',     # DD/MM/YYYY HH:MM
+    '%d/%m/%Y - %H:%M',   # DD/MM/YYYY - HH:MM
+    '%d/%m/%Y',           # DD/MM/YYYY
+    '%H:%M:%S %d-%m-%Y',  # HH:MM:SS DD-MM-YYYY
+    '%H:%M %d-%m-%Y',     # HH:MM DD-MM-YYYY
+]
+
+def normalizar_data_iso(valor):
+    """
+    Normaliza uma data para 'YYYY-MM-DD HH:MM:SS', como as colunas ``_iso``
+    
+    Args:
+        valor: String em um dos FORMATOS_DATA_ISO (frações de segundo são
+            ignoradas) ou objeto datetime
+    
+    Returns:
+        str: Data normalizada ou None se não for uma data reconhecível
+    """
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    if not isinstance(valor, str):
+        return None
+    
+    texto = valor.strip().split('.')[0]
+    for fmt in FORMATOS_DATA_ISO:
+        try:
+            return datetime.strptime(texto, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    return None
+
+def epoch_data(valor):
+    """
+    Converte uma data para epoch, como ``historico.data_alteracao_epoch``
+    
+    O horário de parede é tratado como UTC (sem conversão de fuso), igual ao
+    ``strftime('%s', ...)`` do SQLite usado pela coluna.
+    
+    Args:
+        valor: String em um dos FORMATOS_DATA_ISO ou objeto datetime
+    
+    Returns:
+        int: Segundos desde 1970-01-01 ou None se não for uma data reconhecível
+    """
+    data_iso = normalizar_data_iso(valor)
+    if data_iso is None:
+        return None
+    return calendar.timegm(datetime.strptime(data_iso, '%Y-%m-%d %H:%M:%S').timetuple())
@@ -0,0 +1,223 @@
+"""
+Leitura por streaming de colunas selecionadas de arquivos .xlsx.
+
+O openpyxl (e o ``pd.read_excel`` que usa ele) converte todas as células de
+cada linha, mesmo no modo somente leitura, quando só interessam algumas
+colunas. Aqui o XML da aba é percorrido com ``iterparse`` e só as células das
+colunas pedidas são convertidas; as demais são descartadas sem leitura do
+valor. Os textos compartilhados e os estilos (para reconhecer datas) são
+lidos uma vez por arquivo.
+
+Os valores seguem a conversão do openpyxl com ``data_only=True``: textos,
+números (int quando inteiros), booleanos, datas (``datetime``) e None para
+células vazias ou com erro.
+"""
+
+import zipfile
+import posixpath
+from io import BytesIO
+from datetime import datetime
+from xml.etree.ElementTree import iterparse, fromstring
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils.cell import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import from_excel, CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_ROW = _NS + 'row'
+_C = _NS + 'c'
+_V = _NS + 'v'
+_IS = _NS + 'is'
+_T = _NS + 't'
+_R = _NS + 'r'
+_SI = _NS + 'si'
+
+_DIGITOS = '0123456789'
+
+
+def _texto_rico(elemento):
+    """Texto de um ``<si>``/``<is>``: ``<t>`` direto ou a junção dos trechos ``<r><t>``."""
+    t = elemento.find(_T)
+    if t is not None:
+        return t.text or ''
+    return ''.join(r.findtext(_T) or '' for r in elemento.findall(_R))
+
+
+def _numero(texto):
+    if '.' in texto or 'E' in texto or 'e' in texto:
+        return float(texto)
+    return int(texto)
+
+
+class LeitorXlsx:
+    """Arquivo .xlsx aberto para leitura de colunas por streaming.
+
+    Uso::
+
+        with LeitorXlsx(conteudo) as leitor:
+            colunas, linhas = leitor.ler_colunas('PLACAS', ['PLACA', 'CPF'])
+    """
+
+    def __init__(self, conteudo):
+        self._zip = zipfile.ZipFile(BytesIO(conteudo))
+        self._textos = None
+
+        relacoes = self._relacoes('xl/workbook.xml')
+        workbook = fromstring(self._zip.read('xl/workbook.xml'))
+
+        propriedades = workbook.find(_NS + 'workbookPr')
+        data1904 = propriedades is not None and propriedades.get('date1904') in ('1', 'true')
+        self.epoca = CALENDAR_MAC_1904 if data1904 else CALENDAR_WINDOWS_1900
+
+        # Abas na ordem do arquivo: nome -> caminho no pacote
+        self.abas = {}
+        for aba in workbook.iter(_NS + 'sheet'):
+            self.abas[aba.get('name')] = relacoes[aba.get(_NS_REL + 'id')][1]
+
+        self._caminho_textos = None
+        self._estilos_data = set()
+        for tipo, caminho in relacoes.values():
+            if tipo.endswith('/sharedStrings'):
+                self._caminho_textos = caminho
+            elif tipo.endswith('/styles'):
+                self._estilos_data = self._ler_estilos_data(caminho)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    @property
+    def nomes_abas(self):
+        return list(self.abas)
+
+    def _relacoes(self, parte):
+        """Relações de uma parte do pacote: id -> (tipo, caminho absoluto no zip)."""
+        diretorio, nome = posixpath.split(parte)
+        caminho_rels = posixpath.join(diretorio, '_rels', nome + '.rels')
+        relacoes = {}
+        for rel in fromstring(self._zip.read(caminho_rels)).iter(_NS_PKG_REL + 'Relationship'):
+            alvo = rel.get('Target')
+            if alvo.startswith('/'):
+                caminho = alvo.lstrip('/')
+            else:
+                caminho = posixpath.normpath(posixpath.join(diretorio, alvo))
+            relacoes[rel.get('Id')] = (rel.get('Type', ''), caminho)
+        return relacoes
+
+    def _ler_estilos_data(self, caminho):
+        """Índices dos estilos de célula (``cellXfs``) com formato de data/hora."""
+        estilos = fromstring(self._zip.read(caminho))
+        formatos = dict(BUILTIN_FORMATS)
+        num_fmts = estilos.find(_NS + 'numFmts')
+        if num_fmts is not None:
+            for fmt in num_fmts.findall(_NS + 'numFmt'):
+                formatos[int(fmt.get('numFmtId'))] = fmt.get('formatCode')
+
+        datas = set()
+        cell_xfs = estilos.find(_NS + 'cellXfs')
+        if cell_xfs is not None:
+            for indice, xf in enumerate(cell_xfs.findall(_NS + 'xf')):
+                formato = formatos.get(int(xf.get('numFmtId', 0)))
+                if formato and is_date_format(formato):
+                    datas.add(str(indice))
+        return datas
+
+    def _textos_compartilhados(self):
+        if self._textos is None:
+            self._textos = []
+            if self._caminho_textos:
+                with self._zip.open(self._caminho_textos) as arquivo:
+                    for _, elemento in iterparse(arquivo):
+                        if elemento.tag == _SI:
+                            self._textos.append(_texto_rico(elemento))
+                            elemento.clear()
+        return self._textos
+
+    def _valor(self, celula):
+        """Valor de uma célula (``<c>``), como o openpyxl com ``data_only=True``."""
+        tipo = celula.get('t')
+        if tipo == 'inlineStr':
+            elemento = celula.find(_IS)
+            return _texto_rico(elemento) if elemento is not None else None
+
+        texto = celula.findtext(_V)
+        if texto is None:
+            return None
+        if tipo == 's':
+            return self._textos_compartilhados()[int(texto)]
+        if tipo == 'str':
+            return texto
+        if tipo == 'b':
+            return texto == '1'
+        if tipo == 'e':
+            return None
+        if tipo == 'd':
+            return datetime.fromisoformat(texto.rstrip('Z'))
+
+        numero = _numero(texto)
+        if celula.get('s') in self._estilos_data:
+            return from_excel(numero, self.epoca)
+        return numero
+
+    def ler_colunas(self, aba, colunas):
+        """Lê só as ``colunas`` de uma aba; a primeira linha é o cabeçalho.
+
+        Args:
+            aba: Nome da aba ou posição (0 = primeira)
+            colunas: Nomes (do cabeçalho) das colunas desejadas
+
+        Returns:
+            tuple: (colunas encontradas na ordem de ``colunas``,
+                    lista de linhas com os valores dessas colunas)
+        """
+        nome = self.nomes_abas[aba] if isinstance(aba, int) else aba
+        caminho = self.abas[nome]
+        desejadas = set(colunas)
+
+        cabecalho = True  # a primeira linha lida é o cabeçalho
+        letras = {}  # letra da coluna -> posição no resultado
+        presentes = []
+        linhas = []
+        linha = {}
+        coluna = None  # última coluna vista na linha (para células sem referência)
+
+        with self._zip.open(caminho) as arquivo:
+            for _, elemento in iterparse(arquivo):
+                tag = elemento.tag
+                if tag == _C:
+                    referencia = elemento.get('r')
+                    if referencia is None:
+                        # Referência opcional: a célula vem logo após a anterior
+                        coluna = get_column_letter(column_index_from_string(coluna) + 1 if coluna else 1)
+                    else:
+                        coluna = referencia.rstrip(_DIGITOS)
+                    if cabecalho or coluna in letras:
+                        linha[coluna] = self._valor(elemento)
+                    elemento.clear()
+                elif tag == _ROW:
+                    if cabecalho:
+                        cabecalho = False
+                        # Primeira ocorrência de cada coluna desejada (na ordem do arquivo)
+                        posicoes = {}
+                        for letra, valor in linha.items():
+                            if valor in desejadas and valor not in posicoes:
+                                posicoes[valor] = letra
+                        presentes = [c for c in colunas if c in posicoes]
+                        letras = {posicoes[c]: indice for indice, c in enumerate(presentes)}
+                    elif linha:
+                        valores = [None] * len(presentes)
+                        for letra, valor in linha.items():
+                            valores[letras[letra]] = valor
+                        linhas.append(valores)
+                    linha = {}
+                    coluna = None
+                    elemento.clear()
+        return presentes, linhas
@@ -0,0 +1,80 @@
+import sqlite3
+import logging
+from functools import wraps
+
+from flask import g, has_request_context
+
+logger = logging.getLogger(__name__)
+
+def _chave_argumento(valor):
+    """
+    Converte um argumento em parte da chave do cache
+
+    Cursores e conexões são ignorados (o resultado não depende de qual
+    conexão do pool foi usada) e listas viram tuplas.
+    """
+    if isinstance(valor, (sqlite3.Cursor, sqlite3.Connection)):
+        return None
+    if isinstance(valor, list):
+        return tuple(valor)
+    return valor
+
+def memo_requisicao(func):
+    """
+    Decorator que memoriza o resultado da função durante a requisição atual
+
+    A chave é a função mais os argumentos; o cache fica em ``flask.g`` e é
+    descartado ao fim da requisição. Fora de um contexto de requisição (ou com
+    argumentos não hasheáveis) a função é chamada normalmente.
+
+    O valor memorizado é compartilhado entre as chamadas: quem chama não deve
+    alterá-lo.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not has_request_context():
+            return func(*args, **kwargs)
+
+        try:
+            chave = (
+                func.__module__,
+                func.__qualname__,
+                tuple(_chave_argumento(a) for a in args),
+                tuple(sorted((k, _chave_argumento(v)) for k, v in kwargs.items())),
+            )
+            hash(chave)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        cache = g.setdefault('_memo_requisicao', {})
+        if chave in cache:
+            g._memo_requisicao_hits = g.get('_memo_requisicao_hits', 0) + 1
+            return cache[chave]
+
+        g._memo_requisicao_misses = g.get('_memo_requisicao_misses', 0) + 1
+        resultado = func(*args, **kwargs)
+        cache[chave] = resultado
+        return resultado
+
+    return wrapper
+
+def limpar_memo_requisicao():
+    """
+    Descarta os valores memorizados na requisição atual (após uma escrita)
+    """
+    if has_request_context():
+        g.pop('_memo_requisicao', None)
+
+def estatisticas_memo_requisicao():
+    """
+    Retorna os acertos e faltas do cache da requisição atual
+
+    Returns:
+        dict: {'hits': int, 'misses': int}
+    """
+    if not has_request_context():
+        return {'hits': 0, 'misses': 0}
+    return {
+        'hits': g.get('_memo_requisicao_hits', 0),
+        'misses': g.get('_memo_requisicao_misses', 0),
+    }
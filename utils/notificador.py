@@ -0,0 +1,149 @@
+"""
+Notificador de alterações em registros para os fluxos Server-Sent Events.
+
+As rotas de escrita chamam ``notificar_alteracao_registro`` depois do commit e
+cada aba aberta em /gr/stream ou /comum/stream recebe o evento pela sua fila.
+O notificador é de processo: com vários processos (workers) cada um só enxerga
+as escritas feitas nele.
+"""
+
+import json
+import queue
+import logging
+import threading
+
+from utils.paginacao import limpar_cache_totais
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (segundos) entre comentários de keepalive quando não há eventos;
+# também é o prazo para detectar que o cliente desconectou
+INTERVALO_KEEPALIVE = 25
+
+# Eventos acumulados por inscrito; uma fila cheia descarta os eventos novos
+# (os contadores se corrigem na próxima leitura)
+TAMANHO_MAXIMO_FILA = 500
+
+# Tempo (ms) que o navegador espera antes de reconectar
+TEMPO_RECONEXAO_MS = 5000
+
+_lock = threading.Lock()
+_inscritos = set()
+_versao = 0  # incrementada a cada alteração notificada
+
+
+def inscrever():
+    """Registra um novo inscrito e retorna a fila de eventos dele."""
+    fila = queue.Queue(maxsize=TAMANHO_MAXIMO_FILA)
+    with _lock:
+        _inscritos.add(fila)
+    return fila
+
+
+def cancelar_inscricao(fila):
+    """Remove o inscrito (cliente desconectou)."""
+    with _lock:
+        _inscritos.discard(fila)
+
+
+def total_inscritos():
+    with _lock:
+        return len(_inscritos)
+
+
+def versao_alteracoes():
+    """Contador de alterações notificadas neste processo (muda a cada escrita).
+
+    Permite que caches derivados de registros percebam que ficaram velhos sem
+    consultar o banco.
+    """
+    return _versao
+
+
+def notificar_alteracao_registro(registro_id, acao='alterado'):
+    """Avisa todos os inscritos que um registro mudou.
+
+    Deve ser chamada depois do commit, para que a releitura dos contadores já
+    enxergue a alteração.
+
+    Args:
+        registro_id: ID do registro criado, alterado ou excluído
+        acao: 'criado', 'alterado', 'excluido' ou 'verificado'
+    """
+    global _versao
+
+    try:
+        evento = {'registro_id': int(registro_id), 'acao': acao}
+    except (TypeError, ValueError):
+        logger.error(f"ID de registro inválido na notificação: {registro_id}")
+        return
+
+    # Os totais de paginação em cache deixam de valer com a alteração
+    limpar_cache_totais()
+
+    with _lock:
+        _versao += 1
+        inscritos = list(_inscritos)
+    for fila in inscritos:
+        try:
+            fila.put_nowait(evento)
+        except queue.Full:
+            logger.warning("Fila de eventos cheia; evento descartado para um inscrito")
+
+
+def formatar_evento(nome, dados):
+    """Serializa um evento no formato text/event-stream."""
+    return f"event: {nome}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+def fluxo_eventos(ler_contadores):
+    """Gerador do corpo de uma resposta SSE.
+
+    Envia os contadores completos na conexão e, a cada lote de notificações,
+    um evento ``registro`` por registro alterado seguido de um evento
+    ``contadores`` só com os valores que mudaram (nada é enviado se nenhum
+    contador mudou).
+
+    Args:
+        ler_contadores: Função sem argumentos que retorna o dict de contadores.
+            Roda fora do contexto da requisição: deve abrir a própria conexão.
+    """
+    fila = inscrever()
+    try:
+        ultimos = ler_contadores()
+        yield f"retry: {TEMPO_RECONEXAO_MS}\n\n"
+        yield formatar_evento('contadores', ultimos)
+
+        while True:
+            try:
+                eventos = [fila.get(timeout=INTERVALO_KEEPALIVE)]
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+
+            # Agrupar as notificações que chegaram juntas numa única releitura
+            while True:
+                try:
+                    eventos.append(fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            vistos = set()
+            for evento in eventos:
+                chave = (evento['registro_id'], evento['acao'])
+                if chave not in vistos:
+                    vistos.add(chave)
+                    yield formatar_evento('registro', evento)
+
+            try:
+                atuais = ler_contadores()
+            except Exception as e:
+                logger.error(f"Erro ao ler contadores para o fluxo de eventos: {e}")
+                continue
+
+            delta = {nome: valor for nome, valor in atuais.items() if ultimos.get(nome) != valor}
+            if delta:
+                ultimos = atuais
+                yield formatar_evento('contadores', delta)
+    finally:
+        cancelar_inscricao(fila)
@@ -0,0 +1,172 @@
+"""
+Paginação por chave (keyset) com cursores opacos e total em cache.
+
+Com ``LIMIT ? OFFSET ?`` o SQLite precisa percorrer e descartar todas as linhas
+anteriores à página, então a página 200 custa 200 vezes a página 1. Aqui os
+links de anterior/próxima levam um cursor com os valores da chave de ordenação
+da primeira/última linha exibida e a consulta seguinte começa direto nela
+(``WHERE (chave) < (?)``), usando o índice da ordenação.
+
+Saltos diretos para uma página numerada (sem cursor) continuam usando OFFSET.
+O ``COUNT(*)`` usado para o total de páginas fica em cache por alguns segundos.
+"""
+
+import json
+import time
+import base64
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Tempo (segundos) que o total de linhas de uma consulta fica em cache
+TEMPO_CACHE_TOTAL = 30
+
+# Quantidade máxima de consultas distintas no cache de totais
+MAXIMO_CACHE_TOTAL = 256
+
+_lock_totais = threading.Lock()
+_cache_totais = {}
+
+
+def codificar_cursor(direcao, valores):
+    """Gera o token opaco de um cursor.
+
+    Args:
+        direcao: 'proximo' (linhas depois da chave) ou 'anterior' (linhas antes)
+        valores: Valores da chave de ordenação da linha de referência
+    """
+    dados = json.dumps({'d': direcao, 'v': list(valores)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token, tamanho_chave):
+    """Lê um token gerado por ``codificar_cursor``.
+
+    Returns:
+        tuple: (direcao, valores) ou None se o token for inválido
+    """
+    if not token:
+        return None
+    try:
+        preenchimento = '=' * (-len(token) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(token + preenchimento).decode('utf-8'))
+        direcao = dados['d']
+        valores = dados['v']
+    except Exception as e:
+        logger.warning(f"Cursor de paginação inválido ignorado: {e}")
+        return None
+
+    if direcao not in ('proximo', 'anterior') or not isinstance(valores, list) or len(valores) != tamanho_chave:
+        logger.warning("Cursor de paginação com formato inesperado ignorado")
+        return None
+    if not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in valores):
+        logger.warning("Cursor de paginação com valores inválidos ignorado")
+        return None
+    return direcao, valores
+
+
+def total_em_cache(chave):
+    """Total guardado para ``chave`` (None se ausente ou expirado)."""
+    with _lock_totais:
+        item = _cache_totais.get(chave)
+        if item and item[0] > time.monotonic():
+            return item[1]
+    return None
+
+
+def guardar_total(chave, total):
+    """Guarda o total de ``chave`` por TEMPO_CACHE_TOTAL segundos."""
+    with _lock_totais:
+        if len(_cache_totais) >= MAXIMO_CACHE_TOTAL:
+            _cache_totais.clear()
+        _cache_totais[chave] = (time.monotonic() + TEMPO_CACHE_TOTAL, total)
+
+
+def contar_com_cache(cursor, sql, params=()):
+    """Executa um ``SELECT COUNT(*)`` guardando o resultado por TEMPO_CACHE_TOTAL segundos."""
+    chave = (sql, tuple(params))
+    total = total_em_cache(chave)
+    if total is not None:
+        return total
+
+    cursor.execute(sql, list(params))
+    total = cursor.fetchone()[0]
+    guardar_total(chave, total)
+    return total
+
+
+def limpar_cache_totais():
+    """Descarta os totais em cache (após gravações que mudam as contagens)."""
+    with _lock_totais:
+        _cache_totais.clear()
+
+
+def paginar_keyset(cursor, colunas, tabela, where_sql, params, chave, token, page, per_page, descendente=True):
+    """Busca uma página ordenada pela chave, a partir do cursor quando houver.
+
+    Args:
+        cursor: Cursor do banco
+        colunas: Lista de colunas do SELECT (ex.: ``*``)
+        tabela: Tabela consultada
+        where_sql: Condições da consulta (sem a palavra WHERE)
+        params: Parâmetros das condições
+        chave: Lista de expressões SQL da ordenação; a última deve ser única
+            (ex.: id) e nenhuma pode ser NULL, senão a comparação por linha
+            descarta registros
+        token: Cursor recebido na URL (ou None para usar OFFSET)
+        page: Número da página exibida (usado no OFFSET quando não há cursor)
+        per_page: Linhas por página
+        descendente: Ordenação DESC (True) ou ASC (False) em todas as colunas
+
+    Returns:
+        tuple: (linhas como dicts, cursor_anterior, cursor_proximo)
+    """
+    aliases = [f"_chave_{i}" for i in range(len(chave))]
+    colunas_chave = ", ".join(f"{expr} AS {alias}" for expr, alias in zip(chave, aliases))
+    tupla_chave = "(" + ", ".join(chave) + ")"
+    marcadores = "(" + ", ".join("?" for _ in chave) + ")"
+
+    cursor_lido = decodificar_cursor(token, len(chave))
+    voltar = cursor_lido is not None and cursor_lido[0] == 'anterior'
+
+    # Voltando uma página a ordem e a comparação se invertem; o resultado é
+    # reordenado no final
+    ordem_desc = descendente != voltar
+    direcao_sql = "DESC" if ordem_desc else "ASC"
+    order_by = ", ".join(f"{expr} {direcao_sql}" for expr in chave)
+
+    condicoes = where_sql
+    consulta_params = list(params)
+    if cursor_lido:
+        condicoes = f"({where_sql}) AND {tupla_chave} {'<' if ordem_desc else '>'} {marcadores}"
+        consulta_params.extend(cursor_lido[1])
+
+    sql = f"SELECT {colunas}, {colunas_chave} FROM {tabela} WHERE {condicoes} ORDER BY {order_by} LIMIT ?"
+    consulta_params.append(per_page + 1)
+    if not cursor_lido:
+        sql += " OFFSET ?"
+        consulta_params.append(max(page - 1, 0) * per_page)
+
+    cursor.execute(sql, consulta_params)
+    nomes = [d[0] for d in cursor.description]
+    linhas = [dict(zip(nomes, row)) for row in cursor.fetchall()]
+
+    ha_mais = len(linhas) > per_page
+    linhas = linhas[:per_page]
+    if voltar:
+        linhas.reverse()
+
+    chaves = [[linha.pop(alias) for alias in aliases] for linha in linhas]
+    if not linhas:
+        return linhas, None, None
+
+    if voltar:
+        tem_anterior, tem_proximo = ha_mais, True
+    else:
+        tem_anterior = bool(cursor_lido) or page > 1
+        tem_proximo = ha_mais
+
+    cursor_anterior = codificar_cursor('anterior', chaves[0]) if tem_anterior else None
+    cursor_proximo = codificar_cursor('proximo', chaves[-1]) if tem_proximo else None
+    return linhas, cursor_anterior, cursor_proximo